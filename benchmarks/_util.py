@@ -0,0 +1,47 @@
+"""Shared helpers for the benchmark scripts.
+
+Each ``bench_*.py`` module defines ``bench_<name>()`` functions. A bench
+function performs its setup and returns a zero-argument callable; only
+that callable is timed.
+"""
+
+import os
+import sys
+import timeit
+from typing import Any, Callable, Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def time_callable(func: Callable[[], Any], repeat: int = 5) -> float:
+    """Return the best per-call time of ``func`` in seconds."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def collect(namespace: Dict[str, Any]) -> List[Tuple[str, Callable[[], Callable[[], Any]]]]:
+    """Return the ``bench_*`` functions defined in a module namespace."""
+    return [(name[len("bench_"):], func) for name, func in namespace.items()
+            if name.startswith("bench_") and callable(func)]
+
+
+def format_time(seconds: float) -> str:
+    """Format a duration with a sensible unit."""
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:8.2f} {unit}"
+    return f"{seconds / 1e-9:8.2f} ns"
+
+
+def run_module(namespace: Dict[str, Any]) -> Dict[str, float]:
+    """Run and print every benchmark in a module namespace."""
+    results = {}
+    for name, factory in collect(namespace):
+        results[name] = time_callable(factory())
+        print(f"{name:<40} {format_time(results[name])}")
+    return results
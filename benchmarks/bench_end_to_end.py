@@ -0,0 +1,83 @@
+"""Benchmark client round trips against the local mock server.
+
+The server runs in this process, so timings include its share of the
+work and of the GIL; they track the client's end-to-end cost, not the
+latency of the real cloud.
+
+Run with ``python benchmarks/bench_end_to_end.py [units]``.
+"""
+
+import atexit
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from _util import run_module
+
+from systemair_api.api.systemair_api import SystemairAPI
+from systemair_api.api.websocket_client import SystemairWebSocket
+from systemair_api.auth.authenticator import SystemairAuthenticator
+from systemair_api.models.ventilation_unit import VentilationUnit
+from systemair_api.testing import DEFAULT_EMAIL, DEFAULT_PASSWORD, MockSystemairServer, SimulatedBackend
+
+UNITS = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+POLL_WORKERS = 4
+
+_SERVER = MockSystemairServer(SimulatedBackend(units=UNITS, seed=1), seed=1)
+_SERVER.start()
+_SERVER.install()
+atexit.register(_SERVER.stop)
+
+_API = SystemairAPI(SystemairAuthenticator(DEFAULT_EMAIL, DEFAULT_PASSWORD).authenticate(), requests.Session())
+_UNITS = {device["identifier"]: VentilationUnit(device["identifier"], device["name"])
+          for device in _API.get_account_devices()["data"]["GetAccountDevices"]}
+
+
+def _poll(identifier):
+    _UNITS[identifier].update_from_api(_API.fetch_device_status(identifier))
+
+
+def bench_login():
+    return lambda: SystemairAuthenticator(DEFAULT_EMAIL, DEFAULT_PASSWORD).authenticate()
+
+
+def bench_poll_one_unit():
+    identifier = next(iter(_UNITS))
+    return lambda: _poll(identifier)
+
+
+def bench_poll_cycle_all_units():
+    executor = ThreadPoolExecutor(POLL_WORKERS)
+    atexit.register(executor.shutdown)
+    return lambda: list(executor.map(_poll, _UNITS))
+
+
+def bench_websocket_ingest_all_units():
+    received = {"count": 0}
+    done = threading.Event()
+
+    def on_message(message):
+        _UNITS[message["properties"]["id"]].update_from_websocket(message)
+        received["count"] += 1
+        if received["count"] == len(_UNITS):
+            done.set()
+
+    websocket = SystemairWebSocket(_API.access_token, on_message)
+    websocket.connect()
+    atexit.register(_SERVER.close_streams)
+    while _SERVER.stream_count() == 0:
+        done.wait(0.01)
+
+    def run():
+        received["count"] = 0
+        done.clear()
+        _SERVER.drift(identifiers=_UNITS)
+        if not done.wait(30):
+            raise RuntimeError("WebSocket messages were not received")
+    return run
+
+
+if __name__ == "__main__":
+    print(f"{UNITS} units, {POLL_WORKERS} poll workers")
+    run_module(globals())
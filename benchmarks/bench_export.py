@@ -0,0 +1,59 @@
+"""Benchmark exporting fleet state and history to Arrow record batches.
+
+Run with ``python benchmarks/bench_export.py`` (requires pyarrow). The
+``status_rows`` bench is the conversion this replaces: building a table
+from ``get_status()`` dicts row by row.
+"""
+
+import sys
+
+from _util import run_module
+
+from systemair_api.models import export
+from systemair_api.models.changes import FieldChange
+from systemair_api.models.fleet import Fleet
+from systemair_api.models.history import HISTORY_FIELDS
+from systemair_api.models.telemetry_log import TelemetrySample
+from systemair_api.models.ventilation_unit import VentilationUnit
+
+try:
+    export.fleet_schema()
+except ImportError:
+    sys.exit("pyarrow is not installed")
+
+UNITS = 10000
+
+
+def _fleet():
+    fleet = Fleet()
+    units = []
+    for i in range(UNITS):
+        unit = VentilationUnit(f"IAM_{i:012d}", f"Unit {i}")
+        unit.user_mode = i % 5
+        unit.co2 = 400 + i % 800
+        unit.temperatures["oat"] = (i % 300) / 10.0
+        units.append(unit)
+    fleet.add_many(units, updated_at=[1700000000.0] * UNITS)
+    return fleet
+
+
+_FLEET = _fleet()
+
+
+def bench_fleet_batches_10000_units():
+    return lambda: list(export.fleet_batches(_FLEET))
+
+
+def bench_status_rows_10000_units():
+    return lambda: export.pa.Table.from_pylist([unit.get_status() for unit in _FLEET])
+
+
+def bench_history_batches_100000_samples():
+    samples = [TelemetrySample(1700000000.0 + i, f"IAM_{i % 100:012d}", HISTORY_FIELDS[i % len(HISTORY_FIELDS)],
+                               float(i), "api")
+               for i in range(100000)]
+    return lambda: list(export.history_batches(samples))
+
+
+if __name__ == "__main__":
+    run_module(globals())
@@ -0,0 +1,70 @@
+"""Benchmark scraping the Prometheus exporter for a large fleet.
+
+Run with ``python benchmarks/bench_exporter.py [count]``. Scrapes are timed
+without changes (cached text), after 1% of the units changed, and after
+every unit changed.
+"""
+
+import sys
+
+from _util import run_module
+
+from systemair_api.exporter import PrometheusExporter
+from systemair_api.models.changes import FieldChange
+from systemair_api.models.ventilation_unit import VentilationUnit
+
+COUNT = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+
+
+def _exporter():
+    exporter = PrometheusExporter(functions=False, client_metrics=False)
+    for i in range(COUNT):
+        unit = VentilationUnit(f"IAM_{i:012d}", f"Unit {i}")
+        unit.co2 = 400 + i % 800
+        unit.temperatures["oat"] = (i % 300) / 10.0
+        exporter.attach(unit)
+    exporter.render()
+    return exporter
+
+
+_EXPORTER = _exporter()
+_IDENTIFIERS = [f"IAM_{i:012d}" for i in range(COUNT)]
+
+
+def _changing(every):
+    state = {"t": 0}
+
+    def run():
+        state["t"] += 1
+        for identifier in _IDENTIFIERS[::every]:
+            _EXPORTER.record(identifier, [FieldChange("co2", None, 400 + state["t"] % 800, "websocket", 0.0)])
+        return _EXPORTER.render()
+    return run
+
+
+def bench_scrape_unchanged():
+    return _EXPORTER.render
+
+
+def bench_scrape_1_percent_changed():
+    return _changing(100)
+
+
+def bench_scrape_all_changed():
+    return _changing(1)
+
+
+def bench_record_change_set():
+    changes = [FieldChange("co2", None, 810, "websocket", 0.0), FieldChange("temperatures.oat", None, 4.5, "api", 0.0)]
+    state = {"v": 0.0}
+
+    def run():
+        state["v"] += 1
+        changes[0] = FieldChange("co2", None, state["v"], "websocket", state["v"])
+        _EXPORTER.record("IAM_000000000001", changes)
+    return run
+
+
+if __name__ == "__main__":
+    run_module(globals())
+    print(f"{len(_EXPORTER.render()) / 1e6:.2f} MB of exposition text for {COUNT} units")
@@ -0,0 +1,51 @@
+"""Benchmark fleet-wide queries over 50,000 units.
+
+Run with ``python benchmarks/bench_fleet.py``. Queries use NumPy when it is
+installed and pure Python otherwise.
+"""
+
+from _util import run_module
+from payloads import websocket_message
+
+from systemair_api.models.fleet import Fleet
+from systemair_api.models.ventilation_unit import VentilationUnit
+
+FLEET_SIZE = 50000
+
+_fleet = None
+
+
+def _get_fleet():
+    global _fleet
+    if _fleet is None:
+        _fleet = Fleet()
+        for i in range(FLEET_SIZE):
+            device_id = f"IAM_{i:012d}"
+            _fleet.add(VentilationUnit(device_id, f"Unit {i}"), site=f"site-{i % 40}")
+            _fleet.update_from_websocket(websocket_message(device_id, seed=i))
+    return _fleet
+
+
+def bench_filter_co2():
+    fleet = _get_fleet()
+    return lambda: fleet.filter("co2", ">", 1000)
+
+
+def bench_aggregate_oat_by_site():
+    fleet = _get_fleet()
+    return lambda: fleet.aggregate("oat", "mean", by_site=True)
+
+
+def bench_top_k_co2():
+    fleet = _get_fleet()
+    return lambda: fleet.top_k("co2", 10)
+
+
+def bench_loop_units_co2():
+    """The plain dict-of-units loop the Fleet queries replace."""
+    units = {unit.identifier: unit for unit in _get_fleet()}
+    return lambda: [identifier for identifier, unit in units.items() if unit.co2 is not None and unit.co2 > 1000]
+
+
+if __name__ == "__main__":
+    run_module(globals())
@@ -0,0 +1,54 @@
+"""Benchmark recording and reading unit history in ring buffers.
+
+Run with ``python benchmarks/bench_history.py``.
+"""
+
+from _util import run_module
+
+from systemair_api.models.changes import FieldChange
+from systemair_api.models.history import HistoryStore, RingBuffer
+
+DAY_SAMPLES = 8640  # One sample every 10 seconds for 24 hours
+
+
+def _full_buffer():
+    buffer = RingBuffer(DAY_SAMPLES)
+    for i in range(DAY_SAMPLES + 100):
+        buffer.append(i * 10.0, 20.0 + (i % 50) / 10.0)
+    return buffer
+
+
+def bench_append():
+    buffer = _full_buffer()
+    state = {"t": buffer.latest()[0]}
+
+    def run():
+        state["t"] += 10.0
+        buffer.append(state["t"], 21.5)
+    return run
+
+
+def bench_record_change_set():
+    store = HistoryStore(capacity=DAY_SAMPLES)
+    state = {"t": 0.0}
+
+    def run():
+        state["t"] += 10.0
+        store.record("IAM_1", [FieldChange("co2", 800, 810, "websocket", state["t"]),
+                               FieldChange("temperatures.oat", 4.5, 4.6, "websocket", state["t"])])
+    return run
+
+
+def bench_range_last_hour():
+    buffer = _full_buffer()
+    end = buffer.latest()[0]
+    return lambda: buffer.range(end - 3600, end)
+
+
+def bench_downsample_day_15min():
+    buffer = _full_buffer()
+    return lambda: buffer.downsample(900)
+
+
+if __name__ == "__main__":
+    run_module(globals())
@@ -0,0 +1,37 @@
+"""Benchmark login form extraction on a saved Keycloak login page.
+
+Run with ``python benchmarks/bench_login_form.py``.
+"""
+
+import os
+import subprocess
+import sys
+
+from _util import DATA_DIR, run_module
+
+from systemair_api.auth.login_form import parse_login_form, parse_login_form_bs4
+
+with open(os.path.join(DATA_DIR, "keycloak_login.html"), "rb") as f:
+    PAGE = f.read()
+
+
+def bench_login_form_stdlib():
+    html = PAGE.decode("utf-8")
+    return lambda: parse_login_form(html)
+
+
+def bench_login_form_bs4():
+    return lambda: parse_login_form_bs4(PAGE)
+
+
+def _import_time(module: str) -> float:
+    """Time a cold import of ``module`` in a fresh interpreter."""
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    best = min(float(subprocess.check_output([sys.executable, "-c", code])) for _ in range(5))
+    return best
+
+
+if __name__ == "__main__":
+    run_module(globals())
+    print(f"{'import html.parser':<40} {_import_time('html.parser') * 1e3:8.2f} ms")
+    print(f"{'import bs4':<40} {_import_time('bs4') * 1e3:8.2f} ms")
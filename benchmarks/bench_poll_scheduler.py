@@ -0,0 +1,88 @@
+"""Compare fixed-interval polling with the adaptive PollScheduler in a simulated fleet.
+
+Run with ``python benchmarks/bench_poll_scheduler.py [count]``. The
+simulation runs one hour of virtual time with a mix of units: a tenth
+change every 20 seconds, half are kept fresh by WebSocket updates every
+minute and the rest are idle. It reports the requests made and the mean
+staleness: how long a change on the device goes unseen, sampled every
+second over all units.
+"""
+
+import random
+import sys
+
+from _util import run_module
+
+from systemair_api.api.poll_scheduler import PollScheduler
+
+DURATION = 3600
+FIXED_INTERVAL = 60
+
+
+def _profiles(count):
+    rng = random.Random(1)
+    profiles = []
+    for i in range(count):
+        kind = "fast" if i % 10 == 0 else "pushed" if i % 2 else "idle"
+        profiles.append((f"IAM_{i:012d}", kind, rng.randrange(60)))
+    return profiles
+
+
+def _changes(kind, since, now):
+    """Number of changes a unit went through in (since, now]."""
+    if kind == "fast":
+        return int(now // 20) - int(since // 20)
+    return 0
+
+
+def simulate(count, adaptive):
+    profiles = _profiles(count)
+    scheduler = PollScheduler(requests_per_minute=count, min_interval=20, max_interval=900, clock=lambda: 0.0)
+    last_data = {}
+    for identifier, _, _ in profiles:
+        scheduler.add(identifier, now=0.0)
+        last_data[identifier] = 0.0
+    kinds = {identifier: kind for identifier, kind, _ in profiles}
+    requests = 0
+    stale_total = 0.0
+    for now in range(1, DURATION + 1):
+        now = float(now)
+        for identifier, kind, offset in profiles:
+            if kind == "pushed" and (now + offset) % 60 == 0:
+                scheduler.record_update(identifier, 0, now=now)
+                last_data[identifier] = now
+        if adaptive:
+            due = scheduler.due(now=now)
+        else:
+            due = [identifier for identifier, _, offset in profiles if (now + offset) % FIXED_INTERVAL == 0]
+        for identifier in due:
+            requests += 1
+            scheduler.record_poll(identifier, _changes(kinds[identifier], last_data[identifier], now), now=now)
+            last_data[identifier] = now
+        for identifier, kind, _ in profiles:
+            seen = last_data[identifier]
+            if _changes(kind, seen, now):
+                stale_total += now - (int(seen // 20) + 1) * 20
+    return requests, stale_total / (DURATION * count)
+
+
+def bench_due_50000_units():
+    scheduler = PollScheduler(requests_per_minute=10 ** 9, burst=10 ** 9, min_interval=1, max_interval=1,
+                              clock=lambda: 0.0)
+    for i in range(50000):
+        scheduler.add(f"IAM_{i:012d}", now=0.0)
+    state = {"now": 0.0}
+
+    def run():
+        state["now"] += 1.0
+        for identifier in scheduler.due(limit=1000, now=state["now"]):
+            scheduler.record_poll(identifier, 0, now=state["now"])
+    return run
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    run_module(globals())
+    for label, adaptive in (("fixed 60 s", False), ("adaptive", True)):
+        requests, staleness = simulate(count, adaptive)
+        print(f"{label:<12} {requests:8d} requests/hour, mean staleness {staleness:6.2f} s")
@@ -0,0 +1,48 @@
+"""Benchmark RegisterConstants lookups and register metadata decoding.
+
+Run with ``python benchmarks/bench_register_constants.py``.
+"""
+
+from _util import run_module
+
+from payloads import register_ids
+
+from systemair_api.utils.register_constants import RegisterConstants, register_number
+from systemair_api.utils.register_metadata import REGISTER_CATALOG
+
+
+def bench_get_register_name():
+    return lambda: RegisterConstants.get_register_name(RegisterConstants.REG_MAINBOARD_PU_RUNNING_VERSION_BUILD)
+
+
+def bench_get_register_name_linear_scan_baseline():
+    # The previous implementation, kept for comparison
+    def scan(register_number: int) -> str:
+        for attr, value in RegisterConstants.__dict__.items():
+            if not attr.startswith("__") and value == register_number:
+                return attr
+        return f"UNKNOWN_REGISTER_{register_number}"
+    return lambda: scan(RegisterConstants.REG_MAINBOARD_PU_RUNNING_VERSION_BUILD)
+
+
+def bench_get_register_name_without_prefix():
+    return lambda: RegisterConstants.get_register_name_without_prefix(RegisterConstants.REG_MAINBOARD_TC_SP)
+
+
+def bench_register_number():
+    return lambda: register_number("TC_SP")
+
+
+def bench_decode_many_10k_values():
+    ids = register_ids() * 35
+    ids = ids[:10000]
+    raws = [i % 300 for i in range(len(ids))]
+    return lambda: REGISTER_CATALOG.decode_many(ids, raws)
+
+
+def bench_validate_raw():
+    return lambda: REGISTER_CATALOG.validate_raw(RegisterConstants.REG_MAINBOARD_TC_SP, 215, True)
+
+
+if __name__ == "__main__":
+    run_module(globals())
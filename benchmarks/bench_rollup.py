@@ -0,0 +1,52 @@
+"""Benchmark maintaining rollups and reading them against downsampling raw history.
+
+Run with ``python benchmarks/bench_rollup.py``.
+"""
+
+from _util import run_module
+
+from systemair_api.models.changes import FieldChange
+from systemair_api.models.history import HistoryStore
+from systemair_api.models.rollup import RollupEngine
+
+DAY_SAMPLES = 8640  # One sample every 10 seconds for 24 hours
+
+
+def _changes(t):
+    return [FieldChange("co2", None, 800 + t % 200, "websocket", t * 10.0),
+            FieldChange("temperatures.oat", None, 4.5 + (t % 50) / 10.0, "websocket", t * 10.0)]
+
+
+def _filled():
+    engine = RollupEngine()
+    history = HistoryStore(capacity=DAY_SAMPLES)
+    for t in range(DAY_SAMPLES):
+        engine.record("IAM_1", _changes(t))
+        history.record("IAM_1", _changes(t))
+    return engine, history
+
+
+_ENGINE, _HISTORY = _filled()
+
+
+def bench_record_change_set():
+    engine = RollupEngine()
+    state = {"t": 0}
+
+    def run():
+        state["t"] += 1
+        engine.record("IAM_1", _changes(state["t"]))
+    return run
+
+
+def bench_rollup_query_day_15min():
+    return lambda: _ENGINE.query("IAM_1", "co2", 900)
+
+
+def bench_history_downsample_day_15min():
+    return lambda: [_HISTORY.downsample("IAM_1", "co2", 900, aggregate=aggregate)
+                    for aggregate in ("mean", "min", "max", "last")]
+
+
+if __name__ == "__main__":
+    run_module(globals())
@@ -0,0 +1,65 @@
+"""Benchmark saving and loading fleet snapshots.
+
+Run with ``python benchmarks/bench_snapshot.py [count]``.
+"""
+
+import os
+import sys
+import tempfile
+
+from _util import format_time, run_module, time_callable
+from payloads import get_view_payload, websocket_message
+
+from systemair_api.models.fleet import Fleet
+from systemair_api.models.snapshot import Snapshot, load_snapshot, save_snapshot
+from systemair_api.models.ventilation_unit import VentilationUnit
+
+FLEET_SIZE = 5000
+
+
+def _populated_fleet(count):
+    fleet = Fleet()
+    payload = get_view_payload(300)
+    for i in range(count):
+        device_id = f"IAM_{i:012d}"
+        unit = VentilationUnit(device_id, f"Unit {i}")
+        fleet.add(unit, site=f"site-{i % 40}")
+        fleet.update_from_api(device_id, payload)
+        fleet.update_from_websocket(websocket_message(device_id, seed=i))
+    return fleet
+
+
+def _snapshot_path():
+    directory = tempfile.mkdtemp(prefix="systemair-bench-")
+    return os.path.join(directory, "fleet.snap")
+
+
+def bench_save_snapshot():
+    fleet = _populated_fleet(FLEET_SIZE)
+    path = _snapshot_path()
+    return lambda: save_snapshot(path, fleet)
+
+
+def bench_load_snapshot():
+    path = _snapshot_path()
+    save_snapshot(path, _populated_fleet(FLEET_SIZE))
+    return lambda: load_snapshot(path)
+
+
+def bench_open_snapshot_and_find_stale():
+    path = _snapshot_path()
+    save_snapshot(path, _populated_fleet(FLEET_SIZE))
+
+    def run():
+        with Snapshot(path) as snapshot:
+            return snapshot.stale(300)
+    return run
+
+
+if __name__ == "__main__":
+    FLEET_SIZE = int(sys.argv[1]) if len(sys.argv) > 1 else FLEET_SIZE
+    run_module(globals())
+    path = _snapshot_path()
+    save_snapshot(path, _populated_fleet(FLEET_SIZE))
+    print(f"{FLEET_SIZE} units: {os.path.getsize(path) / 1024:.0f} KiB on disk, "
+          f"full load {format_time(time_callable(lambda: load_snapshot(path)))}")
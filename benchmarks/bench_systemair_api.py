@@ -0,0 +1,57 @@
+"""Benchmark building SystemairAPI requests and handling their responses.
+
+Requests are prepared by ``requests`` exactly as for the network (headers
+merged, JSON body encoded) but answered from memory, so only client-side
+work is timed.
+
+Run with ``python benchmarks/bench_systemair_api.py``.
+"""
+
+import json
+
+import requests
+from _util import run_module
+from payloads import get_view_payload
+
+from systemair_api.api.systemair_api import SystemairAPI
+
+
+class _CannedSession(requests.Session):
+    """Session preparing every request but answering it with a fixed body."""
+
+    def __init__(self, body):
+        super().__init__()
+        self.body = json.dumps(body).encode()
+
+    def post(self, url, data=None, json=None, **kwargs):
+        self.prepare_request(requests.Request("POST", url, headers=kwargs.get("headers"), json=json))
+        response = requests.Response()
+        response.status_code = 200
+        response.headers["Content-Type"] = "application/json"
+        response._content = self.body
+        return response
+
+
+def bench_fetch_device_status_request():
+    api = SystemairAPI("token", session=_CannedSession({"data": {"GetView": {"children": []}}}))
+    return lambda: api.fetch_device_status("IAM_123456789ABC")
+
+
+def bench_fetch_device_status_300_items():
+    api = SystemairAPI("token", session=_CannedSession(get_view_payload(300)))
+    return lambda: api.fetch_device_status("IAM_123456789ABC")
+
+
+def bench_write_data_item():
+    api = SystemairAPI("token", session=_CannedSession({"data": {"WriteDataItems": True}}))
+    return lambda: api.write_data_item("IAM_123456789ABC", 32, 215)
+
+
+def bench_broadcast_device_statuses_1000_units():
+    api = SystemairAPI("token", session=_CannedSession({"data": {"BroadcastDeviceStatuses": True}}))
+    identifiers = [f"IAM_{i:012X}" for i in range(1000)]
+    return lambda: api.broadcast_device_statuses(identifiers)
+
+
+if __name__ == "__main__":
+    run_module(globals())
@@ -0,0 +1,88 @@
+"""Benchmark the on-disk telemetry log against JSON lines of ``get_status()``.
+
+Run with ``python benchmarks/bench_telemetry_log.py``. The data set is one
+day of 50 units, each reporting 8 numeric fields every minute. Besides the
+timings, the script prints the on-disk size of both formats.
+"""
+
+import atexit
+import json
+import os
+import shutil
+import tempfile
+
+from _util import run_module
+
+from systemair_api.models.changes import FieldChange
+from systemair_api.models.history import HISTORY_FIELDS
+from systemair_api.models.telemetry_log import TelemetryLog, TelemetryReader
+
+UNITS = 50
+MINUTES = 24 * 60
+START = 1700000000.0
+
+
+def _status(unit, minute):
+    return {field: 20.0 + (unit + minute) % 50 / 10.0 for field in HISTORY_FIELDS}
+
+
+def _write_log(directory):
+    with TelemetryLog(directory) as log:
+        for minute in range(MINUTES):
+            timestamp = START + minute * 60
+            for unit in range(UNITS):
+                log.append(f"IAM_{unit:012d}", [FieldChange(field, None, value, "api", timestamp)
+                                                for field, value in _status(unit, minute).items()])
+
+
+def _write_jsonl(path):
+    with open(path, "w") as f:
+        for minute in range(MINUTES):
+            for unit in range(UNITS):
+                f.write(json.dumps({"identifier": f"IAM_{unit:012d}", "timestamp": START + minute * 60,
+                                    **_status(unit, minute)}) + "\n")
+
+
+_directory = tempfile.mkdtemp(prefix="telemetry-")
+atexit.register(shutil.rmtree, _directory, True)
+_jsonl = os.path.join(_directory, "status.jsonl")
+_write_log(os.path.join(_directory, "log"))
+_write_jsonl(_jsonl)
+_reader = TelemetryReader(os.path.join(_directory, "log"))
+_LAST_HOUR = (START + (MINUTES - 60) * 60, START + MINUTES * 60)
+
+
+def bench_append_change_set():
+    log = TelemetryLog(os.path.join(_directory, "append"))
+    state = {"t": START}
+
+    def run():
+        state["t"] += 60.0
+        log.append("IAM_1", [FieldChange("co2", 800, 810, "api", state["t"]),
+                             FieldChange("temperatures.oat", 4.5, 4.6, "api", state["t"])])
+    return run
+
+
+def bench_log_range_unit_last_hour():
+    return lambda: _reader.series("IAM_000000000007", "co2", *_LAST_HOUR)
+
+
+def bench_jsonl_range_unit_last_hour():
+    def run():
+        with open(_jsonl) as f:
+            return [(status["timestamp"], status["co2"]) for status in map(json.loads, f)
+                    if status["identifier"] == "IAM_000000000007"
+                    and _LAST_HOUR[0] <= status["timestamp"] < _LAST_HOUR[1]]
+    return run
+
+
+def _size(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+if __name__ == "__main__":
+    run_module(globals())
+    print(f"telemetry log {_size(os.path.join(_directory, 'log')) / 1e6:8.2f} MB")
+    print(f"json lines    {_size(_jsonl) / 1e6:8.2f} MB")
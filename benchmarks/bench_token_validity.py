@@ -0,0 +1,48 @@
+"""Benchmark the token validity check and JWT expiry decoding.
+
+Run with ``python benchmarks/bench_token_validity.py``.
+"""
+
+import base64
+import json
+import time
+from datetime import datetime, timedelta
+
+from _util import run_module
+
+from systemair_api.auth.authenticator import SystemairAuthenticator
+from systemair_api.auth.token_claims import decode_token_claims
+
+
+def _token() -> str:
+    def encode(data):
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).rstrip(b"=").decode()
+    claims = {"exp": int(time.time()) + 3600, "iat": int(time.time()), "sub": "user", "scope": "openid"}
+    return f"{encode({'alg': 'RS256', 'typ': 'JWT'})}.{encode(claims)}.signature"
+
+
+def bench_is_token_valid():
+    auth = SystemairAuthenticator("bench@example.com", "password")
+    auth.token_expiry = datetime.now() + timedelta(hours=1)
+    return auth.is_token_valid
+
+
+def bench_is_token_valid_datetime_baseline():
+    # The previous implementation, kept for comparison
+    expiry = datetime.now() + timedelta(hours=1)
+    return lambda: datetime.now() + timedelta(seconds=30) < expiry
+
+
+def bench_get_token_expiry_cached():
+    auth = SystemairAuthenticator("bench@example.com", "password")
+    token = _token()
+    return lambda: auth.get_token_expiry(token)
+
+
+def bench_decode_token_claims_uncached():
+    token = _token()
+    return lambda: decode_token_claims.__wrapped__(token)
+
+
+if __name__ == "__main__":
+    run_module(globals())
@@ -0,0 +1,93 @@
+"""Compare the memory footprint of the slots-based VentilationUnit with the dict-based layout.
+
+Run with ``python benchmarks/bench_unit_memory.py [count]``.
+"""
+
+import gc
+import sys
+import tracemalloc
+
+from _util import run_module
+from payloads import get_view_payload, websocket_message
+
+from systemair_api.models.ventilation_unit import (
+    FUNCTION_REGISTERS,
+    REGISTER_CATALOG,
+    REGISTER_TARGETS,
+    TEMPERATURE_SLOTS,
+    USER_MODE_TIME_SLOTS,
+    WEBSOCKET_FIELDS,
+    VentilationUnit,
+)
+
+
+class DictVentilationUnit:
+    """Same state as VentilationUnit in the previous layout: a __dict__ and nested dicts."""
+
+    def __init__(self, identifier, name):
+        for attribute in VentilationUnit.__slots__:
+            if not attribute.startswith("_"):
+                setattr(self, attribute, None)
+        self.identifier = identifier
+        self.name = name
+        self.connectivity = []
+        self.versions = []
+        self.temperatures = dict.fromkeys(TEMPERATURE_SLOTS)
+        self.user_mode_times = dict.fromkeys(USER_MODE_TIME_SLOTS)
+        self.active_functions = dict.fromkeys(FUNCTION_REGISTERS.values(), False)
+
+    def update_from_api(self, api_data):
+        for child in api_data["data"]["GetView"]["children"]:
+            data_item = child["properties"].get("dataItem")
+            target = REGISTER_TARGETS.get(data_item["id"]) if data_item else None
+            if target is None:
+                continue
+            attribute, key = target
+            value = data_item["value"] / REGISTER_CATALOG.scale(data_item["id"])
+            if key is None:
+                setattr(self, attribute, value)
+            else:
+                getattr(self, attribute)[key] = value
+
+    def update_from_websocket(self, ws_data):
+        properties = ws_data.get("properties", ws_data)
+        for key, attribute in WEBSOCKET_FIELDS.items():
+            if key in properties:
+                setattr(self, attribute, properties[key])
+        self.temperatures.update(properties.get("temperatures", {}))
+        self.versions = properties.get("versions") or self.versions
+
+
+def measure(cls, count: int, populate: bool) -> int:
+    """Return the bytes allocated to hold ``count`` units of ``cls``."""
+    payload = get_view_payload(300)
+    message = websocket_message()
+    gc.collect()
+    tracemalloc.start()
+    units = []
+    for i in range(count):
+        unit = cls(f"IAM_{i:012d}", f"Unit {i}")
+        if populate:
+            unit.update_from_api(payload)
+            unit.update_from_websocket(message)
+        units.append(unit)
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del units
+    return allocated
+
+
+def bench_create_unit():
+    return lambda: VentilationUnit("IAM_123456789ABC", "Bench Unit")
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    run_module(globals())
+    measure(VentilationUnit, 100, True)  # warm up interpreter caches before measuring
+    for populate in (False, True):
+        label = "populated" if populate else "empty"
+        slots = measure(VentilationUnit, count, populate)
+        dicts = measure(DictVentilationUnit, count, populate)
+        print(f"{count} {label} units: slots {slots / 2**20:6.1f} MiB, "
+              f"__dict__ {dicts / 2**20:6.1f} MiB ({100 * (dicts - slots) / dicts:.0f}% saved)")
@@ -0,0 +1,73 @@
+"""Benchmark VentilationUnit update paths.
+
+Run with ``python benchmarks/bench_ventilation_unit.py``.
+"""
+
+from _util import run_module
+from payloads import get_view_payload, websocket_message
+
+from systemair_api.models.ventilation_unit import VentilationUnit
+
+
+def bench_update_from_api_300_items():
+    unit = VentilationUnit("IAM_123456789ABC", "Bench Unit")
+    payload = get_view_payload(300)
+    return lambda: unit.update_from_api(payload)
+
+
+def bench_update_from_api_unchanged():
+    unit = VentilationUnit("IAM_123456789ABC", "Bench Unit")
+    unit.subscribe(lambda unit, changes: None)
+    payload = get_view_payload(300)
+    unit.update_from_api(payload)
+    return lambda: unit.update_from_api(payload)
+
+
+def bench_update_from_websocket_unchanged():
+    unit = VentilationUnit("IAM_123456789ABC", "Bench Unit")
+    unit.subscribe(lambda unit, changes: None)
+    message = websocket_message()
+    unit.update_from_websocket(message)
+    return lambda: unit.update_from_websocket(message)
+
+
+def bench_update_attribute_function_register():
+    unit = VentilationUnit("IAM_123456789ABC", "Bench Unit")
+    item = {"id": 110, "value": 1}
+    return lambda: unit._update_attribute(item)
+
+
+def bench_update_attribute_untracked_register():
+    unit = VentilationUnit("IAM_123456789ABC", "Bench Unit")
+    item = {"id": 280, "value": 1}
+    return lambda: unit._update_attribute(item)
+
+
+def _populated_unit():
+    unit = VentilationUnit("IAM_123456789ABC", "Bench Unit")
+    unit.update_from_api(get_view_payload(300))
+    unit.update_from_websocket(websocket_message())
+    return unit
+
+
+def bench_get_status_rebuild():
+    unit = _populated_unit()
+
+    def run():
+        unit.invalidate_status()
+        return unit.get_status()
+    return run
+
+
+def bench_get_status_cached():
+    unit = _populated_unit()
+    return unit.get_status
+
+
+def bench_get_status_shared():
+    unit = _populated_unit()
+    return lambda: unit.get_status(shared=True)
+
+
+if __name__ == "__main__":
+    run_module(globals())
@@ -0,0 +1,35 @@
+"""Benchmark decoding and applying WebSocket messages.
+
+Run with ``python benchmarks/bench_websocket_client.py``.
+"""
+
+import json
+
+from _util import run_module
+from payloads import websocket_message
+
+from systemair_api.api.websocket_client import SystemairWebSocket
+from systemair_api.models.ventilation_unit import VentilationUnit
+
+
+def bench_on_message_decode():
+    client = SystemairWebSocket("token", lambda message: None)
+    raw = json.dumps(websocket_message())
+    return lambda: client.on_message(None, raw)
+
+
+def bench_on_message_apply_changed():
+    unit = VentilationUnit("IAM_123456789ABC", "Bench Unit")
+    client = SystemairWebSocket("token", unit.update_from_websocket)
+    # Alternate two messages so every update changes fields
+    raws = [json.dumps(websocket_message(seed=seed)) for seed in (1, 2)]
+    state = {"i": 0}
+
+    def run():
+        state["i"] ^= 1
+        client.on_message(None, raws[state["i"]])
+    return run
+
+
+if __name__ == "__main__":
+    run_module(globals())
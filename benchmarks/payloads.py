@@ -0,0 +1,60 @@
+"""Realistic API and WebSocket payloads shared by the benchmarks."""
+
+import random
+from typing import Any, Dict, List
+
+from systemair_api.utils.register_constants import RegisterConstants
+
+
+def register_ids() -> List[int]:
+    """Return every known register id."""
+    return sorted({value for name, value in vars(RegisterConstants).items()
+                   if name.startswith("REG_") and isinstance(value, int)})
+
+
+def get_view_payload(size: int = 300, seed: int = 1) -> Dict[str, Any]:
+    """Build a ``GetView`` response with ``size`` data item children.
+
+    Like real responses, most children carry registers the model does not
+    track, and a few children are layout elements without a data item.
+    """
+    rng = random.Random(seed)
+    ids = register_ids()
+    children = []
+    for i in range(size):
+        if i % 10 == 9:
+            children.append({"type": "divider", "properties": {"title": f"Section {i}"}})
+            continue
+        register_id = ids[i % len(ids)]
+        children.append({
+            "type": "card",
+            "properties": {"dataItem": {"id": register_id, "value": rng.randint(0, 300)}},
+        })
+    return {"data": {"GetView": {"children": children}}}
+
+
+def websocket_message(device_id: str = "IAM_123456789ABC", seed: int = 1) -> Dict[str, Any]:
+    """Build a ``DEVICE_STATUS_UPDATE`` WebSocket message."""
+    rng = random.Random(seed)
+    return {
+        "type": "SYSTEM_EVENT",
+        "action": "DEVICE_STATUS_UPDATE",
+        "properties": {
+            "id": device_id,
+            "model": "VTR 300",
+            "activeAlarms": False,
+            "airflow": rng.randint(0, 4),
+            "connectivity": ["online", "cloud"],
+            "filterExpiration": 2592000,
+            "serialNumber": "SN12345",
+            "temperature": 20 + rng.random() * 3,
+            "userMode": rng.randint(0, 6),
+            "airQuality": rng.randint(0, 3),
+            "humidity": rng.randint(30, 60),
+            "co2": rng.randint(400, 1200),
+            "update": {"inProgress": False},
+            "configurationWizard": {"active": False},
+            "temperatures": {"oat": rng.randint(-100, 300) / 10, "sat": 19.5, "setpoint": 21.0},
+            "versions": [{"type": "mb", "version": "1.2.3"}, {"type": "iam", "version": "2.0.1"}],
+        },
+    }
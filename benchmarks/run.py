@@ -0,0 +1,137 @@
+"""Run the benchmark scripts and compare the results with a stored baseline.
+
+Usage::
+
+    python benchmarks/run.py                     # run everything, compare with baseline.json
+    python benchmarks/run.py ventilation_unit    # only bench_ventilation_unit.py
+    python benchmarks/run.py -k get_status       # only benchmarks whose name contains get_status
+    python benchmarks/run.py --save              # store the results as the new baseline
+
+Benchmarks are identified as ``<module>.<name>``, e.g.
+``ventilation_unit.get_status_cached``. Saving with a filter only replaces
+the selected entries. The exit status is 1 if a benchmark is slower than
+its baseline by more than ``--tolerance``.
+
+Baselines are only comparable on the machine and Python version that
+produced them; both are stored with the results and a mismatch is
+reported.
+"""
+
+import argparse
+import glob
+import importlib
+import json
+import os
+import platform
+import sys
+from typing import Dict, List, Optional
+
+from _util import collect, format_time, time_callable
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+
+
+def modules(selected: List[str]) -> List[str]:
+    """Get the benchmark module names to run, e.g. ``["bench_fleet"]``."""
+    names = sorted(os.path.basename(path)[:-3] for path in glob.glob(os.path.join(BENCH_DIR, "bench_*.py")))
+    if not selected:
+        return names
+    unknown = [name for name in selected if f"bench_{name}" not in names]
+    if unknown:
+        raise SystemExit(f"Unknown benchmark modules: {', '.join(unknown)}")
+    return [f"bench_{name}" for name in selected]
+
+
+def environment() -> Dict[str, str]:
+    """Describe the machine the results are measured on."""
+    return {"python": platform.python_version(), "implementation": platform.python_implementation(),
+            "machine": platform.machine(), "system": platform.system(), "processor": platform.processor()}
+
+
+def run(names: List[str], keyword: Optional[str], repeat: int) -> Dict[str, float]:
+    """Import the modules and time their benchmarks.
+
+    Modules are imported with an empty argument list, so scripts that
+    read a size from ``sys.argv`` use their default.
+    """
+    results = {}
+    argv = sys.argv
+    for module_name in names:
+        sys.argv = [module_name + ".py"]
+        try:
+            module = importlib.import_module(module_name)
+        finally:
+            sys.argv = argv
+        for name, factory in collect(vars(module)):
+            key = f"{module_name[len('bench_'):]}.{name}"
+            if keyword is not None and keyword not in key:
+                continue
+            results[key] = time_callable(factory(), repeat)
+            print(f"{key:<58} {format_time(results[key])}", flush=True)
+    return results
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float], tolerance: float) -> List[str]:
+    """Print each result against its baseline.
+
+    Returns:
+        list: Keys of the benchmarks slower than the baseline by more than ``tolerance``
+    """
+    regressions = []
+    print(f"\n{'benchmark':<58} {'baseline':>11} {'current':>11} {'ratio':>7}")
+    for key, seconds in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            print(f"{key:<58} {'-':>11} {format_time(seconds)} {'new':>7}")
+            continue
+        ratio = seconds / reference
+        flag = ""
+        if ratio > 1 + tolerance:
+            flag = "  REGRESSION"
+            regressions.append(key)
+        elif ratio < 1 / (1 + tolerance):
+            flag = "  faster"
+        print(f"{key:<58} {format_time(reference)} {format_time(seconds)} {ratio:6.2f}x{flag}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run benchmarks and compare them with a stored baseline.")
+    parser.add_argument("modules", nargs="*", help="modules to run, e.g. fleet for bench_fleet.py; all by default")
+    parser.add_argument("-k", dest="keyword", help="only run benchmarks whose name contains this text")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline file (default: %(default)s)")
+    parser.add_argument("--save", action="store_true", help="store the results in the baseline file")
+    parser.add_argument("--tolerance", type=float, default=0.3,
+                        help="allowed slowdown before a result counts as a regression (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=5, help="timing repeats per benchmark, best is kept")
+    args = parser.parse_args(argv)
+
+    results = run(modules(args.modules), args.keyword, args.repeat)
+    stored = {"environment": environment(), "results": {}}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            stored = json.load(f)
+
+    if args.save:
+        stored["environment"] = environment()
+        stored["results"].update(results)
+        stored["results"] = dict(sorted(stored["results"].items()))
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(stored, f, indent=2)
+            f.write("\n")
+        print(f"\nSaved {len(results)} results to {args.baseline}")
+        return 0
+
+    if stored["environment"] != environment():
+        print(f"\nNote: the baseline was measured on {stored['environment']}, "
+              f"this machine is {environment()}", file=sys.stderr)
+    regressions = compare(results, stored["results"], args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) regressed by more than {args.tolerance:.0%}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
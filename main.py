@@ -1,11 +1,14 @@
 #!/usr/bin/env python
 """Example script demonstrating usage of the systemair_api package."""
 
+import logging
 import os
 import time
 from dotenv import load_dotenv
 
 from systemair_api.auth.authenticator import SystemairAuthenticator
+from systemair_api.auth.token_cache import TOKEN_CACHE_ENV, TokenCache
+from systemair_api.api.poll_scheduler import PollScheduler
 from systemair_api.api.systemair_api import SystemairAPI
 from systemair_api.api.websocket_client import SystemairWebSocket
 from systemair_api.models.ventilation_unit import VentilationUnit
@@ -14,6 +17,12 @@ from systemair_api.utils.constants import UserModes
 # Dictionary to store ventilation units by device ID
 ventilation_units = {}
 
+# Polls units adaptively, so units kept fresh by the WebSocket are rarely fetched
+scheduler = PollScheduler(requests_per_minute=30, min_interval=30, max_interval=900)
+
+# Longest sleep between scheduler checks, so token expiry is noticed in time
+MAX_SLEEP = 30
+
 def get_user_devices(api):
     """Get and initialize VentilationUnit objects for all user devices."""
     response = api.get_account_devices()
@@ -22,6 +31,7 @@ def get_user_devices(api):
         for device in devices:
             unit = VentilationUnit(device["identifier"], device["name"])
             ventilation_units[unit.identifier] = unit
+            scheduler.add(unit.identifier)
     else:
         print("Failed to fetch user devices")
 
@@ -30,13 +40,19 @@ def on_websocket_message(data):
     if data["type"] == "SYSTEM_EVENT" and data["action"] == "DEVICE_STATUS_UPDATE":
         device_id = data["properties"]["id"]
         if device_id in ventilation_units:
-            ventilation_units[device_id].update_from_websocket(data)
-            ventilation_units[device_id].print_status()
+            changes = ventilation_units[device_id].update_from_websocket(data)
+            scheduler.record_update(device_id, len(changes))
+            # Only print units whose status actually changed
+            if changes:
+                ventilation_units[device_id].print_status()
 
 def main():
     """Run the example application."""
     # Load environment variables
     load_dotenv()
+
+    # Show the library's status and diagnostic messages on the console
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     
     # Get credentials
     email = os.getenv('EMAIL')
@@ -46,7 +62,9 @@ def main():
         print("Error: Email or password not found in environment variables")
         return
 
-    authenticator = SystemairAuthenticator(email, password)
+    # Reuse tokens across runs when a token cache location is configured
+    token_cache = TokenCache() if os.getenv(TOKEN_CACHE_ENV) else None
+    authenticator = SystemairAuthenticator(email, password, token_cache)
     api = None
     websocket_client = None
 
@@ -68,20 +86,8 @@ def main():
         # Broadcast device statuses
         broadcast_result = api.broadcast_device_statuses(device_ids)
         print("Fetching initial status for all devices...")
-        for device_id, unit in ventilation_units.items():
-            try:
-                device_status = api.fetch_device_status(device_id)
-                if device_status:
-                    unit.update_from_api(device_status)
-                    unit.print_status()
-                else:
-                    print(f"Failed to fetch device status for {unit.name}")
-            except Exception as e:
-                print(f"Error fetching device status for {unit.name}: {e}")
 
         while True:
-            print(f"\nCurrent token expiry: {authenticator.token_expiry}")
-
             # Check if token is still valid
             if not authenticator.is_token_valid():
                 print("Token expired. Refreshing...")
@@ -102,22 +108,13 @@ def main():
                     websocket_client.connect()
                 broadcast_result = api.broadcast_device_statuses(device_ids)
 
-            # Fetch updated status for all devices
-            print("\nRefreshing device statuses...")
-            for device_id, unit in ventilation_units.items():
-                try:
-                    device_status = api.fetch_device_status(device_id)
-                    if device_status:
-                        unit.update_from_api(device_status)
-                        unit.print_status()
-                    else:
-                        print(f"Failed to fetch device status for {unit.name}")
-                except Exception as e:
-                    print(f"Error fetching device status for {unit.name}: {e}")
+            # Fetch updated status for the units that are due
+            for device_id, changes in scheduler.poll(api, ventilation_units).items():
+                if changes:
+                    ventilation_units[device_id].print_status()
 
-            # Wait before next refresh
-            print(f"\nWaiting 60 seconds before next refresh...")
-            time.sleep(60)
+            # Sleep until the next unit is due
+            time.sleep(min(MAX_SLEEP, scheduler.next_due_in()))
 
     except KeyboardInterrupt:
         print("Program terminated by user.")
@@ -51,6 +51,12 @@ setup(
         "python-dotenv",
     ],
     extras_require={
+        "numpy": [
+            "numpy>=1.17",
+        ],
+        "arrow": [
+            "pyarrow>=8.0",
+        ],
         "dev": [
             "pytest",
             "pytest-cov",
@@ -1,9 +1,20 @@
 """SystemAIR-API - Python library for controlling Systemair ventilation units."""
 
+import logging
+
 from systemair_api.api.systemair_api import SystemairAPI
+from systemair_api.api.account_pool import AccountPool
+from systemair_api.api.poll_scheduler import PollScheduler
 from systemair_api.auth.authenticator import SystemairAuthenticator
+from systemair_api.auth.async_authenticator import AsyncSystemairAuthenticator
+from systemair_api.auth.token_cache import TokenCache
+from systemair_api.models.changes import FieldChange
 from systemair_api.models.ventilation_unit import VentilationUnit
+from systemair_api.models.fleet import Fleet
+from systemair_api.models.snapshot import load_snapshot, save_snapshot
 from systemair_api.api.websocket_client import SystemairWebSocket
+from systemair_api.daemon import SystemairDaemon
+from systemair_api.exporter import PrometheusExporter
 from systemair_api.utils.exceptions import (
     SystemairError,
     AuthenticationError,
@@ -15,13 +26,27 @@ from systemair_api.utils.exceptions import (
     ValidationError
 )
 from systemair_api.utils.constants import UserModes
+from systemair_api.utils.log import disable_queue_logging, enable_queue_logging
 from systemair_api.__version__ import __version__
 
+# Library output goes through logging; applications decide where it ends up
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
 __all__ = [
     'SystemairAPI',
+    'AccountPool',
+    'PollScheduler',
     'SystemairAuthenticator', 
+    'AsyncSystemairAuthenticator',
+    'TokenCache',
     'VentilationUnit',
+    'FieldChange',
+    'Fleet',
+    'save_snapshot',
+    'load_snapshot',
     'SystemairWebSocket',
+    'SystemairDaemon',
+    'PrometheusExporter',
     'SystemairError',
     'AuthenticationError',
     'TokenRefreshError',
@@ -31,5 +56,7 @@ __all__ = [
     'RateLimitError',
     'ValidationError',
     'UserModes',
+    'enable_queue_logging',
+    'disable_queue_logging',
     '__version__'
 ]
\ No newline at end of file
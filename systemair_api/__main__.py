@@ -1,15 +1,22 @@
 #!/usr/bin/env python
 """Main entry point for the systemair_api package."""
 
+import argparse
+import logging
 import os
 import time
 import threading
+from typing import List, Optional
 from dotenv import load_dotenv
 
 from systemair_api.auth.authenticator import SystemairAuthenticator
+from systemair_api.auth.token_cache import TOKEN_CACHE_ENV, TokenCache
+from systemair_api.api.poll_scheduler import PollScheduler
 from systemair_api.api.systemair_api import SystemairAPI
 from systemair_api.api.websocket_client import SystemairWebSocket
 from systemair_api.models.ventilation_unit import VentilationUnit
+from systemair_api.daemon import SystemairDaemon
+from systemair_api.exporter import PrometheusExporter
 from systemair_api.utils.constants import UserModes
 
 def on_message(message: dict) -> None:
@@ -20,10 +27,77 @@ def on_message(message: dict) -> None:
     """
     print("Received WebSocket message:", message)
 
-def main() -> None:
-    """Run the example application demonstrating the SystemAIR API."""
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse the command line.
+    
+    Args:
+        argv: Arguments to parse, defaults to ``sys.argv[1:]``
+        
+    Returns:
+        argparse.Namespace: The parsed options
+    """
+    parser = argparse.ArgumentParser(prog="systemair-api",
+                                     description="Control Systemair ventilation units: run a short demo, or a service with --daemon.")
+    parser.add_argument("--daemon", action="store_true",
+                        help="run as a long-lived service instead of the demo")
+    parser.add_argument("--requests-per-minute", type=float, default=30.0,
+                        help="status poll budget shared by all units (daemon mode)")
+    parser.add_argument("--min-interval", type=float, default=30.0,
+                        help="shortest interval between polls of a unit in seconds (daemon mode)")
+    parser.add_argument("--max-interval", type=float, default=900.0,
+                        help="longest interval between polls of a unit in seconds (daemon mode)")
+    parser.add_argument("--poll-workers", type=int, default=4,
+                        help="maximum number of concurrent status polls (daemon mode)")
+    parser.add_argument("--command-workers", type=int, default=2,
+                        help="maximum number of concurrent commands (daemon mode)")
+    parser.add_argument("--health-interval", type=float, default=60.0,
+                        help="seconds between health reports (daemon mode)")
+    parser.add_argument("--health-file", help="write health reports to this JSON file (daemon mode)")
+    parser.add_argument("--no-websocket", action="store_true",
+                        help="rely on polling only (daemon mode)")
+    parser.add_argument("--metrics-port", type=int,
+                        help="serve Prometheus metrics on this port (daemon mode)")
+    parser.add_argument("--no-function-metrics", action="store_true",
+                        help="do not export a metric per active function and unit (daemon mode)")
+    parser.add_argument("--log-level", default="INFO", help="logging level, e.g. DEBUG or WARNING")
+    return parser.parse_args(argv)
+
+def run_daemon(authenticator: SystemairAuthenticator, args: argparse.Namespace) -> None:
+    """Run the daemon until SIGINT or SIGTERM.
+    
+    Args:
+        authenticator: Authenticator holding the account credentials
+        args: Parsed command line options
+    """
+    scheduler = PollScheduler(requests_per_minute=args.requests_per_minute,
+                              min_interval=args.min_interval, max_interval=args.max_interval)
+    exporter = None
+    if args.metrics_port is not None:
+        exporter = PrometheusExporter(functions=not args.no_function_metrics)
+        exporter.serve(args.metrics_port)
+    daemon = SystemairDaemon(authenticator, scheduler,
+                             poll_workers=args.poll_workers,
+                             command_workers=args.command_workers,
+                             health_interval=args.health_interval,
+                             health_file=args.health_file,
+                             exporter=exporter,
+                             websocket=not args.no_websocket)
+    try:
+        daemon.serve_forever()
+    finally:
+        if exporter is not None:
+            exporter.close()
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run the example application demonstrating the SystemAIR API, or the daemon with ``--daemon``."""
+    args = parse_args(argv)
+
     # Load environment variables from .env file if it exists
     load_dotenv()
+
+    # Show the library's status and diagnostic messages on the console
+    log_format = "%(asctime)s %(levelname)s %(name)s: %(message)s" if args.daemon else "%(message)s"
+    logging.basicConfig(level=args.log_level.upper(), format=log_format)
     
     # Get credentials from environment variables
     email = os.getenv("EMAIL")
@@ -35,7 +109,12 @@ def main() -> None:
         return
     
     # Authenticate
-    authenticator = SystemairAuthenticator(email, password)
+    # Reuse tokens across runs when a token cache location is configured
+    token_cache = TokenCache() if os.getenv(TOKEN_CACHE_ENV) else None
+    authenticator = SystemairAuthenticator(email, password, token_cache)
+    if args.daemon:
+        run_daemon(authenticator, args)
+        return
     access_token = authenticator.authenticate()
     
     if not access_token:
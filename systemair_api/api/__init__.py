@@ -2,3 +2,5 @@
 
 from systemair_api.api.systemair_api import SystemairAPI
 from systemair_api.api.websocket_client import SystemairWebSocket
+from systemair_api.api.account_pool import AccountPool
+from systemair_api.api.poll_scheduler import PollScheduler
@@ -0,0 +1,327 @@
+"""AccountPool - Manage authenticated API clients for many Systemair accounts."""
+
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+
+from systemair_api.api.systemair_api import SystemairAPI
+from systemair_api.auth.async_authenticator import create_pooled_adapter, create_session
+from systemair_api.auth.authenticator import SystemairAuthenticator
+from systemair_api.auth.token_cache import TokenCache
+from systemair_api.utils.exceptions import AuthenticationError, SystemairError
+
+STATE_PENDING = "pending"
+STATE_HEALTHY = "healthy"
+STATE_REFRESHING = "refreshing"
+STATE_FAILED = "failed"
+
+
+class PooledAccount:
+    """Credentials, tokens, API client and health of one account in an :class:`AccountPool`."""
+
+    def __init__(self, account_id: str, authenticator: SystemairAuthenticator,
+                 session: requests.Session, refresh_offset: float) -> None:
+        """Initialize the pooled account.
+
+        Args:
+            account_id: Caller-chosen identifier of the account
+            authenticator: Authenticator holding the account's credentials and tokens
+            session: Session for API requests, sharing the pool's transport
+            refresh_offset: Extra seconds before expiry at which this account refreshes
+        """
+        self.account_id: str = account_id
+        self.authenticator: SystemairAuthenticator = authenticator
+        self.session: requests.Session = session
+        self.refresh_offset: float = refresh_offset
+        self.api: Optional[SystemairAPI] = None
+        self.state: str = STATE_PENDING
+        self.last_refresh: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        self.consecutive_failures: int = 0
+        self.next_attempt: Optional[float] = None  # time.monotonic() before which no refresh is tried
+        self.lock: threading.Lock = threading.Lock()
+
+    def health(self) -> Dict[str, Any]:
+        """Get the health of this account as a dictionary."""
+        return {
+            "state": self.state,
+            "authenticated": self.api is not None,
+            "token_valid": self.authenticator.is_token_valid(),
+            "time_to_expiry": self.authenticator.time_to_expiry(),
+            "last_refresh": self.last_refresh.isoformat() if self.last_refresh else None,
+            "consecutive_failures": self.consecutive_failures,
+            "last_error": self.last_error,
+            "retry_in": max(0.0, self.next_attempt - time.monotonic()) if self.next_attempt is not None else None,
+        }
+
+
+class AccountPool:
+    """Pool of authenticated Systemair accounts sharing one connection pool.
+
+    Every account keeps its own authenticator, tokens and :class:`SystemairAPI`
+    client, but all HTTP traffic goes through a single pooled transport
+    adapter. Token refreshes are spread out: each account refreshes at a
+    fixed, account-specific offset within ``refresh_jitter`` seconds before
+    the common ``refresh_margin``, and at most ``max_concurrency`` logins or
+    refreshes run at once, so a fleet authenticated at the same moment does
+    not hit the SSO token endpoint all together when its tokens age.
+
+    An account whose login or refresh fails is retried by
+    :meth:`refresh_due_accounts` (and so by the background thread) after
+    ``retry_backoff`` seconds, doubling with every consecutive failure up to
+    ``max_retry_backoff``. Accounts whose token expiry is unknown are
+    refreshed every ``max_retry_backoff`` seconds.
+    """
+
+    def __init__(self, max_concurrency: int = 8, pool_maxsize: int = 32, refresh_margin: float = 120.0,
+                 refresh_jitter: float = 180.0, token_cache: Optional[TokenCache] = None,
+                 retry_backoff: float = 30.0, max_retry_backoff: float = 1800.0) -> None:
+        """Initialize the pool.
+
+        Args:
+            max_concurrency: Maximum number of simultaneous logins/refreshes
+            pool_maxsize: Maximum number of pooled connections per host
+            refresh_margin: Refresh tokens at least this many seconds before expiry
+            refresh_jitter: Spread refreshes over this many additional seconds
+            token_cache: Optional token cache shared by all accounts
+            retry_backoff: Seconds before the first retry of a failed account
+            max_retry_backoff: Upper bound of the retry delay
+        """
+        self.max_concurrency: int = max_concurrency
+        self.refresh_margin: float = refresh_margin
+        self.refresh_jitter: float = refresh_jitter
+        self.token_cache: Optional[TokenCache] = token_cache
+        self.retry_backoff: float = retry_backoff
+        self.max_retry_backoff: float = max_retry_backoff
+        self.adapter = create_pooled_adapter(pool_maxsize)
+        self._accounts: Dict[str, PooledAccount] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add_account(self, account_id: str, email: str, password: str) -> PooledAccount:
+        """Add an account to the pool without authenticating it.
+
+        Args:
+            account_id: Caller-chosen identifier of the account
+            email: Account e-mail address
+            password: Account password
+
+        Returns:
+            PooledAccount: The pooled account
+
+        Raises:
+            ValueError: If an account with this identifier already exists
+        """
+        authenticator = SystemairAuthenticator(email, password, self.token_cache,
+                                               session=create_session(self.adapter))
+        offset = self.refresh_jitter * (zlib.crc32(account_id.encode("utf-8")) / 0xFFFFFFFF)
+        account = PooledAccount(account_id, authenticator, create_session(self.adapter), offset)
+        with self._lock:
+            if account_id in self._accounts:
+                raise ValueError(f"Account {account_id} is already in the pool")
+            self._accounts[account_id] = account
+        return account
+
+    def remove_account(self, account_id: str) -> None:
+        """Remove an account from the pool.
+
+        Args:
+            account_id: Identifier of the account
+        """
+        with self._lock:
+            self._accounts.pop(account_id, None)
+
+    def account_ids(self) -> List[str]:
+        """Get the identifiers of all accounts in the pool."""
+        with self._lock:
+            return list(self._accounts)
+
+    def get_account(self, account_id: str) -> PooledAccount:
+        """Get a pooled account.
+
+        Args:
+            account_id: Identifier of the account
+
+        Returns:
+            PooledAccount: The pooled account
+
+        Raises:
+            KeyError: If the account is not in the pool
+        """
+        with self._lock:
+            return self._accounts[account_id]
+
+    def get_api(self, account_id: str) -> SystemairAPI:
+        """Get the API client of an account.
+
+        Args:
+            account_id: Identifier of the account
+
+        Returns:
+            SystemairAPI: The account's API client
+
+        Raises:
+            KeyError: If the account is not in the pool
+            AuthenticationError: If the account has not been authenticated yet
+        """
+        account = self.get_account(account_id)
+        if account.api is None:
+            raise AuthenticationError(f"Account {account_id} is not authenticated")
+        return account.api
+
+    def authenticate_all(self) -> Dict[str, Optional[Exception]]:
+        """Authenticate every account that has no API client yet.
+
+        Returns:
+            dict: Account identifier mapped to None on success or the raised exception
+        """
+        with self._lock:
+            pending = [a for a in self._accounts.values() if a.api is None]
+        return self._run_concurrently(self._authenticate, pending)
+
+    def refresh_due(self) -> List[str]:
+        """Get the identifiers of accounts whose tokens should be refreshed now.
+
+        Accounts whose initial login failed are due again once their backoff
+        has passed; accounts waiting out the backoff of a failed login or
+        refresh are not due.
+
+        Returns:
+            list: Identifiers ordered by how soon their tokens expire, failed logins first
+        """
+        due = []
+        now = time.monotonic()
+        with self._lock:
+            accounts = list(self._accounts.values())
+        for account in accounts:
+            if account.state == STATE_REFRESHING or (account.api is None and account.state != STATE_FAILED):
+                continue
+            if account.next_attempt is not None and now < account.next_attempt:
+                continue
+            if account.api is None:
+                due.append((float("-inf"), account.account_id))
+                continue
+            remaining = account.authenticator.time_to_expiry()
+            if remaining is None or remaining <= self.refresh_margin + account.refresh_offset:
+                due.append((remaining if remaining is not None else float("-inf"), account.account_id))
+        return [account_id for _, account_id in sorted(due)]
+
+    def refresh_due_accounts(self) -> Dict[str, Optional[Exception]]:
+        """Refresh the tokens of all accounts that are due, logging in again where the login failed.
+
+        Returns:
+            dict: Account identifier mapped to None on success or the raised exception
+        """
+        accounts = []
+        for account_id in self.refresh_due():
+            try:
+                accounts.append(self.get_account(account_id))
+            except KeyError:
+                continue
+        return self._run_concurrently(self._renew, accounts)
+
+    def health(self) -> Dict[str, Dict[str, Any]]:
+        """Get the health of every account in the pool.
+
+        Returns:
+            dict: Account identifier mapped to its health dictionary
+        """
+        with self._lock:
+            accounts = list(self._accounts.values())
+        return {account.account_id: account.health() for account in accounts}
+
+    def start(self, interval: float = 30.0) -> None:
+        """Start refreshing due accounts periodically in a daemon thread.
+
+        Args:
+            interval: Seconds between refresh checks
+        """
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval,), name="systemair-account-pool")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background refresh thread."""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self, interval: float) -> None:
+        while not self._stop_event.wait(interval):
+            self.refresh_due_accounts()
+
+    def _run_concurrently(self, func: Callable[[PooledAccount], None],
+                          accounts: List[PooledAccount]) -> Dict[str, Optional[Exception]]:
+        results: Dict[str, Optional[Exception]] = {}
+        if not accounts:
+            return results
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(accounts)),
+                                thread_name_prefix="systemair-pool") as executor:
+            futures = {account.account_id: executor.submit(func, account) for account in accounts}
+            for account_id, future in futures.items():
+                error = future.exception()
+                results[account_id] = error if isinstance(error, Exception) else None
+        return results
+
+    def _authenticate(self, account: PooledAccount) -> None:
+        with account.lock:
+            try:
+                access_token = account.authenticator.authenticate()
+            except (SystemairError, requests.exceptions.RequestException) as e:
+                self._record_failure(account, e)
+                raise
+            self._record_success(account, access_token)
+
+    def _renew(self, account: PooledAccount) -> None:
+        if account.api is None:
+            self._authenticate(account)
+        else:
+            self._refresh(account)
+
+    def _refresh(self, account: PooledAccount) -> None:
+        with account.lock:
+            account.state = STATE_REFRESHING
+            try:
+                try:
+                    access_token = account.authenticator.refresh_access_token()
+                except (SystemairError, requests.exceptions.RequestException):
+                    # The refresh token may have expired too, fall back to a full login
+                    access_token = account.authenticator.authenticate()
+            except (SystemairError, requests.exceptions.RequestException) as e:
+                self._record_failure(account, e)
+                raise
+            self._record_success(account, access_token)
+
+    def _record_success(self, account: PooledAccount, access_token: str) -> None:
+        if account.api is None:
+            account.api = SystemairAPI(access_token, session=account.session)
+        else:
+            account.api.update_token(access_token)
+        account.state = STATE_HEALTHY
+        account.last_refresh = datetime.now()
+        account.last_error = None
+        account.consecutive_failures = 0
+        # Without a known expiry the token cannot be refreshed just in time,
+        # so refresh it at the longest retry interval instead of every check
+        if account.authenticator.time_to_expiry() is None:
+            account.next_attempt = time.monotonic() + self.max_retry_backoff
+        else:
+            account.next_attempt = None
+
+    def _record_failure(self, account: PooledAccount, error: Exception) -> None:
+        account.state = STATE_FAILED
+        account.last_error = str(error)
+        account.consecutive_failures += 1
+        exponent = min(account.consecutive_failures - 1, 16)
+        delay = min(self.retry_backoff * 2 ** exponent, self.max_retry_backoff)
+        account.next_attempt = time.monotonic() + delay
@@ -0,0 +1,371 @@
+"""PollScheduler - Adaptive status polling of many units within a request budget."""
+
+import heapq
+import itertools
+import logging
+import math
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Mapping, Optional
+
+from systemair_api.utils.exceptions import RateLimitError
+
+if TYPE_CHECKING:
+    from systemair_api.api.systemair_api import SystemairAPI
+    from systemair_api.models.changes import ChangeSet
+    from systemair_api.models.ventilation_unit import VentilationUnit
+
+logger = logging.getLogger(__name__)
+
+
+class UnitFreshness:
+    """Freshness and polling state of one unit in a :class:`PollScheduler`.
+
+    Times are ``time.monotonic()`` values.
+    """
+
+    __slots__ = ("identifier", "last_poll", "last_update", "last_change", "change_rate",
+                 "failures", "due", "in_flight", "_entry")
+
+    def __init__(self, identifier: str, due: float) -> None:
+        self.identifier: str = identifier
+        self.last_poll: Optional[float] = None
+        self.last_update: Optional[float] = None
+        self.last_change: Optional[float] = None
+        self.change_rate: Optional[float] = None
+        self.failures: int = 0
+        self.due: float = due
+        self.in_flight: bool = False
+        self._entry: Optional[List[Any]] = None
+
+    def as_dict(self, now: float) -> Dict[str, Any]:
+        """Get the freshness of the unit as a dictionary of ages in seconds."""
+        return {
+            "since_poll": None if self.last_poll is None else now - self.last_poll,
+            "since_update": None if self.last_update is None else now - self.last_update,
+            "since_change": None if self.last_change is None else now - self.last_change,
+            "change_rate": self.change_rate,
+            "failures": self.failures,
+            "due_in": None if math.isinf(self.due) else self.due - now,
+            "in_flight": self.in_flight,
+        }
+
+
+class PollScheduler:
+    """Decide which units to poll and when, within a global request budget.
+
+    Every unit gets a poll interval derived from how often its state has
+    been changing (an exponentially weighted rate of changes per second):
+    units that change often are polled every ``min_interval`` seconds, idle
+    units only every ``max_interval`` seconds. Until a unit has been seen
+    twice its rate is unknown and it is polled again after ``min_interval``. Data from any source resets
+    the clock, so units kept fresh by WebSocket updates are rarely polled.
+    A unit is due once ``last_update + interval`` has passed; due units are
+    handed out earliest-due first, i.e. the stalest units first.
+
+    Requests are limited by a token bucket refilling at
+    ``requests_per_minute`` and holding at most ``burst`` requests. Failed
+    polls back off exponentially and a :class:`RateLimitError` pauses the
+    whole scheduler for its ``retry_after``.
+
+    The scheduler is thread-safe, so WebSocket callbacks may report updates
+    while another thread polls.
+    """
+
+    def __init__(self, requests_per_minute: float = 30.0, burst: Optional[int] = None,
+                 min_interval: float = 30.0, max_interval: float = 900.0, smoothing: float = 0.3,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        """Initialize the scheduler.
+
+        Args:
+            requests_per_minute: Sustained request budget shared by all units
+            burst: Maximum number of requests at once, defaults to ``requests_per_minute``
+            min_interval: Shortest interval between polls of one unit in seconds
+            max_interval: Longest interval between polls of one unit in seconds
+            smoothing: Weight of the latest observation in the change rate (0-1]
+            clock: Monotonic clock, replaceable for testing
+
+        Raises:
+            ValueError: If the budget or intervals are not positive
+        """
+        if requests_per_minute <= 0 or min_interval <= 0 or max_interval < min_interval:
+            raise ValueError("Budget and intervals must be positive, with min_interval <= max_interval")
+        self.requests_per_minute: float = requests_per_minute
+        self.burst: float = float(burst if burst is not None else max(1, int(requests_per_minute)))
+        self.min_interval: float = min_interval
+        self.max_interval: float = max_interval
+        self.smoothing: float = smoothing
+        self._clock = clock
+        self._tokens: float = self.burst
+        self._refilled_at: float = clock()
+        self._paused_until: float = 0.0
+        self._units: Dict[str, UnitFreshness] = {}
+        self._heap: List[List[Any]] = []
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self.polls: int = 0
+        self.failures: int = 0
+
+    def __len__(self) -> int:
+        return len(self._units)
+
+    def __contains__(self, identifier: object) -> bool:
+        return identifier in self._units
+
+    def add(self, identifier: str, now: Optional[float] = None) -> None:
+        """Start scheduling a unit; it is due for a poll right away.
+
+        Args:
+            identifier: Identifier of the unit
+            now: Current monotonic time, defaults to the scheduler clock
+        """
+        with self._lock:
+            if identifier in self._units:
+                return
+            state = self._units[identifier] = UnitFreshness(identifier, 0.0)
+            self._schedule(state, self._now(now))
+
+    def remove(self, identifier: str) -> None:
+        """Stop scheduling a unit.
+
+        Args:
+            identifier: Identifier of the unit
+        """
+        with self._lock:
+            state = self._units.pop(identifier, None)
+            if state is not None and state._entry is not None:
+                state._entry[-1] = None
+
+    def interval(self, identifier: str) -> float:
+        """Get the current poll interval of a unit in seconds.
+
+        Raises:
+            KeyError: If the unit is not scheduled
+        """
+        return self._interval(self._units[identifier])
+
+    def freshness(self, identifier: str, now: Optional[float] = None) -> Dict[str, Any]:
+        """Get the ages of a unit's last poll, update and change in seconds.
+
+        Raises:
+            KeyError: If the unit is not scheduled
+        """
+        return self._units[identifier].as_dict(self._now(now))
+
+    def record_poll(self, identifier: str, changes: int, now: Optional[float] = None) -> None:
+        """Record a completed poll of a unit and schedule the next one.
+
+        Args:
+            identifier: Identifier of the unit
+            changes: Number of fields the poll changed
+            now: Current monotonic time, defaults to the scheduler clock
+        """
+        with self._lock:
+            state = self._units.get(identifier)
+            if state is None:
+                return
+            now = self._now(now)
+            state.last_poll = now
+            state.failures = 0
+            state.in_flight = False
+            self._observe(state, changes, now)
+
+    def record_update(self, identifier: str, changes: int, now: Optional[float] = None) -> None:
+        """Record data about a unit received other than by polling (e.g. over the WebSocket).
+
+        A unit whose poll is in flight is not rescheduled until the poll is
+        reported, so it is never handed out twice at once.
+
+        Args:
+            identifier: Identifier of the unit
+            changes: Number of fields the update changed
+            now: Current monotonic time, defaults to the scheduler clock
+        """
+        with self._lock:
+            state = self._units.get(identifier)
+            if state is None:
+                return
+            self._observe(state, changes, self._now(now))
+
+    def record_failure(self, identifier: str, retry_after: Optional[float] = None,
+                       now: Optional[float] = None) -> None:
+        """Record a failed poll and retry later, backing off on repeated failures.
+
+        Args:
+            identifier: Identifier of the unit
+            retry_after: Seconds the server asked to wait; pauses all polling
+            now: Current monotonic time, defaults to the scheduler clock
+        """
+        with self._lock:
+            now = self._now(now)
+            self.failures += 1
+            if retry_after:
+                self._paused_until = max(self._paused_until, now + retry_after)
+            state = self._units.get(identifier)
+            if state is None:
+                return
+            state.failures += 1
+            state.in_flight = False
+            delay = min(self.max_interval, self.min_interval * 2 ** (state.failures - 1))
+            self._schedule(state, now + max(delay, retry_after or 0.0))
+
+    def due(self, limit: Optional[int] = None, now: Optional[float] = None) -> List[str]:
+        """Take the units to poll now, stalest first, within the request budget.
+
+        Each returned unit counts against the budget and is not handed out
+        again until its poll is reported with :meth:`record_poll` or
+        :meth:`record_failure`.
+
+        Args:
+            limit: Maximum number of units to return
+            now: Current monotonic time, defaults to the scheduler clock
+
+        Returns:
+            list: Identifiers of the units to poll
+        """
+        with self._lock:
+            now = self._now(now)
+            if now < self._paused_until:
+                return []
+            self._refill(now)
+            available = int(self._tokens)
+            if limit is not None:
+                available = min(available, limit)
+            identifiers: List[str] = []
+            heap = self._heap
+            while heap and len(identifiers) < available and heap[0][0] <= now:
+                entry = heapq.heappop(heap)
+                state = entry[-1]
+                if state is None:
+                    continue
+                state._entry = None
+                state.due = math.inf
+                state.in_flight = True
+                identifiers.append(state.identifier)
+            self._tokens -= len(identifiers)
+            return identifiers
+
+    def next_due_in(self, now: Optional[float] = None) -> float:
+        """Get the number of seconds until a poll can be made.
+
+        Returns:
+            float: Seconds until the earliest unit is due and a request is
+                available (0 if one is due now), ``inf`` if no unit is scheduled
+        """
+        with self._lock:
+            now = self._now(now)
+            heap = self._heap
+            while heap and heap[0][-1] is None:
+                heapq.heappop(heap)
+            if not heap:
+                return math.inf
+            self._refill(now)
+            token_wait = max(0.0, (1.0 - self._tokens) * 60.0 / self.requests_per_minute)
+            earliest: float = heap[0][0]
+            return max(earliest - now, token_wait, self._paused_until - now, 0.0)
+
+    def poll(self, api: "SystemairAPI", units: Mapping[str, "VentilationUnit"],
+             limit: Optional[int] = None) -> Dict[str, "ChangeSet"]:
+        """Fetch the status of the due units and apply it to them.
+
+        Args:
+            api: API client used for ``fetch_device_status``
+            units: Units by identifier; scheduled identifiers missing here are skipped
+            limit: Maximum number of units to poll
+
+        Returns:
+            dict: Identifier -> change-set of every unit that was polled successfully
+        """
+        results = {}
+        for identifier in self.due(limit):
+            changes = self.poll_unit(api, identifier, units.get(identifier))
+            if changes is not None:
+                results[identifier] = changes
+        return results
+
+    def poll_unit(self, api: "SystemairAPI", identifier: str,
+                  unit: Optional["VentilationUnit"]) -> Optional["ChangeSet"]:
+        """Fetch and apply the status of one unit handed out by :meth:`due`, recording the outcome.
+
+        Args:
+            api: API client used for ``fetch_device_status``
+            identifier: Identifier of the unit
+            unit: The unit to update, None if it is no longer known
+
+        Returns:
+            list: The change-set of the update, None if the poll failed
+        """
+        if unit is None:
+            self.record_failure(identifier)
+            return None
+        try:
+            changes = unit.update_from_api(api.fetch_device_status(identifier))
+        except RateLimitError as e:
+            logger.warning("Rate limited while polling %s: %s", identifier, e)
+            self.record_failure(identifier, retry_after=e.retry_after or self.min_interval)
+            return None
+        except Exception as e:
+            logger.warning("Error fetching device status for %s: %s", identifier, e)
+            self.record_failure(identifier)
+            return None
+        with self._lock:
+            self.polls += 1
+        self.record_poll(identifier, len(changes))
+        return changes
+
+    def stats(self) -> Dict[str, Any]:
+        """Get request counters and the spread of poll intervals."""
+        with self._lock:
+            intervals = sorted(self._interval(state) for state in self._units.values())
+            return {
+                "units": len(intervals),
+                "polls": self.polls,
+                "failures": self.failures,
+                "tokens": self._tokens,
+                "min_interval": intervals[0] if intervals else None,
+                "median_interval": intervals[len(intervals) // 2] if intervals else None,
+                "max_interval": intervals[-1] if intervals else None,
+            }
+
+    def _now(self, now: Optional[float]) -> float:
+        return self._clock() if now is None else now
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._refilled_at
+        if elapsed > 0:
+            self._tokens = min(self.burst, self._tokens + elapsed * self.requests_per_minute / 60.0)
+            self._refilled_at = now
+
+    def _interval(self, state: UnitFreshness) -> float:
+        """Expected time between changes, clamped to the configured interval range."""
+        if state.change_rate is None:
+            return self.min_interval
+        if state.change_rate <= 0:
+            return self.max_interval
+        return min(self.max_interval, max(self.min_interval, 1.0 / state.change_rate))
+
+    def _observe(self, state: UnitFreshness, changes: int, now: float) -> None:
+        """Fold a new observation into the unit's change rate and reschedule it."""
+        if state.last_update is not None and now > state.last_update:
+            observed = changes / (now - state.last_update)
+            if state.change_rate is None:
+                state.change_rate = observed
+            else:
+                state.change_rate += self.smoothing * (observed - state.change_rate)
+        state.last_update = now
+        if changes:
+            state.last_change = now
+        if not state.in_flight:
+            self._schedule(state, now + self._interval(state))
+
+    def _schedule(self, state: UnitFreshness, due: float) -> None:
+        """Move a unit to a new due time, leaving its old heap entry behind as a tombstone."""
+        if state._entry is not None:
+            state._entry[-1] = None
+        state.due = due
+        # The sequence number breaks ties so entries never compare their states
+        state._entry = [due, next(self._sequence), state]
+        heapq.heappush(self._heap, state._entry)
+        if len(self._heap) > 2 * len(self._units) + 64:
+            self._heap = [entry for entry in self._heap if entry[-1] is not None]
+            heapq.heapify(self._heap)
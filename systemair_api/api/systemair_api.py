@@ -1,9 +1,11 @@
 """SystemairAPI - Core API communication module for Systemair ventilation units."""
 
+import time
 from typing import Dict, List, Optional, Any, Union, cast
 import requests
 from systemair_api.utils.constants import APIEndpoints
 from systemair_api.utils.exceptions import APIError, DeviceNotFoundError, RateLimitError
+from systemair_api.utils.metrics import ClientMetrics
 
 class SystemairAPI:
     """Core API interface for communicating with Systemair Home Solutions API.
@@ -11,14 +13,20 @@ class SystemairAPI:
     Provides methods for discovering devices, fetching device status,
     and sending control commands to ventilation units.
     """
+
+    # Request metrics shared by all clients, set by ClientMetrics.install()
+    metrics: Optional[ClientMetrics] = None
     
-    def __init__(self, access_token: str) -> None:
+    def __init__(self, access_token: str, session: Optional[requests.Session] = None) -> None:
         """Initialize the SystemairAPI with an access token.
         
         Args:
             access_token: A valid JWT access token from authentication
+            session: Optional session to send requests through, e.g. one
+                sharing a connection pool with other clients
         """
         self.access_token: str = access_token
+        self.session: Optional[requests.Session] = session
         self.headers: Dict[str, str] = {
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:128.0) Gecko/20100101 Firefox/128.0',
             'Accept': '*/*',
@@ -45,6 +53,34 @@ class SystemairAPI:
         self.access_token = access_token
         self.headers['x-access-token'] = access_token
 
+    def _post(self, url: str, headers: Dict[str, str], data: Dict[str, Any],
+              operation: str = "graphql") -> requests.Response:
+        """Send a JSON POST request through the configured session, if any.
+        
+        Args:
+            url: Endpoint URL
+            headers: Request headers
+            data: JSON body
+            operation: GraphQL operation name, used to label request metrics
+            
+        Returns:
+            requests.Response: The HTTP response
+        """
+        metrics = self.metrics
+        started = time.perf_counter()
+        try:
+            if self.session is not None:
+                response = self.session.post(url, headers=headers, json=data)
+            else:
+                response = requests.post(url, headers=headers, json=data)
+        except requests.exceptions.RequestException:
+            if metrics is not None:
+                metrics.record_request(operation, None, time.perf_counter() - started)
+            raise
+        if metrics is not None:
+            metrics.record_request(operation, response.status_code, time.perf_counter() - started)
+        return response
+
     def broadcast_device_statuses(self, device_ids: List[str]) -> Dict[str, Any]:
         """Broadcast requests for device statuses to trigger WebSocket updates.
         
@@ -69,7 +105,7 @@ class SystemairAPI:
         }
 
         try:
-            response = requests.post(APIEndpoints.GATEWAY, headers=self.headers, json=data)
+            response = self._post(APIEndpoints.GATEWAY, self.headers, data, "BroadcastDeviceStatuses")
             
             if response.status_code == 429:
                 retry_after = response.headers.get('Retry-After')
@@ -126,7 +162,7 @@ class SystemairAPI:
         }
 
         try:
-            response = requests.post(APIEndpoints.REMOTE, headers=headers, json=data)
+            response = self._post(APIEndpoints.REMOTE, headers, data, "GetView")
             
             if response.status_code == 404:
                 raise DeviceNotFoundError(device_id)
@@ -189,7 +225,7 @@ class SystemairAPI:
         }
 
         try:
-            response = requests.post(APIEndpoints.GATEWAY, headers=self.headers, json=data)
+            response = self._post(APIEndpoints.GATEWAY, self.headers, data, "GetAccountDevices")
             
             if response.status_code == 429:
                 retry_after = response.headers.get('Retry-After')
@@ -247,7 +283,7 @@ class SystemairAPI:
         }
 
         try:
-            response = requests.post(APIEndpoints.REMOTE, headers=headers, json=data)
+            response = self._post(APIEndpoints.REMOTE, headers, data, "WriteDataItems")
             
             if response.status_code == 404:
                 raise DeviceNotFoundError(device_id)
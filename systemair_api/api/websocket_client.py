@@ -2,17 +2,26 @@
 
 import websocket
 import json
+import logging
 import threading
 import ssl
 from typing import Any, Callable, Dict, Optional, Union, cast
 from websocket import WebSocket, WebSocketApp
 
+from systemair_api.utils.constants import APIEndpoints
+from systemair_api.utils.metrics import ClientMetrics
+
+logger = logging.getLogger(__name__)
+
 class SystemairWebSocket:
     """WebSocket client for real-time updates from Systemair Home Solutions API.
     
     Establishes a persistent connection to the Systemair WebSocket server
     and processes incoming messages through a callback function.
     """
+
+    # Connection metrics shared by all clients, set by ClientMetrics.install()
+    metrics: Optional[ClientMetrics] = None
     
     def __init__(self, access_token: str, on_message_callback: Callable[[Dict[str, Any]], None]) -> None:
         """Initialize the WebSocket client.
@@ -33,6 +42,8 @@ class SystemairWebSocket:
             ws: WebSocket connection
             message: Raw message data
         """
+        if self.metrics is not None:
+            self.metrics.websocket_messages.inc()
         data = json.loads(message)
         self.on_message_callback(data)
 
@@ -43,8 +54,9 @@ class SystemairWebSocket:
             ws: WebSocket connection
             error: Error information
         """
-        # Log to stdout for diagnostic purposes, but keep it minimal
-        print(f"WebSocket error: {error}")
+        if self.metrics is not None:
+            self.metrics.websocket_errors.inc()
+        logger.error("WebSocket error: %s", error)
 
     def on_close(self, ws: WebSocket, close_status_code: Any, close_msg: Any) -> None:
         """Handle WebSocket connection closure.
@@ -56,9 +68,9 @@ class SystemairWebSocket:
         """
         # Important status messages are kept to help diagnose issues
         if close_status_code:
-            print(f"WebSocket connection closed with code: {close_status_code}")
+            logger.info("WebSocket connection closed with code: %s", close_status_code)
         else:
-            print("WebSocket connection closed")
+            logger.info("WebSocket connection closed")
 
     def on_open(self, ws: WebSocket) -> None:
         """Handle WebSocket connection opening.
@@ -66,8 +78,10 @@ class SystemairWebSocket:
         Args:
             ws: WebSocket connection
         """
+        if self.metrics is not None:
+            self.metrics.record_websocket_open()
         # Connection established notification is useful for debugging
-        print("WebSocket connection opened")
+        logger.info("WebSocket connection opened")
 
     def connect(self) -> None:
         """Establish a WebSocket connection in a separate thread.
@@ -78,7 +92,7 @@ class SystemairWebSocket:
         # Disable WebSocket trace output to keep logs cleaner
         websocket.enableTrace(False)
         self.ws = websocket.WebSocketApp(
-            f"wss://homesolutions.systemair.com/streaming/",
+            APIEndpoints.STREAMING,
             header=[
                 f"Sec-WebSocket-Protocol: accessToken, {self.access_token}",
                 "Origin: https://homesolutions.systemair.com",
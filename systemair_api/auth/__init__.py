@@ -1,3 +1,5 @@
 """Authentication modules for Systemair Home Solutions cloud."""
 
 from systemair_api.auth.authenticator import SystemairAuthenticator
+from systemair_api.auth.async_authenticator import AsyncSystemairAuthenticator, authenticate_many
+from systemair_api.auth.token_cache import TokenCache
@@ -0,0 +1,158 @@
+"""AsyncSystemairAuthenticator - asyncio front-end for the SSO authentication flow."""
+
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Iterable, List, Optional, Sequence, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from systemair_api.auth.authenticator import SystemairAuthenticator
+from systemair_api.auth.token_cache import TokenCache
+
+DEFAULT_MAX_CONCURRENCY = 16
+
+
+def create_pooled_adapter(pool_maxsize: int = DEFAULT_MAX_CONCURRENCY) -> HTTPAdapter:
+    """Create a transport adapter whose connection pool can be shared by many sessions.
+
+    Args:
+        pool_maxsize: Maximum number of pooled connections kept per host
+
+    Returns:
+        HTTPAdapter: Adapter to mount on several sessions
+    """
+    return HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize)
+
+
+def create_session(adapter: Optional[HTTPAdapter] = None) -> requests.Session:
+    """Create a session that sends its requests through a shared adapter.
+
+    Each session keeps its own cookie jar, which the SSO login requires,
+    while TCP/TLS connections are reused across all sessions mounting the
+    same adapter.
+
+    Args:
+        adapter: Shared adapter, a new pooled adapter is created if omitted
+
+    Returns:
+        requests.Session: Session using the adapter for http and https
+    """
+    session = requests.Session()
+    adapter = adapter if adapter is not None else create_pooled_adapter()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class AsyncSystemairAuthenticator:
+    """Awaitable wrapper around :class:`SystemairAuthenticator`.
+
+    The blocking SSO requests run on an executor so that many accounts can
+    log in or refresh concurrently from a single event loop. Token state
+    lives on the wrapped authenticator and stays usable from synchronous code.
+    """
+
+    def __init__(self, authenticator: SystemairAuthenticator, executor: Optional[Executor] = None) -> None:
+        """Initialize the async authenticator.
+
+        Args:
+            authenticator: The authenticator performing the requests
+            executor: Executor for the blocking calls, defaults to the loop's default executor
+        """
+        self.authenticator: SystemairAuthenticator = authenticator
+        self.executor: Optional[Executor] = executor
+
+    @classmethod
+    def for_accounts(cls, credentials: Iterable[Tuple[str, str]], adapter: Optional[HTTPAdapter] = None,
+                     token_cache: Optional[TokenCache] = None,
+                     executor: Optional[Executor] = None) -> List["AsyncSystemairAuthenticator"]:
+        """Create async authenticators for several accounts sharing one connection pool.
+
+        Args:
+            credentials: Iterable of ``(email, password)`` pairs
+            adapter: Shared transport adapter, a new pooled adapter is created if omitted
+            token_cache: Optional token cache used by every authenticator
+            executor: Executor for the blocking calls
+
+        Returns:
+            list: One AsyncSystemairAuthenticator per account, in input order
+        """
+        adapter = adapter if adapter is not None else create_pooled_adapter()
+        return [
+            cls(SystemairAuthenticator(email, password, token_cache, session=create_session(adapter)), executor)
+            for email, password in credentials
+        ]
+
+    @property
+    def email(self) -> str:
+        """The account e-mail address."""
+        return self.authenticator.email
+
+    @property
+    def access_token(self) -> Optional[str]:
+        """The current access token, if authenticated."""
+        return self.authenticator.access_token
+
+    def is_token_valid(self) -> bool:
+        """Check if the current token is still valid.
+
+        Returns:
+            bool: True if token is valid, False otherwise
+        """
+        return self.authenticator.is_token_valid()
+
+    async def authenticate(self) -> str:
+        """Perform the full authentication flow without blocking the event loop.
+
+        Returns:
+            str: The access token if successful
+
+        Raises:
+            AuthenticationError: If authentication fails for any reason
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.authenticator.authenticate)
+
+    async def refresh_access_token(self) -> str:
+        """Refresh the access token without blocking the event loop.
+
+        Returns:
+            str: The new access token if successful
+
+        Raises:
+            TokenRefreshError: If refresh fails or no refresh token is available
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.authenticator.refresh_access_token)
+
+
+async def authenticate_many(authenticators: Sequence[AsyncSystemairAuthenticator],
+                            max_concurrency: int = DEFAULT_MAX_CONCURRENCY) -> List[Union[str, BaseException]]:
+    """Authenticate many accounts concurrently.
+
+    At most ``max_concurrency`` logins are in flight at once. Authenticators
+    without their own executor share a thread pool of that size. A failure
+    for one account does not affect the others.
+
+    Args:
+        authenticators: The accounts to authenticate
+        max_concurrency: Maximum number of simultaneous logins
+
+    Returns:
+        list: Access token or raised exception per authenticator, in input order
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    shared_executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="systemair-auth")
+
+    async def run(async_auth: AsyncSystemairAuthenticator) -> str:
+        async with semaphore:
+            if async_auth.executor is not None:
+                return await async_auth.authenticate()
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(shared_executor, async_auth.authenticator.authenticate)
+
+    try:
+        return await asyncio.gather(*(run(a) for a in authenticators), return_exceptions=True)
+    finally:
+        shared_executor.shutdown(wait=False)
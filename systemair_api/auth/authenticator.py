@@ -1,15 +1,19 @@
 """SystemairAuthenticator - Authentication module for Systemair Home Solutions cloud."""
 
+import logging
+import time
 import uuid
 import requests
-import json
-import base64
 from typing import Dict, Optional, Any, Union, cast
-from datetime import datetime, timedelta
-from bs4 import BeautifulSoup, Tag
+from datetime import datetime
+from systemair_api.auth.login_form import parse_login_form, parse_login_form_bs4
+from systemair_api.auth.token_cache import TokenCache
+from systemair_api.auth.token_claims import TokenClaims, decode_token_claims
 from systemair_api.utils.constants import APIEndpoints, CLIENT_ID, REDIRECT_URI
 from systemair_api.utils.exceptions import AuthenticationError, TokenRefreshError
 
+logger = logging.getLogger(__name__)
+
 class SystemairAuthenticator:
     """Authentication handler for Systemair Home Solutions cloud.
     
@@ -18,21 +22,28 @@ class SystemairAuthenticator:
     - Token exchange
     - Token refresh
     - Token validation
+    - Optional persistent token caching across processes
     """
     
-    def __init__(self, email: str, password: str) -> None:
+    def __init__(self, email: str, password: str, token_cache: Optional[TokenCache] = None,
+                 session: Optional[requests.Session] = None) -> None:
         """Initialize the authenticator with user credentials.
         
         Args:
             email: User's email address
             password: User's password
+            token_cache: Optional persistent token store consulted before logging in
+            session: Optional session to use for all SSO requests, e.g. one
+                sharing a connection pool with other authenticators
         """
         self.email: str = email
         self.password: str = password
-        self.session: requests.Session = requests.Session()
+        self.session: requests.Session = session if session is not None else requests.Session()
         self.access_token: Optional[str] = None
         self.refresh_token: Optional[str] = None
         self.token_expiry: Optional[datetime] = None
+        self.token_claims: Optional[TokenClaims] = None
+        self.token_cache: Optional[TokenCache] = token_cache
 
     def generate_state_parameter(self) -> str:
         """Generate a random state parameter for the OAuth flow.
@@ -66,7 +77,7 @@ class SystemairAuthenticator:
         
         This method simulates the browser login process by:
         1. Fetching the login page
-        2. Extracting the form and input fields
+        2. Extracting the form and input fields (stdlib parser, BeautifulSoup as fallback)
         3. Submitting the form with credentials
         4. Following redirects to obtain the authorization code
         
@@ -79,29 +90,24 @@ class SystemairAuthenticator:
         Raises:
             Exception: If login fails or authorization code cannot be obtained
         """
-        # print(f"Fetching login page from: {auth_url}")
+        logger.debug("Fetching login page from: %s", auth_url)
         response = self.session.get(auth_url)
-        soup = BeautifulSoup(response.content, 'html.parser')
-
-        form = soup.find('form')
-        if not form:
+        login_form = parse_login_form(response.text)
+        if login_form is None:
+            login_form = parse_login_form_bs4(response.content)
+        if login_form is None:
             raise AuthenticationError('Login form not found')
 
-        # Cast to Tag to ensure proper type handling
-        form_tag = cast(Tag, form)
-        action_url = form_tag['action']
-        inputs = form_tag.find_all('input')
+        action_url, inputs = login_form
 
         form_data = {}
-        for input_tag in inputs:
-            # Cast each input element to Tag
-            input_tag = cast(Tag, input_tag)
-            if input_tag.get('name') == 'username':
-                form_data[input_tag['name']] = self.email
-            elif input_tag.get('name') == 'password':
-                form_data[input_tag['name']] = self.password
-            elif input_tag.get('name'):
-                form_data[input_tag['name']] = input_tag.get('value', '')
+        for name, value in inputs:
+            if name == 'username':
+                form_data[name] = self.email
+            elif name == 'password':
+                form_data[name] = self.password
+            else:
+                form_data[name] = value
 
         headers = {
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:128.0) Gecko/20100101 Firefox/128.0',
@@ -109,15 +115,9 @@ class SystemairAuthenticator:
             'Accept-Language': 'en-US,en;q=0.5',
             'Content-Type': 'application/x-www-form-urlencoded',
         }
-        # print("Submitting login form...")
-        # Handle potential list type for action_url by ensuring it's a string
-        if isinstance(action_url, list):
-            action_url_str = action_url[0] if action_url else ''
-        else:
-            action_url_str = action_url
-            
-        response = self.session.post(action_url_str, data=form_data, headers=headers, allow_redirects=False)
-        # print(f"Login form submission response status: {response.status_code} {response.reason}")
+        logger.debug("Submitting login form...")
+        response = self.session.post(action_url, data=form_data, headers=headers, allow_redirects=False)
+        logger.debug("Login form submission response status: %s %s", response.status_code, response.reason)
 
         if response.status_code == 302:
             redirect_url = response.headers.get('Location')
@@ -127,13 +127,13 @@ class SystemairAuthenticator:
                 raise AuthenticationError('Redirect URL not found in headers')
 
             response = self.session.get(redirect_url, allow_redirects=True)
-            # print(f"Redirect follow-up response status: {response.status_code} {response.reason}")
+            logger.debug("Redirect follow-up response status: %s %s", response.status_code, response.reason)
 
             if response.status_code == 200:
                 if 'code=' in response.url:
                     auth_code = response.url.split('code=')[1].split('&')[0]
                     # print("Authorization Code:", auth_code)
-                    print("Authentication success")
+                    logger.info("Authentication success")
                     return auth_code
                 else:
                     raise AuthenticationError('Authorization code not found in final URL')
@@ -174,11 +174,11 @@ class SystemairAuthenticator:
             'TE': 'trailers',
         }
 
-        response = requests.post(APIEndpoints.TOKEN, data=data, headers=headers)
+        response = self.session.post(APIEndpoints.TOKEN, data=data, headers=headers)
         if response.status_code == 200:
             return cast(Dict[str, Any], response.json())
         else:
-            print("Failed to exchange code for token:", response.content)
+            logger.error("Failed to exchange code for token: %s", response.content)
             response.raise_for_status()
             # This line is never reached but needed for mypy
             return {}
@@ -186,6 +186,10 @@ class SystemairAuthenticator:
     def authenticate(self) -> str:
         """Perform the full authentication flow.
         
+        If a token cache is configured, a cached access token that is still
+        valid is reused, and otherwise the cached refresh token is tried,
+        before falling back to the login flow.
+        
         This method orchestrates the complete authentication process:
         1. Generate state parameter
         2. Construct auth URL
@@ -199,6 +203,9 @@ class SystemairAuthenticator:
         Raises:
             AuthenticationError: If authentication fails for any reason
         """
+        if self.token_cache is not None and self.restore_cached_tokens():
+            return str(self.access_token)
+
         state = self.generate_state_parameter()
         auth_url = self.construct_auth_url(state)
         auth_code = self.simulate_login(auth_url)
@@ -209,7 +216,8 @@ class SystemairAuthenticator:
         if not self.access_token:
             raise AuthenticationError('No access token found in response')
             
-        self.token_expiry = self.get_token_expiry(self.access_token)
+        self._decode_access_token(self.access_token)
+        self.save_cached_tokens()
         return str(self.access_token)
 
     def refresh_access_token(self) -> str:
@@ -243,7 +251,7 @@ class SystemairAuthenticator:
             'Sec-Fetch-Site': 'same-site',
         }
 
-        response = requests.post(APIEndpoints.TOKEN, data=data, headers=headers)
+        response = self.session.post(APIEndpoints.TOKEN, data=data, headers=headers)
         if response.status_code == 200:
             token_data = response.json()
             self.access_token = token_data.get('access_token')
@@ -252,46 +260,129 @@ class SystemairAuthenticator:
             if not self.access_token:
                 raise TokenRefreshError('No access token found in refresh response')
                 
-            self.token_expiry = self.get_token_expiry(self.access_token)
+            self._decode_access_token(self.access_token)
+            self.save_cached_tokens()
             return str(self.access_token)
         else:
             raise TokenRefreshError(f"Failed to refresh token: {response.text}")
 
-    def get_token_expiry(self, token: str) -> Optional[datetime]:
-        """Decode the JWT and extract the expiry time.
+    def restore_cached_tokens(self) -> bool:
+        """Load tokens for this account from the token cache.
+        
+        A cached access token is used as-is while it is valid; otherwise the
+        cached refresh token is exchanged for a new access token. Entries that
+        cannot be refreshed are removed, and a cache that cannot be read is
+        treated as empty.
+        
+        Returns:
+            bool: True if a valid access token is available, False if a full login is needed
+        """
+        if self.token_cache is None:
+            return False
+
+        try:
+            cached = self.token_cache.load(self.email)
+        except OSError as e:
+            logger.warning("Failed to read token cache: %s", e)
+            return False
+        if not cached:
+            return False
+
+        access_token: str = cached['access_token']
+        self.access_token = access_token
+        self.refresh_token = cached['refresh_token']
+        self.token_expiry = cached['token_expiry']
+        self.token_claims = self.get_token_claims(access_token)
+        if self.is_token_valid():
+            return True
+
+        if self.refresh_token:
+            try:
+                self.refresh_access_token()
+                return True
+            except (TokenRefreshError, requests.exceptions.RequestException):
+                pass
+
+        try:
+            self.token_cache.clear(self.email)
+        except OSError as e:
+            logger.warning("Failed to clear token cache: %s", e)
+
+        self.access_token = None
+        self.refresh_token = None
+        self.token_expiry = None
+        self.token_claims = None
+        return False
+
+    def save_cached_tokens(self) -> None:
+        """Write the current tokens to the token cache, if one is configured.
+        
+        Failures to write the cache are reported but never fail authentication.
+        """
+        if self.token_cache is None or not self.access_token:
+            return
+
+        try:
+            self.token_cache.store(self.email, self.access_token, self.refresh_token, self.token_expiry)
+        except OSError as e:
+            logger.warning("Failed to write token cache: %s", e)
+
+    def _decode_access_token(self, token: str) -> None:
+        """Set the claims and expiry of a new access token, decoding it once."""
+        self.token_claims = self.get_token_claims(token)
+        self.token_expiry = self.token_claims.expiry if self.token_claims else None
+
+    def get_token_claims(self, token: str) -> Optional[TokenClaims]:
+        """Decode the claims of a JWT, reusing earlier decodes of the same token.
         
         Args:
             token: JWT token to decode
             
         Returns:
-            datetime: Token expiry time as datetime object
-            
-        Raises:
-            ValueError: If expiry time cannot be found in the token
+            TokenClaims: The decoded claims, or None if the token cannot be decoded
         """
         try:
-            # Split the token and get the payload part (second part)
-            payload = token.split('.')[1]
-
-            # Add padding if necessary
-            payload += '=' * ((4 - len(payload) % 4) % 4)
+            return decode_token_claims(token)
+        except ValueError as e:
+            logger.warning("Error decoding token: %s", e)
+            return None
 
-            # Decode the Base64 string
-            decoded_payload = base64.b64decode(payload)
+    def get_token_expiry(self, token: str) -> Optional[datetime]:
+        """Decode the JWT and extract the expiry time.
+        
+        Args:
+            token: JWT token to decode
+            
+        Returns:
+            datetime: Token expiry time as datetime object, or None if it cannot be decoded
+        """
+        claims = self.get_token_claims(token)
+        return claims.expiry if claims else None
 
-            # Parse the JSON
-            token_data = json.loads(decoded_payload)
+    @property
+    def token_expiry(self) -> Optional[datetime]:
+        """Expiry time of the current access token."""
+        return self._token_expiry
 
-            # Extract the expiry time
-            exp_timestamp = token_data.get('exp')
+    @token_expiry.setter
+    def token_expiry(self, expiry: Optional[datetime]) -> None:
+        self._token_expiry = expiry
+        # Anchor the expiry to the monotonic clock once, so validity checks
+        # need neither datetime arithmetic nor token decoding
+        if expiry is None:
+            self._expires_monotonic: Optional[float] = None
+        else:
+            self._expires_monotonic = time.monotonic() + (expiry - datetime.now()).total_seconds()
 
-            if exp_timestamp:
-                return datetime.fromtimestamp(exp_timestamp)
-            else:
-                raise ValueError("No expiry time found in token")
-        except Exception as e:
-            print(f"Error decoding token: {e}")
+    def time_to_expiry(self) -> Optional[float]:
+        """Return the number of seconds until the current token expires.
+        
+        Returns:
+            float: Seconds until expiry (negative once expired), or None if no expiry is known
+        """
+        if self._expires_monotonic is None:
             return None
+        return self._expires_monotonic - time.monotonic()
 
     def is_token_valid(self) -> bool:
         """Check if the current token is still valid.
@@ -299,8 +390,6 @@ class SystemairAuthenticator:
         Returns:
             bool: True if token is valid, False otherwise
         """
-        if not self.token_expiry:
-            return False
-
         # Consider the token invalid if it's about to expire in the next 30 seconds
-        return datetime.now() + timedelta(seconds=30) < self.token_expiry
+        expires = self._expires_monotonic
+        return expires is not None and time.monotonic() + 30 < expires
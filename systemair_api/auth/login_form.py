@@ -0,0 +1,99 @@
+"""Login form extraction for the Systemair SSO (Keycloak) login page."""
+
+from html.parser import HTMLParser
+from typing import List, Optional, Tuple
+
+LoginForm = Tuple[str, List[Tuple[str, str]]]
+
+
+class _FormComplete(Exception):
+    """Raised internally to stop parsing once the first form has been read."""
+
+
+class _LoginFormParser(HTMLParser):
+    """Streaming parser collecting the action and inputs of the first form."""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.action: Optional[str] = None
+        self.inputs: List[Tuple[str, str]] = []
+        self.in_form: bool = False
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        if tag == "form" and not self.in_form:
+            self.in_form = True
+            self.action = dict(attrs).get("action")
+        elif tag == "input" and self.in_form:
+            attributes = dict(attrs)
+            name = attributes.get("name")
+            if name:
+                self.inputs.append((name, attributes.get("value") or ""))
+
+    def handle_startendtag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "form" and self.in_form:
+            raise _FormComplete()
+
+
+def parse_login_form(html: str) -> Optional[LoginForm]:
+    """Extract the action URL and named inputs of the first form in a page.
+
+    Uses the standard library HTML parser and stops reading as soon as the
+    first ``</form>`` is seen, so it neither builds a document tree nor
+    requires BeautifulSoup.
+
+    Args:
+        html: The login page markup
+
+    Returns:
+        tuple: ``(action_url, [(name, value), ...])`` or None if no form with
+            an action attribute could be found
+    """
+    parser = _LoginFormParser()
+    try:
+        parser.feed(html)
+        parser.close()
+    except _FormComplete:
+        pass
+    except Exception:
+        return None
+
+    if not parser.action:
+        return None
+    return parser.action, parser.inputs
+
+
+def parse_login_form_bs4(content: bytes) -> Optional[LoginForm]:
+    """Extract the login form using BeautifulSoup.
+
+    Slower fallback for markup the streaming parser cannot handle. bs4 is
+    imported lazily so the common path never pays its import cost.
+
+    Args:
+        content: The raw login page
+
+    Returns:
+        tuple: ``(action_url, [(name, value), ...])`` or None if no form with
+            an action attribute could be found
+    """
+    from bs4 import BeautifulSoup, Tag
+
+    soup = BeautifulSoup(content, 'html.parser')
+    form = soup.find('form')
+    if not isinstance(form, Tag):
+        return None
+
+    action_url = form.get('action')
+    if isinstance(action_url, list):
+        action_url = action_url[0] if action_url else None
+    if not action_url:
+        return None
+
+    inputs = []
+    for input_tag in form.find_all('input'):
+        if isinstance(input_tag, Tag) and input_tag.get('name'):
+            value = input_tag.get('value', '')
+            inputs.append((str(input_tag['name']), str(value)))
+    return str(action_url), inputs
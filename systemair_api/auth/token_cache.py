@@ -0,0 +1,174 @@
+"""TokenCache - Persistent on-disk token store shared across processes."""
+
+import hashlib
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None  # type: ignore
+
+TOKEN_CACHE_ENV = "SYSTEMAIR_TOKEN_CACHE"
+
+
+def default_cache_path() -> str:
+    """Return the default location of the token cache file.
+
+    The ``SYSTEMAIR_TOKEN_CACHE`` environment variable takes precedence,
+    followed by ``$XDG_CACHE_HOME/systemair_api/tokens.json`` and finally
+    ``~/.cache/systemair_api/tokens.json``.
+
+    Returns:
+        str: Absolute path of the cache file
+    """
+    override = os.getenv(TOKEN_CACHE_ENV)
+    if override:
+        return os.path.abspath(os.path.expanduser(override))
+    cache_home = os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "systemair_api", "tokens.json")
+
+
+class TokenCache:
+    """File-backed token store keyed by account.
+
+    Tokens for all accounts live in a single JSON file readable only by the
+    current user. Reads take a shared lock and writes an exclusive lock on a
+    sidecar ``.lock`` file, and the data file is replaced atomically, so
+    concurrent CLI jobs and worker processes never observe a partial write.
+    Account keys are hashed so the file does not reveal e-mail addresses.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        """Initialize the cache.
+
+        Args:
+            path: Location of the cache file, defaults to :func:`default_cache_path`
+        """
+        self.path: str = path or default_cache_path()
+        self.lock_path: str = f"{self.path}.lock"
+
+    @staticmethod
+    def account_key(account: str) -> str:
+        """Derive the storage key for an account.
+
+        Args:
+            account: Account identifier, usually the login e-mail address
+
+        Returns:
+            str: Hex digest used as key in the cache file
+        """
+        return hashlib.sha256(account.strip().lower().encode("utf-8")).hexdigest()
+
+    def load(self, account: str) -> Optional[Dict[str, Any]]:
+        """Load the cached tokens for an account.
+
+        Args:
+            account: Account identifier, usually the login e-mail address
+
+        Returns:
+            dict: Entry with ``access_token``, ``refresh_token`` and
+                ``token_expiry`` (datetime or None), or None if nothing usable is cached
+        """
+        with self._locked(exclusive=False):
+            entry = self._read().get(self.account_key(account))
+
+        if not isinstance(entry, dict) or not entry.get("access_token"):
+            return None
+
+        expires_at = entry.get("expires_at")
+        return {
+            "access_token": entry["access_token"],
+            "refresh_token": entry.get("refresh_token"),
+            "token_expiry": datetime.fromtimestamp(expires_at) if expires_at else None,
+        }
+
+    def store(self, account: str, access_token: str, refresh_token: Optional[str],
+              token_expiry: Optional[datetime]) -> None:
+        """Store tokens for an account, replacing any previous entry.
+
+        Args:
+            account: Account identifier, usually the login e-mail address
+            access_token: Current access token
+            refresh_token: Current refresh token, if any
+            token_expiry: Expiry time of the access token, if known
+
+        Raises:
+            OSError: If the cache file cannot be written
+        """
+        with self._locked(exclusive=True):
+            entries = self._read()
+            entries[self.account_key(account)] = {
+                "access_token": access_token,
+                "refresh_token": refresh_token,
+                "expires_at": token_expiry.timestamp() if token_expiry else None,
+            }
+            self._write(entries)
+
+    def clear(self, account: str) -> None:
+        """Remove the cached tokens for an account.
+
+        Args:
+            account: Account identifier, usually the login e-mail address
+
+        Raises:
+            OSError: If the cache file cannot be written
+        """
+        with self._locked(exclusive=True):
+            entries = self._read()
+            if entries.pop(self.account_key(account), None) is not None:
+                self._write(entries)
+
+    def _read(self) -> Dict[str, Any]:
+        """Read all entries, treating a missing or corrupt file as empty."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _write(self, entries: Dict[str, Any]) -> None:
+        """Atomically replace the cache file with owner-only permissions."""
+        directory = os.path.dirname(self.path)
+        fd, tmp_path = tempfile.mkstemp(prefix=".tokens-", dir=directory)
+        try:
+            if hasattr(os, "fchmod"):
+                os.fchmod(fd, 0o600)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entries, f)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    @contextmanager
+    def _locked(self, exclusive: bool) -> Iterator[None]:
+        """Hold an inter-process lock on the cache for the duration of the block."""
+        os.makedirs(os.path.dirname(self.path), mode=0o700, exist_ok=True)
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            elif msvcrt is not None:  # pragma: no cover - Windows
+                msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            elif msvcrt is not None:  # pragma: no cover - Windows
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+            os.close(fd)
@@ -0,0 +1,99 @@
+"""Decoded JWT claims for Systemair access tokens."""
+
+import base64
+import json
+import time
+from datetime import datetime
+from functools import lru_cache
+from typing import Optional, Tuple
+
+
+class TokenClaims:
+    """The subset of JWT claims the client cares about.
+
+    The expiry is anchored to the monotonic clock when the token is decoded,
+    so validity checks are a single float comparison and are unaffected by
+    wall-clock adjustments.
+    """
+
+    __slots__ = ("exp", "iat", "sub", "scopes", "_expires_monotonic")
+
+    def __init__(self, exp: float, iat: Optional[float] = None, sub: Optional[str] = None,
+                 scopes: Tuple[str, ...] = ()) -> None:
+        """Initialize the claims.
+
+        Args:
+            exp: Expiry time as a UNIX timestamp
+            iat: Issue time as a UNIX timestamp
+            sub: Subject (account) identifier
+            scopes: Granted OAuth scopes
+        """
+        self.exp: float = exp
+        self.iat: Optional[float] = iat
+        self.sub: Optional[str] = sub
+        self.scopes: Tuple[str, ...] = scopes
+        self._expires_monotonic: float = time.monotonic() + (exp - time.time())
+
+    @property
+    def expiry(self) -> datetime:
+        """Expiry time as a local datetime."""
+        return datetime.fromtimestamp(self.exp)
+
+    def time_to_expiry(self) -> float:
+        """Return the number of seconds until the token expires (negative once expired)."""
+        return self._expires_monotonic - time.monotonic()
+
+    def is_valid(self, leeway: float = 30.0) -> bool:
+        """Check if the token is valid for at least ``leeway`` more seconds.
+
+        Args:
+            leeway: Safety margin in seconds
+
+        Returns:
+            bool: True if the token does not expire within the margin
+        """
+        return time.monotonic() + leeway < self._expires_monotonic
+
+    def __repr__(self) -> str:
+        return f"TokenClaims(sub={self.sub!r}, exp={self.exp!r}, scopes={self.scopes!r})"
+
+
+@lru_cache(maxsize=256)
+def decode_token_claims(token: str) -> TokenClaims:
+    """Decode the payload of a JWT into :class:`TokenClaims`.
+
+    Results are cached per token string, so repeated calls for the same
+    token do not split, base64-decode or JSON-parse it again. The signature
+    is not verified.
+
+    Args:
+        token: JWT token to decode
+
+    Returns:
+        TokenClaims: The decoded claims
+
+    Raises:
+        ValueError: If the token is malformed or has no expiry time
+    """
+    try:
+        # Split the token and get the payload part (second part)
+        payload = token.split('.')[1]
+
+        # Add padding if necessary
+        payload += '=' * ((4 - len(payload) % 4) % 4)
+
+        token_data = json.loads(base64.urlsafe_b64decode(payload))
+    except (IndexError, ValueError, TypeError) as e:
+        raise ValueError(f"Malformed token: {e}") from e
+
+    exp_timestamp = token_data.get('exp')
+    if not exp_timestamp:
+        raise ValueError("No expiry time found in token")
+
+    scope = token_data.get('scope') or ''
+    return TokenClaims(
+        exp=exp_timestamp,
+        iat=token_data.get('iat'),
+        sub=token_data.get('sub'),
+        scopes=tuple(scope.split()),
+    )
@@ -0,0 +1,497 @@
+"""SystemairDaemon - Run authentication, streaming, polling and commands as one service."""
+
+import json
+import logging
+import os
+import queue
+import signal
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, NamedTuple, Optional, Set
+
+from systemair_api.api.poll_scheduler import PollScheduler
+from systemair_api.api.systemair_api import SystemairAPI
+from systemair_api.api.websocket_client import SystemairWebSocket
+from systemair_api.auth.authenticator import SystemairAuthenticator
+from systemair_api.models.changes import ChangeListener
+from systemair_api.models.ventilation_unit import VentilationUnit
+from systemair_api.utils.exceptions import APIError, DeviceNotFoundError, SystemairError
+
+if TYPE_CHECKING:
+    from systemair_api.exporter import PrometheusExporter
+
+logger = logging.getLogger(__name__)
+
+STATE_STOPPED = "stopped"
+STATE_STARTING = "starting"
+STATE_RUNNING = "running"
+STATE_DEGRADED = "degraded"
+STATE_STOPPING = "stopping"
+
+# Unit methods that may be queued with SystemairDaemon.submit()
+# Longest wait between login attempts, also used as the refresh interval of
+# tokens whose expiry is unknown
+MAX_AUTH_BACKOFF = 300.0
+
+COMMANDS = frozenset({"set_user_mode", "set_temperature", "set_user_mode_time", "set_value"})
+
+
+class Command(NamedTuple):
+    """A queued write to one unit: ``getattr(unit, action)(api, *args)``."""
+
+    identifier: str
+    action: str
+    args: tuple
+    future: Future
+
+
+class SystemairDaemon:
+    """Supervisor running a Systemair account as a long-lived service.
+
+    One supervisor thread owns the control loop. On every tick it
+
+    - refreshes the access token ``refresh_margin`` seconds before expiry,
+      falling back to a full login, and hands the new token to the API
+      client and a fresh WebSocket connection;
+    - restarts the WebSocket connection when it dropped, with backoff;
+    - hands due units from the :class:`PollScheduler` to a pool of at most
+      ``poll_workers`` threads;
+    - dispatches queued commands to a pool of at most ``command_workers``
+      threads, with at most one command per unit in flight;
+    - rolls back optimistic writes that were never confirmed and logs (or
+      writes to ``health_file``) a health report every ``health_interval``
+      seconds.
+
+    WebSocket messages are applied on the WebSocket thread and reported to
+    the scheduler, which postpones polls of units that are kept fresh.
+    """
+
+    def __init__(self, authenticator: SystemairAuthenticator, scheduler: Optional[PollScheduler] = None,
+                 poll_workers: int = 4, command_workers: int = 2, refresh_margin: float = 120.0,
+                 tick_interval: float = 1.0, health_interval: float = 60.0,
+                 health_file: Optional[str] = None, on_changes: Optional[ChangeListener] = None,
+                 websocket: bool = True,
+                 websocket_factory: Callable[[str, Callable[[Dict[str, Any]], None]], Any] = SystemairWebSocket,
+                 api_factory: Callable[[str], SystemairAPI] = SystemairAPI,
+                 exporter: Optional["PrometheusExporter"] = None) -> None:
+        """Initialize the daemon.
+
+        Args:
+            authenticator: Authenticator holding the account credentials
+            scheduler: Poll scheduler, defaults to a ``PollScheduler()``
+            poll_workers: Maximum number of concurrent status polls
+            command_workers: Maximum number of concurrent commands
+            refresh_margin: Refresh the token this many seconds before expiry
+            tick_interval: Longest time between supervisor ticks in seconds
+            health_interval: Seconds between health reports
+            health_file: Optional path the health report is written to as JSON
+            on_changes: Listener subscribed to every unit, see :meth:`VentilationUnit.subscribe`;
+                pass a ``PrometheusExporter`` as ``exporter`` instead, so units are attached to it
+            websocket: Stream updates over the WebSocket
+            websocket_factory: Creates the WebSocket client from a token and a message callback
+            api_factory: Creates the API client from a token
+            exporter: Prometheus exporter every discovered unit is attached to
+
+        Raises:
+            ValueError: If a worker count is not positive
+        """
+        if poll_workers < 1 or command_workers < 1:
+            raise ValueError("Worker counts must be at least 1")
+        self.authenticator = authenticator
+        self.scheduler: PollScheduler = scheduler if scheduler is not None else PollScheduler()
+        self.poll_workers: int = poll_workers
+        self.command_workers: int = command_workers
+        self.refresh_margin: float = refresh_margin
+        self.tick_interval: float = tick_interval
+        self.health_interval: float = health_interval
+        self.health_file: Optional[str] = health_file
+        self.on_changes: Optional[ChangeListener] = on_changes
+        self.exporter: Optional["PrometheusExporter"] = exporter
+        self.use_websocket: bool = websocket
+        self._websocket_factory = websocket_factory
+        self._api_factory = api_factory
+
+        self.units: Dict[str, VentilationUnit] = {}
+        self.api: Optional[SystemairAPI] = None
+        self.state: str = STATE_STOPPED
+        self.started_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.last_message_at: Optional[float] = None
+        self.messages: int = 0
+        self.commands_done: int = 0
+        self.commands_failed: int = 0
+
+        self._websocket: Optional[Any] = None
+        self._websocket_failures: int = 0
+        self._websocket_retry_at: float = 0.0
+        self._auth_failures: int = 0
+        self._auth_retry_at: float = 0.0
+        self._next_health_at: float = 0.0
+        self._commands: "queue.Queue[Command]" = queue.Queue()
+        self._deferred: List[Command] = []
+        self._busy_units: Set[str] = set()
+        self._polls_in_flight: int = 0
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._poll_executor: Optional[ThreadPoolExecutor] = None
+        self._command_executor: Optional[ThreadPoolExecutor] = None
+
+    def start(self) -> None:
+        """Authenticate, discover the account's units and start the supervisor thread.
+
+        Raises:
+            AuthenticationError: If the initial login fails
+            APIError: If the device list cannot be fetched
+        """
+        if self._thread is not None:
+            return
+        self.state = STATE_STARTING
+        self.started_at = time.monotonic()
+        self._stop_event.clear()
+        token = self.authenticator.authenticate()
+        self._schedule_refresh(self.started_at)
+        self.api = self._api_factory(token)
+        self.discover_units()
+        self._poll_executor = ThreadPoolExecutor(self.poll_workers, thread_name_prefix="systemair-poll")
+        self._command_executor = ThreadPoolExecutor(self.command_workers, thread_name_prefix="systemair-command")
+        if self.use_websocket:
+            self._connect_websocket(token)
+        self._thread = threading.Thread(target=self.run, name="systemair-daemon", daemon=True)
+        self._thread.start()
+        logger.info("Daemon started with %d units", len(self.units))
+
+    def discover_units(self) -> List[str]:
+        """Add the units of the account that are not known yet.
+
+        Returns:
+            list: Identifiers of the newly added units
+        """
+        response = self._require_api().get_account_devices() or {}
+        added = []
+        for device in response.get("data", {}).get("GetAccountDevices") or []:
+            identifier = device["identifier"]
+            if identifier in self.units:
+                continue
+            unit = VentilationUnit(identifier, device.get("name", identifier))
+            if self.on_changes is not None:
+                unit.subscribe(self.on_changes)
+            if self.exporter is not None:
+                self.exporter.attach(unit)
+            self.units[identifier] = unit
+            self.scheduler.add(identifier)
+            added.append(identifier)
+        return added
+
+    def submit(self, identifier: str, action: str, *args: Any) -> Future:
+        """Queue a write to a unit.
+
+        Commands for the same unit run one at a time, in submission order.
+
+        Args:
+            identifier: Identifier of the unit
+            action: Unit method to call, one of ``COMMANDS``
+            *args: Arguments after the API client, e.g. ``UserModes.AWAY``
+
+        Returns:
+            Future: Resolves to the method's return value or raises its exception;
+                raises ``APIError`` if the API did not accept the write
+
+        Raises:
+            ValueError: If the action is not a known command
+            DeviceNotFoundError: If the unit is not known
+        """
+        if action not in COMMANDS:
+            raise ValueError(f"Unknown command {action!r}, expected one of {sorted(COMMANDS)}")
+        if identifier not in self.units:
+            raise DeviceNotFoundError(identifier)
+        future: Future = Future()
+        self._commands.put(Command(identifier, action, args, future))
+        self._wake_event.set()
+        return future
+
+    def run(self) -> None:
+        """Run supervisor ticks until :meth:`stop` is called."""
+        self.state = STATE_RUNNING
+        while not self._stop_event.is_set():
+            try:
+                self.tick()
+            except Exception as e:
+                self.last_error = str(e)
+                logger.exception("Daemon tick failed")
+            wait = min(self.tick_interval, self.scheduler.next_due_in())
+            self._wake_event.wait(max(wait, 0.05))
+            self._wake_event.clear()
+
+    def tick(self, now: Optional[float] = None) -> None:
+        """Run one iteration of the control loop.
+
+        Args:
+            now: Current monotonic time, defaults to now
+        """
+        now = time.monotonic() if now is None else now
+        self._check_token(now)
+        if self.use_websocket:
+            self._check_websocket(now)
+        self._dispatch_polls()
+        self._dispatch_commands()
+        for unit in list(self.units.values()):
+            unit.expire_pending()
+        degraded = self._auth_failures > 0 or (self.use_websocket and self._websocket_failures > 0)
+        if self.state in (STATE_RUNNING, STATE_DEGRADED):
+            self.state = STATE_DEGRADED if degraded else STATE_RUNNING
+        if now >= self._next_health_at:
+            self._next_health_at = now + self.health_interval
+            self._report_health()
+
+    def stop(self, timeout: Optional[float] = 10.0) -> None:
+        """Stop the supervisor, finish in-flight work and close the WebSocket.
+
+        Queued commands that have not started are cancelled.
+
+        Args:
+            timeout: Seconds to wait for the supervisor thread
+        """
+        self.state = STATE_STOPPING
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+        pending = self._deferred
+        self._deferred = []
+        while True:
+            try:
+                pending.append(self._commands.get_nowait())
+            except queue.Empty:
+                break
+        for command in pending:
+            command.future.cancel()
+        for executor in (self._poll_executor, self._command_executor):
+            if executor is not None:
+                executor.shutdown(wait=True)
+        self._poll_executor = self._command_executor = None
+        if self._websocket is not None:
+            self._websocket.disconnect()
+            self._websocket = None
+        self.state = STATE_STOPPED
+        self._report_health()
+        logger.info("Daemon stopped")
+
+    def serve_forever(self) -> None:
+        """Start the daemon and block until SIGINT or SIGTERM, then shut down gracefully.
+
+        Signal handlers can only be installed from the main thread.
+        """
+        previous = {}
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            previous[signum] = signal.signal(signum, self._handle_signal)
+        try:
+            self.start()
+            while not self._stop_event.is_set():
+                self._stop_event.wait(1.0)
+        finally:
+            self.stop()
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+
+    def health(self) -> Dict[str, Any]:
+        """Get the health of the daemon and its components as a dictionary."""
+        now = time.monotonic()
+        websocket = self._websocket
+        thread = getattr(websocket, "thread", None)
+        return {
+            "state": self.state,
+            "uptime": None if self.started_at is None else now - self.started_at,
+            "units": len(self.units),
+            "token_time_to_expiry": self.authenticator.time_to_expiry(),
+            "auth_failures": self._auth_failures,
+            "websocket_connected": bool(thread is not None and thread.is_alive()),
+            "websocket_failures": self._websocket_failures,
+            "websocket_messages": self.messages,
+            "since_last_message": None if self.last_message_at is None else now - self.last_message_at,
+            "polls_in_flight": self._polls_in_flight,
+            "commands_queued": self._commands.qsize() + len(self._deferred),
+            "commands_done": self.commands_done,
+            "commands_failed": self.commands_failed,
+            "pending_writes": sum(len(unit.pending_writes()) for unit in self.units.values()),
+            "write_metrics": VentilationUnit.write_metrics.as_dict(),
+            "scheduler": self.scheduler.stats(),
+            "last_error": self.last_error,
+        }
+
+    def _handle_signal(self, signum: int, frame: Any) -> None:
+        logger.info("Received signal %d, shutting down", signum)
+        self._stop_event.set()
+        self._wake_event.set()
+
+    def _require_api(self) -> SystemairAPI:
+        if self.api is None:
+            raise SystemairError("Daemon is not started")
+        return self.api
+
+    def _check_token(self, now: float) -> None:
+        """Refresh the token ahead of expiry, retrying failed logins with backoff."""
+        time_to_expiry = self.authenticator.time_to_expiry()
+        if time_to_expiry is not None and time_to_expiry > self.refresh_margin:
+            return
+        if now < self._auth_retry_at:
+            return
+        try:
+            try:
+                token = self.authenticator.refresh_access_token()
+            except SystemairError as e:
+                logger.warning("Token refresh failed, logging in again: %s", e)
+                token = self.authenticator.authenticate()
+        except Exception as e:
+            self._auth_failures += 1
+            self._auth_retry_at = now + min(MAX_AUTH_BACKOFF, 5.0 * 2 ** min(self._auth_failures - 1, 16))
+            self.last_error = f"Authentication failed: {e}"
+            logger.error("Authentication failed (attempt %d): %s", self._auth_failures, e)
+            return
+        self._auth_failures = 0
+        self._schedule_refresh(now)
+        self._require_api().update_token(token)
+        logger.info("Access token renewed")
+        if self.use_websocket:
+            self._connect_websocket(token)
+
+    def _schedule_refresh(self, now: float) -> None:
+        """Wait before the next refresh if the new token's expiry is unknown, else refresh on expiry."""
+        if self.authenticator.time_to_expiry() is None:
+            self._auth_retry_at = now + MAX_AUTH_BACKOFF
+        else:
+            self._auth_retry_at = 0.0
+
+    def _check_websocket(self, now: float) -> None:
+        """Reconnect the WebSocket if its connection thread ended."""
+        thread = getattr(self._websocket, "thread", None)
+        if thread is not None and thread.is_alive():
+            self._websocket_failures = 0
+            return
+        if now < self._websocket_retry_at:
+            return
+        self._websocket_failures += 1
+        self._websocket_retry_at = now + min(300.0, 2.0 ** self._websocket_failures)
+        logger.warning("WebSocket connection lost, reconnecting (attempt %d)", self._websocket_failures)
+        self._connect_websocket(self._require_api().access_token)
+
+    def _connect_websocket(self, token: str) -> None:
+        if self._websocket is not None:
+            try:
+                self._websocket.disconnect()
+            except Exception as e:
+                logger.warning("Error closing WebSocket: %s", e)
+        try:
+            self._websocket = self._websocket_factory(token, self._on_message)
+            self._websocket.connect()
+            self._require_api().broadcast_device_statuses(list(self.units))
+        except Exception as e:
+            self.last_error = f"WebSocket connection failed: {e}"
+            logger.error("WebSocket connection failed: %s", e)
+
+    def _on_message(self, message: Dict[str, Any]) -> None:
+        """Apply a WebSocket status update to its unit and report it to the scheduler."""
+        self.last_message_at = time.monotonic()
+        self.messages += 1
+        if message.get("type") != "SYSTEM_EVENT" or message.get("action") != "DEVICE_STATUS_UPDATE":
+            return
+        properties: Dict[str, Any] = message.get("properties") or {}
+        identifier = properties.get("id")
+        if not isinstance(identifier, str):
+            return
+        unit = self.units.get(identifier)
+        if unit is None:
+            return
+        changes = unit.update_from_websocket(message)
+        self.scheduler.record_update(identifier, len(changes))
+
+    def _dispatch_polls(self) -> None:
+        """Hand due units to the poll workers, up to the number of idle workers."""
+        executor = self._poll_executor
+        if executor is None:
+            return
+        with self._lock:
+            capacity = self.poll_workers - self._polls_in_flight
+        if capacity <= 0:
+            return
+        api = self._require_api()
+        for identifier in self.scheduler.due(limit=capacity):
+            with self._lock:
+                self._polls_in_flight += 1
+            future = executor.submit(self.scheduler.poll_unit, api, identifier, self.units.get(identifier))
+            future.add_done_callback(self._poll_done)
+
+    def _poll_done(self, future: Future) -> None:
+        with self._lock:
+            self._polls_in_flight -= 1
+        self._wake_event.set()
+
+    def _dispatch_commands(self) -> None:
+        """Start queued commands for units without a command in flight."""
+        executor = self._command_executor
+        if executor is None:
+            return
+        waiting = self._deferred
+        self._deferred = []
+        while True:
+            try:
+                waiting.append(self._commands.get_nowait())
+            except queue.Empty:
+                break
+        for command in waiting:
+            with self._lock:
+                busy = command.identifier in self._busy_units
+                if not busy:
+                    self._busy_units.add(command.identifier)
+            if busy or not command.future.set_running_or_notify_cancel():
+                if busy:
+                    self._deferred.append(command)
+                continue
+            executor.submit(self._run_command, command)
+
+    def _run_command(self, command: Command) -> None:
+        unit = self.units[command.identifier]
+        try:
+            result = getattr(unit, command.action)(self._require_api(), *command.args)
+            if result is False:
+                # The setters report rejected writes by returning False rather than raising
+                raise APIError(f"Command {command.action} was not accepted for {command.identifier}")
+        except Exception as e:
+            logger.warning("Command %s on %s failed: %s", command.action, command.identifier, e)
+            with self._lock:
+                self.commands_failed += 1
+                self._busy_units.discard(command.identifier)
+            command.future.set_exception(e)
+        else:
+            with self._lock:
+                self.commands_done += 1
+                self._busy_units.discard(command.identifier)
+            command.future.set_result(result)
+        self._wake_event.set()
+
+    def _report_health(self) -> None:
+        report = self.health()
+        logger.info("Health: state=%s units=%d websocket=%s polls=%d failures=%d queued=%d",
+                    report["state"], report["units"], report["websocket_connected"],
+                    report["scheduler"]["polls"], report["scheduler"]["failures"], report["commands_queued"])
+        if self.health_file is None:
+            return
+        directory = os.path.dirname(os.path.abspath(self.health_file))
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(prefix=".health-", dir=directory)
+            with os.fdopen(fd, "w") as f:
+                json.dump(dict(report, updated_at=time.time()), f, indent=2)
+            os.replace(tmp_path, self.health_file)
+        except OSError as e:
+            logger.warning("Failed to write health file: %s", e)
+            if tmp_path is not None:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+
@@ -0,0 +1,204 @@
+"""Prometheus exporter for ventilation unit state and client metrics."""
+
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from systemair_api.models.changes import ChangeSet
+from systemair_api.models.fleet import FUNCTION_PREFIX
+from systemair_api.models.ventilation_unit import FUNCTION_REGISTERS, TEMPERATURE_SLOTS, VentilationUnit
+from systemair_api.utils.metrics import CONTENT_TYPE, DEFAULT_MAX_SERIES, ClientMetrics, Gauge, MetricRegistry
+
+logger = logging.getLogger(__name__)
+
+# Unit gauge -> (help, labels besides "unit")
+UNIT_METRICS: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "systemair_temperature_celsius": ("Temperatures reported by the unit.", ("sensor",)),
+    "systemair_airflow_level": ("Airflow level.", ()),
+    "systemair_air_quality_level": ("Indoor air quality level.", ()),
+    "systemair_humidity_percent": ("Relative humidity.", ()),
+    "systemair_co2_ppm": ("CO2 concentration.", ()),
+    "systemair_user_mode": ("Active user mode, see UserModes.", ()),
+    "systemair_eco_mode": ("Whether eco mode is on.", ()),
+    "systemair_active_alarms": ("Number of active alarms.", ()),
+    "systemair_alarm": ("Alarm state by alarm type.", ("type",)),
+    "systemair_filter_expiration": ("Filter expiration as reported by the unit.", ()),
+    "systemair_function_active": ("Whether a unit function is active.", ("function",)),
+    "systemair_last_update_timestamp_seconds": ("UNIX time of the last applied update.", ()),
+}
+
+# Status field -> (unit gauge, label values besides the unit)
+FIELD_METRICS: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "temperature": ("systemair_temperature_celsius", ("main",)),
+    **{f"temperatures.{key}": ("systemair_temperature_celsius", (key,)) for key in TEMPERATURE_SLOTS},
+    "airflow": ("systemair_airflow_level", ()),
+    "air_quality": ("systemair_air_quality_level", ()),
+    "humidity": ("systemair_humidity_percent", ()),
+    "co2": ("systemair_co2_ppm", ()),
+    "user_mode": ("systemair_user_mode", ()),
+    "eco_mode": ("systemair_eco_mode", ()),
+    "active_alarms": ("systemair_active_alarms", ()),
+    "alarm_type_a": ("systemair_alarm", ("a",)),
+    "alarm_type_b": ("systemair_alarm", ("b",)),
+    "alarm_type_c": ("systemair_alarm", ("c",)),
+    "filter_expiration": ("systemair_filter_expiration", ()),
+    **{f"{FUNCTION_PREFIX}{name}": ("systemair_function_active", (name,)) for name in FUNCTION_REGISTERS.values()},
+}
+
+
+class PrometheusExporter:
+    """Expose unit state and API client metrics for Prometheus to scrape.
+
+    The exporter is a change listener: attached units update their gauges
+    as changes arrive, so a scrape only concatenates text that was rendered
+    when a value last changed. Optimistic writes are exported right away
+    and reverted if they are rolled back.
+
+    The number of series is bounded by ``max_series`` per metric; units
+    beyond it are not exported and counted in
+    ``systemair_exporter_dropped_series``. Per-function gauges (17 per
+    unit) can be turned off with ``functions=False`` for large fleets.
+    """
+
+    def __init__(self, registry: Optional[MetricRegistry] = None, max_series: int = DEFAULT_MAX_SERIES,
+                 functions: bool = True, client_metrics: bool = True) -> None:
+        """Initialize the exporter.
+
+        Args:
+            registry: Registry to add the metrics to, defaults to a new one
+            max_series: Maximum number of series per metric for a new registry
+            functions: Export a gauge per active function and unit
+            client_metrics: Record API request and WebSocket metrics of all clients
+        """
+        self.registry: MetricRegistry = registry if registry is not None else MetricRegistry(max_series)
+        self.functions: bool = functions
+        self._gauges: Dict[str, Gauge] = {
+            name: self.registry.gauge(name, documentation, ("unit",) + labelnames)
+            for name, (documentation, labelnames) in UNIT_METRICS.items()
+        }
+        self._units = self.registry.gauge("systemair_exporter_units", "Units exported.")
+        self._dropped = self.registry.gauge("systemair_exporter_dropped_series",
+                                            "Series not exported because of the series limit.")
+        self._attached: Dict[str, bool] = {}
+        self.client: Optional[ClientMetrics] = None
+        if client_metrics:
+            self.client = ClientMetrics(self.registry)
+            self.client.install()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def __call__(self, unit: VentilationUnit, changes: ChangeSet) -> None:
+        """Export the changes of a unit; the change listener interface."""
+        self.record(unit.identifier, changes)
+
+    def attach(self, unit: VentilationUnit) -> None:
+        """Export the current state of a unit and keep it up to date."""
+        unit.subscribe(self)
+        self._attached[unit.identifier] = True
+        self._units.set(len(self._attached))
+        self.observe(unit)
+
+    def detach(self, unit: VentilationUnit) -> None:
+        """Stop exporting a unit and drop its series."""
+        unit.unsubscribe(self)
+        self._attached.pop(unit.identifier, None)
+        self._units.set(len(self._attached))
+        for name, labels in FIELD_METRICS.values():
+            self._gauges[name].remove((unit.identifier,) + labels)
+        self._gauges["systemair_last_update_timestamp_seconds"].remove((unit.identifier,))
+
+    def observe(self, unit: VentilationUnit) -> None:
+        """Set every gauge of a unit from its current state."""
+        status = unit.get_status()
+        values: Dict[str, Any] = {}
+        for key, value in status.items():
+            if isinstance(value, dict):
+                values.update((f"{key}.{inner}", inner_value) for inner, inner_value in value.items())
+            else:
+                values[key] = value
+        for field in FIELD_METRICS:
+            if field in values:
+                self._set(unit.identifier, field, values[field])
+
+    def record(self, identifier: str, changes: ChangeSet) -> None:
+        """Update the gauges of a unit from a change-set.
+
+        Args:
+            identifier: Identifier of the unit
+            changes: Change-set of an update
+        """
+        latest: Optional[float] = None
+        for change in changes:
+            self._set(identifier, change.field, change.new)
+            latest = change.timestamp if latest is None else max(latest, change.timestamp)
+        if latest is not None:
+            self._gauges["systemair_last_update_timestamp_seconds"].set(latest, (identifier,))
+
+    def render(self) -> bytes:
+        """Get the exposition text of all metrics."""
+        self._dropped.set(self.registry.dropped)
+        return self.registry.render()
+
+    def serve(self, port: int = 9877, host: str = "") -> Tuple[str, int]:
+        """Serve ``/metrics`` over HTTP from a background thread.
+
+        Args:
+            port: Port to listen on, 0 for any free port
+            host: Address to bind, defaults to all interfaces
+
+        Returns:
+            tuple: The ``(host, port)`` the server is bound to
+        """
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = exporter.render()
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                logger.debug("%s - %s", self.address_string(), format % args)
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="systemair-exporter", daemon=True)
+        self._thread.start()
+        address = self._server.server_address
+        logger.info("Serving metrics on port %d", address[1])
+        return str(address[0]), int(address[1])
+
+    def close(self) -> None:
+        """Stop the HTTP server and stop recording client metrics."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self.client is not None:
+            self.client.uninstall()
+
+    def attach_all(self, units: Iterable[VentilationUnit]) -> None:
+        """Attach several units, e.g. a :class:`Fleet` or ``daemon.units.values()``."""
+        for unit in units:
+            self.attach(unit)
+
+    def _set(self, identifier: str, field: str, value: Any) -> None:
+        metric = FIELD_METRICS.get(field)
+        if metric is None:
+            return
+        name, labels = metric
+        if name == "systemair_function_active" and not self.functions:
+            return
+        if value is not None and not isinstance(value, (int, float)):
+            return
+        self._gauges[name].set(value, (identifier,) + labels)
@@ -1,4 +1,11 @@
 """Data models for Systemair ventilation units."""
 
+from systemair_api.models.changes import FieldChange
+from systemair_api.models.fleet import Fleet
+from systemair_api.models.history import HistoryStore, RingBuffer
+from systemair_api.models.pending import PendingWrite, WriteMetrics
+from systemair_api.models.rollup import Rollup, RollupEngine
+from systemair_api.models.snapshot import Snapshot, load_snapshot, save_snapshot
+from systemair_api.models.telemetry_log import TelemetryLog, TelemetryReader, TelemetrySample, TelemetrySegment
 from systemair_api.models.ventilation_data import VentilationData
 from systemair_api.models.ventilation_unit import VentilationUnit
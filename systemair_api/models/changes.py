@@ -0,0 +1,31 @@
+"""Change-sets emitted when a ventilation unit's state changes."""
+
+from typing import Any, Callable, List, NamedTuple
+
+SOURCE_API = "api"
+SOURCE_WEBSOCKET = "websocket"
+SOURCE_LOCAL = "local"
+SOURCE_ROLLBACK = "rollback"
+
+
+class FieldChange(NamedTuple):
+    """A single field that changed value during an update.
+
+    Attributes:
+        field: Status field name, nested keys joined with a dot (e.g. ``"temperatures.oat"``)
+        old: Value before the update
+        new: Value after the update
+        source: Where the update came from (``"api"``, ``"websocket"``, ``"local"``
+            or ``"rollback"`` for unconfirmed optimistic writes being undone)
+        timestamp: UNIX time at which the update was applied
+    """
+
+    field: str
+    old: Any
+    new: Any
+    source: str
+    timestamp: float
+
+
+ChangeSet = List[FieldChange]
+ChangeListener = Callable[[Any, ChangeSet], None]
@@ -0,0 +1,299 @@
+"""Export of fleet state and telemetry history to Arrow and Parquet files.
+
+Exports are written as a stream of record batches, so memory use is
+bounded by the batch size rather than by the amount of data. Requires the
+optional ``arrow`` extra (pyarrow).
+
+Fleet exports hold one row per unit with typed columns: narrow integers for
+modes, levels and alarm counts, float64 temperatures, a UTC timestamp for
+the last update and one boolean ``function_<name>`` column per active
+function. History exports hold one row per sample, with the unit, field
+and source dictionary-encoded.
+"""
+
+import os
+import tempfile
+import time
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from systemair_api.models.fleet import _COLUMN_SOURCES, COLUMNS, MISSING_INT, Fleet, _to_column_value
+from systemair_api.models.history import HistoryStore
+from systemair_api.models.telemetry_log import TelemetryReader, TelemetrySample
+from systemair_api.models.ventilation_unit import FUNCTION_BITS, VentilationUnit
+
+# pyarrow is optional and imported by _require_pyarrow on the first export,
+# so importing the package does not pay for it
+pa: Any = None
+pc: Any = None
+pq: Any = None
+
+FORMATS = ("parquet", "arrow")
+
+DEFAULT_BATCH_SIZE = 65536
+
+# Fleet column -> Arrow type of the exported column
+FLEET_TYPES: Dict[str, str] = {
+    "user_mode": "int8",
+    "airflow": "int16",
+    "air_quality": "int16",
+    "humidity": "int16",
+    "co2": "int32",
+    "filter_expiration": "int64",
+    "active_alarms": "int32",
+    "alarm_type_a": "int16",
+    "alarm_type_b": "int16",
+    "alarm_type_c": "int16",
+    "eco_mode": "bool",
+    "temperature": "float64",
+    "oat": "float64",
+    "sat": "float64",
+    "setpoint": "float64",
+}
+
+FleetSource = Union[Fleet, Iterable[VentilationUnit]]
+HistorySource = Union[TelemetryReader, HistoryStore, Iterable[TelemetrySample]]
+
+
+def _require_pyarrow() -> None:
+    global pa, pc, pq
+    if pa is not None:
+        return
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Arrow and Parquet export requires pyarrow; install the 'arrow' extra") from None
+    pc, pq, pa = pyarrow.compute, pyarrow.parquet, pyarrow
+
+
+def fleet_schema() -> "pa.Schema":
+    """Get the Arrow schema of fleet exports."""
+    _require_pyarrow()
+    fields = [pa.field("identifier", pa.string(), nullable=False), pa.field("site", pa.string()),
+              pa.field("updated_at", pa.timestamp("us", tz="UTC"))]
+    fields.extend(pa.field(name, pa.type_for_alias(type_name)) for name, type_name in FLEET_TYPES.items())
+    fields.extend(pa.field(f"function_{name}", pa.bool_(), nullable=False) for name in FUNCTION_BITS)
+    return pa.schema(fields)
+
+
+def history_schema() -> "pa.Schema":
+    """Get the Arrow schema of history exports."""
+    _require_pyarrow()
+    text = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        pa.field("timestamp", pa.timestamp("us", tz="UTC"), nullable=False),
+        pa.field("identifier", text, nullable=False),
+        pa.field("field", text, nullable=False),
+        pa.field("value", pa.float64()),
+        pa.field("source", text),
+    ])
+
+
+def _fleet_columns(source: FleetSource,
+                   created_at: float) -> Tuple[List[str], List[Optional[str]], Dict[str, "pa.Array"]]:
+    """Get the identifiers, sites and raw Arrow columns of a fleet or of individual units."""
+    if isinstance(source, Fleet):
+        units, sites, columns = source.table((*FLEET_TYPES, "functions", "updated_at"))
+        identifiers = [unit.identifier for unit in units]
+    else:
+        units = list(source)
+        identifiers = [unit.identifier for unit in units]
+        sites = [None] * len(units)
+        columns = {name: array(COLUMNS[name][0], [_to_column_value(COLUMNS[name][0], getattr(unit, attribute))
+                                                  for unit in units])
+                   for name, attribute in _COLUMN_SOURCES.items()}
+        columns["updated_at"] = array("d", [created_at] * len(units))
+    # Both NumPy arrays and array.array expose their memory, so wrapping them
+    # does not copy; fleet columns are copies already, so the fleet can change meanwhile
+    arrays = {name: pa.Array.from_buffers(pa.float64() if COLUMNS[name][0] == "d" else pa.int64(), len(identifiers),
+                                          [None, pa.py_buffer(values)])
+              for name, values in columns.items()}
+    return identifiers, sites, arrays
+
+
+def _typed_array(raw: "pa.Array", type_name: str) -> "pa.Array":
+    """Convert a raw fleet column to its export type, with missing values as nulls."""
+    missing = pc.is_nan(raw) if pa.types.is_floating(raw.type) else pc.equal(raw, MISSING_INT)
+    masked = pc.if_else(missing, pa.scalar(None, raw.type), raw)
+    target = pa.type_for_alias(type_name)
+    if pa.types.is_boolean(target):
+        return pc.not_equal(masked, 0)
+    return masked.cast(target)
+
+
+def fleet_batches(source: FleetSource, batch_size: int = DEFAULT_BATCH_SIZE,
+                  created_at: Optional[float] = None) -> Iterator["pa.RecordBatch"]:
+    """Convert the state of a fleet or of individual units to record batches.
+
+    Args:
+        source: A :class:`Fleet` (site labels and update times are kept) or
+            an iterable of units (their state counts as updated at ``created_at``)
+        batch_size: Maximum number of units per batch
+        created_at: UNIX time of the export, defaults to now
+
+    Yields:
+        pyarrow.RecordBatch: Batches following :func:`fleet_schema`
+
+    Raises:
+        ImportError: If pyarrow is not installed
+        ValueError: If the batch size is not positive
+    """
+    _require_pyarrow()
+    if batch_size < 1:
+        raise ValueError("Batch size must be positive")
+    schema = fleet_schema()
+    created_at = time.time() if created_at is None else created_at
+    identifiers, sites, columns = _fleet_columns(source, created_at)
+    for first in range(0, len(identifiers), batch_size):
+        last = first + batch_size
+        updated_at = _typed_array(columns["updated_at"].slice(first, batch_size), "float64")
+        arrays = [
+            pa.array(identifiers[first:last], type=pa.string()),
+            pa.array(sites[first:last], type=pa.string()),
+            pc.round(pc.multiply(updated_at, 1e6)).cast(pa.int64()).cast(pa.timestamp("us", tz="UTC")),
+        ]
+        arrays.extend(_typed_array(columns[name].slice(first, batch_size), type_name)
+                      for name, type_name in FLEET_TYPES.items())
+        functions = columns["functions"].slice(first, batch_size)
+        arrays.extend(pc.not_equal(pc.bit_wise_and(functions, bit), 0) for bit in FUNCTION_BITS.values())
+        yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def _history_samples(source: HistorySource, identifier: Optional[str], field: Optional[str],
+                     start: Optional[float], end: Optional[float]) -> Iterator[Tuple[float, str, str,
+                                                                                 Optional[float], Optional[str]]]:
+    """Iterate over ``(timestamp, identifier, field, value, source)`` of the matching samples."""
+    if isinstance(source, TelemetryReader):
+        yield from source.scan(identifier, field, start, end)
+    elif isinstance(source, HistoryStore):
+        # The store does not keep the source of a sample
+        identifiers = source.identifiers() if identifier is None else [identifier]
+        for unit_identifier in identifiers:
+            for unit_field in (sorted(source.fields) if field is None else [field]):
+                for timestamp, value in source.range(unit_identifier, unit_field, start, end):
+                    yield timestamp, unit_identifier, unit_field, value, None
+    else:
+        for sample in source:
+            if ((identifier is None or sample.identifier == identifier)
+                    and (field is None or sample.field == field)
+                    and (start is None or sample.timestamp >= start)
+                    and (end is None or sample.timestamp < end)):
+                yield sample
+
+
+def history_batches(source: HistorySource, identifier: Optional[str] = None, field: Optional[str] = None,
+                    start: Optional[float] = None, end: Optional[float] = None,
+                    batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator["pa.RecordBatch"]:
+    """Convert recorded samples to record batches, reading the source incrementally.
+
+    Args:
+        source: A :class:`TelemetryReader`, a :class:`HistoryStore` or an
+            iterable of :class:`TelemetrySample`
+        identifier: Only samples of this unit
+        field: Only samples of this field
+        start: Only samples at or after this UNIX time
+        end: Only samples before this UNIX time
+        batch_size: Maximum number of samples per batch
+
+    Yields:
+        pyarrow.RecordBatch: Batches following :func:`history_schema`
+
+    Raises:
+        ImportError: If pyarrow is not installed
+        ValueError: If the batch size is not positive
+    """
+    _require_pyarrow()
+    if batch_size < 1:
+        raise ValueError("Batch size must be positive")
+    schema = history_schema()
+    samples = _history_samples(source, identifier, field, start, end)
+    while True:
+        batch = [sample for _, sample in zip(range(batch_size), samples)]
+        if not batch:
+            return
+        timestamps, identifiers, fields, values, sources = zip(*batch)
+        yield pa.RecordBatch.from_arrays([
+            pa.array([round(timestamp * 1e6) for timestamp in timestamps], type=pa.int64()).cast(
+                pa.timestamp("us", tz="UTC")),
+            pa.array(identifiers, type=pa.string()).dictionary_encode(),
+            pa.array(fields, type=pa.string()).dictionary_encode(),
+            pa.array(values, type=pa.float64()),
+            pa.array(sources, type=pa.string()).dictionary_encode(),
+        ], schema=schema)
+
+
+def write_batches(path: str, schema: "pa.Schema", batches: Iterable["pa.RecordBatch"],
+                  format: str = "parquet", compression: Optional[str] = "zstd") -> int:
+    """Stream record batches to an Arrow IPC or Parquet file.
+
+    The file is written to a temporary file first and then atomically
+    moved into place, so readers never see a partial export.
+
+    Args:
+        path: Destination file
+        schema: Schema of the batches
+        batches: Record batches to write
+        format: ``"parquet"`` or ``"arrow"`` (Arrow IPC file format)
+        compression: Compression codec, None to write uncompressed
+
+    Returns:
+        int: Number of rows written
+
+    Raises:
+        ImportError: If pyarrow is not installed
+        ValueError: If the format is unknown
+    """
+    _require_pyarrow()
+    if format not in FORMATS:
+        raise ValueError(f"Unknown format {format!r}, expected one of {list(FORMATS)}")
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".export-", dir=directory)
+    os.close(fd)
+    rows = 0
+    try:
+        if format == "parquet":
+            writer: Any = pq.ParquetWriter(tmp_path, schema, compression=compression or "none")
+        else:
+            options = pa.ipc.IpcWriteOptions(compression=compression)
+            writer = pa.ipc.new_file(tmp_path, schema, options=options)
+        with writer:
+            for batch in batches:
+                writer.write_batch(batch)
+                rows += batch.num_rows
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    return rows
+
+
+def export_fleet(path: str, source: FleetSource, format: str = "parquet",
+                 batch_size: int = DEFAULT_BATCH_SIZE, created_at: Optional[float] = None) -> int:
+    """Write the state of a fleet or of individual units to an Arrow or Parquet file.
+
+    See :func:`fleet_batches` and :func:`write_batches`.
+
+    Returns:
+        int: Number of units written
+    """
+    return write_batches(path, fleet_schema(), fleet_batches(source, batch_size, created_at), format)
+
+
+def export_history(path: str, source: HistorySource, format: str = "parquet",
+                   identifier: Optional[str] = None, field: Optional[str] = None, start: Optional[float] = None,
+                   end: Optional[float] = None, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """Write recorded samples to an Arrow or Parquet file.
+
+    See :func:`history_batches` and :func:`write_batches`.
+
+    Returns:
+        int: Number of samples written
+    """
+    return write_batches(path, history_schema(),
+                         history_batches(source, identifier, field, start, end, batch_size), format)
@@ -0,0 +1,565 @@
+"""Fleet - Column-oriented state and queries for many ventilation units."""
+
+import heapq
+import math
+import operator
+import threading
+from array import array
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from systemair_api.models.changes import ChangeSet
+from systemair_api.models.ventilation_unit import FUNCTION_BITS, TEMPERATURE_SLOTS, VentilationUnit
+from systemair_api.utils.exceptions import DeviceNotFoundError
+
+# NumPy is optional and imported by _numpy on the first query; None means
+# it is not installed and queries fall back to pure Python
+_NOT_IMPORTED: Any = object()
+np: Any = _NOT_IMPORTED
+
+
+
+def _numpy() -> Any:
+    """Get the numpy module, importing it on first use, or None if it is not installed."""
+    global np
+    if np is _NOT_IMPORTED:
+        try:
+            import numpy
+        except ImportError:
+            np = None
+        else:
+            np = numpy
+    return np
+
+
+# Stored in integer columns for values that are not known yet. The pure
+# Python queries treat a value as missing if it is NaN (``item != item``)
+# or equal to MISSING_INT, whatever the column type.
+MISSING_INT = -(2 ** 63)
+
+# Column -> (array typecode, status field feeding it). Integer columns use
+# MISSING_INT and float columns NaN for missing values.
+COLUMNS: Dict[str, Tuple[str, Optional[str]]] = {
+    "user_mode": ("q", "user_mode"),
+    "airflow": ("q", "airflow"),
+    "air_quality": ("q", "air_quality"),
+    "humidity": ("q", "humidity"),
+    "co2": ("q", "co2"),
+    "filter_expiration": ("q", "filter_expiration"),
+    "active_alarms": ("q", "active_alarms"),
+    "alarm_type_a": ("q", "alarm_type_a"),
+    "alarm_type_b": ("q", "alarm_type_b"),
+    "alarm_type_c": ("q", "alarm_type_c"),
+    "eco_mode": ("q", "eco_mode"),
+    "temperature": ("d", "temperature"),
+    "oat": ("d", "temperatures.oat"),
+    "sat": ("d", "temperatures.sat"),
+    "setpoint": ("d", "temperatures.setpoint"),
+    "functions": ("q", None),   # Bitmask of active functions, see FUNCTION_BITS
+    "updated_at": ("d", None),  # UNIX time of the last change, NaN if never updated
+}
+
+# Status field -> column
+FIELD_COLUMNS: Dict[str, str] = {field: name for name, (_, field) in COLUMNS.items() if field}
+
+# Column -> unit attribute holding its value, used to load a unit's current state
+_COLUMN_SOURCES: Dict[str, str] = {
+    name: TEMPERATURE_SLOTS[field.split(".", 1)[1]] if field.startswith("temperatures.") else field
+    for name, (_, field) in COLUMNS.items() if field
+}
+_COLUMN_SOURCES["functions"] = "function_bits"
+
+FUNCTION_PREFIX = "active_functions."
+
+AGGREGATES = ("mean", "min", "max", "sum", "count")
+
+OPERATORS: Dict[str, Callable[[Any, Any], Any]] = {
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+_NUMPY_DTYPES = {"q": "int64", "d": "float64"}
+
+
+def _to_column_value(typecode: str, value: Any) -> Union[int, float]:
+    """Convert a field value to what a column of the given type stores."""
+    try:
+        if typecode == "d":
+            return math.nan if value is None else float(value)
+        return MISSING_INT if value is None else int(value)
+    except (TypeError, ValueError):
+        return math.nan if typecode == "d" else MISSING_INT
+
+
+class Fleet:
+    """Container for many :class:`VentilationUnit` objects with column-wise state.
+
+    The numeric state of every unit is mirrored into one ``array`` per
+    field, indexed by the unit's position in the fleet. Columns are kept up
+    to date through the change-sets the units emit, so only fields that
+    actually change are written. Fleet-wide filters, aggregates and top-k
+    queries then run over the columns instead of over unit objects, using
+    NumPy when it is installed.
+
+    Units can carry a site label to group aggregates by.
+
+    A fleet is thread-safe: units may be updated from several threads (their
+    change-sets are written into the columns under the fleet's lock) while
+    other threads add or remove units and run queries.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty fleet."""
+        self._columns: Dict[str, array] = {name: array(typecode) for name, (typecode, _) in COLUMNS.items()}
+        self._site_codes: array = array("q")
+        self._site_names: List[str] = []
+        self._site_lookup: Dict[str, int] = {}
+        self._units: List[VentilationUnit] = []
+        self._index: Dict[str, int] = {}
+        # Reentrant, as queries call each other and units may notify while it is held
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._units)
+
+    def __contains__(self, identifier: object) -> bool:
+        return identifier in self._index
+
+    def __iter__(self) -> Iterator[VentilationUnit]:
+        with self._lock:
+            return iter(list(self._units))
+
+    def add(self, unit: VentilationUnit, site: Optional[str] = None, updated_at: Optional[float] = None) -> int:
+        """Add a unit to the fleet.
+
+        Args:
+            unit: The unit to add; its current state is copied into the columns
+            site: Optional site label used to group aggregates
+            updated_at: UNIX time the unit's state was last updated, if known
+
+        Returns:
+            int: Row index of the unit
+
+        Raises:
+            ValueError: If a unit with the same identifier is already in the fleet
+        """
+        with self._lock:
+            self.add_many([unit], [site], [updated_at])
+            return len(self._units) - 1
+
+    def add_many(self, units: Iterable[VentilationUnit], sites: Optional[Iterable[Optional[str]]] = None,
+                 updated_at: Optional[Iterable[Optional[float]]] = None) -> None:
+        """Add several units at once, filling each column in a single pass.
+
+        Args:
+            units: The units to add
+            sites: Site label per unit, in the same order
+            updated_at: Last update time per unit, in the same order
+
+        Raises:
+            ValueError: If an identifier is already in the fleet or repeated, or
+                if ``sites``/``updated_at`` do not match the number of units
+        """
+        units = list(units)
+        sites = [None] * len(units) if sites is None else list(sites)
+        updated_at = [None] * len(units) if updated_at is None else list(updated_at)
+        if len(sites) != len(units) or len(updated_at) != len(units):
+            raise ValueError("sites and updated_at must have one entry per unit")
+        with self._lock:
+            added = set()
+            for unit in units:
+                if unit.identifier in self._index or unit.identifier in added:
+                    raise ValueError(f"Unit {unit.identifier} is already in the fleet")
+                added.add(unit.identifier)
+
+            for name, source in _COLUMN_SOURCES.items():
+                typecode = COLUMNS[name][0]
+                self._columns[name].extend([_to_column_value(typecode, getattr(unit, source)) for unit in units])
+            self._columns["updated_at"].extend([math.nan if value is None else value for value in updated_at])
+            self._site_codes.extend([self._site_code(site) for site in sites])
+            for unit in units:
+                self._index[unit.identifier] = len(self._units)
+                self._units.append(unit)
+                unit.subscribe(self._on_unit_changes)
+
+    def remove(self, identifier: str) -> VentilationUnit:
+        """Remove a unit from the fleet.
+
+        The last row is moved into the freed slot, so row indexes of other
+        units may change.
+
+        Args:
+            identifier: Identifier of the unit
+
+        Returns:
+            VentilationUnit: The removed unit
+
+        Raises:
+            DeviceNotFoundError: If the unit is not in the fleet
+        """
+        with self._lock:
+            row = self._row(identifier)
+            unit = self._units[row]
+            unit.unsubscribe(self._on_unit_changes)
+
+            last = len(self._units) - 1
+            for column in list(self._columns.values()) + [self._site_codes]:
+                column[row] = column[last]
+                column.pop()
+            moved = self._units.pop()
+            if row != last:
+                self._units[row] = moved
+                self._index[moved.identifier] = row
+            del self._index[identifier]
+            return unit
+
+    def get(self, identifier: str) -> VentilationUnit:
+        """Get a unit by identifier.
+
+        Raises:
+            DeviceNotFoundError: If the unit is not in the fleet
+        """
+        with self._lock:
+            return self._units[self._row(identifier)]
+
+    def identifiers(self) -> List[str]:
+        """Get the identifiers of all units in row order."""
+        with self._lock:
+            return [unit.identifier for unit in self._units]
+
+    def set_site(self, identifier: str, site: Optional[str]) -> None:
+        """Change the site label of a unit.
+
+        Args:
+            identifier: Identifier of the unit
+            site: New site label, or None to clear it
+        """
+        with self._lock:
+            self._site_codes[self._row(identifier)] = self._site_code(site)
+
+    def site_of(self, identifier: str) -> Optional[str]:
+        """Get the site label of a unit."""
+        with self._lock:
+            return self._site_label(self._site_codes[self._row(identifier)])
+
+    def sites(self) -> List[str]:
+        """Get all site labels in use."""
+        with self._lock:
+            used = set(self._site_codes)
+            return [name for code, name in enumerate(self._site_names) if code in used]
+
+    def update_from_api(self, identifier: str, api_data: Dict[str, Any]) -> ChangeSet:
+        """Update a unit from its GetView API response.
+
+        Args:
+            identifier: Identifier of the unit
+            api_data: GetView response of the unit
+
+        Returns:
+            list: The fields that changed
+
+        Raises:
+            DeviceNotFoundError: If the unit is not in the fleet
+        """
+        return self.get(identifier).update_from_api(api_data)
+
+    def update_from_websocket(self, ws_data: Dict[str, Any]) -> ChangeSet:
+        """Update the unit a ``DEVICE_STATUS_UPDATE`` WebSocket message refers to.
+
+        Args:
+            ws_data: The WebSocket message
+
+        Returns:
+            list: The fields that changed, empty for messages about unknown units
+        """
+        properties: Dict[str, Any] = ws_data.get("properties") or {}
+        identifier = properties.get("id")
+        if not isinstance(identifier, str):
+            return []
+        with self._lock:
+            row = self._index.get(identifier)
+            if row is None:
+                return []
+            unit = self._units[row]
+        return unit.update_from_websocket(ws_data)
+
+    def column(self, name: str) -> Any:
+        """Get a copy of a column.
+
+        Args:
+            name: Column name, see ``COLUMNS``
+
+        Returns:
+            A NumPy array if NumPy is installed, otherwise an ``array.array``
+        """
+        with self._lock:
+            return self._copy(self._get_column(name))
+
+    def table(self, names: Iterable[str]) -> Tuple[List[VentilationUnit], List[Optional[str]], Dict[str, Any]]:
+        """Get the units, their site labels and copies of some columns, all as of the same moment.
+
+        Args:
+            names: Column names
+
+        Returns:
+            tuple: Units in row order, their site labels and the columns by
+                name (as returned by :meth:`column`)
+        """
+        with self._lock:
+            columns = {name: self._copy(self._get_column(name)) for name in names}
+            return list(self._units), [self._site_label(code) for code in self._site_codes], columns
+
+    def filter(self, name: str, op: str, value: Union[int, float], site: Optional[str] = None) -> List[str]:
+        """Find the units whose column value satisfies a comparison.
+
+        Units for which the value is missing never match.
+
+        Args:
+            name: Column name
+            op: One of ``<``, ``<=``, ``==``, ``!=``, ``>``, ``>=``
+            value: Value to compare against
+            site: Only consider units with this site label
+
+        Returns:
+            list: Identifiers of the matching units
+
+        Raises:
+            ValueError: If the operator is not supported
+        """
+        compare = OPERATORS.get(op)
+        if compare is None:
+            raise ValueError(f"Unsupported operator {op!r}, expected one of {list(OPERATORS)}")
+        with self._lock:
+            values = self._get_column(name)
+            site_code = self._site_filter(site)
+            if site_code is False:
+                return []
+
+            if _numpy() is not None:
+                data = self._view(values)
+                mask = self._valid_mask(values, data) & compare(data, value)
+                if site_code is not None:
+                    mask &= self._view(self._site_codes) == site_code
+                rows = np.flatnonzero(mask).tolist()
+            elif site_code is None:
+                rows = [row for row, item in enumerate(values)
+                        if item == item and item != MISSING_INT and compare(item, value)]
+            else:
+                rows = [row for row, (item, code) in enumerate(zip(values, self._site_codes))
+                        if code == site_code and item == item and item != MISSING_INT and compare(item, value)]
+            return [self._units[row].identifier for row in rows]
+
+    def with_function(self, function: str) -> List[str]:
+        """Find the units on which a function is active.
+
+        Args:
+            function: Function name, e.g. ``"heating"`` or ``"free_cooling"``
+
+        Returns:
+            list: Identifiers of the matching units
+
+        Raises:
+            KeyError: If the function name is unknown
+        """
+        bit = FUNCTION_BITS[function]
+        with self._lock:
+            functions = self._columns["functions"]
+            if _numpy() is not None:
+                rows = np.flatnonzero(self._view(functions) & bit).tolist()
+            else:
+                rows = [row for row, bits in enumerate(functions) if bits & bit]
+            return [self._units[row].identifier for row in rows]
+
+    def with_alarms(self) -> List[str]:
+        """Find the units reporting active alarms (including filter alarms)."""
+        return self.filter("active_alarms", "!=", 0)
+
+    def stale(self, max_age: float, now: float) -> List[str]:
+        """Find the units that have not changed for longer than ``max_age`` seconds.
+
+        Units that never received an update are always stale.
+
+        Args:
+            max_age: Maximum age in seconds
+            now: Current UNIX time
+
+        Returns:
+            list: Identifiers of the stale units
+        """
+        cutoff = now - max_age
+        with self._lock:
+            updated_at = self._columns["updated_at"]
+            if _numpy() is not None:
+                data = self._view(updated_at)
+                rows = np.flatnonzero(np.isnan(data) | (data < cutoff)).tolist()
+            else:
+                rows = [row for row, value in enumerate(updated_at) if math.isnan(value) or value < cutoff]
+            return [self._units[row].identifier for row in rows]
+
+    def aggregate(self, name: str, func: str = "mean",
+                  by_site: bool = False) -> Union[Optional[float], Dict[Optional[str], Optional[float]]]:
+        """Aggregate a column over all units, ignoring missing values.
+
+        Args:
+            name: Column name
+            func: One of ``mean``, ``min``, ``max``, ``sum``, ``count``
+            by_site: Aggregate per site label instead of over the whole fleet
+
+        Returns:
+            The aggregate (None if no unit has a value), or a dict mapping each
+            site label (None for units without one) to its aggregate
+
+        Raises:
+            ValueError: If the aggregate function is not supported
+        """
+        if func not in AGGREGATES:
+            raise ValueError(f"Unsupported aggregate {func!r}, expected one of {list(AGGREGATES)}")
+        with self._lock:
+            values = self._get_column(name)
+            if _numpy() is not None:
+                return self._aggregate_numpy(values, func, by_site)
+
+            if not by_site:
+                return self._reduce([item for item in values if item == item and item != MISSING_INT], func)
+            groups: Dict[int, List[Union[int, float]]] = {}
+            for item, code in zip(values, self._site_codes):
+                if item == item and item != MISSING_INT:
+                    groups.setdefault(code, []).append(item)
+            return {self._site_label(code): self._reduce(items, func) for code, items in groups.items()}
+
+    def top_k(self, name: str, k: int = 10, largest: bool = True) -> List[Tuple[str, Union[int, float]]]:
+        """Find the units with the largest (or smallest) values in a column.
+
+        Args:
+            name: Column name
+            k: Number of units to return
+            largest: Return the largest values if True, the smallest otherwise
+
+        Returns:
+            list: ``(identifier, value)`` pairs, best first
+        """
+        values = self._get_column(name)
+        if k <= 0:
+            return []
+        with self._lock:
+            if _numpy() is not None:
+                data = self._view(values)
+                rows = np.flatnonzero(self._valid_mask(values, data))
+                if len(rows) > k:
+                    keys = -data[rows] if largest else data[rows]
+                    rows = rows[np.argpartition(keys, k - 1)[:k]]
+                rows = rows[np.argsort(-data[rows] if largest else data[rows], kind="stable")]
+                best = [(int(row), data[row].item()) for row in rows]
+            else:
+                select = heapq.nlargest if largest else heapq.nsmallest
+                candidates = ((item, row) for row, item in enumerate(values) if item == item and item != MISSING_INT)
+                best = [(row, item) for item, row in select(k, candidates, key=operator.itemgetter(0))]
+            return [(self._units[row].identifier, value) for row, value in best]
+
+    def _on_unit_changes(self, unit: VentilationUnit, changes: ChangeSet) -> None:
+        """Write the changes emitted by a unit into its row."""
+        with self._lock:
+            row = self._index.get(unit.identifier)
+            if row is None:
+                return
+            for change in changes:
+                name = FIELD_COLUMNS.get(change.field)
+                if name is not None:
+                    column = self._columns[name]
+                    column[row] = _to_column_value(column.typecode, change.new)
+                elif change.field.startswith(FUNCTION_PREFIX):
+                    bit = FUNCTION_BITS[change.field[len(FUNCTION_PREFIX):]]
+                    functions = self._columns["functions"]
+                    functions[row] = functions[row] | bit if change.new else functions[row] & ~bit
+            self._columns["updated_at"][row] = max(change.timestamp for change in changes)
+
+    def _row(self, identifier: str) -> int:
+        row = self._index.get(identifier)
+        if row is None:
+            raise DeviceNotFoundError(identifier, "Unit is not in the fleet")
+        return row
+
+    def _get_column(self, name: str) -> array:
+        column = self._columns.get(name)
+        if column is None:
+            raise ValueError(f"Unknown column {name!r}, expected one of {list(COLUMNS)}")
+        return column
+
+    def _site_code(self, site: Optional[str]) -> int:
+        if site is None:
+            return -1
+        code = self._site_lookup.get(site)
+        if code is None:
+            code = self._site_lookup[site] = len(self._site_names)
+            self._site_names.append(site)
+        return code
+
+    def _site_label(self, code: int) -> Optional[str]:
+        return self._site_names[code] if code >= 0 else None
+
+    def _site_filter(self, site: Optional[str]) -> Union[int, None, bool]:
+        """Site code to filter on, None for no filter or False for an unknown site."""
+        if site is None:
+            return None
+        return self._site_lookup.get(site, False)
+
+    @staticmethod
+    def _copy(values: array) -> Any:
+        if _numpy() is not None:
+            return np.array(values, dtype=_NUMPY_DTYPES[values.typecode])
+        return array(values.typecode, values)
+
+    @staticmethod
+    def _view(values: array) -> Any:
+        """Zero-copy NumPy view of a column, only to be used within a query holding the lock.
+
+        The column cannot be resized while the view exists, so views must
+        not outlive the query.
+        """
+        dtype = _NUMPY_DTYPES[values.typecode]
+        return np.frombuffer(values, dtype=dtype) if len(values) else np.empty(0, dtype=dtype)
+
+    @staticmethod
+    def _valid_mask(values: array, data: Any) -> Any:
+        return ~np.isnan(data) if values.typecode == "d" else data != MISSING_INT
+
+    @staticmethod
+    def _reduce(items: List[Union[int, float]], func: str) -> Optional[float]:
+        if func == "count":
+            return float(len(items))
+        if not items:
+            return None
+        if func == "mean":
+            return math.fsum(items) / len(items)
+        if func == "sum":
+            return float(math.fsum(items))
+        return float(min(items) if func == "min" else max(items))
+
+    def _aggregate_numpy(self, values: array, func: str,
+                         by_site: bool) -> Union[Optional[float], Dict[Optional[str], Optional[float]]]:
+        data = self._view(values)
+        valid = self._valid_mask(values, data)
+        selected = data[valid].astype("float64")
+        if not by_site:
+            if func == "count":
+                return float(len(selected))
+            if not len(selected):
+                return None
+            return float(getattr(np, func)(selected))
+
+        # Shift codes by one so units without a site (-1) get bucket 0
+        codes = self._view(self._site_codes)[valid] + 1
+        counts = np.bincount(codes, minlength=len(self._site_names) + 1)
+        if func in ("mean", "sum"):
+            sums = np.bincount(codes, weights=selected, minlength=len(counts))
+            results = sums / np.maximum(counts, 1) if func == "mean" else sums
+        elif func == "count":
+            results = counts.astype("float64")
+        else:
+            results = np.full(len(counts), np.inf if func == "min" else -np.inf)
+            (np.minimum if func == "min" else np.maximum).at(results, codes, selected)
+        return {self._site_label(code - 1): (float(results[code]) if func == "count" or counts[code] else None)
+                for code in np.flatnonzero(counts).tolist()}
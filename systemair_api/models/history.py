@@ -0,0 +1,294 @@
+"""Fixed-memory, in-memory history of numeric unit fields."""
+
+import math
+import threading
+from array import array
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from systemair_api.models.changes import SOURCE_API, SOURCE_WEBSOCKET, ChangeSet
+from systemair_api.models.ventilation_unit import VentilationUnit
+
+# Fields recorded by default, using the status field names of FieldChange
+HISTORY_FIELDS: Tuple[str, ...] = (
+    "temperature",
+    "temperatures.oat",
+    "temperatures.sat",
+    "temperatures.setpoint",
+    "airflow",
+    "air_quality",
+    "humidity",
+    "co2",
+)
+
+# Change sources that reflect the device state (optimistic local writes are not recorded)
+HISTORY_SOURCES = frozenset({SOURCE_API, SOURCE_WEBSOCKET})
+
+DEFAULT_CAPACITY = 4096
+
+
+def _aggregate_mean(values: List[float]) -> float:
+    return math.fsum(values) / len(values)
+
+
+AGGREGATES: Dict[str, Callable[[List[float]], float]] = {
+    "mean": _aggregate_mean,
+    "min": min,
+    "max": max,
+    "first": lambda values: values[0],
+    "last": lambda values: values[-1],
+    "count": lambda values: float(len(values)),
+}
+
+
+class RingBuffer:
+    """Time series of a fixed number of (timestamp, value) samples.
+
+    Timestamps and values live in two preallocated ``array('d')`` buffers;
+    once full, each new sample overwrites the oldest one, so memory use is
+    fixed at 16 bytes per sample of capacity. Samples must be appended in
+    time order; older samples are rejected. Missing values are stored as NaN.
+    """
+
+    __slots__ = ("capacity", "_timestamps", "_values", "_start", "_count")
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY) -> None:
+        """Initialize an empty buffer.
+
+        Args:
+            capacity: Maximum number of samples kept
+
+        Raises:
+            ValueError: If the capacity is not positive
+        """
+        if capacity < 1:
+            raise ValueError("Capacity must be at least 1")
+        self.capacity: int = capacity
+        self._timestamps = array("d", bytes(8 * capacity))
+        self._values = array("d", bytes(8 * capacity))
+        self._start = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, timestamp: float, value: Optional[float]) -> bool:
+        """Add a sample, overwriting the oldest one if the buffer is full.
+
+        Args:
+            timestamp: UNIX time of the sample
+            value: Sample value, None for a missing value
+
+        Returns:
+            bool: False if the sample was older than the newest one and dropped
+        """
+        count = self._count
+        capacity = self.capacity
+        if count and timestamp < self._timestamps[(self._start + count - 1) % capacity]:
+            return False
+        if count < capacity:
+            index = (self._start + count) % capacity
+            self._count = count + 1
+        else:
+            index = self._start
+            self._start = (index + 1) % capacity
+        self._timestamps[index] = timestamp
+        self._values[index] = math.nan if value is None else value
+        return True
+
+    def latest(self) -> Optional[Tuple[float, float]]:
+        """Get the newest sample, or None if the buffer is empty."""
+        if not self._count:
+            return None
+        index = (self._start + self._count - 1) % self.capacity
+        return self._timestamps[index], self._values[index]
+
+    def _bisect(self, timestamp: float) -> int:
+        """Logical index of the first sample at or after ``timestamp``."""
+        low, high = 0, self._count
+        start, capacity, timestamps = self._start, self.capacity, self._timestamps
+        while low < high:
+            middle = (low + high) // 2
+            if timestamps[(start + middle) % capacity] < timestamp:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _slice(self, column: "array[float]", first: int, last: int) -> "array[float]":
+        """Copy logical samples ``[first, last)`` of a column, in time order."""
+        begin = (self._start + first) % self.capacity
+        length = last - first
+        if begin + length <= self.capacity:
+            return column[begin:begin + length]
+        return column[begin:] + column[:begin + length - self.capacity]
+
+    def range(self, start: Optional[float] = None,
+              end: Optional[float] = None) -> Tuple["array[float]", "array[float]"]:
+        """Get the samples with ``start <= timestamp < end``.
+
+        Args:
+            start: Earliest timestamp, defaults to the oldest sample
+            end: Timestamp after the newest sample to include, defaults to all
+
+        Returns:
+            tuple: ``(timestamps, values)`` arrays in time order
+        """
+        first = 0 if start is None else self._bisect(start)
+        last = self._count if end is None else self._bisect(end)
+        last = max(first, last)
+        return self._slice(self._timestamps, first, last), self._slice(self._values, first, last)
+
+    def downsample(self, step: float, start: Optional[float] = None, end: Optional[float] = None,
+                   aggregate: str = "mean") -> List[Tuple[float, float]]:
+        """Aggregate the samples of a time range into fixed-width buckets.
+
+        Buckets start at multiples of ``step`` and empty buckets are left
+        out. Missing (NaN) values are ignored.
+
+        Args:
+            step: Bucket width in seconds
+            start: Earliest timestamp, defaults to the oldest sample
+            end: Timestamp after the newest sample to include, defaults to all
+            aggregate: One of ``mean``, ``min``, ``max``, ``first``, ``last``, ``count``
+
+        Returns:
+            list: ``(bucket start, aggregated value)`` pairs in time order
+
+        Raises:
+            ValueError: If the step is not positive or the aggregate is unknown
+        """
+        if step <= 0:
+            raise ValueError("Step must be positive")
+        func = AGGREGATES.get(aggregate)
+        if func is None:
+            raise ValueError(f"Unknown aggregate {aggregate!r}, expected one of {sorted(AGGREGATES)}")
+        timestamps, values = self.range(start, end)
+        buckets: List[Tuple[float, float]] = []
+        bucket_start = math.nan
+        bucket: List[float] = []
+        for timestamp, value in zip(timestamps, values):
+            if value != value:
+                continue
+            current = timestamp - timestamp % step
+            if current != bucket_start:
+                if bucket:
+                    buckets.append((bucket_start, func(bucket)))
+                bucket_start = current
+                bucket = []
+            bucket.append(value)
+        if bucket:
+            buckets.append((bucket_start, func(bucket)))
+        return buckets
+
+    def clear(self) -> None:
+        """Drop all samples."""
+        self._start = 0
+        self._count = 0
+
+
+class HistoryStore:
+    """Recent history of numeric fields for many units.
+
+    The store is a change listener: attach it to units (or pass it to
+    ``unit.subscribe``) and every change applied by ``update_from_api`` or
+    ``update_from_websocket`` to one of the recorded ``fields`` is appended
+    to the ring buffer of that unit and field. Buffers are allocated when a
+    field first changes. Since only changes are recorded, a series holds the
+    value from each sample until the next one.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, fields: Iterable[str] = HISTORY_FIELDS) -> None:
+        """Initialize an empty store.
+
+        Args:
+            capacity: Samples kept per unit and field, e.g. 8640 for 24 hours
+                at one change every 10 seconds
+            fields: Status field names to record
+        """
+        if capacity < 1:
+            raise ValueError("Capacity must be at least 1")
+        self.capacity: int = capacity
+        self.fields: frozenset = frozenset(fields)
+        self._series: Dict[str, Dict[str, RingBuffer]] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, unit: VentilationUnit, changes: ChangeSet) -> None:
+        """Record the changes of a unit; the change listener interface."""
+        self.record(unit.identifier, changes)
+
+    def attach(self, unit: VentilationUnit) -> None:
+        """Start recording the changes of a unit."""
+        unit.subscribe(self)
+
+    def detach(self, unit: VentilationUnit, forget: bool = False) -> None:
+        """Stop recording the changes of a unit.
+
+        Args:
+            unit: The unit
+            forget: Also drop its recorded history
+        """
+        unit.unsubscribe(self)
+        if forget:
+            with self._lock:
+                self._series.pop(unit.identifier, None)
+
+    def record(self, identifier: str, changes: ChangeSet) -> None:
+        """Append the numeric changes from the device to the unit's series.
+
+        Args:
+            identifier: Identifier of the unit
+            changes: Change-set of an update
+        """
+        fields = self.fields
+        with self._lock:
+            series = self._series.get(identifier)
+            for change in changes:
+                if change.field not in fields or change.source not in HISTORY_SOURCES:
+                    continue
+                value = change.new
+                if value is not None and not isinstance(value, (int, float)):
+                    continue
+                if series is None:
+                    series = self._series[identifier] = {}
+                buffer = series.get(change.field)
+                if buffer is None:
+                    buffer = series[change.field] = RingBuffer(self.capacity)
+                buffer.append(change.timestamp, value)
+
+    def series(self, identifier: str, field: str) -> Optional[RingBuffer]:
+        """Get the ring buffer of a unit and field, or None if nothing was recorded."""
+        return self._series.get(identifier, {}).get(field)
+
+    def identifiers(self) -> List[str]:
+        """Get the identifiers of units with recorded history."""
+        return list(self._series)
+
+    def range(self, identifier: str, field: str, start: Optional[float] = None,
+              end: Optional[float] = None) -> List[Tuple[float, Optional[float]]]:
+        """Get the samples of a unit and field with ``start <= timestamp < end``.
+
+        Returns:
+            list: ``(timestamp, value)`` pairs in time order, None for missing values
+        """
+        buffer = self.series(identifier, field)
+        if buffer is None:
+            return []
+        with self._lock:
+            timestamps, values = buffer.range(start, end)
+        return [(timestamp, None if value != value else value) for timestamp, value in zip(timestamps, values)]
+
+    def downsample(self, identifier: str, field: str, step: float, start: Optional[float] = None,
+                   end: Optional[float] = None, aggregate: str = "mean") -> List[Tuple[float, float]]:
+        """Aggregate the samples of a unit and field into fixed-width buckets.
+
+        See :meth:`RingBuffer.downsample`.
+        """
+        buffer = self.series(identifier, field)
+        if buffer is None:
+            return []
+        with self._lock:
+            return buffer.downsample(step, start, end, aggregate)
+
+    def memory_usage(self) -> int:
+        """Get the number of bytes allocated for samples."""
+        return sum(16 * buffer.capacity for series in self._series.values() for buffer in series.values())
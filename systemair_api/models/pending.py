@@ -0,0 +1,114 @@
+"""Tracking of optimistic writes awaiting confirmation from the device."""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+
+class PendingWrite:
+    """A field value written locally that the device has not confirmed yet."""
+
+    __slots__ = ("field", "attribute", "value", "fallback", "started", "deadline")
+
+    def __init__(self, field: str, attribute: str, value: Any, fallback: Any, timeout: float) -> None:
+        """Initialize the pending write.
+
+        Args:
+            field: Status field name, e.g. ``"temperatures.setpoint"``
+            attribute: Unit attribute (or slot) storing the field
+            value: Value written to the device and shown optimistically
+            fallback: Value to restore if the write is never confirmed
+            timeout: Seconds to wait for confirmation
+        """
+        self.field: str = field
+        self.attribute: str = attribute
+        self.value: Any = value
+        self.fallback: Any = fallback
+        self.started: float = time.monotonic()
+        self.deadline: float = self.started + timeout
+
+    def __repr__(self) -> str:
+        return f"PendingWrite(field={self.field!r}, value={self.value!r}, fallback={self.fallback!r})"
+
+
+class WriteMetrics:
+    """Counters and confirmation latencies of optimistic writes.
+
+    Latency statistics are computed over the most recent ``window``
+    confirmations.
+    """
+
+    def __init__(self, window: int = 256) -> None:
+        """Initialize empty metrics.
+
+        Args:
+            window: Number of recent confirmation latencies to keep
+        """
+        self.requested: int = 0
+        self.confirmed: int = 0
+        self.rolled_back: int = 0
+        self.superseded: int = 0
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record_requested(self, superseded: bool = False) -> None:
+        """Count a new optimistic write, replacing a pending one if ``superseded``."""
+        with self._lock:
+            self.requested += 1
+            if superseded:
+                self.superseded += 1
+
+    def record_confirmed(self, latency: float) -> None:
+        """Count a confirmed write and its latency in seconds."""
+        with self._lock:
+            self.confirmed += 1
+            self._latencies.append(latency)
+
+    def record_rolled_back(self) -> None:
+        """Count a write rolled back after its timeout."""
+        with self._lock:
+            self.rolled_back += 1
+
+    @property
+    def pending(self) -> int:
+        """Number of writes still awaiting confirmation."""
+        return self.requested - self.confirmed - self.rolled_back - self.superseded
+
+    def latency_percentile(self, percentile: float) -> Optional[float]:
+        """Get a percentile of the recent confirmation latencies.
+
+        Args:
+            percentile: Percentile between 0 and 100
+
+        Returns:
+            float: Latency in seconds, or None if nothing was confirmed yet
+        """
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if not latencies:
+            return None
+        index = min(len(latencies) - 1, int(round(percentile / 100.0 * (len(latencies) - 1))))
+        return latencies[index]
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Get the counters and latency statistics as a dictionary."""
+        with self._lock:
+            latencies = list(self._latencies)
+        return {
+            "requested": self.requested,
+            "confirmed": self.confirmed,
+            "rolled_back": self.rolled_back,
+            "superseded": self.superseded,
+            "pending": self.pending,
+            "latency_mean": sum(latencies) / len(latencies) if latencies else None,
+            "latency_p50": self.latency_percentile(50),
+            "latency_p95": self.latency_percentile(95),
+            "latency_max": max(latencies) if latencies else None,
+        }
+
+    def reset(self) -> None:
+        """Clear all counters and latencies."""
+        with self._lock:
+            self.requested = self.confirmed = self.rolled_back = self.superseded = 0
+            self._latencies.clear()
@@ -0,0 +1,265 @@
+"""Incremental min/max/mean/last rollups of numeric unit fields."""
+
+import threading
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+from systemair_api.models.changes import ChangeSet
+from systemair_api.models.history import HISTORY_FIELDS, HISTORY_SOURCES
+from systemair_api.models.telemetry_log import TelemetrySample
+from systemair_api.models.ventilation_unit import VentilationUnit
+
+# Bucket width in seconds -> number of buckets kept
+DEFAULT_RESOLUTIONS: Dict[int, int] = {
+    60: 1440,    # One day of minutes
+    900: 672,    # One week of quarter hours
+    3600: 720,   # Thirty days of hours
+}
+
+
+class Rollup(NamedTuple):
+    """Aggregates of the samples in one bucket."""
+
+    start: float
+    samples: int
+    mean: float
+    min: float
+    max: float
+    last: float
+
+
+class _Bucket:
+    """Running aggregates of one bucket."""
+
+    __slots__ = ("start", "count", "total", "minimum", "maximum", "last", "last_timestamp")
+
+    def __init__(self, start: float, timestamp: float, value: float) -> None:
+        self.start = start
+        self.count = 1
+        self.total = value
+        self.minimum = value
+        self.maximum = value
+        self.last = value
+        self.last_timestamp = timestamp
+
+    def add(self, timestamp: float, value: float) -> None:
+        self.count += 1
+        self.total += value
+        if value < self.minimum:
+            self.minimum = value
+        elif value > self.maximum:
+            self.maximum = value
+        if timestamp >= self.last_timestamp:
+            self.last = value
+            self.last_timestamp = timestamp
+
+    def freeze(self) -> Rollup:
+        return Rollup(self.start, self.count, self.total / self.count, self.minimum, self.maximum, self.last)
+
+
+class RollupSeries:
+    """Rollups of one unit and field at one resolution.
+
+    Buckets start at multiples of ``resolution``. The newest bucket stays
+    open and is updated in place; older buckets are kept up to ``capacity``,
+    and a late sample still updates the bucket it belongs to while that is
+    kept. Buckets without samples are left out.
+    """
+
+    __slots__ = ("resolution", "_buckets")
+
+    def __init__(self, resolution: int, capacity: int) -> None:
+        """Initialize an empty series.
+
+        Args:
+            resolution: Bucket width in seconds
+            capacity: Number of buckets kept, including the open one
+
+        Raises:
+            ValueError: If the resolution or capacity is not positive
+        """
+        if resolution <= 0 or capacity < 1:
+            raise ValueError("Resolution and capacity must be positive")
+        self.resolution: int = resolution
+        self._buckets: Deque[_Bucket] = deque(maxlen=capacity)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def add(self, timestamp: float, value: float) -> bool:
+        """Fold a sample into its bucket.
+
+        Returns:
+            bool: False if the sample belongs to a bucket that was already dropped
+        """
+        start = timestamp - timestamp % self.resolution
+        buckets = self._buckets
+        if buckets:
+            newest = buckets[-1]
+            if start == newest.start:
+                newest.add(timestamp, value)
+                return True
+        if not buckets or start > buckets[-1].start:
+            buckets.append(_Bucket(start, timestamp, value))
+            return True
+        # Late samples almost always belong to one of the newest buckets
+        for index in range(len(buckets) - 1, -1, -1):
+            bucket = buckets[index]
+            if bucket.start == start:
+                bucket.add(timestamp, value)
+                return True
+            if bucket.start < start:
+                if len(buckets) == buckets.maxlen:
+                    buckets.popleft()
+                    index -= 1
+                buckets.insert(index + 1, _Bucket(start, timestamp, value))
+                return True
+        if len(buckets) < buckets.maxlen:  # type: ignore[operator]
+            buckets.appendleft(_Bucket(start, timestamp, value))
+            return True
+        return False
+
+    def latest(self) -> Optional[Rollup]:
+        """Get the newest (open) bucket, or None if the series is empty."""
+        return self._buckets[-1].freeze() if self._buckets else None
+
+    def range(self, start: Optional[float] = None, end: Optional[float] = None) -> List[Rollup]:
+        """Get the buckets starting at or after ``start`` and before ``end``, in time order."""
+        return [bucket.freeze() for bucket in self._buckets
+                if (start is None or bucket.start >= start) and (end is None or bucket.start < end)]
+
+
+class RollupEngine:
+    """Precomputed rollups of numeric fields for many units.
+
+    Like :class:`~systemair_api.models.history.HistoryStore`, the engine is
+    a change listener: every change from the device to one of ``fields`` is
+    folded into the open bucket of each resolution, so reading a rollup
+    never scans raw samples. Stored telemetry can be replayed with
+    :meth:`backfill`.
+
+    Aggregates are over the recorded samples, i.e. the changes, and are not
+    weighted by how long each value was held.
+    """
+
+    def __init__(self, resolutions: Mapping[int, int] = DEFAULT_RESOLUTIONS,
+                 fields: Iterable[str] = HISTORY_FIELDS) -> None:
+        """Initialize an empty engine.
+
+        Args:
+            resolutions: Bucket width in seconds -> number of buckets kept
+            fields: Status field names to roll up
+
+        Raises:
+            ValueError: If no resolution is given or one is not positive
+        """
+        if not resolutions or any(width <= 0 or kept < 1 for width, kept in resolutions.items()):
+            raise ValueError("Resolutions and the number of buckets kept must be positive")
+        self.resolutions: Dict[int, int] = dict(sorted(resolutions.items()))
+        self.fields: frozenset = frozenset(fields)
+        self._series: Dict[str, Dict[str, Tuple[RollupSeries, ...]]] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, unit: VentilationUnit, changes: ChangeSet) -> None:
+        """Roll up the changes of a unit; the change listener interface."""
+        self.record(unit.identifier, changes)
+
+    def attach(self, unit: VentilationUnit) -> None:
+        """Start rolling up the changes of a unit."""
+        unit.subscribe(self)
+
+    def detach(self, unit: VentilationUnit, forget: bool = False) -> None:
+        """Stop rolling up the changes of a unit.
+
+        Args:
+            unit: The unit
+            forget: Also drop its rollups
+        """
+        unit.unsubscribe(self)
+        if forget:
+            with self._lock:
+                self._series.pop(unit.identifier, None)
+
+    def record(self, identifier: str, changes: ChangeSet) -> None:
+        """Fold the numeric changes from the device into the unit's rollups.
+
+        Args:
+            identifier: Identifier of the unit
+            changes: Change-set of an update
+        """
+        fields = self.fields
+        with self._lock:
+            for change in changes:
+                if change.field in fields and change.source in HISTORY_SOURCES:
+                    self._add(identifier, change.field, change.timestamp, change.new)
+
+    def backfill(self, samples: Iterable[TelemetrySample]) -> int:
+        """Fold stored samples, e.g. from ``TelemetryReader.scan()``, into the rollups.
+
+        Returns:
+            int: Number of samples folded in
+        """
+        fields = self.fields
+        added = 0
+        with self._lock:
+            for sample in samples:
+                if sample.field in fields and sample.source in HISTORY_SOURCES:
+                    added += self._add(sample.identifier, sample.field, sample.timestamp, sample.value)
+        return added
+
+    def identifiers(self) -> List[str]:
+        """Get the identifiers of units with rollups."""
+        return list(self._series)
+
+    def query(self, identifier: str, field: str, resolution: int, start: Optional[float] = None,
+              end: Optional[float] = None) -> List[Rollup]:
+        """Get the rollups of a unit and field whose bucket starts in ``[start, end)``.
+
+        Args:
+            identifier: Identifier of the unit
+            field: Status field name
+            resolution: Bucket width in seconds, one of ``resolutions``
+            start: Earliest bucket start, defaults to the oldest bucket
+            end: Bucket start after the newest bucket to include, defaults to all
+
+        Returns:
+            list: Rollups in time order; the newest one may still be open
+
+        Raises:
+            ValueError: If the resolution is not configured
+        """
+        with self._lock:
+            series = self._get(identifier, field, resolution)
+            return [] if series is None else series.range(start, end)
+
+    def latest(self, identifier: str, field: str, resolution: int) -> Optional[Rollup]:
+        """Get the newest rollup of a unit and field, or None if nothing was recorded.
+
+        Raises:
+            ValueError: If the resolution is not configured
+        """
+        with self._lock:
+            series = self._get(identifier, field, resolution)
+            return None if series is None else series.latest()
+
+    def _get(self, identifier: str, field: str, resolution: int) -> Optional[RollupSeries]:
+        if resolution not in self.resolutions:
+            raise ValueError(f"Unknown resolution {resolution!r}, expected one of {list(self.resolutions)}")
+        series = self._series.get(identifier, {}).get(field)
+        if series is None:
+            return None
+        return series[list(self.resolutions).index(resolution)]
+
+    def _add(self, identifier: str, field: str, timestamp: float, value: object) -> bool:
+        if value is None or not isinstance(value, (int, float)) or value != value:
+            return False
+        unit_series = self._series.get(identifier)
+        if unit_series is None:
+            unit_series = self._series[identifier] = {}
+        series = unit_series.get(field)
+        if series is None:
+            series = unit_series[field] = tuple(RollupSeries(width, kept) for width, kept in self.resolutions.items())
+        value = float(value)
+        for rollups in series:
+            rollups.add(timestamp, value)
+        return True
@@ -0,0 +1,356 @@
+"""Binary snapshots of ventilation unit and fleet state.
+
+A snapshot file starts with a fixed header followed by one block per
+column. All values of a column are stored contiguously, so numeric columns
+can be read straight from a memory-mapped file without parsing::
+
+    header  magic (8s) | version (H) | reserved (H) | unit count (I)
+            | created at (d) | CRC-32 (I) | padding (4x)
+    block   column name (32s) | kind (c) | padding (7x) | payload length (Q)
+            | payload, zero-padded to a multiple of 8 bytes
+
+The CRC-32 covers the header fields from the version up to the creation
+time, followed by the body. All numbers are little-endian. The kind of a column is the ``array``
+typecode of its payload:
+
+- ``b``, ``h``, ``i``, ``q``: integers, using the narrowest type that holds
+  every value; missing values are stored as the type's minimum
+- ``d``: float64, missing values are stored as NaN
+- ``B``: booleans as uint8, missing values are stored as 255
+- ``j``: zlib-compressed UTF-8 JSON array holding the value of every unit,
+  used for text, lists and columns mixing types
+"""
+
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+import zlib
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from systemair_api.models.fleet import Fleet
+from systemair_api.models.ventilation_unit import VentilationUnit
+
+SNAPSHOT_MAGIC = b"SAIRSNAP"
+SNAPSHOT_VERSION = 1
+
+_HEADER = struct.Struct("<8sHHIdI4x")
+# Header bytes covered by the checksum: version through creation time
+_CHECKED_HEADER = slice(len(SNAPSHOT_MAGIC), struct.calcsize("<8sHHId"))
+_BLOCK = struct.Struct("<32sc7xQ")
+_ALIGNMENT = 8
+
+KIND_FLOAT = b"d"
+KIND_BOOL = b"B"
+KIND_JSON = b"j"
+
+# Integer kind -> value stored for missing values, narrowest kind first
+INT_MISSING: Dict[bytes, int] = {
+    kind: -(1 << (8 * array(kind.decode("ascii")).itemsize - 1)) for kind in (b"b", b"h", b"i", b"q")
+}
+BOOL_MISSING = 255
+
+# Unit slots that hold runtime state rather than device state
+TRANSIENT_ATTRIBUTES = frozenset({"identifier", "_listeners", "_status", "_status_view", "_pending",
+                                  "__weakref__"})
+
+# Unit attributes stored in a snapshot, besides the identifier
+SNAPSHOT_ATTRIBUTES: Tuple[str, ...] = tuple(
+    name for name in VentilationUnit.__slots__ if name not in TRANSIENT_ATTRIBUTES
+)
+
+_NUMERIC_KINDS = frozenset(INT_MISSING) | {KIND_FLOAT, KIND_BOOL}
+
+
+def _column_kind(values: List[Any]) -> bytes:
+    """Pick the most compact kind that round-trips every value of a column exactly."""
+    types = set(map(type, values))
+    types.discard(type(None))
+    if not types or types == {bool}:
+        return KIND_BOOL
+    present = [value for value in values if value is not None]
+    if types == {int}:
+        low, high = min(present), max(present)
+        for kind, missing in INT_MISSING.items():
+            if missing < low and high < -missing:
+                return kind
+        return KIND_JSON
+    if types == {float} and not any(map(math.isnan, present)):
+        return KIND_FLOAT
+    return KIND_JSON
+
+
+def _encode_column(kind: bytes, values: List[Any]) -> bytes:
+    if kind == KIND_JSON:
+        return zlib.compress(json.dumps(values, separators=(",", ":")).encode("utf-8"), 1)
+    if kind == KIND_FLOAT:
+        missing: Union[int, float] = math.nan
+    else:
+        missing = BOOL_MISSING if kind == KIND_BOOL else INT_MISSING[kind]
+    column = array(kind.decode("ascii"), [missing if value is None else value for value in values])
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column.tobytes()
+
+
+def save_snapshot(path: str, source: Union[Fleet, Iterable[VentilationUnit]],
+                  created_at: Optional[float] = None) -> int:
+    """Write the state of a fleet or of individual units to a snapshot file.
+
+    The file is written to a temporary file first and then atomically
+    moved into place, so readers never see a partial snapshot.
+
+    Args:
+        path: Destination file
+        source: A :class:`Fleet` (site labels and update times are kept) or
+            an iterable of units (their state counts as updated at ``created_at``)
+        created_at: UNIX time of the snapshot, defaults to now
+
+    Returns:
+        int: Number of units written
+    """
+    created_at = time.time() if created_at is None else created_at
+    if isinstance(source, Fleet):
+        units, sites, fleet_columns = source.table(["updated_at"])
+        updated_at = [None if math.isnan(value) else value for value in fleet_columns["updated_at"].tolist()]
+    else:
+        units = list(source)
+        sites = [None] * len(units)
+        updated_at = [created_at] * len(units)
+
+    columns: List[Tuple[str, List[Any]]] = [("site", sites), ("updated_at", updated_at)]
+    columns.extend((name, [getattr(unit, name) for unit in units]) for name in SNAPSHOT_ATTRIBUTES)
+
+    blocks = [("identifier", KIND_JSON, _encode_column(KIND_JSON, [unit.identifier for unit in units]))]
+    for name, values in columns:
+        kind = _column_kind(values)
+        blocks.append((name, kind, _encode_column(kind, values)))
+
+    body = bytearray()
+    for name, kind, payload in blocks:
+        body += _BLOCK.pack(name.encode("ascii"), kind, len(payload))
+        body += payload
+        body += b"\0" * (-len(payload) % _ALIGNMENT)
+    fields = _HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, 0, len(units), created_at, 0)[_CHECKED_HEADER]
+    header = _HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, 0, len(units), created_at,
+                          zlib.crc32(body, zlib.crc32(fields)))
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".snapshot-", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(header)
+            f.write(body)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    return len(units)
+
+
+class Snapshot:
+    """Read-only, memory-mapped snapshot file.
+
+    Opening a snapshot only reads the header and the block directory.
+    Numeric columns are served as zero-copy ``memoryview`` objects over the
+    mapped file; unit objects are only built by :meth:`units` and
+    :meth:`to_fleet`. Close the snapshot (or use it as a context manager)
+    once done, after dropping any column views obtained from it.
+    """
+
+    def __init__(self, path: str, verify: bool = True) -> None:
+        """Open and validate a snapshot file.
+
+        Args:
+            path: Snapshot file
+            verify: Check the CRC-32 of the whole body, which reads the entire file
+
+        Raises:
+            ValueError: If the file is not a snapshot, has an unsupported
+                version, fails the checksum or has columns whose length does
+                not match its unit count
+        """
+        with open(path, "rb") as f:
+            try:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as e:
+                raise ValueError(f"{path} is not a snapshot: {e}") from e
+        self._buffer = memoryview(self._mmap)
+        try:
+            self._blocks = self._read_directory(path, verify)
+            if verify:
+                # Numeric columns are checked against the unit count on open, JSON ones when decoded
+                self.identifiers()
+        except BaseException:
+            self.close()
+            raise
+
+    def _read_directory(self, path: str, verify: bool) -> Dict[str, Tuple[bytes, int, int]]:
+        if len(self._buffer) < _HEADER.size:
+            raise ValueError(f"{path} is not a snapshot: file too short")
+        magic, version, _, count, created_at, crc = _HEADER.unpack_from(self._buffer)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} is not a snapshot: bad magic {magic!r}")
+        if version > SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version {version} (expected <= {SNAPSHOT_VERSION})")
+        if verify and zlib.crc32(self._buffer[_HEADER.size:], zlib.crc32(self._buffer[_CHECKED_HEADER])) != crc:
+            raise ValueError(f"Snapshot {path} is corrupt: checksum mismatch")
+
+        self.version: int = version
+        self.count: int = count
+        self.created_at: float = created_at
+        blocks = {}
+        offset = _HEADER.size
+        while offset < len(self._buffer):
+            if offset + _BLOCK.size > len(self._buffer):
+                raise ValueError(f"Snapshot {path} is truncated")
+            name, kind, length = _BLOCK.unpack_from(self._buffer, offset)
+            offset += _BLOCK.size
+            if offset + length > len(self._buffer):
+                raise ValueError(f"Snapshot {path} is truncated")
+            name = name.rstrip(b"\0").decode("ascii")
+            if kind in _NUMERIC_KINDS and length != count * array(kind.decode("ascii")).itemsize:
+                raise ValueError(f"Snapshot {path} is corrupt: column {name} does not hold {count} values")
+            blocks[name] = (kind, offset, length)
+            offset += length + (-length % _ALIGNMENT)
+        if "identifier" not in blocks:
+            raise ValueError(f"Snapshot {path} is corrupt: no identifier column")
+        return blocks
+
+    def __enter__(self) -> "Snapshot":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Unmap the file."""
+        self._buffer.release()
+        self._mmap.close()
+
+    @property
+    def columns(self) -> List[str]:
+        """Names of the columns in the snapshot."""
+        return list(self._blocks)
+
+    def column(self, name: str) -> Union[memoryview, array, List[Any]]:
+        """Get the raw values of a column.
+
+        Args:
+            name: Column name
+
+        Returns:
+            A zero-copy ``memoryview`` for numeric columns (missing values
+            are stored as described in the module docstring; big-endian hosts
+            get a byte-swapped ``array`` copy), the decoded list for JSON columns
+
+        Raises:
+            KeyError: If the column is not in the snapshot
+            ValueError: If a JSON column does not hold one value per unit
+        """
+        kind, offset, length = self._blocks[name]
+        payload = self._buffer[offset:offset + length]
+        if kind == KIND_JSON:
+            with payload:
+                values = json.loads(zlib.decompress(payload).decode("utf-8"))
+            if not isinstance(values, list) or len(values) != self.count:
+                raise ValueError(f"Snapshot column {name} does not hold {self.count} values")
+            return values
+        if kind not in _NUMERIC_KINDS:
+            payload.release()
+            raise ValueError(f"Column {name} has unsupported kind {kind!r}")
+        if sys.byteorder == "big":
+            with payload:
+                column = array(kind.decode("ascii"), payload)
+            column.byteswap()
+            return column
+        return payload.cast(kind.decode("ascii"))
+
+    def values(self, name: str) -> List[Any]:
+        """Get the values of a column as Python objects, with None for missing values.
+
+        Raises:
+            KeyError: If the column is not in the snapshot
+            ValueError: If a JSON column does not hold one value per unit
+        """
+        kind = self._blocks[name][0]
+        column = self.column(name)
+        if isinstance(column, list):
+            return column
+        items: List[Any] = column.tolist()
+        if isinstance(column, memoryview):
+            column.release()
+        if kind == KIND_FLOAT:
+            return [None if item != item else item for item in items]
+        if kind == KIND_BOOL:
+            return [None if item == BOOL_MISSING else bool(item) for item in items]
+        missing = INT_MISSING[kind]
+        return [None if item == missing else item for item in items]
+
+    def identifiers(self) -> List[str]:
+        """Get the unit identifiers in snapshot order."""
+        return self.values("identifier")
+
+    def stale(self, max_age: float, now: Optional[float] = None) -> List[str]:
+        """Find units whose stored state is older than ``max_age`` seconds.
+
+        Only the identifier and update-time columns are read, so this is
+        cheap enough to decide what to refetch before building any units.
+
+        Args:
+            max_age: Maximum age in seconds
+            now: Current UNIX time, defaults to now
+
+        Returns:
+            list: Identifiers of units that need to be refetched
+        """
+        cutoff = (time.time() if now is None else now) - max_age
+        return [identifier for identifier, updated_at in zip(self.identifiers(), self.values("updated_at"))
+                if updated_at is None or updated_at < cutoff]
+
+    def units(self) -> List[VentilationUnit]:
+        """Build the units stored in the snapshot."""
+        identifiers = self.identifiers()
+        attributes = [(name, self.values(name)) for name in self._blocks
+                      if name in SNAPSHOT_ATTRIBUTES]
+        units = []
+        for row, identifier in enumerate(identifiers):
+            unit = VentilationUnit(identifier, "")
+            for name, values in attributes:
+                setattr(unit, name, values[row])
+            units.append(unit)
+        return units
+
+    def to_fleet(self) -> Fleet:
+        """Build a fleet holding the units, site labels and update times of the snapshot."""
+        fleet = Fleet()
+        fleet.add_many(self.units(), self.values("site"), self.values("updated_at"))
+        return fleet
+
+
+def load_snapshot(path: str, verify: bool = True) -> Fleet:
+    """Load a snapshot file into a fleet.
+
+    Use ``fleet.stale(max_age, now)`` afterwards to find the units whose
+    last-known state is too old and should be refetched.
+
+    Args:
+        path: Snapshot file
+        verify: Check the CRC-32 of the whole body
+
+    Returns:
+        Fleet: The restored fleet
+
+    Raises:
+        ValueError: If the file is not a valid snapshot
+    """
+    with Snapshot(path, verify) as snapshot:
+        return snapshot.to_fleet()
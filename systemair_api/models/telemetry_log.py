@@ -0,0 +1,476 @@
+"""Append-only, memory-mapped on-disk log of unit field samples.
+
+A telemetry log is a directory of segment files. Each segment holds
+fixed-width sample records; after every ``block_records`` records an index
+block summarizes the block before it, so readers can skip blocks by time,
+field and unit without decoding them::
+
+    header  magic (8s) | version (H) | record size (H) | block records (I)
+            | created at (d) | reserved (8x)
+    record  timestamp (d) | unit code (I) | field code (H) | source (B)
+            | padding (x) | value (d)
+    index   magic (4s) | record count (I) | min timestamp (d)
+            | max timestamp (d) | field mask (Q) | unit bitmap (256s)
+
+All numbers are little-endian. Blocks have a fixed size, so the position
+of every index block follows from the file size. Records after the last
+index block (the block being written) are scanned linearly.
+
+Unit codes are line numbers in the segment's ``.units`` sidecar file, which
+lists the identifiers in the order they first appear. Field codes index
+``TELEMETRY_FIELDS``; new fields are only ever appended to it. Values are
+stored as float64 (booleans as 0/1, missing values as NaN).
+"""
+
+import math
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+from typing import Any, BinaryIO, Dict, Iterator, List, NamedTuple, Optional, TextIO, Tuple
+
+from systemair_api.models.changes import (
+    SOURCE_API,
+    SOURCE_LOCAL,
+    SOURCE_ROLLBACK,
+    SOURCE_WEBSOCKET,
+    ChangeSet,
+)
+from systemair_api.models.ventilation_unit import (
+    FUNCTION_REGISTERS,
+    TEMPERATURE_SLOTS,
+    USER_MODE_TIME_SLOTS,
+    VentilationUnit,
+)
+
+# NumPy is optional and imported by _numpy on the first scan; None means it
+# is not installed and blocks are decoded with struct
+_NOT_IMPORTED: Any = object()
+np: Any = _NOT_IMPORTED
+_RECORD_DTYPE: Any = None
+
+TELEMETRY_MAGIC = b"SAIRTLOG"
+TELEMETRY_VERSION = 1
+
+_HEADER = struct.Struct("<8sHHId8x")
+_RECORD = struct.Struct("<dIHBxd")
+_INDEX = struct.Struct("<4sIddQ256s")
+_INDEX_MAGIC = b"TIDX"
+_UNIT_BITS = 256 * 8
+
+# Field code -> status field name. Append only: codes are stored in segments.
+TELEMETRY_FIELDS: Tuple[str, ...] = (
+    "temperature",
+    *(f"temperatures.{key}" for key in TEMPERATURE_SLOTS),
+    "airflow",
+    "air_quality",
+    "humidity",
+    "co2",
+    "user_mode",
+    "user_mode_remaining_time",
+    *(f"user_mode_times.{key}" for key in USER_MODE_TIME_SLOTS),
+    "active_alarms",
+    "filter_expiration",
+    "eco_mode",
+    "locked_user",
+    "alarm_type_a",
+    "alarm_type_b",
+    "alarm_type_c",
+    "suw_required",
+    "reheater_type",
+    *(f"active_functions.{name}" for name in FUNCTION_REGISTERS.values()),
+)
+FIELD_CODES: Dict[str, int] = {field: code for code, field in enumerate(TELEMETRY_FIELDS)}
+
+# Change source <-> stored code
+SOURCE_CODES: Dict[str, int] = {SOURCE_API: 0, SOURCE_WEBSOCKET: 1, SOURCE_LOCAL: 2, SOURCE_ROLLBACK: 3}
+SOURCE_NAMES: Dict[int, str] = {code: source for source, code in SOURCE_CODES.items()}
+
+_SEGMENT_NAME = re.compile(r"^segment-(\d{8})\.tlog$")
+
+
+class TelemetrySample(NamedTuple):
+    """A sample read back from a telemetry log."""
+
+    timestamp: float
+    identifier: str
+    field: str
+    value: Optional[float]
+    source: str
+
+
+def _segment_paths(directory: str) -> List[Tuple[int, str]]:
+    """List the ``(sequence number, path)`` of the segments in a directory, oldest first."""
+    segments = []
+    for name in os.listdir(directory):
+        match = _SEGMENT_NAME.match(name)
+        if match:
+            segments.append((int(match.group(1)), os.path.join(directory, name)))
+    return sorted(segments)
+
+
+def _units_path(segment_path: str) -> str:
+    return segment_path[:-len(".tlog")] + ".units"
+
+
+class TelemetryLog:
+    """Writer appending unit field changes to a telemetry log directory.
+
+    The log is a change listener: attach it to units (or pass it to
+    ``unit.subscribe``) and every numeric change they apply is appended.
+    Records are buffered in memory and written a block at a time (and by
+    :meth:`flush`). A new segment is started when the current one reaches
+    ``segment_records`` records, and every writer starts a segment of its
+    own, so existing files are never modified.
+    """
+
+    def __init__(self, directory: str, block_records: int = 4096, segment_records: int = 4096 * 256,
+                 max_segments: Optional[int] = None) -> None:
+        """Open a log directory for writing, creating it if needed.
+
+        Args:
+            directory: Directory holding the segments
+            block_records: Records per indexed block
+            segment_records: Records per segment before rotating, rounded
+                up to whole blocks
+            max_segments: Delete the oldest segments beyond this many
+
+        Raises:
+            ValueError: If the block or segment size is not positive
+        """
+        if block_records < 1 or segment_records < 1:
+            raise ValueError("Block and segment sizes must be positive")
+        self.directory: str = directory
+        self.block_records: int = block_records
+        self.segment_records: int = -(-segment_records // block_records) * block_records
+        self.max_segments: Optional[int] = max_segments
+        self.records: int = 0
+        os.makedirs(directory, exist_ok=True)
+        existing = _segment_paths(directory)
+        self._sequence = existing[-1][0] if existing else 0
+        self._file: Optional[BinaryIO] = None
+        self._units_file: Optional[TextIO] = None
+        self._units: Dict[str, int] = {}
+        self._segment_count = 0
+        self._block: List[Tuple[float, int, int, int, float]] = []
+        self._pending = bytearray()
+        self._lock = threading.Lock()
+
+    def __call__(self, unit: VentilationUnit, changes: ChangeSet) -> None:
+        """Append the changes of a unit; the change listener interface."""
+        self.append(unit.identifier, changes)
+
+    def __enter__(self) -> "TelemetryLog":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def attach(self, unit: VentilationUnit) -> None:
+        """Start logging the changes of a unit."""
+        unit.subscribe(self)
+
+    def detach(self, unit: VentilationUnit) -> None:
+        """Stop logging the changes of a unit."""
+        unit.unsubscribe(self)
+
+    def append(self, identifier: str, changes: ChangeSet) -> int:
+        """Append the numeric changes of a change-set.
+
+        Args:
+            identifier: Identifier of the unit
+            changes: Change-set of an update
+
+        Returns:
+            int: Number of records appended
+        """
+        appended = 0
+        with self._lock:
+            for change in changes:
+                field_code = FIELD_CODES.get(change.field)
+                value = change.new
+                if field_code is None or (value is not None and not isinstance(value, (int, float))):
+                    continue
+                self._append(change.timestamp, identifier, field_code, SOURCE_CODES.get(change.source, 0),
+                             math.nan if value is None else float(value))
+                appended += 1
+        return appended
+
+    def append_sample(self, timestamp: float, identifier: str, field: str, value: Optional[float],
+                      source: str = SOURCE_API) -> None:
+        """Append a single sample.
+
+        Raises:
+            ValueError: If the field is not in ``TELEMETRY_FIELDS``
+        """
+        field_code = FIELD_CODES.get(field)
+        if field_code is None:
+            raise ValueError(f"Unknown telemetry field {field!r}")
+        with self._lock:
+            self._append(timestamp, identifier, field_code, SOURCE_CODES.get(source, 0),
+                         math.nan if value is None else float(value))
+
+    def flush(self) -> None:
+        """Write buffered records to disk."""
+        with self._lock:
+            self._write_pending()
+
+    def close(self) -> None:
+        """Flush and close the current segment."""
+        with self._lock:
+            self._write_pending()
+            self._close_segment()
+
+    def _append(self, timestamp: float, identifier: str, field_code: int, source_code: int,
+                value: float) -> None:
+        units_file = self._units_file
+        if units_file is None or self._segment_count >= self.segment_records:
+            self._write_pending()
+            units_file = self._open_segment()
+        unit_code = self._units.get(identifier)
+        if unit_code is None:
+            unit_code = self._units[identifier] = len(self._units)
+            # The sidecar must be durable before any record refers to the code
+            units_file.write(identifier + "\n")
+            units_file.flush()
+        record = (timestamp, unit_code, field_code, source_code, value)
+        self._pending += _RECORD.pack(*record)
+        self._block.append(record)
+        self._segment_count += 1
+        self.records += 1
+        if len(self._block) == self.block_records:
+            self._pending += self._index_block(self._block)
+            self._block = []
+            self._write_pending()
+
+    @staticmethod
+    def _index_block(records: List[Tuple[float, int, int, int, float]]) -> bytes:
+        field_mask = 0
+        unit_bitmap = bytearray(_UNIT_BITS // 8)
+        for _, unit_code, field_code, _, _ in records:
+            field_mask |= 1 << (field_code % 64)
+            bit = unit_code % _UNIT_BITS
+            unit_bitmap[bit >> 3] |= 1 << (bit & 7)
+        timestamps = [record[0] for record in records]
+        return _INDEX.pack(_INDEX_MAGIC, len(records), min(timestamps), max(timestamps), field_mask,
+                           bytes(unit_bitmap))
+
+    def _write_pending(self) -> None:
+        if self._pending and self._file is not None:
+            self._file.write(self._pending)
+            self._file.flush()
+            self._pending = bytearray()
+
+    def _open_segment(self) -> TextIO:
+        """Start a new segment, returning its unit sidecar."""
+        self._close_segment()
+        self._sequence += 1
+        path = os.path.join(self.directory, f"segment-{self._sequence:08d}.tlog")
+        segment = self._file = open(path, "xb")
+        segment.write(_HEADER.pack(TELEMETRY_MAGIC, TELEMETRY_VERSION, _RECORD.size, self.block_records,
+                                   time.time()))
+        units_file = self._units_file = open(_units_path(path), "x", encoding="utf-8")
+        self._units = {}
+        self._segment_count = 0
+        self._block = []
+        if self.max_segments is not None:
+            for _, old_path in _segment_paths(self.directory)[:-self.max_segments]:
+                for stale in (old_path, _units_path(old_path)):
+                    try:
+                        os.unlink(stale)
+                    except OSError:
+                        pass
+        return units_file
+
+    def _close_segment(self) -> None:
+        if self._file is not None:
+            self._file.close()
+        if self._units_file is not None:
+            self._units_file.close()
+        self._file = None
+        self._units_file = None
+
+
+class TelemetrySegment:
+    """Read-only, memory-mapped view of one segment file."""
+
+    def __init__(self, path: str) -> None:
+        """Open and validate a segment.
+
+        Args:
+            path: Segment file
+
+        Raises:
+            ValueError: If the file is not a telemetry segment or has an
+                unsupported version
+        """
+        self.path: str = path
+        with open(path, "rb") as f:
+            try:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as e:
+                raise ValueError(f"{path} is not a telemetry segment: {e}") from e
+        if len(self._mmap) < _HEADER.size:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a telemetry segment: file too short")
+        magic, version, record_size, block_records, created_at = _HEADER.unpack_from(self._mmap)
+        if magic != TELEMETRY_MAGIC or record_size != _RECORD.size:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a telemetry segment")
+        if version > TELEMETRY_VERSION:
+            self._mmap.close()
+            raise ValueError(f"Unsupported telemetry version {version} (expected <= {TELEMETRY_VERSION})")
+        self.created_at: float = created_at
+        self.block_records: int = block_records
+        with open(_units_path(path), encoding="utf-8") as f:
+            self.identifiers: List[str] = f.read().splitlines()
+        self._unit_codes = {identifier: code for code, identifier in enumerate(self.identifiers)}
+
+    def __enter__(self) -> "TelemetrySegment":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Unmap the file."""
+        self._mmap.close()
+
+    def _blocks(self) -> Iterator[Tuple[int, int, Optional[Tuple[float, float, int, bytes]]]]:
+        """Yield ``(offset, record count, index or None)`` for each block, the unindexed tail last."""
+        block_size = self.block_records * _RECORD.size
+        stride = block_size + _INDEX.size
+        offset = _HEADER.size
+        size = len(self._mmap)
+        while offset + stride <= size:
+            magic, count, low, high, field_mask, unit_bitmap = _INDEX.unpack_from(self._mmap, offset + block_size)
+            if magic != _INDEX_MAGIC or count != self.block_records:
+                raise ValueError(f"Telemetry segment {self.path} is corrupt at offset {offset + block_size}")
+            yield offset, count, (low, high, field_mask, unit_bitmap)
+            offset += stride
+        tail = (size - offset) // _RECORD.size
+        if tail:
+            yield offset, tail, None
+
+    def scan(self, identifier: Optional[str] = None, field: Optional[str] = None,
+             start: Optional[float] = None, end: Optional[float] = None) -> Iterator[TelemetrySample]:
+        """Iterate over the samples matching all given filters, in write order.
+
+        Args:
+            identifier: Only samples of this unit
+            field: Only samples of this field
+            start: Only samples at or after this UNIX time
+            end: Only samples before this UNIX time
+        """
+        unit_code = None
+        if identifier is not None:
+            unit_code = self._unit_codes.get(identifier)
+            if unit_code is None:
+                return
+        field_code = None
+        if field is not None:
+            field_code = FIELD_CODES.get(field)
+            if field_code is None:
+                return
+        low_bound = -math.inf if start is None else start
+        high_bound = math.inf if end is None else end
+        identifiers = self.identifiers
+        for offset, count, index in self._blocks():
+            if index is not None:
+                low, high, field_mask, unit_bitmap = index
+                if high < low_bound or low >= high_bound:
+                    continue
+                if field_code is not None and not field_mask >> (field_code % 64) & 1:
+                    continue
+                if unit_code is not None:
+                    bit = unit_code % _UNIT_BITS
+                    if not unit_bitmap[bit >> 3] >> (bit & 7) & 1:
+                        continue
+            for timestamp, unit, code, source, value in self._records(offset, count, unit_code, field_code,
+                                                                     low_bound, high_bound):
+                yield TelemetrySample(timestamp, identifiers[unit], TELEMETRY_FIELDS[code],
+                                      None if value != value else value, SOURCE_NAMES.get(source, SOURCE_API))
+
+    def _records(self, offset: int, count: int, unit_code: Optional[int], field_code: Optional[int],
+                 low_bound: float, high_bound: float) -> List[Tuple[Any, ...]]:
+        """Decode the matching ``(timestamp, unit, field, source, value)`` records of one block."""
+        if _numpy() is not None:
+            records = np.frombuffer(self._mmap, dtype=_RECORD_DTYPE, count=count, offset=offset)
+            mask = (records["timestamp"] >= low_bound) & (records["timestamp"] < high_bound)
+            if unit_code is not None:
+                mask &= records["unit"] == unit_code
+            if field_code is not None:
+                mask &= records["field"] == field_code
+            matches: List[Tuple[Any, ...]] = records[mask].tolist()
+            return matches
+        view = memoryview(self._mmap)[offset:offset + count * _RECORD.size]
+        try:
+            return [record for record in _RECORD.iter_unpack(view)
+                    if low_bound <= record[0] < high_bound
+                    and (unit_code is None or record[1] == unit_code)
+                    and (field_code is None or record[2] == field_code)]
+        finally:
+            view.release()
+
+
+def _numpy() -> Any:
+    """Get the numpy module, importing it on first use, or None if it is not installed."""
+    global np, _RECORD_DTYPE
+    if np is _NOT_IMPORTED:
+        try:
+            import numpy
+        except ImportError:  # pragma: no cover - exercised when numpy is not installed
+            np = None
+        else:
+            _RECORD_DTYPE = numpy.dtype({"names": ["timestamp", "unit", "field", "source", "value"],
+                                         "formats": ["<f8", "<u4", "<u2", "u1", "<f8"],
+                                         "offsets": [0, 8, 12, 14, 16], "itemsize": _RECORD.size})
+            np = numpy
+    return np
+
+
+class TelemetryReader:
+    """Range scans over all segments of a telemetry log directory.
+
+    Segments are mapped for the duration of a scan only, so the reader can
+    be kept open while a :class:`TelemetryLog` keeps writing; flushed
+    records are visible to the next scan.
+    """
+
+    def __init__(self, directory: str) -> None:
+        """Initialize the reader.
+
+        Args:
+            directory: Directory holding the segments
+        """
+        self.directory: str = directory
+
+    def segments(self) -> List[str]:
+        """Get the segment paths, oldest first."""
+        return [path for _, path in _segment_paths(self.directory)]
+
+    def scan(self, identifier: Optional[str] = None, field: Optional[str] = None,
+             start: Optional[float] = None, end: Optional[float] = None) -> Iterator[TelemetrySample]:
+        """Iterate over the samples matching all given filters, oldest segment first.
+
+        See :meth:`TelemetrySegment.scan`.
+        """
+        for path in self.segments():
+            try:
+                segment = TelemetrySegment(path)
+            except (OSError, ValueError):
+                # Segments deleted by retention or still being created
+                continue
+            with segment:
+                yield from segment.scan(identifier, field, start, end)
+
+    def series(self, identifier: str, field: str, start: Optional[float] = None,
+               end: Optional[float] = None) -> List[Tuple[float, Optional[float]]]:
+        """Get the ``(timestamp, value)`` samples of one unit and field.
+
+        Returns:
+            list: Samples in write order, None for missing values
+        """
+        return [(sample.timestamp, sample.value) for sample in self.scan(identifier, field, start, end)]
@@ -1,16 +1,324 @@
 """Ventilation unit model."""
 
+import logging
+import threading
+import time
+from collections.abc import MutableMapping
 from datetime import datetime
-from typing import Dict, List, Optional, Any, Union, Tuple, Set, cast
+from types import MappingProxyType
+from typing import Dict, Iterator, List, Mapping, Optional, Any, Union, Tuple, Set, cast
 
+from systemair_api.models.changes import (
+    SOURCE_API,
+    SOURCE_LOCAL,
+    SOURCE_ROLLBACK,
+    SOURCE_WEBSOCKET,
+    ChangeListener,
+    ChangeSet,
+    FieldChange,
+)
+from systemair_api.models.pending import PendingWrite, WriteMetrics
 from systemair_api.models.ventilation_data import USER_MODES, VentilationData
 from systemair_api.utils.constants import UserModes
 from systemair_api.utils.register_constants import RegisterConstants
+from systemair_api.utils.register_metadata import REGISTER_CATALOG
 from systemair_api.api.systemair_api import SystemairAPI
 
+logger = logging.getLogger(__name__)
+
+FUNCTION_ACTIVE_PREFIX = "REG_MAINBOARD_FUNCTION_ACTIVE_"
+
+# Register id -> active_functions key for the FUNCTION_ACTIVE register range
+FUNCTION_REGISTERS: Dict[int, str] = {
+    register_id: RegisterConstants.get_register_name(register_id)[len(FUNCTION_ACTIVE_PREFIX):].lower()
+    for register_id in range(RegisterConstants.REG_MAINBOARD_FUNCTION_ACTIVE_COOLING,
+                             RegisterConstants.REG_MAINBOARD_FUNCTION_ACTIVE_CDI_3 + 1)
+}
+
+# Register id -> (attribute, key within a dict attribute or None)
+REGISTER_TARGETS: Dict[int, Tuple[str, Optional[str]]] = {
+    RegisterConstants.REG_MAINBOARD_USERMODE_MODE_HMI: ("user_mode", None),
+    RegisterConstants.REG_MAINBOARD_SPEED_INDICATION_APP: ("airflow", None),
+    RegisterConstants.REG_MAINBOARD_TC_SP: ("temperatures", "setpoint"),
+    RegisterConstants.REG_MAINBOARD_USERMODE_REMAINING_TIME_L: ("user_mode_remaining_time", None),
+    RegisterConstants.REG_MAINBOARD_USERMODE_HOLIDAY_TIME: ("user_mode_times", "holiday"),
+    RegisterConstants.REG_MAINBOARD_USERMODE_AWAY_TIME: ("user_mode_times", "away"),
+    RegisterConstants.REG_MAINBOARD_USERMODE_FIREPLACE_TIME: ("user_mode_times", "fireplace"),
+    RegisterConstants.REG_MAINBOARD_USERMODE_REFRESH_TIME: ("user_mode_times", "refresh"),
+    RegisterConstants.REG_MAINBOARD_USERMODE_CROWDED_TIME: ("user_mode_times", "crowded"),
+    RegisterConstants.REG_MAINBOARD_IAQ_LEVEL: ("air_quality", None),
+    RegisterConstants.REG_MAINBOARD_SENSOR_OAT: ("temperatures", "oat"),
+    RegisterConstants.REG_MAINBOARD_ECO_MODE_ON_OFF: ("eco_mode", None),
+    RegisterConstants.REG_MAINBOARD_LOCKED_USER: ("locked_user", None),
+    RegisterConstants.REG_MAINBOARD_ALARM_TYPE_A: ("alarm_type_a", None),
+    RegisterConstants.REG_MAINBOARD_ALARM_TYPE_B: ("alarm_type_b", None),
+    RegisterConstants.REG_MAINBOARD_ALARM_TYPE_C: ("alarm_type_c", None),
+    RegisterConstants.REG_MAINBOARD_SUW_REQUIRED: ("suw_required", None),
+    RegisterConstants.REG_MAINBOARD_UNIT_CONFIG_REHEATER_TYPE: ("reheater_type", None),
+}
+REGISTER_TARGETS.update(
+    (register_id, ("active_functions", name)) for register_id, name in FUNCTION_REGISTERS.items()
+)
+
+# Key -> slot storing it, for the fixed-key dict attributes backed by slots
+TEMPERATURE_SLOTS: Dict[str, str] = {
+    "oat": "_temperature_oat",  # Outdoor Air Temperature
+    "sat": "_temperature_sat",  # Supply Air Temperature
+    "setpoint": "_temperature_setpoint",
+}
+USER_MODE_TIME_SLOTS: Dict[str, str] = {
+    "holiday": "_user_mode_time_holiday",      # REG_MAINBOARD_USERMODE_HOLIDAY_TIME
+    "away": "_user_mode_time_away",            # REG_MAINBOARD_USERMODE_AWAY_TIME
+    "fireplace": "_user_mode_time_fireplace",  # REG_MAINBOARD_USERMODE_FIREPLACE_TIME
+    "refresh": "_user_mode_time_refresh",      # REG_MAINBOARD_USERMODE_REFRESH_TIME
+    "crowded": "_user_mode_time_crowded",      # REG_MAINBOARD_USERMODE_CROWDED_TIME
+}
+_SLOTTED_ATTRIBUTES: Dict[str, Dict[str, str]] = {
+    "temperatures": TEMPERATURE_SLOTS,
+    "user_mode_times": USER_MODE_TIME_SLOTS,
+}
+
+# active_functions key -> bit in the function bitmask
+FUNCTION_BITS: Dict[str, int] = {name: 1 << index for index, name in enumerate(FUNCTION_REGISTERS.values())}
+
+
+def _storage_target(attribute: str, key: Optional[str]) -> Tuple[str, Optional[str]]:
+    """Resolve a public (attribute, key) pair to the slot that stores it."""
+    slots = _SLOTTED_ATTRIBUTES.get(attribute)
+    if slots is not None and key is not None:
+        return slots[key], None
+    return attribute, key
+
+
+def _field_name(attribute: str, key: Optional[str]) -> str:
+    """Status field name of a public (attribute, key) pair, e.g. ``temperatures.oat``."""
+    return f"{attribute}.{key}" if key is not None else attribute
+
+
+# Register id -> (storage attribute, key or None, divisor or None, field name), with
+# scaling taken from the register catalog. Slot-backed dict entries are written directly.
+REGISTER_FIELDS: Dict[int, Tuple[str, Optional[str], Optional[float], str]] = {
+    register_id: _storage_target(attribute, key) + (REGISTER_CATALOG.scale(register_id)
+                                                    if REGISTER_CATALOG.scale(register_id) != 1.0 else None,
+                                                    _field_name(attribute, key))
+    for register_id, (attribute, key) in REGISTER_TARGETS.items()
+}
+
+# WebSocket property -> attribute, for the top-level properties of a unit
+WEBSOCKET_FIELDS: Dict[str, str] = {
+    "model": "model",
+    "activeAlarms": "active_alarms",
+    "airflow": "airflow",
+    "connectivity": "connectivity",
+    "filterExpiration": "filter_expiration",
+    "serialNumber": "serial_number",
+    "temperature": "temperature",
+    "userMode": "user_mode",
+    "airQuality": "air_quality",
+    "humidity": "humidity",
+    "co2": "co2",
+}
+
+# Mode -> register holding the duration of that timed mode
+MODE_TIME_REGISTERS: Dict[int, int] = {
+    UserModes.HOLIDAY: RegisterConstants.REG_MAINBOARD_USERMODE_HOLIDAY_TIME,
+    UserModes.AWAY: RegisterConstants.REG_MAINBOARD_USERMODE_AWAY_TIME,
+    UserModes.FIREPLACE: RegisterConstants.REG_MAINBOARD_USERMODE_FIREPLACE_TIME,
+    UserModes.REFRESH: RegisterConstants.REG_MAINBOARD_USERMODE_REFRESH_TIME,
+    UserModes.CROWDED: RegisterConstants.REG_MAINBOARD_USERMODE_CROWDED_TIME,
+}
+
+# Register unit -> (minutes per unit, display name)
+TIME_UNITS: Dict[str, Tuple[int, str]] = {
+    "min": (1, "minutes"),
+    "h": (60, "hours"),
+    "d": (24 * 60, "days"),
+}
+
+
+# Locks serializing updates of units, shared by units with the same hash of
+# their identifier so that units do not each carry a lock
+_UNIT_LOCKS: Tuple[threading.Lock, ...] = tuple(threading.Lock() for _ in range(64))
+
+# Status entries holding containers, copied for callers of get_status()
+_NESTED_STATUS_KEYS = ("connectivity", "temperatures", "versions", "active_functions", "user_mode_times")
+
+
+def _freeze(value: Any) -> Any:
+    """Return a read-only version of a status value."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _replace(view: MutableMapping, values: Mapping[str, Any], default: Any) -> None:
+    """Assign every key of a fixed-key view, using ``default`` for keys missing from ``values``.
+
+    Raises:
+        KeyError: If ``values`` has a key the view does not, before anything is assigned
+    """
+    for key in values:
+        if key not in view:
+            raise KeyError(key)
+    for key in view:
+        view[key] = values.get(key, default)
+
+
+class SlotFieldView(MutableMapping):
+    """Dict-like view over a fixed set of slots of a :class:`VentilationUnit`.
+
+    Reads and writes go straight to the unit's slots, so the view can be
+    created on demand instead of every unit carrying its own dictionary.
+    The set of keys is fixed: unknown keys raise ``KeyError`` and keys
+    cannot be deleted.
+    """
+
+    __slots__ = ("_unit", "_slots")
+
+    def __init__(self, unit: "VentilationUnit", slots: Dict[str, str]) -> None:
+        self._unit = unit
+        self._slots = slots
+
+    def __getitem__(self, key: str) -> Any:
+        return getattr(self._unit, self._slots[key])
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        setattr(self._unit, self._slots[key], value)
+        self._unit._status = None
+
+    def __delitem__(self, key: str) -> None:
+        raise TypeError(f"Cannot delete fixed key {key!r}")
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._slots)
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._slots
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class FunctionFlagsView(MutableMapping):
+    """Dict-like view of the active functions stored as a single bitmask."""
+
+    __slots__ = ("_unit",)
+
+    def __init__(self, unit: "VentilationUnit") -> None:
+        self._unit = unit
+
+    def __getitem__(self, key: str) -> bool:
+        return bool(self._unit._function_bits & FUNCTION_BITS[key])
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        bit = FUNCTION_BITS[key]
+        if value:
+            self._unit._function_bits |= bit
+        else:
+            self._unit._function_bits &= ~bit
+        self._unit._status = None
+
+    def __delitem__(self, key: str) -> None:
+        raise TypeError(f"Cannot delete fixed key {key!r}")
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(FUNCTION_BITS)
+
+    def __len__(self) -> int:
+        return len(FUNCTION_BITS)
+
+    def __contains__(self, key: object) -> bool:
+        return key in FUNCTION_BITS
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
 
 class VentilationUnit:
-    """Model representing a Systemair ventilation unit."""
+    """Model representing a Systemair ventilation unit.
+    
+    Attributes are stored in ``__slots__`` rather than a per-instance
+    ``__dict__``, which keeps large fleets of units and their snapshots
+    compact. Setting attributes that are not declared here raises
+    ``AttributeError``.
+
+    ``temperatures``, ``user_mode_times`` and ``active_functions`` behave like
+    dictionaries but are views over individual slots (and a bitmask for the
+    active functions), so a unit does not own any nested dictionaries.
+
+    Updates only write fields whose value actually changed. Each update
+    returns the list of :class:`FieldChange` entries it applied and passes
+    it to the listeners registered with :meth:`subscribe`; updates that
+    change nothing notify no one.
+
+    :meth:`get_status` is cached and rebuilt only after a field changed
+    through an update, a local write or one of the dict-like views. Code
+    that assigns attributes directly must call :meth:`invalidate_status`.
+
+    Successful writes of the user mode and the temperature setpoint are
+    applied optimistically and tracked as pending until a poll or WebSocket
+    update reports the written value. Differing values reported meanwhile
+    are held back, as the device may not have applied the write yet; if no
+    confirmation arrives within ``confirmation_timeout`` seconds the field
+    is rolled back to the last value reported by the device. Counters and
+    confirmation latencies of all units are collected in ``write_metrics``.
+
+    Updates, rollbacks and writes may come from different threads, e.g.
+    poll workers, the WebSocket thread and command workers of the daemon.
+    Their changes to one unit are applied under a lock; listeners are
+    notified after it is released.
+    """
+
+    __slots__ = (
+        "identifier",
+        "name",
+        "model",
+        "active_alarms",
+        "airflow",
+        "connectivity",
+        "filter_expiration",
+        "serial_number",
+        "temperature",
+        "user_mode",
+        "air_quality",
+        "humidity",
+        "co2",
+        "update_in_progress",
+        "configuration_wizard_active",
+        "user_mode_remaining_time",
+        "_user_mode_time_holiday",
+        "_user_mode_time_away",
+        "_user_mode_time_fireplace",
+        "_user_mode_time_refresh",
+        "_user_mode_time_crowded",
+        "_temperature_oat",
+        "_temperature_sat",
+        "_temperature_setpoint",
+        "versions",
+        "eco_mode",
+        "locked_user",
+        "alarm_type_a",
+        "alarm_type_b",
+        "alarm_type_c",
+        "suw_required",
+        "reheater_type",
+        "_function_bits",
+        "_listeners",
+        "_status",
+        "_status_view",
+        "_pending",
+        "__weakref__",
+    )
+
+    # Seconds to wait for an optimistic write to be confirmed before rolling it back
+    confirmation_timeout: float = 30.0
+    # Optimistic write counters and confirmation latencies, shared by all units
+    write_metrics: WriteMetrics = WriteMetrics()
     
     def __init__(self, identifier: str, name: str) -> None:
         """Initialize a ventilation unit with a unique identifier and name."""
@@ -30,18 +338,14 @@ class VentilationUnit:
         self.update_in_progress: bool = False
         self.configuration_wizard_active: bool = False
         self.user_mode_remaining_time: Optional[int] = None
-        self.user_mode_times: Dict[str, Optional[int]] = {
-            "holiday": None,  # REG_MAINBOARD_USERMODE_HOLIDAY_TIME
-            "away": None,     # REG_MAINBOARD_USERMODE_AWAY_TIME
-            "fireplace": None, # REG_MAINBOARD_USERMODE_FIREPLACE_TIME
-            "refresh": None,  # REG_MAINBOARD_USERMODE_REFRESH_TIME
-            "crowded": None,  # REG_MAINBOARD_USERMODE_CROWDED_TIME
-        }
-        self.temperatures: Dict[str, Optional[float]] = {
-            "oat": None,  # Outdoor Air Temperature
-            "sat": None,  # Supply Air Temperature
-            "setpoint": None
-        }
+        self._user_mode_time_holiday: Optional[int] = None
+        self._user_mode_time_away: Optional[int] = None
+        self._user_mode_time_fireplace: Optional[int] = None
+        self._user_mode_time_refresh: Optional[int] = None
+        self._user_mode_time_crowded: Optional[int] = None
+        self._temperature_oat: Optional[float] = None
+        self._temperature_sat: Optional[float] = None
+        self._temperature_setpoint: Optional[float] = None
         self.versions: List[Dict[str, str]] = []
 
         # Attributes from API data
@@ -52,134 +356,303 @@ class VentilationUnit:
         self.alarm_type_c: Optional[int] = None
         self.suw_required: Optional[int] = None
         self.reheater_type: Optional[int] = None
-        self.active_functions: Dict[str, bool] = {
-            'cooling': False,
-            'free_cooling': False,
-            'heating': False,
-            'defrosting': False,
-            'heat_recovery': False,
-            'cooling_recovery': False,
-            'moisture_transfer': False,
-            'secondary_air': False,
-            'vacuum_cleaner': False,
-            'cooker_hood': False,
-            'user_lock': False,
-            'eco_mode': False,
-            'heater_cool_down': False,
-            'pressure_guard': False,
-            'cdi_1': False,
-            'cdi_2': False,
-            'cdi_3': False
-        }
+        self._function_bits: int = 0
+        self._listeners: Optional[List[ChangeListener]] = None
+        self._status: Optional[Dict[str, Any]] = None
+        self._status_view: Optional[Mapping[str, Any]] = None
+        self._pending: Optional[Dict[str, PendingWrite]] = None
+
+    @property
+    def _lock(self) -> threading.Lock:
+        """Lock serializing changes to this unit, shared with a few other units."""
+        return _UNIT_LOCKS[hash(self.identifier) % len(_UNIT_LOCKS)]
 
-    def update_from_api(self, api_data: Dict[str, Any]) -> None:
-        """Update the ventilation unit with data from the API."""
+    @property
+    def function_bits(self) -> int:
+        """Active functions as a bitmask of ``FUNCTION_BITS`` values."""
+        return self._function_bits
+
+    @property
+    def temperatures(self) -> SlotFieldView:
+        """Temperatures (``oat``, ``sat``, ``setpoint``) as a dict-like view."""
+        return SlotFieldView(self, TEMPERATURE_SLOTS)
+
+    @temperatures.setter
+    def temperatures(self, values: Mapping[str, Optional[float]]) -> None:
+        _replace(self.temperatures, values, None)
+
+    @property
+    def user_mode_times(self) -> SlotFieldView:
+        """Configured durations of the timed user modes as a dict-like view."""
+        return SlotFieldView(self, USER_MODE_TIME_SLOTS)
+
+    @user_mode_times.setter
+    def user_mode_times(self, values: Mapping[str, Optional[int]]) -> None:
+        _replace(self.user_mode_times, values, None)
+
+    @property
+    def active_functions(self) -> FunctionFlagsView:
+        """Active state of each unit function as a dict-like view."""
+        return FunctionFlagsView(self)
+
+    @active_functions.setter
+    def active_functions(self, values: Mapping[str, bool]) -> None:
+        _replace(self.active_functions, values, False)
+
+    def subscribe(self, listener: ChangeListener) -> ChangeListener:
+        """Register a listener for the changes applied by updates.
+
+        Args:
+            listener: Callable invoked as ``listener(unit, changes)`` after every
+                update that changed at least one field
+
+        Returns:
+            The listener, so this method can be used as a decorator
+        """
+        if self._listeners is None:
+            self._listeners = []
+        self._listeners.append(listener)
+        return listener
+
+    def unsubscribe(self, listener: ChangeListener) -> None:
+        """Remove a listener registered with :meth:`subscribe`.
+
+        Args:
+            listener: The listener to remove
+        """
+        if self._listeners and listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _notify(self, changes: ChangeSet) -> None:
+        """Pass a non-empty change-set to every listener."""
+        if not changes or not self._listeners:
+            return
+        for listener in list(self._listeners):
+            try:
+                listener(self, changes)
+            except Exception:
+                logger.exception("Error in change listener for %s", self.identifier)
+
+    def _set_field(self, field: str, attribute: str, value: Any, source: str,
+                   timestamp: float) -> Optional[FieldChange]:
+        """Set an attribute if its value differs and describe the change.
+
+        Must be called with the unit's lock held. A device value confirming a
+        pending write is reported as a change from the last value the device
+        reported before, even though the attribute already holds it, so
+        consumers ignoring local changes still see it.
+        """
+        confirmed = None
+        if self._pending is not None and source != SOURCE_LOCAL and field in self._pending:
+            confirmed = self._reconcile_pending(field, value)
+            if confirmed is None:
+                return None
+        old = getattr(self, attribute)
+        if old == value:
+            if confirmed is not None and confirmed.fallback != value:
+                return FieldChange(field, confirmed.fallback, value, source, timestamp)
+            return None
+        setattr(self, attribute, value)
+        self._status = None
+        return FieldChange(field, old, value, source, timestamp)
+
+    def update_from_api(self, api_data: Dict[str, Any]) -> ChangeSet:
+        """Update the ventilation unit with data from the API.
+
+        Args:
+            api_data: GetView response of the unit
+
+        Returns:
+            list: The fields that changed, empty if the update was a no-op
+        """
+        if self._pending:
+            self.expire_pending()
+        changes: ChangeSet = []
         if 'data' in api_data and 'GetView' in api_data['data']:
+            timestamp = time.time()
             children = api_data['data']['GetView']['children']
-            for child in children:
-                if 'properties' in child and 'dataItem' in child['properties']:
-                    data_item = child['properties']['dataItem']
-                    self._update_attribute(data_item)
-
-    def _update_attribute(self, data_item: Dict[str, Any]) -> None:
-        """Update a specific attribute based on register data."""
-        register_id = data_item['id']
+            with self._lock:
+                for child in children:
+                    properties = child.get('properties')
+                    if properties and 'dataItem' in properties:
+                        change = self._update_attribute(properties['dataItem'], SOURCE_API, timestamp)
+                        if change is not None:
+                            changes.append(change)
+        self._notify(changes)
+        return changes
+
+    def _update_attribute(self, data_item: Dict[str, Any], source: str = SOURCE_API,
+                          timestamp: Optional[float] = None) -> Optional[FieldChange]:
+        """Update a specific attribute based on register data.
+
+        Returns:
+            FieldChange: The applied change, or None if the register is not
+                tracked or its value did not change
+        """
+        field = REGISTER_FIELDS.get(data_item['id'])
+        if field is None:
+            return None
+
+        attribute, key, scale, name = field
         value = data_item['value']
+        if scale is not None:
+            value = value / scale
+
+        if timestamp is None:
+            timestamp = time.time()
+        if key is None:
+            return self._set_field(name, attribute, value, source, timestamp)
 
-        if register_id == RegisterConstants.REG_MAINBOARD_USERMODE_MODE_HMI:
-            self.user_mode = value
-        elif register_id == RegisterConstants.REG_MAINBOARD_SPEED_INDICATION_APP:
-            self.airflow = value
-        elif register_id == RegisterConstants.REG_MAINBOARD_TC_SP:
-            self.temperatures['setpoint'] = value / 10.0
-        elif register_id == RegisterConstants.REG_MAINBOARD_USERMODE_REMAINING_TIME_L:
-            self.user_mode_remaining_time = value
-        elif register_id == RegisterConstants.REG_MAINBOARD_USERMODE_HOLIDAY_TIME:
-            self.user_mode_times['holiday'] = value
-        elif register_id == RegisterConstants.REG_MAINBOARD_USERMODE_AWAY_TIME:
-            self.user_mode_times['away'] = value
-        elif register_id == RegisterConstants.REG_MAINBOARD_USERMODE_FIREPLACE_TIME:
-            self.user_mode_times['fireplace'] = value
-        elif register_id == RegisterConstants.REG_MAINBOARD_USERMODE_REFRESH_TIME:
-            self.user_mode_times['refresh'] = value
-        elif register_id == RegisterConstants.REG_MAINBOARD_USERMODE_CROWDED_TIME:
-            self.user_mode_times['crowded'] = value
-        elif register_id == RegisterConstants.REG_MAINBOARD_IAQ_LEVEL:
-            self.air_quality = value
-        elif register_id == RegisterConstants.REG_MAINBOARD_SENSOR_OAT:
-            self.temperatures['oat'] = value / 10.0
-        elif register_id == RegisterConstants.REG_MAINBOARD_ECO_MODE_ON_OFF:
-            self.eco_mode = value
-        elif register_id == RegisterConstants.REG_MAINBOARD_LOCKED_USER:
-            self.locked_user = value
-        elif register_id == RegisterConstants.REG_MAINBOARD_ALARM_TYPE_A:
-            self.alarm_type_a = value
-        elif register_id == RegisterConstants.REG_MAINBOARD_ALARM_TYPE_B:
-            self.alarm_type_b = value
-        elif register_id == RegisterConstants.REG_MAINBOARD_ALARM_TYPE_C:
-            self.alarm_type_c = value
-        elif register_id == RegisterConstants.REG_MAINBOARD_SUW_REQUIRED:
-            self.suw_required = value
-        elif register_id == RegisterConstants.REG_MAINBOARD_UNIT_CONFIG_REHEATER_TYPE:
-            self.reheater_type = value
-        elif register_id in range(RegisterConstants.REG_MAINBOARD_FUNCTION_ACTIVE_COOLING,
-                                  RegisterConstants.REG_MAINBOARD_FUNCTION_ACTIVE_CDI_3 + 1):
-            function_name = RegisterConstants.get_register_name(register_id).split('_')[-1].lower()
-            self.active_functions[function_name] = value
-
-    def update_from_websocket(self, ws_data: Dict[str, Any]) -> None:
-        """Update the ventilation unit with data from a WebSocket message."""
+        # active_functions entries are bits of a single integer
+        bit = FUNCTION_BITS[key]
+        old = bool(self._function_bits & bit)
+        value = bool(value)
+        if old == value:
+            return None
+        self._function_bits ^= bit
+        self._status = None
+        return FieldChange(name, old, value, source, timestamp)
+
+    def update_from_websocket(self, ws_data: Dict[str, Any]) -> ChangeSet:
+        """Update the ventilation unit with data from a WebSocket message.
+
+        Args:
+            ws_data: Message data, optionally nested under ``properties``
+
+        Returns:
+            list: The fields that changed, empty if the update was a no-op
+        """
+        if self._pending:
+            self.expire_pending()
         properties = ws_data
 
         # Extract property data if it's nested in 'properties'
         if "properties" in ws_data:
             properties = ws_data.get("properties", {})
 
+        timestamp = time.time()
+        updates = []
+
         # Update basic properties
-        if "model" in properties:
-            self.model = properties.get("model")
-        if "activeAlarms" in properties:
-            self.active_alarms = properties.get("activeAlarms")
-        if "airflow" in properties:
-            self.airflow = properties.get("airflow")
-        if "connectivity" in properties:
-            self.connectivity = properties.get("connectivity")
-        if "filterExpiration" in properties:
-            self.filter_expiration = properties.get("filterExpiration")
-        if "serialNumber" in properties:
-            self.serial_number = properties.get("serialNumber")
-        if "temperature" in properties:
-            self.temperature = properties.get("temperature")
-        if "userMode" in properties:
-            self.user_mode = properties.get("userMode")
-        if "airQuality" in properties:
-            self.air_quality = properties.get("airQuality")
-        if "humidity" in properties:
-            self.humidity = properties.get("humidity")
-        if "co2" in properties:
-            self.co2 = properties.get("co2")
+        for key, attribute in WEBSOCKET_FIELDS.items():
+            if key in properties:
+                updates.append((attribute, attribute, properties.get(key)))
 
         # Update nested properties
         update_info = properties.get("update", {})
         if update_info and "inProgress" in update_info:
-            self.update_in_progress = update_info.get("inProgress")
+            updates.append(("update_in_progress", "update_in_progress", update_info.get("inProgress")))
 
         config_wizard = properties.get("configurationWizard", {})
         if config_wizard and "active" in config_wizard:
-            self.configuration_wizard_active = config_wizard.get("active")
+            updates.append(("configuration_wizard_active", "configuration_wizard_active",
+                            config_wizard.get("active")))
 
         # Update temperature data
         temps = properties.get("temperatures", {})
         if temps:
             # Only update specific temperature keys that exist
             for key, value in temps.items():
-                if key in self.temperatures:
-                    self.temperatures[key] = value
+                if key in TEMPERATURE_SLOTS:
+                    updates.append((_field_name("temperatures", key), TEMPERATURE_SLOTS[key], value))
 
         # Update version data
         versions = properties.get("versions", [])
         if versions:
-            self.versions = versions
+            updates.append(("versions", "versions", versions))
+
+        changes: ChangeSet = []
+        with self._lock:
+            for field, attribute, value in updates:
+                change = self._set_field(field, attribute, value, SOURCE_WEBSOCKET, timestamp)
+                if change is not None:
+                    changes.append(change)
+        self._notify(changes)
+        return changes
+
+    def _set_local_field(self, field: str, attribute: str, value: Any) -> None:
+        """Apply a locally known change (e.g. after a successful write) and notify listeners."""
+        with self._lock:
+            change = self._set_field(field, attribute, value, SOURCE_LOCAL, time.time())
+        if change is not None:
+            self._notify([change])
+
+    def _begin_pending(self, field: str, attribute: str, value: Any) -> None:
+        """Apply a successful write optimistically and wait for the device to confirm it."""
+        with self._lock:
+            if self._pending is None:
+                self._pending = {}
+            previous = self._pending.pop(field, None)
+            fallback = previous.fallback if previous is not None else getattr(self, attribute)
+            self._pending[field] = PendingWrite(field, attribute, value, fallback, self.confirmation_timeout)
+            self.write_metrics.record_requested(superseded=previous is not None)
+            change = self._set_field(field, attribute, value, SOURCE_LOCAL, time.time())
+        if change is not None:
+            self._notify([change])
+
+    def _reconcile_pending(self, field: str, value: Any) -> Optional[PendingWrite]:
+        """Match a value reported by the device against a pending write.
+
+        Returns:
+            PendingWrite: The confirmed write if the value confirms it and may
+                be applied, None if it must be held back until confirmation or rollback
+        """
+        pending = cast(Dict[str, PendingWrite], self._pending)[field]
+        if value != pending.value:
+            pending.fallback = value
+            return None
+        del cast(Dict[str, PendingWrite], self._pending)[field]
+        self.write_metrics.record_confirmed(time.monotonic() - pending.started)
+        return pending
+
+    def expire_pending(self, now: Optional[float] = None) -> ChangeSet:
+        """Roll back optimistic writes that were not confirmed in time.
+
+        Updates call this before applying new data. Call it periodically as
+        well when the unit may go without updates for a while.
+
+        Args:
+            now: Current ``time.monotonic()`` value, defaults to now
+
+        Returns:
+            list: The rolled back fields, restored to the last value reported
+                by the device (or the value before the write)
+        """
+        if not self._pending:
+            return []
+        now = time.monotonic() if now is None else now
+        timestamp = time.time()
+        changes: ChangeSet = []
+        with self._lock:
+            for field, pending in list(self._pending.items()):
+                if now < pending.deadline:
+                    continue
+                del self._pending[field]
+                self.write_metrics.record_rolled_back()
+                change = self._set_field(field, pending.attribute, pending.fallback, SOURCE_ROLLBACK, timestamp)
+                if change is not None:
+                    changes.append(change)
+        self._notify(changes)
+        return changes
+
+    def pending_writes(self) -> Dict[str, Any]:
+        """Get the fields with unconfirmed optimistic writes.
+
+        Returns:
+            dict: Field name -> value written but not yet reported by the device
+        """
+        if not self._pending:
+            return {}
+        with self._lock:
+            return {field: pending.value for field, pending in self._pending.items()}
+
+    def is_pending(self, field: str) -> bool:
+        """Check whether a field holds an unconfirmed optimistic write.
+
+        Args:
+            field: Status field name, e.g. ``"user_mode"`` or ``"temperatures.setpoint"``
+        """
+        return bool(self._pending) and field in cast(Dict[str, PendingWrite], self._pending)
 
     def __str__(self) -> str:
         """String representation of the ventilation unit."""
@@ -201,8 +674,52 @@ class VentilationUnit:
         # Placeholder implementation - will need to be updated based on how filter alarms are detected
         return self.active_alarms
         
-    def get_status(self) -> Dict[str, Any]:
-        """Get the current status of the ventilation unit as a dictionary."""
+    def invalidate_status(self) -> None:
+        """Mark the cached status as stale.
+
+        Updates already do this for the fields they change; call it after
+        assigning attributes of the unit directly.
+        """
+        self._status = None
+
+    def get_status(self, shared: bool = False) -> Mapping[str, Any]:
+        """Get the current status of the ventilation unit.
+
+        The status is built once and cached until a field changes, so
+        repeated calls for an unchanged unit are cheap.
+
+        Args:
+            shared: Return the cached status as a read-only mapping shared by
+                all callers (nested dicts are read-only too and lists become
+                tuples) instead of a private copy
+
+        Returns:
+            dict: The status, a ``MappingProxyType`` if ``shared`` is True
+        """
+        status = self._status
+        if status is None:
+            with self._lock:
+                status = self._status
+                if status is None:
+                    status = self._status = self._build_status()
+                    self._status_view = None
+        if shared:
+            view = self._status_view
+            if view is None:
+                view = _freeze(status)
+                with self._lock:
+                    # Only cache the view if no update replaced the status meanwhile
+                    if self._status is status:
+                        self._status_view = view
+            return view
+        status = status.copy()
+        for key in _NESTED_STATUS_KEYS:
+            if status[key] is not None:
+                status[key] = status[key].copy()
+        return status
+
+    def _build_status(self) -> Dict[str, Any]:
+        """Build the status dictionary from the current fields."""
         return {
             "name": self.name,
             "model": self.model,
@@ -219,7 +736,7 @@ class VentilationUnit:
             "co2": self.co2,
             "update_in_progress": self.update_in_progress,
             "configuration_wizard_active": self.configuration_wizard_active,
-            "temperatures": self.temperatures,
+            "temperatures": {key: getattr(self, slot) for key, slot in TEMPERATURE_SLOTS.items()},
             "versions": self.versions,
             "eco_mode": self.eco_mode,
             "locked_user": self.locked_user,
@@ -228,42 +745,56 @@ class VentilationUnit:
             "alarm_type_c": self.alarm_type_c,
             "suw_required": self.suw_required,
             "reheater_type": self.reheater_type,
-            "active_functions": self.active_functions,
+            "active_functions": {name: bool(self._function_bits & bit)
+                                 for name, bit in FUNCTION_BITS.items()},
             "user_mode_remaining_time": self.user_mode_remaining_time,
-            "user_mode_times": self.user_mode_times
+            "user_mode_times": {key: getattr(self, slot) for key, slot in USER_MODE_TIME_SLOTS.items()}
         }
 
-    def print_status(self) -> None:
-        """Print the current status of the ventilation unit."""
-        print(f"\n{datetime.now()} - Status for {self.name}:")
+    def format_status(self) -> str:
+        """Format the current status of the ventilation unit as readable text."""
         status = self.get_status()
+        lines = [f"{datetime.now()} - Status for {self.name}:"]
         for key, value in status.items():
             if key not in ["active_functions", "versions", "connectivity"]:
-                print(f"{key.replace('_', ' ').title()}: {value}")
+                lines.append(f"{key.replace('_', ' ').title()}: {value}")
 
-        print("Temperatures:")
+        lines.append("Temperatures:")
         for temp_key, temp_value in status["temperatures"].items():
-            print(f"  - {temp_key.upper()}: {temp_value}")
+            lines.append(f"  - {temp_key.upper()}: {temp_value}")
 
-        print("Versions:")
+        lines.append("Versions:")
         for version in status["versions"]:
-            print(f"  - {version['type'].upper()}: {version['version']}")
+            lines.append(f"  - {version['type'].upper()}: {version['version']}")
 
-        print("Connectivity:", status["connectivity"])
+        lines.append(f"Connectivity: {status['connectivity']}")
 
-        print("Active Functions:")
+        lines.append("Active Functions:")
         for function, is_active in status["active_functions"].items():
             if is_active:
-                print(f"  - {function.replace('_', ' ').title()}")
+                lines.append(f"  - {function.replace('_', ' ').title()}")
+        return "\n".join(lines)
+
+    def print_status(self, level: int = logging.INFO) -> None:
+        """Log the current status of the ventilation unit.
+
+        The status is only formatted if the ``systemair_api.models`` logger
+        is enabled for ``level``; use :meth:`format_status` to get the text.
+
+        Args:
+            level: Logging level of the record
+        """
+        if logger.isEnabledFor(level):
+            logger.log(level, "%s", self.format_status())
 
-    def set_value(self, api: SystemairAPI, key: int, value: Union[int, float, str], noprint: bool = False) -> Optional[bool]:
+    def set_value(self, api: SystemairAPI, key: int, value: Union[int, float, str], noprint: bool = False) -> bool:
         """Set a register value for the ventilation unit.
         
         Args:
             api: The SystemairAPI instance to use for communication
             key: The register key to set
             value: The value to set
-            noprint: Whether to suppress print output
+            noprint: Whether to suppress the log message
             
         Returns:
             bool: True if successful, False otherwise
@@ -273,16 +804,16 @@ class VentilationUnit:
             key,
             value
         )
+        success = bool(result and result.get('data', {}).get('WriteDataItems'))
         if not noprint:
-            if result and result.get('data', {}).get('WriteDataItems'):
-                print(f"Value for {RegisterConstants.get_register_name_by_number(key)} set to {value}")
+            if success:
+                logger.info("Value for %s set to %s", RegisterConstants.get_register_name_by_number(key), value)
             else:
-                print(f"Failed to set user mode for {self.name}")
-            return None
-        else:
-            return bool(result and result.get('data', {}).get('WriteDataItems'))
+                logger.warning("Failed to set %s for %s", RegisterConstants.get_register_name_by_number(key),
+                               self.name)
+        return success
 
-    def set_user_mode(self, api: SystemairAPI, mode_value: int, time_minutes: Optional[int] = None) -> None:
+    def set_user_mode(self, api: SystemairAPI, mode_value: int, time_minutes: Optional[int] = None) -> bool:
         """Set the user mode for the ventilation unit.
         
         Args:
@@ -292,53 +823,49 @@ class VentilationUnit:
                 (Refresh, Crowded, Fireplace, Away, Holiday)
             
         Returns:
-            None
+            bool: True if the mode (and the time, if given) was written, False otherwise
         """
-        # Map mode values to their time registers and determine if we need to set time
-        mode_to_time_register = {
-            UserModes.HOLIDAY: RegisterConstants.REG_MAINBOARD_USERMODE_HOLIDAY_TIME,
-            UserModes.AWAY: RegisterConstants.REG_MAINBOARD_USERMODE_AWAY_TIME,
-            UserModes.FIREPLACE: RegisterConstants.REG_MAINBOARD_USERMODE_FIREPLACE_TIME,
-            UserModes.REFRESH: RegisterConstants.REG_MAINBOARD_USERMODE_REFRESH_TIME,
-            UserModes.CROWDED: RegisterConstants.REG_MAINBOARD_USERMODE_CROWDED_TIME,
-        }
-        
+        time_written = True
         # Set the time value first if provided and this is a timed mode
-        time_register = mode_to_time_register.get(mode_value)
+        time_register = MODE_TIME_REGISTERS.get(mode_value)
         if time_minutes is not None and time_register is not None:
             # Convert minutes to the units expected by each specific register
             api_time_value = self._convert_minutes_to_api_units(mode_value, time_minutes)
-            self.set_value(api, time_register, api_time_value, True)
-            # Update local cache (keep in minutes for internal use)
+            time_written = self.set_value(api, time_register, api_time_value, True)
             mode_key = self.get_mode_name_for_key(mode_value)
-            if mode_key and hasattr(self, "user_mode_times") and mode_key in self.user_mode_times:
-                self.user_mode_times[mode_key] = time_minutes
+            if not time_written:
+                logger.warning("Failed to set %s mode time for %s", mode_key, self.name)
+            elif mode_key in USER_MODE_TIME_SLOTS:
+                # Update local cache (keep in minutes for internal use)
+                self._set_local_field(_field_name("user_mode_times", mode_key),
+                                      USER_MODE_TIME_SLOTS[mode_key], time_minutes)
         
         # Then set the mode
         if self.set_value(api, RegisterConstants.REG_MAINBOARD_USERMODE_HMI_CHANGE_REQUEST, mode_value + 1, True):
-            # self.user_mode = mode_value
-            print(f"User mode set to {USER_MODES.get(mode_value, {}).get('name', 'Unknown')} for {self.name}")
-        else:
-            print(f"Failed to set user mode for {self.name}")
+            self._begin_pending("user_mode", "user_mode", mode_value)
+            logger.info("User mode set to %s for %s", USER_MODES.get(mode_value, {}).get('name', 'Unknown'),
+                        self.name)
+            return time_written
+        logger.warning("Failed to set user mode for %s", self.name)
+        return False
 
     def _convert_minutes_to_api_units(self, mode_value: int, time_minutes: int) -> int:
         """Convert time in minutes to the units expected by the API for each mode.
         
-        API expects:
+        The unit of each mode's time register comes from the register catalog:
         - HOLIDAY: days (REG_MAINBOARD_USERMODE_HOLIDAY_TIME = 251)
         - AWAY: hours (REG_MAINBOARD_USERMODE_AWAY_TIME = 252) 
         - FIREPLACE: minutes (REG_MAINBOARD_USERMODE_FIREPLACE_TIME = 253)
         - REFRESH: minutes (REG_MAINBOARD_USERMODE_REFRESH_TIME = 254)
         - CROWDED: hours (REG_MAINBOARD_USERMODE_CROWDED_TIME = 255)
         """
-        if mode_value == UserModes.HOLIDAY:
-            return max(1, time_minutes // (24 * 60))  # Convert to days, minimum 1
-        elif mode_value in [UserModes.AWAY, UserModes.CROWDED]:
-            return max(1, time_minutes // 60)  # Convert to hours, minimum 1
-        elif mode_value in [UserModes.FIREPLACE, UserModes.REFRESH]:
-            return time_minutes  # Already in minutes
-        else:
+        time_register = MODE_TIME_REGISTERS.get(mode_value)
+        if time_register is None:
             return time_minutes  # Fallback
+        minutes_per_unit = TIME_UNITS.get(REGISTER_CATALOG.unit(time_register), (1, ""))[0]
+        if minutes_per_unit == 1:
+            return time_minutes  # Already in minutes
+        return max(1, time_minutes // minutes_per_unit)  # Convert to hours/days, minimum 1
             
     def get_mode_name_for_key(self, mode_value: int) -> str:
         """Map numeric mode value to string mode key.
@@ -358,7 +885,7 @@ class VentilationUnit:
         }
         return mode_map.get(mode_value, "")
             
-    def set_temperature(self, api: SystemairAPI, temperature: int) -> None:
+    def set_temperature(self, api: SystemairAPI, temperature: int) -> bool:
         """Set the temperature setpoint for the ventilation unit.
         
         Args:
@@ -366,14 +893,21 @@ class VentilationUnit:
             temperature: Temperature in tenths of degrees (e.g., 210 for 21.0°C)
             
         Returns:
-            None
+            bool: True if the setpoint was written, False otherwise
+            
+        Raises:
+            ValidationError: If the setpoint is outside the supported range
         """
+        REGISTER_CATALOG.validate_raw(RegisterConstants.REG_MAINBOARD_TC_SP, temperature, write=True)
         if self.set_value(api, RegisterConstants.REG_MAINBOARD_TC_SP, temperature, True):
-            print(f"Temperature set to {temperature/10.0:.1f}°C for {self.name}")
-        else:
-            print(f"Failed to set temperature for {self.name}")
+            self._begin_pending(_field_name("temperatures", "setpoint"), TEMPERATURE_SLOTS["setpoint"],
+                                temperature / REGISTER_CATALOG.scale(RegisterConstants.REG_MAINBOARD_TC_SP))
+            logger.info("Temperature set to %.1f°C for %s", temperature / 10.0, self.name)
+            return True
+        logger.warning("Failed to set temperature for %s", self.name)
+        return False
             
-    def set_user_mode_time(self, api: SystemairAPI, mode: str, time_value: int) -> None:
+    def set_user_mode_time(self, api: SystemairAPI, mode: str, time_value: int) -> bool:
         """Set the time duration for a specific user mode.
         
         Args:
@@ -382,7 +916,7 @@ class VentilationUnit:
             time_value: The time duration in minutes
             
         Returns:
-            None
+            bool: True if the time was written, False if it failed or the mode is invalid
         """
         # Map mode names to their respective registers and mode values
         mode_info = {
@@ -394,8 +928,8 @@ class VentilationUnit:
         }
         
         if mode not in mode_info:
-            print(f"Invalid mode: {mode}. Must be one of {list(mode_info.keys())}")
-            return
+            logger.error("Invalid mode: %s. Must be one of %s", mode, list(mode_info.keys()))
+            return False
             
         register, mode_value = mode_info[mode]
         
@@ -404,9 +938,10 @@ class VentilationUnit:
         
         if self.set_value(api, register, api_time_value, True):
             # Show the user-friendly units in the message
-            unit_name = "days" if mode == 'holiday' else ("hours" if mode in ['away', 'crowded'] else "minutes")
-            print(f"{mode.capitalize()} mode time set to {api_time_value} {unit_name} for {self.name}")
+            unit_name = TIME_UNITS.get(REGISTER_CATALOG.unit(register), (1, "minutes"))[1]
+            logger.info("%s mode time set to %s %s for %s", mode.capitalize(), api_time_value, unit_name, self.name)
             # Update our local cache (keep in minutes for internal consistency)
-            self.user_mode_times[mode] = time_value
-        else:
-            print(f"Failed to set {mode} mode time for {self.name}")
+            self._set_local_field(_field_name("user_mode_times", mode), USER_MODE_TIME_SLOTS[mode], time_value)
+            return True
+        logger.warning("Failed to set %s mode time for %s", mode, self.name)
+        return False
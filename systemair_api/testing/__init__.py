@@ -0,0 +1,15 @@
+"""Local stand-in for the Systemair cloud, for offline tests, benchmarks and load tests."""
+
+from systemair_api.testing.server import FaultProfile, MockSystemairServer, install_endpoints, restore_endpoints
+from systemair_api.testing.simulation import DEFAULT_EMAIL, DEFAULT_PASSWORD, SimulatedBackend, SimulatedUnit
+
+__all__ = [
+    "MockSystemairServer",
+    "FaultProfile",
+    "install_endpoints",
+    "restore_endpoints",
+    "SimulatedBackend",
+    "SimulatedUnit",
+    "DEFAULT_EMAIL",
+    "DEFAULT_PASSWORD",
+]
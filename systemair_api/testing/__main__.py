@@ -0,0 +1,64 @@
+"""Run the mock Systemair server: ``python -m systemair_api.testing``."""
+
+import argparse
+import logging
+import threading
+from typing import List, Optional
+
+from systemair_api.testing.server import FaultProfile, MockSystemairServer
+from systemair_api.testing.simulation import DEFAULT_EMAIL, DEFAULT_PASSWORD, SimulatedBackend
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse the command line.
+
+    Args:
+        argv: Arguments to parse, defaults to ``sys.argv[1:]``
+
+    Returns:
+        argparse.Namespace: The parsed options
+    """
+    parser = argparse.ArgumentParser(prog="python -m systemair_api.testing",
+                                     description="Serve a simulated Systemair cloud for offline testing.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to bind")
+    parser.add_argument("--port", type=int, default=8080, help="port to listen on, 0 for any free port")
+    parser.add_argument("--units", type=int, default=10, help="number of simulated units")
+    parser.add_argument("--email", default=DEFAULT_EMAIL, help="email address of the account")
+    parser.add_argument("--password", default=DEFAULT_PASSWORD, help="password of the account")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="random extra latency of up to this many seconds")
+    parser.add_argument("--rate-limit", type=float, default=0.0,
+                        help="probability of answering a GraphQL request with 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After of rate limited requests in seconds")
+    parser.add_argument("--failure-rate", type=float, default=0.0,
+                        help="probability of answering a GraphQL request with 500")
+    parser.add_argument("--message-rate", type=float, default=0.0,
+                        help="status updates per second streamed from drifting units")
+    parser.add_argument("--timestamps", action="store_true",
+                        help="add the send time as sentAt to streamed messages")
+    parser.add_argument("--token-lifetime", type=float, default=300.0, help="seconds an access token is valid")
+    parser.add_argument("--seed", type=int, help="seed of the simulated state and fault injection")
+    parser.add_argument("--log-level", default="INFO", help="logging level, e.g. DEBUG or WARNING")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Serve until interrupted."""
+    args = parse_args(argv)
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    backend = SimulatedBackend(args.units, args.email, args.password, seed=args.seed)
+    faults = FaultProfile(args.latency, args.jitter, args.rate_limit, args.retry_after, args.failure_rate)
+    server = MockSystemairServer(backend, args.host, args.port, faults, args.token_lifetime,
+                                 args.message_rate, args.seed, args.timestamps)
+    server.start()
+    print(f"Serving {args.units} units for {args.email} at {server.url}", flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
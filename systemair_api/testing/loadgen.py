@@ -0,0 +1,474 @@
+"""Load generator measuring how many units one client process can track.
+
+:class:`LoadGenerator` runs a :class:`~systemair_api.daemon.SystemairDaemon`
+- REST polling through :class:`~systemair_api.api.systemair_api.SystemairAPI`
+and WebSocket ingest through
+:class:`~systemair_api.api.websocket_client.SystemairWebSocket` into
+:class:`~systemair_api.models.ventilation_unit.VentilationUnit` objects -
+against a :class:`~systemair_api.testing.server.MockSystemairServer`
+serving a simulated fleet at a fixed message rate. After a warm-up it
+measures, over a fixed window:
+
+- throughput: WebSocket messages, polls and applied changes per second;
+- end-to-end update latency: from the server sending a message to the
+  daemon having applied it to its unit;
+- poll latency: round trip of ``fetch_device_status``;
+- CPU time and resident memory of the client process.
+
+By default the server runs in a child process, so its CPU time is not
+charged to the client. Both sides read the same wall clock, so latencies
+are only meaningful with the server on the same host.
+
+Run a sweep over fleet sizes with::
+
+    python -m systemair_api.testing.loadgen --units 1000,5000,10000 --message-rate 500
+"""
+
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence
+
+import requests
+
+from systemair_api.api.poll_scheduler import PollScheduler
+from systemair_api.api.systemair_api import SystemairAPI
+from systemair_api.api.websocket_client import SystemairWebSocket
+from systemair_api.auth.authenticator import SystemairAuthenticator
+from systemair_api.daemon import SystemairDaemon
+from systemair_api.models.changes import ChangeSet
+from systemair_api.models.ventilation_unit import VentilationUnit
+from systemair_api.testing.server import (STATS_PATH, FaultProfile, MockSystemairServer, install_endpoints,
+                                          restore_endpoints)
+from systemair_api.testing.simulation import DEFAULT_EMAIL, DEFAULT_PASSWORD, SimulatedBackend
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentiles(samples: Sequence[float]) -> Dict[str, float]:
+    """Summarize samples by their median, tail percentiles and maximum.
+
+    Args:
+        samples: Measured values, in any order
+
+    Returns:
+        dict: ``p50``, ``p95``, ``p99`` and ``max``, empty if there are no samples
+    """
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+    summary = {f"p{p}": ordered[min(len(ordered) - 1, len(ordered) * p // 100)] for p in PERCENTILES}
+    summary["max"] = ordered[-1]
+    return summary
+
+
+def resident_memory() -> Optional[int]:
+    """Get the resident set size of this process in bytes.
+
+    Where the current size is not available (e.g. macOS) the peak size is
+    returned instead.
+
+    Returns:
+        int: Size in bytes, None if it cannot be determined
+    """
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class LoadReport(NamedTuple):
+    """Measurements of one load generator run; latencies are in seconds."""
+
+    units: int
+    message_rate: float
+    duration: float
+    messages_sent: int
+    messages: int
+    polls: int
+    poll_errors: int
+    changes: int
+    update_latency: Dict[str, float]
+    poll_latency: Dict[str, float]
+    cpu_time: float
+    server_cpu_time: Optional[float]
+    rss: Optional[int]
+    rss_growth: Optional[int]
+
+    @property
+    def messages_per_second(self) -> float:
+        """WebSocket messages received per second."""
+        return self.messages / self.duration
+
+    @property
+    def polls_per_second(self) -> float:
+        """Successful polls per second."""
+        return self.polls / self.duration
+
+    @property
+    def changes_per_second(self) -> float:
+        """Changed fields applied to units per second."""
+        return self.changes / self.duration
+
+    @property
+    def cpu_percent(self) -> float:
+        """CPU time of the client process as a percentage of one core."""
+        return 100.0 * self.cpu_time / self.duration
+
+    @property
+    def messages_behind(self) -> int:
+        """Messages sent during the window but not received, growing once the client falls behind."""
+        return max(0, self.messages_sent - self.messages)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Get the measurements and derived rates as a dictionary."""
+        result = self._asdict()
+        result.update(messages_per_second=self.messages_per_second, polls_per_second=self.polls_per_second,
+                      changes_per_second=self.changes_per_second, cpu_percent=self.cpu_percent,
+                      messages_behind=self.messages_behind)
+        return result
+
+
+def format_reports(reports: Sequence[LoadReport]) -> str:
+    """Format reports as a table, one row per run."""
+    def ms(summary: Dict[str, float], key: str) -> str:
+        return f"{summary[key] * 1000:.1f}" if key in summary else "-"
+
+    def mib(size: Optional[int]) -> str:
+        return "-" if size is None else f"{size / 2 ** 20:.0f}"
+
+    header = (f"{'units':>7} {'msg/s':>8} {'behind':>7} {'upd p50':>8} {'upd p99':>8} {'poll/s':>7} "
+              f"{'poll p50':>9} {'poll p99':>9} {'errors':>6} {'cpu %':>6} {'srv %':>6} {'rss MiB':>8} {'+MiB':>6}")
+    lines = [header]
+    for report in reports:
+        server_cpu = "-" if report.server_cpu_time is None else f"{100 * report.server_cpu_time / report.duration:.0f}"
+        lines.append(f"{report.units:>7} {report.messages_per_second:>8.0f} {report.messages_behind:>7} "
+                     f"{ms(report.update_latency, 'p50'):>8} {ms(report.update_latency, 'p99'):>8} "
+                     f"{report.polls_per_second:>7.1f} {ms(report.poll_latency, 'p50'):>9} "
+                     f"{ms(report.poll_latency, 'p99'):>9} {report.poll_errors:>6} {report.cpu_percent:>6.0f} "
+                     f"{server_cpu:>6} {mib(report.rss):>8} {mib(report.rss_growth):>6}")
+    lines.append("Latencies in milliseconds; CPU as a percentage of one core.")
+    return "\n".join(lines)
+
+
+class _Recorder:
+    """Counters and latency samples, recorded only while active."""
+
+    def __init__(self) -> None:
+        self.active = False
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.messages = 0
+            self.polls = 0
+            self.poll_errors = 0
+            self.changes = 0
+            self.update_latency: List[float] = []
+            self.poll_latency: List[float] = []
+
+    def message(self, latency: Optional[float]) -> None:
+        if not self.active:
+            return
+        with self._lock:
+            self.messages += 1
+            if latency is not None:
+                self.update_latency.append(latency)
+
+    def poll(self, latency: Optional[float]) -> None:
+        if not self.active:
+            return
+        with self._lock:
+            if latency is None:
+                self.poll_errors += 1
+            else:
+                self.polls += 1
+                self.poll_latency.append(latency)
+
+    def changed(self, unit: VentilationUnit, changes: ChangeSet) -> None:
+        if not self.active:
+            return
+        with self._lock:
+            self.changes += len(changes)
+
+
+class _TimedAPI(SystemairAPI):
+    """API client recording the round trip of every status poll."""
+
+    def __init__(self, access_token: str, recorder: _Recorder) -> None:
+        super().__init__(access_token)
+        self._recorder = recorder
+
+    def fetch_device_status(self, device_id: str) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            result = super().fetch_device_status(device_id)
+        except Exception:
+            self._recorder.poll(None)
+            raise
+        self._recorder.poll(time.perf_counter() - started)
+        return result
+
+
+class _ServerProcess:
+    """The mock server CLI in a child process, so its CPU time is not charged to the client."""
+
+    def __init__(self, args: List[str]) -> None:
+        command = [sys.executable, "-m", "systemair_api.testing", "--port", "0", "--log-level", "WARNING",
+                   "--timestamps"] + args
+        self._process = subprocess.Popen(command, stdout=subprocess.PIPE, universal_newlines=True)
+        stdout = self._process.stdout
+        line = stdout.readline() if stdout is not None else ""
+        if not line:
+            self._process.wait()
+            raise RuntimeError(f"Mock server exited with status {self._process.returncode}")
+        self.url = line.split()[-1]
+
+    def stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = requests.get(self.url + STATS_PATH, timeout=10).json()
+        return stats
+
+    def stop(self) -> None:
+        self._process.terminate()
+        self._process.wait(10)
+        stdout = self._process.stdout
+        if stdout is not None:
+            stdout.close()
+
+
+class _InProcessServer:
+    """The mock server on threads of this process; its CPU time counts as the client's."""
+
+    def __init__(self, server: MockSystemairServer) -> None:
+        self._server = server
+        server.start()
+        self.url = server.url
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self._server.stats_snapshot()
+        del stats["cpu_time"]
+        return stats
+
+    def stop(self) -> None:
+        self._server.stop()
+
+
+class LoadGenerator:
+    """Measures a daemon tracking a simulated fleet at a given size and message rate.
+
+    Example::
+
+        report = LoadGenerator(units=5000, message_rate=500, duration=60).run()
+        print(format_reports([report]))
+    """
+
+    def __init__(self, units: int = 1000, message_rate: float = 100.0, poll_rate: float = 10.0,
+                 poll_interval: float = 30.0, poll_workers: int = 4, duration: float = 30.0,
+                 warmup: float = 5.0, latency: float = 0.0, jitter: float = 0.0,
+                 separate_process: bool = True, seed: Optional[int] = 1,
+                 progress_interval: float = 5.0) -> None:
+        """Initialize the load generator.
+
+        Args:
+            units: Number of simulated units on the account
+            message_rate: Status updates per second streamed by the server
+            poll_rate: Poll budget of the daemon in requests per second
+            poll_interval: Shortest interval between polls of one unit in seconds
+            poll_workers: Maximum number of concurrent polls
+            duration: Length of the measurement window in seconds
+            warmup: Seconds between starting the daemon and measuring, covering
+                discovery and the initial status broadcast
+            latency: Seconds the server adds to every HTTP request
+            jitter: Random extra server latency of up to this many seconds
+            separate_process: Run the server in a child process
+            seed: Seed of the simulated fleet and drift
+            progress_interval: Seconds between progress log messages
+
+        Raises:
+            ValueError: If the fleet size, duration or a rate is not positive
+        """
+        if units < 1:
+            raise ValueError("At least one unit is required")
+        if duration <= 0 or poll_rate <= 0 or poll_interval <= 0:
+            raise ValueError("Duration, poll rate and poll interval must be positive")
+        if message_rate < 0 or warmup < 0:
+            raise ValueError("Message rate and warm-up must not be negative")
+        self.units: int = units
+        self.message_rate: float = message_rate
+        self.poll_rate: float = poll_rate
+        self.poll_interval: float = poll_interval
+        self.poll_workers: int = poll_workers
+        self.duration: float = duration
+        self.warmup: float = warmup
+        self.latency: float = latency
+        self.jitter: float = jitter
+        self.separate_process: bool = separate_process
+        self.seed: Optional[int] = seed
+        self.progress_interval: float = progress_interval
+        self._recorder = _Recorder()
+
+    def run(self) -> LoadReport:
+        """Start the server and daemon, measure for ``duration`` seconds and shut both down.
+
+        Returns:
+            LoadReport: The measurements of the window
+        """
+        self._recorder.active = False
+        self._recorder.reset()
+        rss_before = resident_memory()
+        server = self._start_server()
+        saved = install_endpoints(server.url)
+        daemon = None
+        try:
+            scheduler = PollScheduler(self.poll_rate * 60.0, min_interval=self.poll_interval,
+                                      max_interval=max(900.0, self.poll_interval))
+            daemon = SystemairDaemon(SystemairAuthenticator(DEFAULT_EMAIL, DEFAULT_PASSWORD), scheduler,
+                                     poll_workers=self.poll_workers, health_interval=3600.0,
+                                     on_changes=self._recorder.changed, websocket_factory=self._websocket,
+                                     api_factory=self._api)
+            daemon.start()
+            logger.info("Tracking %d units, warming up for %.0fs", len(daemon.units), self.warmup)
+            time.sleep(self.warmup)
+            return self._measure(server, rss_before)
+        finally:
+            # Stopping the server first closes the WebSocket from its side, which ends the client promptly
+            server.stop()
+            if daemon is not None:
+                daemon.stop()
+            restore_endpoints(saved)
+
+    def _start_server(self) -> Any:
+        if self.separate_process:
+            args = ["--units", str(self.units), "--message-rate", str(self.message_rate),
+                    "--latency", str(self.latency), "--jitter", str(self.jitter)]
+            if self.seed is not None:
+                args += ["--seed", str(self.seed)]
+            return _ServerProcess(args)
+        backend = SimulatedBackend(self.units, seed=self.seed)
+        return _InProcessServer(MockSystemairServer(backend, faults=FaultProfile(self.latency, self.jitter),
+                                                    message_rate=self.message_rate, seed=self.seed,
+                                                    timestamps=True))
+
+    def _measure(self, server: Any, rss_before: Optional[int]) -> LoadReport:
+        recorder = self._recorder
+        recorder.reset()
+        server_before = server.stats()
+        cpu_before = time.process_time()
+        started = time.monotonic()
+        recorder.active = True
+        end = started + self.duration
+        while True:
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(remaining, self.progress_interval))
+            elapsed = time.monotonic() - started
+            logger.info("%.0fs: %.0f messages/s, %.1f polls/s, CPU %.0f%%", elapsed, recorder.messages / elapsed,
+                        recorder.polls / elapsed, 100.0 * (time.process_time() - cpu_before) / elapsed)
+        recorder.active = False
+        duration = time.monotonic() - started
+        cpu_time = time.process_time() - cpu_before
+        server_after = server.stats()
+        rss = resident_memory()
+        server_cpu = server_after.get("cpu_time")
+        return LoadReport(
+            units=self.units,
+            message_rate=self.message_rate,
+            duration=duration,
+            messages_sent=server_after.get("messages", 0) - server_before.get("messages", 0),
+            messages=recorder.messages,
+            polls=recorder.polls,
+            poll_errors=recorder.poll_errors,
+            changes=recorder.changes,
+            update_latency=percentiles(recorder.update_latency),
+            poll_latency=percentiles(recorder.poll_latency),
+            cpu_time=cpu_time,
+            server_cpu_time=None if server_cpu is None else server_cpu - server_before["cpu_time"],
+            rss=rss,
+            rss_growth=None if rss is None or rss_before is None else rss - rss_before,
+        )
+
+    def _api(self, token: str) -> SystemairAPI:
+        return _TimedAPI(token, self._recorder)
+
+    def _websocket(self, token: str, callback: Callable[[Dict[str, Any]], None]) -> SystemairWebSocket:
+        recorder = self._recorder
+
+        def on_message(message: Dict[str, Any]) -> None:
+            callback(message)
+            sent = message.get("sentAt")
+            recorder.message(None if sent is None else time.time() - sent)
+        return SystemairWebSocket(token, on_message)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse the command line.
+
+    Args:
+        argv: Arguments to parse, defaults to ``sys.argv[1:]``
+
+    Returns:
+        argparse.Namespace: The parsed options
+    """
+    parser = argparse.ArgumentParser(prog="python -m systemair_api.testing.loadgen",
+                                     description="Measure the client tracking a simulated fleet.")
+    parser.add_argument("--units", default="1000",
+                        help="fleet size, or comma separated sizes to run one after another")
+    parser.add_argument("--message-rate", type=float, default=100.0,
+                        help="status updates per second streamed by the server")
+    parser.add_argument("--poll-rate", type=float, default=10.0, help="poll budget in requests per second")
+    parser.add_argument("--poll-interval", type=float, default=30.0,
+                        help="shortest interval between polls of one unit in seconds")
+    parser.add_argument("--poll-workers", type=int, default=4, help="maximum number of concurrent polls")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds measured per fleet size")
+    parser.add_argument("--warmup", type=float, default=5.0, help="seconds before measuring")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds the server adds to every request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="random extra latency of up to this many seconds")
+    parser.add_argument("--in-process", action="store_true",
+                        help="run the server in this process; its CPU time then counts as the client's")
+    parser.add_argument("--seed", type=int, default=1, help="seed of the simulated fleet")
+    parser.add_argument("--json", action="store_true", help="print the reports as JSON instead of a table")
+    parser.add_argument("--log-level", default="INFO", help="logging level, e.g. DEBUG or WARNING")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run the load generator for every requested fleet size and print the reports."""
+    args = parse_args(argv)
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    try:
+        sizes = [int(size) for size in args.units.split(",")]
+    except ValueError:
+        raise SystemExit(f"Invalid fleet sizes: {args.units}")
+    reports = []
+    for size in sizes:
+        generator = LoadGenerator(size, args.message_rate, args.poll_rate, args.poll_interval, args.poll_workers,
+                                  args.duration, args.warmup, args.latency, args.jitter, not args.in_process,
+                                  args.seed)
+        reports.append(generator.run())
+    if args.json:
+        print(json.dumps([report.as_dict() for report in reports], indent=2))
+    else:
+        print(format_reports(reports))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,618 @@
+"""Local stand-in for the Systemair Home Solutions cloud.
+
+:class:`MockSystemairServer` serves the parts of the cloud the client talks
+to from a single local HTTP port:
+
+- the SSO login page, login form and OpenID Connect token endpoint
+  (authorization code and refresh token grants);
+- the GraphQL ``GetAccountDevices``, ``GetView``, ``WriteDataItems`` and
+  ``BroadcastDeviceStatuses`` operations on the gateway and remote API;
+- the streaming WebSocket, pushing ``DEVICE_STATUS_UPDATE`` messages.
+
+Units and accounts come from a :class:`SimulatedBackend`. Latency, rate
+limiting (429) and server errors can be injected with a
+:class:`FaultProfile`, and sensor drift can be streamed at a fixed message
+rate. The client is pointed at the server by :meth:`~MockSystemairServer.install`,
+which rewrites :class:`~systemair_api.utils.constants.APIEndpoints`.
+
+For load tests, streamed messages can carry the time they were sent in a
+``sentAt`` field (seconds since the epoch), and ``GET /stats`` returns the
+server's counters and CPU time as JSON.
+"""
+
+import base64
+import hashlib
+import html
+import itertools
+import json
+import logging
+import random
+import re
+import socket
+import struct
+import threading
+import time
+import uuid
+from collections import Counter
+from email.message import Message
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+from systemair_api.testing.simulation import SimulatedBackend, SimulatedUnit
+from systemair_api.utils.constants import APIEndpoints
+from systemair_api.utils.exceptions import ValidationError
+
+logger = logging.getLogger(__name__)
+
+AUTH_PATH = urlsplit(APIEndpoints.AUTH).path
+TOKEN_PATH = urlsplit(APIEndpoints.TOKEN).path
+LOGIN_PATH = "/auth/realms/iot/login-actions/authenticate"
+GATEWAY_PATH = urlsplit(APIEndpoints.GATEWAY).path
+REMOTE_PATH = urlsplit(APIEndpoints.REMOTE).path
+STREAMING_PATH = urlsplit(APIEndpoints.STREAMING).path
+STATS_PATH = "/stats"
+
+OPERATIONS = ("GetAccountDevices", "GetView", "WriteDataItems", "BroadcastDeviceStatuses")
+_OPERATION = re.compile(r"\b(" + "|".join(OPERATIONS) + r")\b")
+
+_WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+OPCODE_TEXT = 0x1
+OPCODE_CLOSE = 0x8
+OPCODE_PING = 0x9
+OPCODE_PONG = 0xA
+
+_LOGIN_PAGE = """<!DOCTYPE html>
+<html><head><title>Sign in to iot</title></head><body>
+<form id="kc-form-login" action="{action}" method="post">
+<input id="username" name="username" type="text" autocomplete="off"/>
+<input id="password" name="password" type="password" autocomplete="off"/>
+<input type="hidden" id="id-hidden-input" name="credentialId"/>
+<input type="submit" name="login" id="kc-login" value="Sign In"/>
+</form>{error}
+</body></html>
+"""
+
+
+class FaultProfile(NamedTuple):
+    """Faults injected into HTTP requests.
+
+    Probabilities are per request. Rate limiting and server errors only
+    apply to GraphQL requests; latency applies to every HTTP request.
+    """
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    rate_limit: float = 0.0
+    retry_after: Optional[int] = 1
+    failure_rate: float = 0.0
+
+
+class _Response(NamedTuple):
+    status: int
+    body: bytes
+    headers: Dict[str, str]
+
+
+def _json_response(data: Any, status: int = 200, headers: Optional[Dict[str, str]] = None) -> _Response:
+    return _Response(status, json.dumps(data).encode(), dict(headers or {}, **{"Content-Type": "application/json"}))
+
+
+def _graphql_error(message: str) -> _Response:
+    return _json_response({"errors": [{"message": message}], "data": None})
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _frame(opcode: int, payload: bytes) -> bytes:
+    """Encode an unmasked WebSocket frame, as sent by servers."""
+    length = len(payload)
+    if length < 126:
+        header = struct.pack("!BB", 0x80 | opcode, length)
+    elif length < 1 << 16:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, length)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+    return header + payload
+
+
+def _read_frame(stream: Any) -> Optional[Tuple[int, bytes]]:
+    """Read one (masked) client frame, or None when the connection is gone."""
+    head = stream.read(2)
+    if len(head) < 2:
+        return None
+    opcode, length = head[0] & 0x0F, head[1] & 0x7F
+    if length == 126:
+        length = struct.unpack("!H", stream.read(2))[0]
+    elif length == 127:
+        length = struct.unpack("!Q", stream.read(8))[0]
+    mask = stream.read(4) if head[1] & 0x80 else b""
+    payload = stream.read(length)
+    if mask and length:
+        key = (mask * (length // 4 + 1))[:length]
+        payload = (int.from_bytes(payload, "big") ^ int.from_bytes(key, "big")).to_bytes(length, "big")
+    return opcode, payload
+
+
+def install_endpoints(url: str) -> Dict[str, str]:
+    """Point :class:`APIEndpoints` at a mock server, e.g. one running in another process.
+
+    Args:
+        url: Base URL of the server, e.g. ``http://127.0.0.1:8080``
+
+    Returns:
+        dict: The replaced endpoints, for :func:`restore_endpoints`
+    """
+    saved = {name: getattr(APIEndpoints, name) for name in ("AUTH", "TOKEN", "GATEWAY", "REMOTE", "STREAMING")}
+    url = url.rstrip("/")
+    APIEndpoints.AUTH = url + AUTH_PATH
+    APIEndpoints.TOKEN = url + TOKEN_PATH
+    APIEndpoints.GATEWAY = url + GATEWAY_PATH
+    APIEndpoints.REMOTE = url + REMOTE_PATH
+    APIEndpoints.STREAMING = "ws" + url[len("http"):] + STREAMING_PATH
+    return saved
+
+
+def restore_endpoints(saved: Dict[str, str]) -> None:
+    """Restore endpoints returned by :func:`install_endpoints`."""
+    for name, value in saved.items():
+        setattr(APIEndpoints, name, value)
+
+
+class StreamConnection:
+    """A WebSocket connection of an account; frames may be sent from any thread."""
+
+    def __init__(self, sock: socket.socket, email: str) -> None:
+        self.socket = sock
+        self.email: str = email
+        self.open: bool = True
+        self._lock = threading.Lock()
+
+    def send(self, payload: bytes, opcode: int = OPCODE_TEXT) -> bool:
+        """Send a frame.
+
+        Returns:
+            bool: False if the connection is closed
+        """
+        frame = _frame(opcode, payload)
+        with self._lock:
+            if not self.open:
+                return False
+            try:
+                self.socket.sendall(frame)
+                return True
+            except OSError:
+                self.open = False
+                return False
+
+    def close(self, code: int = 1000) -> None:
+        """Send a close frame and shut the connection down."""
+        self.send(struct.pack("!H", code), OPCODE_CLOSE)
+        with self._lock:
+            self.open = False
+            try:
+                self.socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Routes requests to the :class:`MockSystemairServer` owning the HTTP server."""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without this, delayed ACKs stall every response
+    disable_nagle_algorithm = True
+    server: "_HTTPServer"
+
+    def do_GET(self) -> None:
+        mock = self.server.mock
+        mock.delay()
+        url = urlsplit(self.path)
+        if url.path == STREAMING_PATH and self.headers.get("Upgrade", "").lower() == "websocket":
+            self._stream(mock)
+        elif url.path == AUTH_PATH:
+            self._send(mock.login_page(parse_qs(url.query)))
+        elif url.path == STATS_PATH:
+            self._send(_json_response(mock.stats_snapshot()))
+        elif url.path == "/":
+            self._send(_Response(200, b"<html><body>Signed in</body></html>", {"Content-Type": "text/html"}))
+        else:
+            self._send(_Response(404, b"", {}))
+
+    def do_POST(self) -> None:
+        mock = self.server.mock
+        mock.delay()
+        url = urlsplit(self.path)
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if url.path == LOGIN_PATH:
+            self._send(mock.login(parse_qs(url.query), parse_qs(body.decode())))
+        elif url.path == TOKEN_PATH:
+            self._send(mock.token(parse_qs(body.decode())))
+        elif url.path in (GATEWAY_PATH, REMOTE_PATH):
+            response, push = mock.graphql(self.headers, body)
+            self._send(response)
+            if push:
+                mock.push(push)
+        else:
+            self._send(_Response(404, b"", {}))
+
+    def _send(self, response: _Response) -> None:
+        self.send_response(response.status)
+        for name, value in response.headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(response.body)))
+        self.end_headers()
+        self.wfile.write(response.body)
+
+    def _stream(self, mock: "MockSystemairServer") -> None:
+        protocols = [item.strip() for item in self.headers.get("Sec-WebSocket-Protocol", "").split(",")]
+        token = protocols[1] if len(protocols) > 1 and protocols[0] == "accessToken" else None
+        email = mock.authorize(token)
+        key = self.headers.get("Sec-WebSocket-Key")
+        if email is None or not key:
+            self._send(_Response(401, b"", {}))
+            return
+        accept = base64.b64encode(hashlib.sha1((key + _WEBSOCKET_GUID).encode()).digest()).decode()
+        self.send_response(101)
+        self.send_header("Upgrade", "websocket")
+        self.send_header("Connection", "Upgrade")
+        self.send_header("Sec-WebSocket-Accept", accept)
+        self.send_header("Sec-WebSocket-Protocol", "accessToken")
+        self.end_headers()
+        self.wfile.flush()
+        connection = StreamConnection(self.connection, email)
+        mock.open_stream(connection)
+        try:
+            while connection.open:
+                frame = _read_frame(self.rfile)
+                if frame is None or frame[0] == OPCODE_CLOSE:
+                    break
+                if frame[0] == OPCODE_PING:
+                    connection.send(frame[1], OPCODE_PONG)
+        except (OSError, struct.error):
+            pass
+        finally:
+            mock.close_stream(connection)
+            connection.close()
+            self.close_connection = True
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], mock: "MockSystemairServer") -> None:
+        self.mock = mock
+        super().__init__(address, _Handler)
+
+
+class MockSystemairServer:
+    """A local stand-in for the Systemair cloud, for tests, benchmarks and load tests.
+
+    The server runs on background threads. Used as a context manager it is
+    started and installed on enter, and uninstalled and stopped on exit::
+
+        with MockSystemairServer(SimulatedBackend(units=1000)) as server:
+            authenticator = SystemairAuthenticator(DEFAULT_EMAIL, DEFAULT_PASSWORD)
+            api = SystemairAPI(authenticator.authenticate())
+            api.get_account_devices()
+
+    After the login form is submitted the browser is redirected to the
+    server itself rather than to the real redirect URI.
+    """
+
+    def __init__(self, backend: Optional[SimulatedBackend] = None, host: str = "127.0.0.1", port: int = 0,
+                 faults: FaultProfile = FaultProfile(), token_lifetime: float = 300.0,
+                 message_rate: float = 0.0, seed: Optional[int] = None, timestamps: bool = False) -> None:
+        """Initialize the server.
+
+        Args:
+            backend: Accounts and units to serve, defaults to ``SimulatedBackend()``
+            host: Address to bind
+            port: Port to listen on, 0 for any free port
+            faults: Faults injected into HTTP requests; may be replaced while running
+            token_lifetime: Seconds an access token is valid
+            message_rate: Status updates per second streamed from drifting units
+            seed: Seed of the fault injection
+            timestamps: Add the send time as ``sentAt`` to every streamed message
+        """
+        self.backend: SimulatedBackend = backend if backend is not None else SimulatedBackend()
+        self.host: str = host
+        self.port: int = port
+        self.faults: FaultProfile = faults
+        self.token_lifetime: float = token_lifetime
+        self.message_rate: float = message_rate
+        self.timestamps: bool = timestamps
+        self.stats: Counter = Counter()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._serials = itertools.count(1)
+        self._sessions: Dict[str, str] = {}
+        self._codes: Dict[str, str] = {}
+        self._access_tokens: Dict[str, Tuple[str, float]] = {}
+        self._refresh_tokens: Dict[str, str] = {}
+        self._streams: Dict[str, List[StreamConnection]] = {}
+        self._endpoints: Optional[Dict[str, str]] = None
+        self._server: Optional[_HTTPServer] = None
+        self._threads: List[threading.Thread] = []
+        self._stopped = threading.Event()
+
+    @property
+    def url(self) -> str:
+        """Base URL of the running server."""
+        return f"http://{self.host}:{self.port}"
+
+    def __enter__(self) -> "MockSystemairServer":
+        self.start()
+        self.install()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.uninstall()
+        self.stop()
+
+    def start(self) -> None:
+        """Start serving, and streaming drift if ``message_rate`` is set."""
+        if self._server is not None:
+            return
+        self._stopped.clear()
+        self._server = _HTTPServer((self.host, self.port), self)
+        self.port = self._server.server_address[1]
+        self._threads = [threading.Thread(target=self._server.serve_forever, args=(0.05,),
+                                         name="systemair-mock", daemon=True)]
+        if self.message_rate > 0:
+            self._threads.append(threading.Thread(target=self._simulate, name="systemair-mock-drift", daemon=True))
+        for thread in self._threads:
+            thread.start()
+        logger.info("Mock Systemair server listening on %s", self.url)
+
+    def stop(self) -> None:
+        """Close all WebSocket connections and stop serving."""
+        self._stopped.set()
+        self.close_streams()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def install(self) -> None:
+        """Point :class:`APIEndpoints`, and so every client, at this server."""
+        saved = install_endpoints(self.url)
+        if self._endpoints is None:
+            self._endpoints = saved
+
+    def uninstall(self) -> None:
+        """Restore the endpoints replaced by :meth:`install`."""
+        if self._endpoints is not None:
+            restore_endpoints(self._endpoints)
+            self._endpoints = None
+
+    def delay(self) -> None:
+        """Sleep for the injected latency of one request."""
+        faults = self.faults
+        if faults.latency or faults.jitter:
+            time.sleep(faults.latency + self._rng.uniform(0, faults.jitter))
+
+    def expire_tokens(self) -> None:
+        """Expire all access tokens, e.g. to exercise token refresh."""
+        with self._lock:
+            self._access_tokens = {token: (email, 0.0) for token, (email, _) in self._access_tokens.items()}
+
+    def authorize(self, token: Optional[str]) -> Optional[str]:
+        """Get the account of a valid access token, or None."""
+        entry = self._access_tokens.get(token) if token else None
+        if entry is None or entry[1] <= time.time():
+            return None
+        return entry[0]
+
+    def login_page(self, query: Dict[str, List[str]], error: str = "") -> _Response:
+        """Render the SSO login form of an authorization request."""
+        session = uuid.uuid4().hex
+        with self._lock:
+            self._sessions[session] = (query.get("state") or [""])[0]
+        action = self.url + LOGIN_PATH + "?" + urlencode(
+            {"session_code": session, "execution": uuid.uuid4(), "client_id": (query.get("client_id") or [""])[0],
+             "tab_id": session[:11]})
+        page = _LOGIN_PAGE.format(action=html.escape(action), error=error)
+        return _Response(200, page.encode(), {"Content-Type": "text/html;charset=utf-8"})
+
+    def login(self, query: Dict[str, List[str]], form: Dict[str, List[str]]) -> _Response:
+        """Check submitted credentials and redirect with an authorization code."""
+        with self._lock:
+            state = self._sessions.pop((query.get("session_code") or [""])[0], None)
+        email = (form.get("username") or [""])[0]
+        account = self.backend.accounts.get(email)
+        if state is None or account is None or (form.get("password") or [""])[0] != account.password:
+            self._count("login_failures")
+            return self.login_page(query, '<span id="input-error">Invalid username or password.</span>')
+        code = uuid.uuid4().hex
+        with self._lock:
+            self._codes[code] = email
+        self._count("logins")
+        location = self.url + "/?" + urlencode({"state": state, "session_state": uuid.uuid4(), "code": code})
+        return _Response(302, b"", {"Location": location})
+
+    def token(self, form: Dict[str, List[str]]) -> _Response:
+        """Handle the authorization code and refresh token grants."""
+        grant = (form.get("grant_type") or [""])[0]
+        with self._lock:
+            if grant == "authorization_code":
+                email = self._codes.pop((form.get("code") or [""])[0], None)
+            elif grant == "refresh_token":
+                email = self._refresh_tokens.pop((form.get("refresh_token") or [""])[0], None)
+            else:
+                email = None
+        if email is None:
+            return _json_response({"error": "invalid_grant", "error_description": "Invalid grant"}, 400)
+        self._count("tokens")
+        return _json_response(self.issue_tokens(email))
+
+    def issue_tokens(self, email: str) -> Dict[str, Any]:
+        """Issue an access and refresh token for an account, as the token endpoint does."""
+        now = int(time.time())
+        expires = now + int(self.token_lifetime)
+        subject = self.backend.accounts[email].subject
+        header = _b64(b'{"alg":"none","typ":"JWT"}')
+
+        def token(claims: Dict[str, Any]) -> str:
+            return f"{header}.{_b64(json.dumps(claims).encode())}.{next(self._serials)}"
+
+        access_token = token({"exp": expires, "iat": now, "sub": subject, "email": email,
+                              "scope": "openid email profile", "typ": "Bearer"})
+        refresh_token = token({"exp": now + 30 * 86400, "iat": now, "sub": subject, "typ": "Refresh"})
+        with self._lock:
+            self._access_tokens[access_token] = (email, float(expires))
+            self._refresh_tokens[refresh_token] = email
+        return {"access_token": access_token, "expires_in": int(self.token_lifetime),
+                "refresh_token": refresh_token, "refresh_expires_in": 30 * 86400,
+                "token_type": "Bearer", "scope": "openid email profile"}
+
+    def graphql(self, headers: Message, body: bytes) -> Tuple[_Response, List[SimulatedUnit]]:
+        """Handle a GraphQL request.
+
+        Args:
+            headers: Request headers, looked up case-insensitively
+            body: Request body
+
+        Returns:
+            tuple: The response and the units whose status is streamed once it was sent
+        """
+        faults = self.faults
+        if faults.rate_limit and self._rng.random() < faults.rate_limit:
+            self._count("rate_limited")
+            retry = {} if faults.retry_after is None else {"Retry-After": str(faults.retry_after)}
+            return _json_response({"errors": [{"message": "Too many requests"}]}, 429, retry), []
+        if faults.failure_rate and self._rng.random() < faults.failure_rate:
+            self._count("failed")
+            return _json_response({"errors": [{"message": "Internal server error"}]}, 500), []
+        email = self.authorize(headers.get("x-access-token"))
+        if email is None:
+            self._count("unauthorized")
+            return _json_response({"errors": [{"message": "Unauthorized"}]}, 401), []
+        try:
+            request = json.loads(body)
+            match = _OPERATION.search(request.get("query") or "")
+        except (ValueError, AttributeError):
+            match = None
+        if match is None:
+            return _json_response({"errors": [{"message": "Unknown operation"}]}, 400), []
+        operation = match.group(1)
+        self._count(operation)
+        variables = request.get("variables") or {}
+        if operation == "GetAccountDevices":
+            devices = [unit.device() for unit in self.backend.accounts[email].units]
+            return _json_response({"data": {"GetAccountDevices": devices}}), []
+        if operation == "BroadcastDeviceStatuses":
+            identifiers = variables.get("deviceIds") or []
+            units = [self.backend.unit(email, identifier) for identifier in identifiers]
+            missing = [identifier for identifier, unit in zip(identifiers, units) if unit is None]
+            if missing:
+                return _graphql_error(f"Device {missing[0]} not found"), []
+            return _json_response({"data": {"BroadcastDeviceStatuses": True}}), units  # type: ignore[return-value]
+        identifier = headers.get("device-id") or ""
+        unit = self.backend.unit(email, identifier)
+        if unit is None:
+            return _graphql_error(f"Device {identifier} not found"), []
+        if operation == "GetView":
+            return _Response(200, unit.view_body(), {"Content-Type": "application/json"}), []
+        try:
+            with self.backend.lock:
+                for point in (variables.get("input") or {}).get("dataPoints") or []:
+                    unit.write(int(point["id"]), point["value"])
+        except ValidationError as e:
+            return _graphql_error(f"Invalid value for {e.field}: {e.message}"), []
+        except (KeyError, TypeError, ValueError) as e:
+            return _graphql_error(f"Invalid data point: {e}"), []
+        return _json_response({"data": {"WriteDataItems": True}}), [unit]
+
+    def open_stream(self, connection: StreamConnection) -> None:
+        """Register a WebSocket connection of an account."""
+        with self._lock:
+            self._streams.setdefault(connection.email, []).append(connection)
+        self._count("streams")
+
+    def close_stream(self, connection: StreamConnection) -> None:
+        """Forget a WebSocket connection."""
+        with self._lock:
+            connections = self._streams.get(connection.email, [])
+            if connection in connections:
+                connections.remove(connection)
+
+    def close_streams(self, code: int = 1001) -> int:
+        """Close all WebSocket connections from the server side, e.g. to exercise reconnects.
+
+        Returns:
+            int: Number of connections closed
+        """
+        with self._lock:
+            streams = [connection for connections in self._streams.values() for connection in connections]
+        for connection in streams:
+            connection.close(code)
+        return len(streams)
+
+    def stream_count(self) -> int:
+        """Get the number of open WebSocket connections."""
+        with self._lock:
+            return sum(len(connections) for connections in self._streams.values())
+
+    def push(self, units: Iterable[SimulatedUnit]) -> int:
+        """Stream the current status of units to their accounts' WebSocket connections.
+
+        Returns:
+            int: Number of messages sent
+        """
+        sent = 0
+        for unit in units:
+            email = self.backend.owner(unit.identifier)
+            connections = self._streams.get(email) if email is not None else None
+            if not connections:
+                continue
+            body = unit.message_body()
+            if self.timestamps:
+                body = body[:-1] + b', "sentAt": ' + repr(time.time()).encode() + b"}"
+            for connection in list(connections):
+                sent += connection.send(body)
+        if sent:
+            self._count("messages", sent)
+        return sent
+
+    def drift(self, count: int = 1, identifiers: Optional[Iterable[str]] = None) -> int:
+        """Change random units (see :meth:`SimulatedBackend.drift`) and stream their status.
+
+        Returns:
+            int: Number of messages sent
+        """
+        return self.push(self.backend.drift(count, identifiers))
+
+    def stats_snapshot(self) -> Dict[str, Any]:
+        """Get the counters, open streams and CPU time of the server process as a dictionary."""
+        with self._lock:
+            snapshot: Dict[str, Any] = dict(self.stats)
+        snapshot["open_streams"] = self.stream_count()
+        snapshot["cpu_time"] = time.process_time()
+        return snapshot
+
+    def _simulate(self) -> None:
+        """Stream drifting units at ``message_rate`` messages per second."""
+        interval = 0.01
+        due = 0.0
+        last = time.monotonic()
+        while not self._stopped.wait(interval):
+            now = time.monotonic()
+            due += (now - last) * self.message_rate
+            last = now
+            count = int(due)
+            if count:
+                due -= count
+                self.drift(count)
+
+    def _count(self, key: str, amount: int = 1) -> None:
+        with self._lock:
+            self.stats[key] += amount
@@ -0,0 +1,261 @@
+"""Simulated Systemair accounts and ventilation units for the mock server.
+
+Units keep their state as raw register values, like the real devices, and
+render it as ``GetView`` responses and ``DEVICE_STATUS_UPDATE`` WebSocket
+messages. Encoded responses are cached until the unit changes, so a
+backend with thousands of units is not the bottleneck when benchmarking
+the client against it.
+"""
+
+import json
+import random
+import threading
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+from systemair_api.models.ventilation_unit import FUNCTION_REGISTERS, REGISTER_TARGETS
+from systemair_api.utils.constants import UserModes
+from systemair_api.utils.register_constants import RegisterConstants
+from systemair_api.utils.register_metadata import REGISTER_CATALOG
+
+DEFAULT_EMAIL = "user@example.com"
+DEFAULT_PASSWORD = "password"
+
+_R = RegisterConstants
+
+# Registers reported by GetView: the ones the client tracks and the supply air sensor
+VIEW_REGISTERS = tuple(sorted(set(REGISTER_TARGETS) | {_R.REG_MAINBOARD_SENSOR_SAT}))
+
+# Initial raw values of registers that are not randomized
+_DEFAULT_REGISTERS: Dict[int, int] = {
+    _R.REG_MAINBOARD_USERMODE_HOLIDAY_TIME: 7,
+    _R.REG_MAINBOARD_USERMODE_AWAY_TIME: 24,
+    _R.REG_MAINBOARD_USERMODE_FIREPLACE_TIME: 30,
+    _R.REG_MAINBOARD_USERMODE_REFRESH_TIME: 30,
+    _R.REG_MAINBOARD_USERMODE_CROWDED_TIME: 4,
+    _R.REG_MAINBOARD_UNIT_CONFIG_REHEATER_TYPE: 1,
+}
+
+
+class Account(NamedTuple):
+    """A simulated Home Solutions account."""
+
+    email: str
+    password: str
+    subject: str
+    units: List["SimulatedUnit"]
+
+
+class SimulatedUnit:
+    """A simulated ventilation unit.
+
+    Attributes that only appear in WebSocket messages (humidity, CO2,
+    filter expiration) are kept next to the registers.
+    """
+
+    def __init__(self, identifier: str, name: str, rng: random.Random) -> None:
+        """Initialize a unit with a plausible random state.
+
+        Args:
+            identifier: Device identifier, e.g. ``IAM_000000000001``
+            name: Display name of the unit
+            rng: Random source for the initial state
+        """
+        self.identifier: str = identifier
+        self.name: str = name
+        self.registers: Dict[int, int] = {register_id: 0 for register_id in VIEW_REGISTERS}
+        self.registers.update(_DEFAULT_REGISTERS)
+        self.registers[_R.REG_MAINBOARD_USERMODE_MODE_HMI] = rng.choice((UserModes.AUTO, UserModes.MANUAL))
+        self.registers[_R.REG_MAINBOARD_SPEED_INDICATION_APP] = rng.randint(2, 4)
+        self.registers[_R.REG_MAINBOARD_TC_SP] = rng.randint(18, 23) * 10
+        self.registers[_R.REG_MAINBOARD_SENSOR_OAT] = rng.randint(-100, 250)
+        self.registers[_R.REG_MAINBOARD_SENSOR_SAT] = self.registers[_R.REG_MAINBOARD_TC_SP] + rng.randint(-20, 10)
+        self.registers[_R.REG_MAINBOARD_IAQ_LEVEL] = rng.randint(0, 2)
+        self.registers[_R.REG_MAINBOARD_ECO_MODE_ON_OFF] = rng.randint(0, 1)
+        heating = next(register_id for register_id, name in FUNCTION_REGISTERS.items() if name == "heating")
+        self.registers[heating] = int(self.registers[_R.REG_MAINBOARD_SENSOR_OAT] < 100)
+        self.humidity: int = rng.randint(30, 60)
+        self.co2: int = rng.randint(400, 1200)
+        self.filter_expiration: int = rng.randint(1, 180) * 86400
+        self.model: str = "VSR 300"
+        self.serial_number: str = f"SN{identifier[-8:]}"
+        self.version: int = 0
+        self._view: Optional[bytes] = None
+        self._message: Optional[bytes] = None
+
+    def device(self) -> Dict[str, Any]:
+        """Get the ``GetAccountDevices`` entry of the unit."""
+        return {
+            "identifier": self.identifier,
+            "name": self.name,
+            "street": "Simulated Street 1",
+            "zipcode": "0001",
+            "city": "Simulation",
+            "country": "Norway",
+            "deviceType": {"entry": "IAM", "module": "IAM", "scope": "IAM", "type": "LEGACY"},
+        }
+
+    def view(self) -> Dict[str, Any]:
+        """Get the ``GetView`` response of the unit."""
+        return {"data": {"GetView": {"children": [
+            {"type": "DataItem", "properties": {"dataItem": {"id": register_id, "value": value}}}
+            for register_id, value in self.registers.items()
+        ]}}}
+
+    def view_body(self) -> bytes:
+        """Get the encoded ``GetView`` response, cached until the unit changes."""
+        body = self._view
+        if body is None:
+            body = self._view = json.dumps(self.view()).encode()
+        return body
+
+    def status_message(self) -> Dict[str, Any]:
+        """Get the ``DEVICE_STATUS_UPDATE`` WebSocket message of the unit."""
+        registers = self.registers
+        return {
+            "type": "SYSTEM_EVENT",
+            "action": "DEVICE_STATUS_UPDATE",
+            "properties": {
+                "id": self.identifier,
+                "model": self.model,
+                "activeAlarms": any(registers[register_id] for register_id in (
+                    _R.REG_MAINBOARD_ALARM_TYPE_A, _R.REG_MAINBOARD_ALARM_TYPE_B, _R.REG_MAINBOARD_ALARM_TYPE_C)),
+                "airflow": registers[_R.REG_MAINBOARD_SPEED_INDICATION_APP],
+                "connectivity": ["CLOUD"],
+                "filterExpiration": self.filter_expiration,
+                "serialNumber": self.serial_number,
+                "temperature": registers[_R.REG_MAINBOARD_SENSOR_SAT] / 10,
+                "userMode": registers[_R.REG_MAINBOARD_USERMODE_MODE_HMI],
+                "airQuality": registers[_R.REG_MAINBOARD_IAQ_LEVEL],
+                "humidity": self.humidity,
+                "co2": self.co2,
+                "update": {"inProgress": False},
+                "configurationWizard": {"active": False},
+                "temperatures": {
+                    "oat": registers[_R.REG_MAINBOARD_SENSOR_OAT] / 10,
+                    "sat": registers[_R.REG_MAINBOARD_SENSOR_SAT] / 10,
+                    "setpoint": registers[_R.REG_MAINBOARD_TC_SP] / 10,
+                },
+                "versions": [{"type": "IAM", "version": "2.1.0"}, {"type": "MB", "version": "1.16.0"}],
+            },
+        }
+
+    def message_body(self) -> bytes:
+        """Get the encoded WebSocket message, cached until the unit changes."""
+        body = self._message
+        if body is None:
+            body = self._message = json.dumps(self.status_message()).encode()
+        return body
+
+    def write(self, register_id: int, value: str) -> None:
+        """Apply a ``WriteDataItems`` data point.
+
+        Writing the user mode change request switches the user mode to the
+        requested value minus one, as on the real units.
+
+        Args:
+            register_id: Register to write
+            value: Raw value as sent by the client
+
+        Raises:
+            ValidationError: If the register is read-only or the value is out of range
+            ValueError: If the value is not a number or the register is not simulated
+        """
+        raw = int(float(value))
+        REGISTER_CATALOG.validate_raw(register_id, raw, write=True)
+        if register_id == _R.REG_MAINBOARD_USERMODE_HMI_CHANGE_REQUEST:
+            register_id, raw = _R.REG_MAINBOARD_USERMODE_MODE_HMI, raw - 1
+        elif register_id not in self.registers:
+            raise ValueError(f"Register {register_id} is not simulated")
+        self.registers[register_id] = raw
+        self.touch()
+
+    def drift(self, rng: random.Random) -> None:
+        """Move the sensor readings a small random step, as between two status updates."""
+        registers = self.registers
+        registers[_R.REG_MAINBOARD_SENSOR_OAT] += rng.randint(-2, 2)
+        registers[_R.REG_MAINBOARD_SENSOR_SAT] += rng.randint(-1, 1)
+        self.humidity = min(100, max(0, self.humidity + rng.randint(-1, 1)))
+        self.co2 = max(400, self.co2 + rng.randint(-25, 25))
+        self.touch()
+
+    def touch(self) -> None:
+        """Drop the cached responses after the state was changed directly."""
+        self.version += 1
+        self._view = None
+        self._message = None
+
+
+class SimulatedBackend:
+    """Accounts and units served by :class:`~systemair_api.testing.server.MockSystemairServer`.
+
+    Units are numbered across all accounts, so identifiers are unique and
+    stable for a given order of :meth:`add_account` calls.
+    """
+
+    def __init__(self, units: int = 10, email: str = DEFAULT_EMAIL, password: str = DEFAULT_PASSWORD,
+                 seed: Optional[int] = None) -> None:
+        """Initialize the backend with one account.
+
+        Args:
+            units: Number of units of the default account
+            email: Email address of the default account
+            password: Password of the default account
+            seed: Seed of the random state of units and of :meth:`drift`
+        """
+        self.rng = random.Random(seed)
+        self.accounts: Dict[str, Account] = {}
+        self.units: Dict[str, SimulatedUnit] = {}
+        self._order: List[SimulatedUnit] = []
+        self._owners: Dict[str, str] = {}
+        self.lock = threading.RLock()
+        self.add_account(email, password, units)
+
+    def add_account(self, email: str, password: str, units: int) -> Account:
+        """Add an account owning ``units`` new units.
+
+        Raises:
+            ValueError: If an account with the email address already exists
+        """
+        if email in self.accounts:
+            raise ValueError(f"Account {email!r} already exists")
+        with self.lock:
+            owned = []
+            for _ in range(units):
+                index = len(self.units) + 1
+                unit = SimulatedUnit(f"IAM_{index:012X}", f"Unit {index}", self.rng)
+                self.units[unit.identifier] = unit
+                self._order.append(unit)
+                self._owners[unit.identifier] = email
+                owned.append(unit)
+            account = Account(email, password, f"{len(self.accounts) + 1:08x}-0000-4000-8000-000000000000", owned)
+            self.accounts[email] = account
+        return account
+
+    def owner(self, identifier: str) -> Optional[str]:
+        """Get the email address of the account owning a unit."""
+        return self._owners.get(identifier)
+
+    def unit(self, email: str, identifier: str) -> Optional[SimulatedUnit]:
+        """Get a unit of an account, or None if the account does not own it."""
+        return self.units.get(identifier) if self._owners.get(identifier) == email else None
+
+    def drift(self, count: int = 1, identifiers: Optional[Iterable[str]] = None) -> List[SimulatedUnit]:
+        """Change the sensor readings of random units.
+
+        Args:
+            count: Number of units to pick, with replacement; ignored if
+                ``identifiers`` is given
+            identifiers: Change exactly these units
+
+        Returns:
+            list: The changed units
+        """
+        with self.lock:
+            if identifiers is None:
+                order, randrange = self._order, self.rng.randrange
+                units = [order[randrange(len(order))] for _ in range(count)] if order else []
+            else:
+                units = [self.units[identifier] for identifier in identifiers]
+            for unit in units:
+                unit.drift(self.rng)
+        return units
@@ -1,4 +1,26 @@
 """Utility modules for Systemair API."""
 
 from systemair_api.utils.constants import UserModes, APIEndpoints
-from systemair_api.utils.register_constants import RegisterConstants
+from systemair_api.utils.log import (
+    LOGGER_NAME,
+    disable_queue_logging,
+    enable_queue_logging,
+    get_logger,
+)
+from systemair_api.utils.metrics import ClientMetrics, MetricRegistry
+from systemair_api.utils.register_constants import (
+    RegisterConstants,
+    REGISTER_IDS,
+    REGISTER_NAMES,
+    REGISTER_SUBSYSTEMS,
+    register_name,
+    register_number,
+    register_short_name,
+    register_subsystem,
+)
+from systemair_api.utils.register_metadata import (
+    REGISTER_CATALOG,
+    RegisterCatalog,
+    RegisterMetadata,
+    get_register_metadata,
+)
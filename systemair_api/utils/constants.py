@@ -7,6 +7,7 @@ AUTH_URL = "https://sso.systemair.com/auth/realms/iot/protocol/openid-connect/au
 TOKEN_URL = "https://sso.systemair.com/auth/realms/iot/protocol/openid-connect/token"
 GATEWAY_API_URL = "https://homesolutions.systemair.com/gateway/api"
 REMOTE_API_URL = "https://homesolutions.systemair.com/gateway/remote-api/"
+STREAMING_URL = "wss://homesolutions.systemair.com/streaming/"
 
 
 class UserModes(IntEnum):
@@ -26,3 +27,4 @@ class APIEndpoints:
     REMOTE = REMOTE_API_URL
     AUTH = AUTH_URL
     TOKEN = TOKEN_URL
+    STREAMING = STREAMING_URL
@@ -0,0 +1,78 @@
+"""Logging helpers for the systemair_api package.
+
+The library only emits records through per-subsystem loggers below the
+``systemair_api`` logger (``systemair_api.api``, ``systemair_api.auth``,
+``systemair_api.models`` and so on) and installs a ``NullHandler``, so
+nothing is written unless the application configures logging. Messages use
+lazy ``%`` formatting: disabled records cost a level check only.
+"""
+
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional, Union
+
+LOGGER_NAME = "systemair_api"
+
+DEFAULT_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+
+def get_logger(subsystem: Optional[str] = None) -> logging.Logger:
+    """Get the package logger or the logger of one of its subsystems.
+
+    Args:
+        subsystem: Subsystem name such as ``"api"`` or ``"models.ventilation_unit"``,
+            None for the package logger
+
+    Returns:
+        logging.Logger: The logger
+    """
+    return logging.getLogger(f"{LOGGER_NAME}.{subsystem}" if subsystem else LOGGER_NAME)
+
+
+def enable_queue_logging(*handlers: logging.Handler, level: Union[int, str, None] = None,
+                         logger: Optional[logging.Logger] = None) -> QueueListener:
+    """Send library log records through a queue to handlers running on a background thread.
+
+    The calling threads (API calls, WebSocket callbacks, update loops) only
+    put records on an in-memory queue; formatting and I/O happen on the
+    listener thread.
+
+    Args:
+        *handlers: Handlers that write the records, defaults to a stderr
+            ``StreamHandler`` using ``DEFAULT_FORMAT``
+        level: Optional level to set on the logger
+        logger: Logger to attach the queue to, defaults to the package logger
+
+    Returns:
+        QueueListener: The started listener; pass it to :func:`disable_queue_logging`
+            to flush the queue and detach the handler
+    """
+    if not handlers:
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(logging.Formatter(DEFAULT_FORMAT))
+        handlers = (stream_handler,)
+    logger = get_logger() if logger is None else logger
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+    queue_handler = QueueHandler(log_queue)
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    # Remember where the queue handler was attached so it can be removed again
+    listener.queue_handler = queue_handler  # type: ignore[attr-defined]
+    listener.logger = logger  # type: ignore[attr-defined]
+    logger.addHandler(queue_handler)
+    if level is not None:
+        logger.setLevel(level)
+    listener.start()
+    return listener
+
+
+def disable_queue_logging(listener: QueueListener) -> None:
+    """Stop a listener started by :func:`enable_queue_logging`.
+
+    Records already queued are written before this returns.
+
+    Args:
+        listener: The listener returned by :func:`enable_queue_logging`
+    """
+    listener.logger.removeHandler(listener.queue_handler)  # type: ignore[attr-defined]
+    listener.stop()
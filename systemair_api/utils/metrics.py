@@ -0,0 +1,407 @@
+"""Metric registry rendering the Prometheus text exposition format.
+
+Updating a metric never takes a lock. Gauges store values with single
+dictionary assignments; counters and histograms accumulate into a shard
+owned by the updating thread and are summed when rendered. Shards of
+finished threads are folded into a single retired shard, so short-lived
+threads do not accumulate shards. Every update
+that changes a value stamps the metric with a new version from a global
+counter, and :meth:`MetricRegistry.render` re-renders only the metrics
+whose version moved since the last scrape.
+
+Each metric holds at most ``max_series`` label combinations; updates that
+would add more are dropped and counted in ``MetricRegistry.dropped``.
+"""
+
+import bisect
+import itertools
+import math
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Type, TypeVar
+
+Labels = Tuple[str, ...]
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_MAX_SERIES = 50000
+
+# Request latency buckets in seconds
+LATENCY_BUCKETS: Tuple[float, ...] = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Global version counter; next() on itertools.count is atomic under the GIL
+_VERSIONS = itertools.count(1)
+
+
+def _format_value(value: float) -> str:
+    if value != value:
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer() and abs(value) < 2 ** 53:
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)) + "}"
+
+
+class _Metric:
+    """Base class holding the name, labels and render cache of a metric."""
+
+    kind = ""
+
+    def __init__(self, registry: "MetricRegistry", name: str, documentation: str,
+                 labelnames: Sequence[str]) -> None:
+        self.registry = registry
+        self.name: str = name
+        self.documentation: str = documentation
+        self.labelnames: Tuple[str, ...] = tuple(labelnames)
+        self.version: int = next(_VERSIONS)
+        self._known: Dict[Labels, bool] = {}
+        self._rendered: str = ""
+        self._rendered_version: int = 0
+
+    def _admit(self, labels: Labels) -> bool:
+        """Check whether a label combination may be recorded, registering it if new."""
+        if labels in self._known:
+            return True
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {labels!r}")
+        # Concurrent first updates may admit a few series past the limit
+        if len(self._known) >= self.registry.max_series:
+            self.registry.dropped += 1
+            return False
+        self._known[labels] = True
+        return True
+
+    def _touch(self) -> None:
+        self.version = next(_VERSIONS)
+
+    def render(self) -> str:
+        """Get the exposition text of the metric, re-rendering only if it changed."""
+        version = self.version
+        if version != self._rendered_version:
+            lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+            lines.extend(self._samples())
+            self._rendered = "\n".join(lines) + "\n"
+            self._rendered_version = version
+        return self._rendered
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class _ShardedMetric(_Metric):
+    """Metric accumulating per-thread shards that are merged when rendered."""
+
+    def __init__(self, registry: "MetricRegistry", name: str, documentation: str,
+                 labelnames: Sequence[str]) -> None:
+        super().__init__(registry, name, documentation, labelnames)
+        self._local = threading.local()
+        # (owning thread, shard) of every thread that updated the metric and is still running
+        self._shards: List[Tuple[threading.Thread, Dict[Labels, List[float]]]] = []
+        self._retired: Dict[Labels, List[float]] = {}
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> Dict[Labels, List[float]]:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._shards_lock:
+                self._retire_finished()
+                self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    def _retire_finished(self) -> None:
+        """Fold the shards of finished threads into the retired shard; needs ``_shards_lock``."""
+        running = [(thread, shard) for thread, shard in self._shards if thread.is_alive()]
+        if len(running) == len(self._shards):
+            return
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                continue
+            for labels, values in shard.items():
+                total = self._retired.get(labels)
+                if total is None:
+                    self._retired[labels] = list(values)
+                else:
+                    for index, value in enumerate(values):
+                        total[index] += value
+        self._shards = running
+
+    def _merged(self, width: int) -> Dict[Labels, List[float]]:
+        with self._shards_lock:
+            self._retire_finished()
+            shards = [{labels: list(values) for labels, values in self._retired.items()}]
+            shards.extend(shard for _, shard in self._shards)
+        merged: Dict[Labels, List[float]] = {}
+        for shard in shards:
+            for labels, values in shard.copy().items():
+                total = merged.get(labels)
+                if total is None:
+                    total = merged[labels] = [0.0] * width
+                for index, value in enumerate(values):
+                    total[index] += value
+        return merged
+
+    def remove(self, labels: Labels) -> None:
+        """Drop a series from every shard."""
+        with self._shards_lock:
+            for _, shard in self._shards:
+                shard.pop(labels, None)
+            self._retired.pop(labels, None)
+        self._known.pop(labels, None)
+        self._touch()
+
+
+class Counter(_ShardedMetric):
+    """Monotonically increasing count, e.g. of requests."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, labels: Labels = ()) -> None:
+        """Add to the count of a label combination."""
+        if not self._admit(labels):
+            return
+        shard = self._shard()
+        values = shard.get(labels)
+        if values is None:
+            shard[labels] = [amount]
+        else:
+            values[0] += amount
+        self._touch()
+
+    def value(self, labels: Labels = ()) -> float:
+        """Get the current count of a label combination."""
+        return self._merged(1).get(labels, [0.0])[0]
+
+    def _samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(values[0])}"
+                for labels, values in sorted(self._merged(1).items())]
+
+
+class Histogram(_ShardedMetric):
+    """Distribution of observations in cumulative buckets, e.g. of request latency."""
+
+    kind = "histogram"
+
+    def __init__(self, registry: "MetricRegistry", name: str, documentation: str,
+                 labelnames: Sequence[str], buckets: Iterable[float] = LATENCY_BUCKETS) -> None:
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets: Tuple[float, ...] = tuple(sorted(buckets))
+
+    def observe(self, value: float, labels: Labels = ()) -> None:
+        """Record an observation for a label combination."""
+        if not self._admit(labels):
+            return
+        shard = self._shard()
+        values = shard.get(labels)
+        if values is None:
+            # One count per bucket plus +Inf, then the sum
+            values = shard[labels] = [0.0] * (len(self.buckets) + 2)
+        values[bisect.bisect_left(self.buckets, value)] += 1
+        values[-1] += value
+        self._touch()
+
+    def _samples(self) -> List[str]:
+        lines = []
+        bounds = [_format_value(bound) for bound in self.buckets] + ["+Inf"]
+        labelnames = self.labelnames + ("le",)
+        for labels, values in sorted(self._merged(len(self.buckets) + 2).items()):
+            cumulative = 0.0
+            for bound, count in zip(bounds, values):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(labelnames, labels + (bound,))} "
+                             f"{_format_value(cumulative)}")
+            suffix = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{suffix} {_format_value(values[-1])}")
+            lines.append(f"{self.name}_count{suffix} {_format_value(cumulative)}")
+        return lines
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, e.g. a temperature.
+
+    The exposition line of a series is rendered when its value changes, so
+    rendering a gauge with many series only joins the stored lines.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, registry: "MetricRegistry", name: str, documentation: str,
+                 labelnames: Sequence[str]) -> None:
+        super().__init__(registry, name, documentation, labelnames)
+        self._values: Dict[Labels, float] = {}
+        self._lines: Dict[Labels, str] = {}
+
+    def set(self, value: Optional[float], labels: Labels = ()) -> None:
+        """Set the value of a label combination; None removes the series."""
+        if value is None:
+            self.remove(labels)
+            return
+        value = float(value)
+        current = self._values.get(labels)
+        if current == value or (current is not None and current != current and value != value):
+            return
+        if current is None and not self._admit(labels):
+            return
+        self._values[labels] = value
+        self._lines[labels] = f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+        self._touch()
+
+    def value(self, labels: Labels = ()) -> Optional[float]:
+        """Get the value of a label combination, None if it is not set."""
+        return self._values.get(labels)
+
+    def remove(self, labels: Labels) -> None:
+        """Drop a series."""
+        self._lines.pop(labels, None)
+        if self._values.pop(labels, None) is not None:
+            self._touch()
+        self._known.pop(labels, None)
+
+    def _samples(self) -> List[str]:
+        return list(self._lines.copy().values())
+
+
+_M = TypeVar("_M", bound=_Metric)
+
+
+class MetricRegistry:
+    """Collection of metrics rendered together for one scrape endpoint."""
+
+    def __init__(self, max_series: int = DEFAULT_MAX_SERIES) -> None:
+        """Initialize an empty registry.
+
+        Args:
+            max_series: Maximum number of label combinations per metric
+        """
+        self.max_series: int = max_series
+        self.dropped: int = 0
+        self._metrics: Dict[str, _Metric] = {}
+        self._rendered: bytes = b""
+        self._rendered_version: int = -1
+        self._render_lock = threading.Lock()
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._metrics
+
+    def get(self, name: str) -> Optional[_Metric]:
+        """Get a registered metric by name."""
+        return self._metrics.get(name)
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Register a counter, or get the one registered under ``name``."""
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """Register a gauge, or get the one registered under ``name``."""
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Iterable[float] = LATENCY_BUCKETS) -> Histogram:
+        """Register a histogram, or get the one registered under ``name``."""
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = Histogram(self, name, documentation, labelnames, buckets)
+        return self._check(metric, Histogram, labelnames)
+
+    def render(self) -> bytes:
+        """Get the exposition text of all metrics.
+
+        The previous text is returned as is when no metric changed since,
+        and otherwise only changed metrics are rendered again.
+        """
+        with self._render_lock:
+            metrics = list(self._metrics.values())
+            version = max((metric.version for metric in metrics), default=0)
+            if version != self._rendered_version:
+                self._rendered = "".join(metric.render() for metric in metrics).encode("utf-8")
+                self._rendered_version = version
+            return self._rendered
+
+    def _register(self, cls: Type[_M], name: str, documentation: str, labelnames: Sequence[str]) -> _M:
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = cls(self, name, documentation, labelnames)
+        return self._check(metric, cls, labelnames)
+
+    @staticmethod
+    def _check(metric: _Metric, cls: Type[_M], labelnames: Sequence[str]) -> _M:
+        if not isinstance(metric, cls) or type(metric) is not cls or metric.labelnames != tuple(labelnames):
+            raise ValueError(f"Metric {metric.name} is already registered with a different type or labels")
+        return metric
+
+
+class ClientMetrics:
+    """Request and WebSocket metrics of the API clients.
+
+    Install an instance with :meth:`install` and every ``SystemairAPI``
+    request and ``SystemairWebSocket`` event is recorded in its registry.
+    """
+
+    def __init__(self, registry: MetricRegistry) -> None:
+        """Register the client metrics in a registry."""
+        self.registry = registry
+        self.request_duration = registry.histogram(
+            "systemair_api_request_duration_seconds", "Duration of Systemair API requests.", ("operation",))
+        self.requests = registry.counter(
+            "systemair_api_requests_total", "Systemair API requests by HTTP status (error: no response).",
+            ("operation", "status"))
+        self.rate_limited = registry.counter(
+            "systemair_api_rate_limited_total", "Systemair API requests rejected with 429 Too Many Requests.",
+            ("operation",))
+        self.websocket_connections = registry.counter(
+            "systemair_websocket_connections_total", "WebSocket connections opened.")
+        self.websocket_reconnects = registry.counter(
+            "systemair_websocket_reconnects_total", "WebSocket connections opened after the first one.")
+        self.websocket_messages = registry.counter(
+            "systemair_websocket_messages_total", "WebSocket messages received.")
+        self.websocket_errors = registry.counter(
+            "systemair_websocket_errors_total", "WebSocket errors.")
+
+    def install(self) -> None:
+        """Record the metrics of all API and WebSocket clients."""
+        # Imported here as the clients import this module
+        from systemair_api.api.systemair_api import SystemairAPI
+        from systemair_api.api.websocket_client import SystemairWebSocket
+
+        SystemairAPI.metrics = self
+        SystemairWebSocket.metrics = self
+
+    def uninstall(self) -> None:
+        """Stop recording client metrics, if this instance is installed."""
+        from systemair_api.api.systemair_api import SystemairAPI
+        from systemair_api.api.websocket_client import SystemairWebSocket
+
+        if SystemairAPI.metrics is self:
+            SystemairAPI.metrics = None
+        if SystemairWebSocket.metrics is self:
+            SystemairWebSocket.metrics = None
+
+    def record_request(self, operation: str, status: Optional[int], duration: float) -> None:
+        """Record a completed request.
+
+        Args:
+            operation: GraphQL operation, e.g. ``GetView``
+            status: HTTP status code, None if no response was received
+            duration: Seconds until the response (or failure)
+        """
+        labels = (operation,)
+        self.request_duration.observe(duration, labels)
+        self.requests.inc(1, (operation, "error" if status is None else str(status)))
+        if status == 429:
+            self.rate_limited.inc(1, labels)
+
+    def record_websocket_open(self) -> None:
+        """Record an opened WebSocket connection."""
+        if self.websocket_connections.value():
+            self.websocket_reconnects.inc()
+        self.websocket_connections.inc()
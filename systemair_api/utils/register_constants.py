@@ -1,5 +1,9 @@
 """Register constants for Systemair ventilation units."""
 
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
+
+
 class RegisterConstants:
     """Register constants used for reading and writing data to ventilation units."""
     REG_IAM_HEARTBEAT = 0
@@ -302,23 +306,98 @@ class RegisterConstants:
     @classmethod
     def get_register_name(cls, register_number: int) -> str:
         """Get the register name for a given register number."""
-        for attr, value in cls.__dict__.items():
-            if not attr.startswith("__") and value == register_number:
-                return attr
-        return f"UNKNOWN_REGISTER_{register_number}"
+        return register_name(register_number)
 
 
     @classmethod
     def get_register_name_by_number(cls, register_number: int) -> str:
         """Get the register name for a given register number."""
-        for attr, value in cls.__dict__.items():
-            if not attr.startswith("__") and value == register_number:
-                return attr
-        return f"UNKNOWN_REGISTER_{register_number}"
+        return register_name(register_number)
 
 
     @classmethod
     def get_register_name_without_prefix(cls, register_number: int) -> str:
         """Get the register name without the REG_MAINBOARD_ prefix."""
-        full_name = cls.get_register_name_by_number(register_number)
-        return full_name.replace("REG_MAINBOARD_", "")
+        return register_short_name(register_number)
+
+
+def _build_index() -> Tuple[Dict[int, str], Dict[str, int], Dict[int, str], Dict[str, Tuple[int, ...]]]:
+    """Build the register lookup tables from the RegisterConstants class attributes."""
+    names: Dict[int, str] = {}
+    ids: Dict[str, int] = {}
+    short_names: Dict[int, str] = {}
+    subsystems: Dict[str, List[int]] = {}
+    for attr, value in vars(RegisterConstants).items():
+        if not attr.startswith("REG_") or not isinstance(value, int):
+            continue
+        # Keep the first name for a number, matching the previous linear scan
+        if value not in names:
+            names[value] = attr
+            short_names[value] = attr.replace("REG_MAINBOARD_", "")
+            subsystems.setdefault(attr.split("_")[1], []).append(value)
+        ids[attr] = value
+    return names, ids, short_names, {key: tuple(values) for key, values in subsystems.items()}
+
+
+_names, _ids, _short_names, _subsystems = _build_index()
+
+# Read-only lookup tables, built once at import
+REGISTER_NAMES: Mapping[int, str] = MappingProxyType(_names)
+REGISTER_IDS: Mapping[str, int] = MappingProxyType(_ids)
+REGISTER_SHORT_NAMES: Mapping[int, str] = MappingProxyType(_short_names)
+REGISTER_SUBSYSTEMS: Mapping[str, Tuple[int, ...]] = MappingProxyType(_subsystems)
+_SHORT_NAME_IDS: Mapping[str, int] = MappingProxyType({name: number for number, name in _short_names.items()})
+_REGISTER_SUBSYSTEM: Mapping[int, str] = MappingProxyType(
+    {number: subsystem for subsystem, numbers in _subsystems.items() for number in numbers}
+)
+
+
+def register_name(register_number: int) -> str:
+    """Get the register name for a given register number.
+
+    Args:
+        register_number: The register number
+
+    Returns:
+        str: The constant name, or ``UNKNOWN_REGISTER_<n>`` if it is not known
+    """
+    name = REGISTER_NAMES.get(register_number)
+    return name if name is not None else f"UNKNOWN_REGISTER_{register_number}"
+
+
+def register_short_name(register_number: int) -> str:
+    """Get the register name without the REG_MAINBOARD_ prefix.
+
+    Args:
+        register_number: The register number
+
+    Returns:
+        str: The short name, or ``UNKNOWN_REGISTER_<n>`` if it is not known
+    """
+    name = REGISTER_SHORT_NAMES.get(register_number)
+    return name if name is not None else f"UNKNOWN_REGISTER_{register_number}"
+
+
+def register_number(name: str) -> Optional[int]:
+    """Get the register number for a full or REG_MAINBOARD_-stripped register name.
+
+    Args:
+        name: The register name, e.g. ``REG_MAINBOARD_TC_SP`` or ``TC_SP``
+
+    Returns:
+        int: The register number, or None if the name is not known
+    """
+    number = REGISTER_IDS.get(name)
+    return number if number is not None else _SHORT_NAME_IDS.get(name)
+
+
+def register_subsystem(register_number: int) -> Optional[str]:
+    """Get the subsystem a register belongs to.
+
+    Args:
+        register_number: The register number
+
+    Returns:
+        str: ``"MAINBOARD"`` or ``"IAM"``, or None if the register is not known
+    """
+    return _REGISTER_SUBSYSTEM.get(register_number)
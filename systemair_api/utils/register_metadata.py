@@ -0,0 +1,273 @@
+"""Register metadata catalog: scaling, units, limits and access mode per register."""
+
+from array import array
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from systemair_api.utils.exceptions import ValidationError
+from systemair_api.utils.register_constants import RegisterConstants, REGISTER_NAMES
+
+Number = Union[int, float]
+
+ACCESS_READ = 1
+ACCESS_WRITE = 2
+ACCESS_READ_WRITE = ACCESS_READ | ACCESS_WRITE
+
+DATA_TYPES: Tuple[str, ...] = ("int", "bool", "enum", "float")
+UNITS: Tuple[str, ...] = ("", "°C", "%", "ppm", "min", "h", "d", "Pa", "rpm", "l/s")
+
+# Flag bits stored per register in the catalog table
+_KNOWN = 1
+_READABLE = 2
+_WRITABLE = 4
+
+_NAN = float("nan")
+
+
+class RegisterMetadata(NamedTuple):
+    """Metadata of a single register.
+
+    Limits are in engineering units, i.e. after dividing the raw value by ``scale``.
+    """
+
+    register_id: int
+    name: str
+    scale: float
+    unit: str
+    minimum: Optional[float]
+    maximum: Optional[float]
+    access: int
+    data_type: str
+
+    @property
+    def readable(self) -> bool:
+        """Whether the register can be read."""
+        return bool(self.access & ACCESS_READ)
+
+    @property
+    def writable(self) -> bool:
+        """Whether the register can be written."""
+        return bool(self.access & ACCESS_WRITE)
+
+
+# (register, scale, unit, minimum, maximum, access, data type)
+_Definition = Tuple[int, float, str, Optional[float], Optional[float], int, str]
+
+_R = RegisterConstants
+_DEFINITIONS: List[_Definition] = [
+    (_R.REG_MAINBOARD_USERMODE_MODE_HMI, 1, "", 0, 6, ACCESS_READ, "enum"),
+    (_R.REG_MAINBOARD_USERMODE_HMI_CHANGE_REQUEST, 1, "", 1, 7, ACCESS_WRITE, "enum"),
+    (_R.REG_MAINBOARD_SPEED_INDICATION_APP, 1, "", 0, 7, ACCESS_READ, "enum"),
+    (_R.REG_MAINBOARD_TC_SP, 10, "°C", 12, 30, ACCESS_READ_WRITE, "float"),
+    (_R.REG_MAINBOARD_IAQ_LEVEL, 1, "", 0, 2, ACCESS_READ, "enum"),
+    (_R.REG_MAINBOARD_ECO_MODE_ON_OFF, 1, "", 0, 1, ACCESS_READ_WRITE, "bool"),
+    (_R.REG_MAINBOARD_LOCKED_USER, 1, "", 0, 1, ACCESS_READ, "bool"),
+    (_R.REG_MAINBOARD_SUW_REQUIRED, 1, "", 0, 1, ACCESS_READ, "bool"),
+    (_R.REG_MAINBOARD_UNIT_CONFIG_REHEATER_TYPE, 1, "", None, None, ACCESS_READ, "enum"),
+    (_R.REG_MAINBOARD_USERMODE_REMAINING_TIME_L, 1, "min", 0, None, ACCESS_READ, "int"),
+    (_R.REG_MAINBOARD_USERMODE_HOLIDAY_TIME, 1, "d", 1, 365, ACCESS_READ_WRITE, "int"),
+    (_R.REG_MAINBOARD_USERMODE_AWAY_TIME, 1, "h", 1, 72, ACCESS_READ_WRITE, "int"),
+    (_R.REG_MAINBOARD_USERMODE_FIREPLACE_TIME, 1, "min", 1, 60, ACCESS_READ_WRITE, "int"),
+    (_R.REG_MAINBOARD_USERMODE_REFRESH_TIME, 1, "min", 1, 240, ACCESS_READ_WRITE, "int"),
+    (_R.REG_MAINBOARD_USERMODE_CROWDED_TIME, 1, "h", 1, 8, ACCESS_READ_WRITE, "int"),
+    (_R.REG_MAINBOARD_ALARM_TYPE_A, 1, "", None, None, ACCESS_READ, "int"),
+    (_R.REG_MAINBOARD_ALARM_TYPE_B, 1, "", None, None, ACCESS_READ, "int"),
+    (_R.REG_MAINBOARD_ALARM_TYPE_C, 1, "", None, None, ACCESS_READ, "int"),
+    (_R.REG_MAINBOARD_SENSOR_RHS, 1, "%", 0, 100, ACCESS_READ, "int"),
+    (_R.REG_MAINBOARD_SENSOR_CO2S, 1, "ppm", 0, 10000, ACCESS_READ, "int"),
+    (_R.REG_MAINBOARD_SENSOR_RHS_PDM, 1, "%", 0, 100, ACCESS_READ, "int"),
+    (_R.REG_MAINBOARD_SENSOR_P_SAF, 1, "Pa", None, None, ACCESS_READ, "int"),
+    (_R.REG_MAINBOARD_SENSOR_P_EAF, 1, "Pa", None, None, ACCESS_READ, "int"),
+    (_R.REG_MAINBOARD_SENSOR_FLOW_SAF, 1, "l/s", None, None, ACCESS_READ, "int"),
+    (_R.REG_MAINBOARD_SENSOR_FLOW_EAF, 1, "l/s", None, None, ACCESS_READ, "int"),
+    (_R.REG_MAINBOARD_SENSOR_RPM_SAF, 1, "rpm", None, None, ACCESS_READ, "int"),
+    (_R.REG_MAINBOARD_SENSOR_RPM_EAF, 1, "rpm", None, None, ACCESS_READ, "int"),
+]
+# Temperature sensors report tenths of a degree
+_DEFINITIONS.extend(
+    (register_id, 10, "°C", -50, 100, ACCESS_READ, "float")
+    for register_id in (_R.REG_MAINBOARD_SENSOR_SAT, _R.REG_MAINBOARD_SENSOR_OAT, _R.REG_MAINBOARD_SENSOR_FPT,
+                        _R.REG_MAINBOARD_SENSOR_RAT, _R.REG_MAINBOARD_SENSOR_EAT, _R.REG_MAINBOARD_SENSOR_ECT,
+                        _R.REG_MAINBOARD_SENSOR_EFT, _R.REG_MAINBOARD_SENSOR_OHT)
+)
+_DEFINITIONS.extend(
+    (register_id, 1, "", 0, 1, ACCESS_READ, "bool")
+    for register_id in range(_R.REG_MAINBOARD_FUNCTION_ACTIVE_COOLING, _R.REG_MAINBOARD_FUNCTION_ACTIVE_CDI_3 + 1)
+)
+del _R
+
+
+class RegisterCatalog:
+    """Array-backed register metadata table.
+
+    Each attribute is stored in its own contiguous array indexed by register
+    id, so decoding or validating a value is a couple of array reads with no
+    per-register branching. The arrays support the buffer protocol and can be
+    wrapped without copying (e.g. ``numpy.frombuffer(catalog.scales, 'f8')``)
+    to decode whole batches with fancy indexing.
+
+    Registers without metadata decode with a scale of 1 and have no limits.
+    """
+
+    def __init__(self, definitions: Iterable[_Definition]) -> None:
+        """Build the table.
+
+        Args:
+            definitions: ``(register, scale, unit, minimum, maximum, access, data type)`` tuples
+        """
+        definitions = list(definitions)
+        size = max([max(REGISTER_NAMES, default=0)] + [d[0] for d in definitions]) + 1
+        self.size: int = size
+        self.scales: "array[float]" = array("d", [1.0]) * size
+        self.minimums: "array[float]" = array("d", [_NAN]) * size
+        self.maximums: "array[float]" = array("d", [_NAN]) * size
+        self.flags: "array[int]" = array("B", [0]) * size
+        self.units: "array[int]" = array("B", [0]) * size
+        self.data_types: "array[int]" = array("B", [0]) * size
+
+        for register_id, scale, unit, minimum, maximum, access, data_type in definitions:
+            self.scales[register_id] = float(scale)
+            self.minimums[register_id] = _NAN if minimum is None else float(minimum)
+            self.maximums[register_id] = _NAN if maximum is None else float(maximum)
+            self.flags[register_id] = (_KNOWN | (_READABLE if access & ACCESS_READ else 0)
+                                       | (_WRITABLE if access & ACCESS_WRITE else 0))
+            self.units[register_id] = UNITS.index(unit)
+            self.data_types[register_id] = DATA_TYPES.index(data_type)
+
+    def __contains__(self, register_id: object) -> bool:
+        return isinstance(register_id, int) and 0 <= register_id < self.size and bool(
+            self.flags[register_id] & _KNOWN)
+
+    def get(self, register_id: int) -> Optional[RegisterMetadata]:
+        """Get the metadata of a register.
+
+        Args:
+            register_id: The register id
+
+        Returns:
+            RegisterMetadata: The metadata, or None if the register is not catalogued
+        """
+        if register_id not in self:
+            return None
+        flags = self.flags[register_id]
+        minimum = self.minimums[register_id]
+        maximum = self.maximums[register_id]
+        return RegisterMetadata(
+            register_id=register_id,
+            name=REGISTER_NAMES.get(register_id, f"UNKNOWN_REGISTER_{register_id}"),
+            scale=self.scales[register_id],
+            unit=UNITS[self.units[register_id]],
+            minimum=None if minimum != minimum else minimum,
+            maximum=None if maximum != maximum else maximum,
+            access=(ACCESS_READ if flags & _READABLE else 0) | (ACCESS_WRITE if flags & _WRITABLE else 0),
+            data_type=DATA_TYPES[self.data_types[register_id]],
+        )
+
+    def scale(self, register_id: int) -> float:
+        """Get the factor the raw value of a register is divided by."""
+        return self.scales[register_id] if 0 <= register_id < self.size else 1.0
+
+    def unit(self, register_id: int) -> str:
+        """Get the unit of a register, or an empty string if it has none."""
+        return UNITS[self.units[register_id]] if 0 <= register_id < self.size else ""
+
+    def decode(self, register_id: int, raw: Number) -> Number:
+        """Convert a raw register value to engineering units.
+
+        Args:
+            register_id: The register id
+            raw: The value as reported by the device
+
+        Returns:
+            The scaled value; unscaled registers return ``raw`` unchanged
+        """
+        scale = self.scales[register_id] if 0 <= register_id < self.size else 1.0
+        return raw if scale == 1.0 else raw / scale
+
+    def decode_many(self, register_ids: Sequence[int], raws: Sequence[Number]) -> List[Number]:
+        """Decode a batch of raw values.
+
+        Args:
+            register_ids: The register ids
+            raws: The raw values, in the same order
+
+        Returns:
+            list: The decoded values
+        """
+        scales = self.scales
+        size = self.size
+        decoded = []
+        for register_id, raw in zip(register_ids, raws):
+            scale = scales[register_id] if 0 <= register_id < size else 1.0
+            decoded.append(raw if scale == 1.0 else raw / scale)
+        return decoded
+
+    def encode(self, register_id: int, value: Number) -> int:
+        """Convert a value in engineering units to the raw register value.
+
+        Args:
+            register_id: The register id
+            value: The value in engineering units
+
+        Returns:
+            int: The raw value to write
+        """
+        return int(round(value * self.scale(register_id)))
+
+    def validate(self, register_id: int, value: Number, write: bool = False) -> None:
+        """Check a value in engineering units against the register's limits.
+
+        Args:
+            register_id: The register id
+            value: The value in engineering units
+            write: Also require the register to be writable
+
+        Raises:
+            ValidationError: If the value is out of range or the register is read-only
+        """
+        if register_id not in self:
+            return
+        field = REGISTER_NAMES.get(register_id, f"register_{register_id}")
+        if write and not self.flags[register_id] & _WRITABLE:
+            raise ValidationError("Register is read-only", field=field)
+        minimum = self.minimums[register_id]
+        maximum = self.maximums[register_id]
+        if value < minimum or value > maximum:
+            raise ValidationError("Value out of range", field=field, value=value)
+
+    def validate_raw(self, register_id: int, raw: Number, write: bool = False) -> None:
+        """Check a raw register value against the register's limits.
+
+        Args:
+            register_id: The register id
+            raw: The raw register value
+            write: Also require the register to be writable
+
+        Raises:
+            ValidationError: If the value is out of range or the register is read-only
+        """
+        self.validate(register_id, self.decode(register_id, raw), write)
+
+
+REGISTER_CATALOG = RegisterCatalog(_DEFINITIONS)
+
+
+def get_register_metadata(register_id: int) -> Optional[RegisterMetadata]:
+    """Get the metadata of a register from the default catalog.
+
+    Args:
+        register_id: The register id
+
+    Returns:
+        RegisterMetadata: The metadata, or None if the register is not catalogued
+    """
+    return REGISTER_CATALOG.get(register_id)
+
+
+def catalogued_registers() -> Dict[int, RegisterMetadata]:
+    """Get the metadata of every catalogued register, keyed by register id."""
+    catalogued = {}
+    for register_id in range(REGISTER_CATALOG.size):
+        meta = REGISTER_CATALOG.get(register_id)
+        if meta is not None:
+            catalogued[register_id] = meta
+    return catalogued
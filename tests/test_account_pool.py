@@ -0,0 +1,155 @@
+import pytest
+from unittest.mock import patch
+from datetime import datetime, timedelta
+
+from systemair_api.api.account_pool import AccountPool, STATE_FAILED, STATE_HEALTHY, STATE_PENDING
+from systemair_api.auth.authenticator import SystemairAuthenticator
+from systemair_api.utils.exceptions import AuthenticationError, TokenRefreshError
+
+
+def fake_authenticate(self):
+    """Log in without network access, issuing a one hour token"""
+    if self.password == "wrong":
+        raise AuthenticationError("Login failed")
+    self.access_token = f"token-{self.email}"
+    self.refresh_token = "refresh"
+    self.token_expiry = datetime.now() + timedelta(hours=1)
+    return self.access_token
+
+
+class TestAccountPool:
+    @pytest.fixture
+    def pool(self):
+        """Create a pool with three accounts"""
+        pool = AccountPool(max_concurrency=4, refresh_margin=120, refresh_jitter=180)
+        for i in range(3):
+            pool.add_account(f"acct{i}", f"user{i}@example.com", "test_password")
+        return pool
+
+    def test_add_account(self, pool):
+        """Test that accounts share the pool's transport adapter"""
+        assert pool.account_ids() == ["acct0", "acct1", "acct2"]
+        for account_id in pool.account_ids():
+            account = pool.get_account(account_id)
+            assert account.state == STATE_PENDING
+            assert account.session.get_adapter("https://") is pool.adapter
+            assert account.authenticator.session.get_adapter("https://") is pool.adapter
+            assert 0 <= account.refresh_offset <= 180
+        with pytest.raises(ValueError):
+            pool.add_account("acct0", "dup@example.com", "pw")
+        with pytest.raises(AuthenticationError):
+            pool.get_api("acct0")
+
+    @patch.object(SystemairAuthenticator, 'authenticate', fake_authenticate)
+    def test_authenticate_all(self, pool):
+        """Test authenticating every account and recording failures"""
+        pool.add_account("broken", "broken@example.com", "wrong")
+
+        results = pool.authenticate_all()
+
+        assert results["acct0"] is None
+        assert isinstance(results["broken"], AuthenticationError)
+        api = pool.get_api("acct1")
+        assert api.access_token == "token-user1@example.com"
+        assert api.session is pool.get_account("acct1").session
+
+        health = pool.health()
+        assert health["acct0"]["state"] == STATE_HEALTHY
+        assert health["acct0"]["token_valid"] is True
+        assert health["broken"]["state"] == STATE_FAILED
+        assert health["broken"]["consecutive_failures"] == 1
+        assert health["broken"]["last_error"] == "Login failed"
+
+    @patch.object(SystemairAuthenticator, 'authenticate', fake_authenticate)
+    def test_refresh_due_is_staggered(self, pool):
+        """Test that only accounts inside their own refresh window are due"""
+        pool.authenticate_all()
+        assert pool.refresh_due() == []
+
+        for account_id in pool.account_ids():
+            account = pool.get_account(account_id)
+            account.refresh_offset = {"acct0": 0, "acct1": 100, "acct2": 170}[account_id]
+            account.authenticator.token_expiry = datetime.now() + timedelta(seconds=200)
+
+        assert pool.refresh_due() == ["acct1", "acct2"]
+
+    @patch.object(SystemairAuthenticator, 'authenticate', fake_authenticate)
+    def test_refresh_due_accounts(self, pool):
+        """Test refreshing due accounts, falling back to login if refresh fails"""
+        pool.authenticate_all()
+        for account_id in pool.account_ids():
+            pool.get_account(account_id).authenticator.token_expiry = datetime.now()
+
+        def refresh(self):
+            if self.email == "user2@example.com":
+                raise TokenRefreshError()
+            self.access_token = "refreshed"
+            self.token_expiry = datetime.now() + timedelta(hours=1)
+            return self.access_token
+
+        with patch.object(SystemairAuthenticator, 'refresh_access_token', refresh):
+            results = pool.refresh_due_accounts()
+
+        assert results == {"acct0": None, "acct1": None, "acct2": None}
+        assert pool.get_api("acct0").access_token == "refreshed"
+        assert pool.get_api("acct2").access_token == "token-user2@example.com"
+        assert pool.refresh_due() == []
+
+    @patch.object(SystemairAuthenticator, 'authenticate', fake_authenticate)
+    def test_failed_refresh_backs_off(self, pool):
+        """Test that failing accounts are retried with exponential backoff"""
+        pool.authenticate_all()
+        account = pool.get_account("acct0")
+        account.authenticator.token_expiry = datetime.now()
+
+        with patch.object(SystemairAuthenticator, 'refresh_access_token', side_effect=TokenRefreshError()), \
+                patch.object(SystemairAuthenticator, 'authenticate', side_effect=AuthenticationError("Login failed")):
+            assert isinstance(pool.refresh_due_accounts()["acct0"], AuthenticationError)
+            assert pool.refresh_due() == []
+            assert 0 < pool.health()["acct0"]["retry_in"] <= 30
+
+            account.next_attempt = 0
+            pool.refresh_due_accounts()
+            assert 30 < pool.health()["acct0"]["retry_in"] <= 60
+
+            account.consecutive_failures = 100
+            account.next_attempt = 0
+            pool.refresh_due_accounts()
+            assert 1790 < pool.health()["acct0"]["retry_in"] <= 1800
+
+        account.next_attempt = 0
+        assert pool.refresh_due() == ["acct0"]
+        assert pool.refresh_due_accounts() == {"acct0": None}
+        assert account.next_attempt is None
+        assert pool.health()["acct0"]["retry_in"] is None
+
+    @patch.object(SystemairAuthenticator, 'authenticate', fake_authenticate)
+    def test_unknown_expiry_is_not_refreshed_every_check(self, pool):
+        """Test that an account without a known token expiry waits between refreshes"""
+        pool.authenticate_all()
+        account = pool.get_account("acct1")
+        account.authenticator.token_expiry = None
+
+        assert pool.refresh_due() == ["acct1"]
+        with patch.object(SystemairAuthenticator, 'refresh_access_token', return_value="refreshed"):
+            assert pool.refresh_due_accounts() == {"acct1": None}
+
+        assert pool.refresh_due() == []
+        assert pool.health()["acct1"]["retry_in"] > 1790
+
+    def test_failed_login_is_retried(self, pool):
+        """Test that accounts whose first login failed are logged in again after their backoff"""
+        with patch.object(SystemairAuthenticator, 'authenticate', side_effect=AuthenticationError("Down")):
+            pool.authenticate_all()
+        assert pool.health()["acct0"]["state"] == STATE_FAILED
+        assert pool.refresh_due() == []
+
+        account = pool.get_account("acct0")
+        account.next_attempt = 0
+        with patch.object(SystemairAuthenticator, 'authenticate', fake_authenticate):
+            assert pool.refresh_due() == ["acct0"]
+            assert pool.refresh_due_accounts() == {"acct0": None}
+
+        assert pool.get_api("acct0").access_token == "token-user0@example.com"
+        assert pool.health()["acct0"]["state"] == STATE_HEALTHY
+        assert pool.refresh_due() == []
@@ -0,0 +1,57 @@
+import asyncio
+import time
+import pytest
+from unittest.mock import patch
+
+from systemair_api.auth.async_authenticator import (
+    AsyncSystemairAuthenticator,
+    authenticate_many,
+    create_pooled_adapter,
+)
+from systemair_api.auth.authenticator import SystemairAuthenticator
+from systemair_api.utils.exceptions import AuthenticationError
+
+
+class TestAsyncSystemairAuthenticator:
+    @pytest.fixture
+    def credentials(self):
+        """Credentials for several test accounts"""
+        return [(f"user{i}@example.com", "test_password") for i in range(10)]
+
+    def test_for_accounts_shares_adapter(self, credentials):
+        """Test that all accounts share one transport adapter but not cookies"""
+        adapter = create_pooled_adapter()
+        authenticators = AsyncSystemairAuthenticator.for_accounts(credentials, adapter)
+
+        assert [a.email for a in authenticators] == [email for email, _ in credentials]
+        sessions = [a.authenticator.session for a in authenticators]
+        assert all(s.get_adapter("https://sso.systemair.com") is adapter for s in sessions)
+        assert sessions[0].cookies is not sessions[1].cookies
+
+    @patch.object(SystemairAuthenticator, 'authenticate')
+    def test_authenticate(self, mock_authenticate):
+        """Test awaiting a single login"""
+        mock_authenticate.return_value = "test_access_token"
+        async_auth = AsyncSystemairAuthenticator(SystemairAuthenticator("test@example.com", "pw"))
+
+        assert asyncio.run(async_auth.authenticate()) == "test_access_token"
+        mock_authenticate.assert_called_once()
+
+    def test_authenticate_many_runs_concurrently(self, credentials):
+        """Test that logins overlap instead of running one after another"""
+        def slow_login(self):
+            time.sleep(0.2)
+            if self.email == "user3@example.com":
+                raise AuthenticationError("Login failed")
+            return f"token-{self.email}"
+
+        authenticators = AsyncSystemairAuthenticator.for_accounts(credentials)
+        with patch.object(SystemairAuthenticator, 'authenticate', slow_login):
+            start = time.monotonic()
+            results = asyncio.run(authenticate_many(authenticators, max_concurrency=10))
+            elapsed = time.monotonic() - start
+
+        assert elapsed < 1.0
+        assert results[0] == "token-user0@example.com"
+        assert isinstance(results[3], AuthenticationError)
+        assert results[9] == "token-user9@example.com"
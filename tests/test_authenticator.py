@@ -1,10 +1,12 @@
 import pytest
 import os
+import time
 from unittest.mock import Mock, patch, MagicMock
 from datetime import datetime, timedelta
 from bs4 import BeautifulSoup
 
 from systemair_api.auth.authenticator import SystemairAuthenticator
+from systemair_api.auth.token_claims import TokenClaims
 
 
 class TestSystemairAuthenticator:
@@ -74,7 +76,7 @@ class TestSystemairAuthenticator:
         mock_get.assert_called()
         mock_post.assert_called_once()
 
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_exchange_code_for_token(self, mock_post, mock_authenticator, mock_auth_response):
         """Test the exchange of authorization code for access token"""
         mock_post.return_value = mock_auth_response
@@ -90,8 +92,8 @@ class TestSystemairAuthenticator:
     @patch.object(SystemairAuthenticator, 'construct_auth_url')
     @patch.object(SystemairAuthenticator, 'simulate_login')
     @patch.object(SystemairAuthenticator, 'exchange_code_for_token')
-    @patch.object(SystemairAuthenticator, 'get_token_expiry')
-    def test_authenticate(self, mock_get_token_expiry, mock_exchange_code, mock_simulate_login, 
+    @patch.object(SystemairAuthenticator, 'get_token_claims')
+    def test_authenticate(self, mock_get_token_claims, mock_exchange_code, mock_simulate_login, 
                          mock_construct_auth_url, mock_generate_state, mock_authenticator):
         """Test the full authentication flow"""
         # Setup mocks
@@ -102,7 +104,7 @@ class TestSystemairAuthenticator:
             "access_token": "test_access_token",
             "refresh_token": "test_refresh_token"
         }
-        mock_get_token_expiry.return_value = datetime.now() + timedelta(hours=1)
+        mock_get_token_claims.return_value = TokenClaims(time.time() + 3600)
         
         # Call authenticate
         token = mock_authenticator.authenticate()
@@ -118,9 +120,9 @@ class TestSystemairAuthenticator:
         mock_construct_auth_url.assert_called_once_with("test_state")
         mock_simulate_login.assert_called_once_with("https://test_auth_url")
         mock_exchange_code.assert_called_once_with("test_auth_code")
-        mock_get_token_expiry.assert_called_once_with("test_access_token")
+        mock_get_token_claims.assert_called_once_with("test_access_token")
 
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_refresh_access_token(self, mock_post, mock_authenticator, mock_auth_response):
         """Test refreshing the access token"""
         # Setup
@@ -0,0 +1,239 @@
+import base64
+import json
+import time
+
+import pytest
+from unittest.mock import Mock, patch
+
+from systemair_api.api.poll_scheduler import PollScheduler
+from systemair_api.auth.authenticator import SystemairAuthenticator
+from systemair_api.daemon import MAX_AUTH_BACKOFF, STATE_DEGRADED, STATE_RUNNING, STATE_STOPPED, SystemairDaemon
+from systemair_api.exporter import PrometheusExporter
+from systemair_api.utils.constants import UserModes
+from systemair_api.utils.exceptions import (
+    APIError,
+    AuthenticationError,
+    DeviceNotFoundError,
+    TokenRefreshError,
+    ValidationError,
+)
+from systemair_api.utils.register_constants import RegisterConstants
+
+
+def setpoint_response(raw):
+    """Build a GetView response reporting a setpoint register value"""
+    return {"data": {"GetView": {"children": [
+        {"properties": {"dataItem": {"id": RegisterConstants.REG_MAINBOARD_TC_SP, "value": raw}}}]}}}
+
+
+def make_token(claims):
+    """Build an unsigned JWT carrying the given claims"""
+    def encode(data):
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).rstrip(b"=").decode()
+    return f"{encode({'alg': 'none', 'typ': 'JWT'})}.{encode(claims)}.signature"
+
+
+def wait_for(condition, timeout=5.0):
+    """Wait until a condition holds, failing the test on timeout"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "Timed out waiting for condition"
+        time.sleep(0.01)
+
+
+class TestSystemairDaemon:
+    @pytest.fixture
+    def api(self):
+        """Create a mock API client for an account with two units"""
+        api = Mock()
+        api.access_token = "token"
+        api.get_account_devices.return_value = {"data": {"GetAccountDevices": [
+            {"identifier": "IAM_1", "name": "Living room"},
+            {"identifier": "IAM_2", "name": "Bedroom"},
+        ]}}
+        api.fetch_device_status.return_value = setpoint_response(210)
+        api.write_data_item.return_value = {"data": {"WriteDataItems": True}}
+        return api
+
+    @pytest.fixture
+    def authenticator(self):
+        """Create a mock authenticator with a fresh token"""
+        authenticator = Mock()
+        authenticator.authenticate.return_value = "token"
+        authenticator.time_to_expiry.return_value = 3600.0
+        return authenticator
+
+    @pytest.fixture
+    def websocket_factory(self):
+        """Create a factory of mock WebSocket clients that record their message callback"""
+        factory = Mock()
+        factory.return_value.thread.is_alive.return_value = True
+        return factory
+
+    @pytest.fixture
+    def daemon(self, api, authenticator, websocket_factory, tmp_path):
+        """Create a daemon wired to the mocks"""
+        daemon = SystemairDaemon(authenticator, PollScheduler(requests_per_minute=600),
+                                 tick_interval=0.05, health_file=str(tmp_path / "health.json"),
+                                 websocket_factory=websocket_factory, api_factory=lambda token: api)
+        yield daemon
+        daemon.stop()
+
+    def test_start_polls_units_and_stops(self, daemon, api, websocket_factory, tmp_path):
+        """Test discovery, initial polls, streaming and graceful shutdown"""
+        daemon.start()
+        assert sorted(daemon.units) == ["IAM_1", "IAM_2"]
+        websocket_factory.assert_called_once_with("token", daemon._on_message)
+        api.broadcast_device_statuses.assert_called_once_with(["IAM_1", "IAM_2"])
+
+        wait_for(lambda: daemon.scheduler.stats()["polls"] == 2)
+        assert daemon.units["IAM_1"].temperatures["setpoint"] == 21.0
+        assert daemon.health()["state"] == STATE_RUNNING
+
+        daemon.stop()
+        websocket_factory.return_value.disconnect.assert_called_once()
+        health = json.loads((tmp_path / "health.json").read_text())
+        assert health["state"] == STATE_STOPPED
+        assert health["units"] == 2
+
+    def test_websocket_messages(self, daemon, api):
+        """Test that status updates reach their unit and postpone its polls"""
+        daemon.api = api
+        daemon.discover_units()
+        daemon._on_message({"type": "SYSTEM_EVENT", "action": "DEVICE_STATUS_UPDATE",
+                            "properties": {"id": "IAM_2", "co2": 800}})
+        daemon._on_message({"type": "SYSTEM_EVENT", "action": "DEVICE_STATUS_UPDATE",
+                            "properties": {"id": "IAM_9", "co2": 800}})
+
+        assert daemon.units["IAM_2"].co2 == 800
+        assert daemon.messages == 2
+        assert daemon.scheduler.freshness("IAM_2")["since_update"] is not None
+        assert daemon.scheduler.freshness("IAM_1")["since_update"] is None
+
+    def test_commands(self, daemon, api):
+        """Test that queued commands run against their unit"""
+        daemon.start()
+        future = daemon.submit("IAM_1", "set_user_mode", UserModes.AWAY)
+        assert future.result(timeout=5) is True
+        api.write_data_item.assert_called_with("IAM_1", RegisterConstants.REG_MAINBOARD_USERMODE_HMI_CHANGE_REQUEST,
+                                               UserModes.AWAY + 1)
+        assert daemon.units["IAM_1"].is_pending("user_mode")
+
+        failing = daemon.submit("IAM_2", "set_temperature", 999)
+        with pytest.raises(ValidationError):
+            failing.result(timeout=5)
+        wait_for(lambda: daemon.commands_failed == 1)
+        assert daemon.commands_done == 1
+
+        # Writes rejected by the API fail the command, too
+        api.write_data_item.return_value = {"data": {"WriteDataItems": False}}
+        rejected = daemon.submit("IAM_2", "set_temperature", 215)
+        with pytest.raises(APIError):
+            rejected.result(timeout=5)
+        wait_for(lambda: daemon.commands_failed == 2)
+        assert not daemon.units["IAM_2"].is_pending("temperatures.setpoint")
+
+        with pytest.raises(ValueError):
+            daemon.submit("IAM_1", "delete_everything")
+        with pytest.raises(DeviceNotFoundError):
+            daemon.submit("IAM_9", "set_temperature", 210)
+
+    def test_token_refresh(self, daemon, api, authenticator, websocket_factory):
+        """Test that tokens are renewed ahead of expiry, falling back to a login"""
+        daemon.api = api
+        authenticator.time_to_expiry.return_value = 60.0
+        authenticator.refresh_access_token.return_value = "refreshed"
+        daemon.tick(now=0.0)
+        api.update_token.assert_called_once_with("refreshed")
+        websocket_factory.assert_called_once_with("refreshed", daemon._on_message)
+
+        authenticator.refresh_access_token.side_effect = TokenRefreshError("Expired")
+        authenticator.authenticate.return_value = "logged-in"
+        daemon.tick(now=1.0)
+        api.update_token.assert_called_with("logged-in")
+
+    def test_authentication_backoff(self, daemon, api, authenticator):
+        """Test that failed logins are retried with backoff and degrade the daemon"""
+        daemon.api = api
+        daemon.state = STATE_RUNNING
+        authenticator.time_to_expiry.return_value = -1.0
+        authenticator.refresh_access_token.side_effect = TokenRefreshError("Expired")
+        authenticator.authenticate.side_effect = AuthenticationError("Down")
+
+        daemon.tick(now=0.0)
+        daemon.tick(now=1.0)
+        assert authenticator.authenticate.call_count == 1
+        assert daemon.state == STATE_DEGRADED
+        assert "Down" in daemon.last_error
+
+        daemon.tick(now=5.0)
+        assert authenticator.authenticate.call_count == 2
+
+    def test_token_without_expiry(self, api, websocket_factory):
+        """Test that a token without an expiry claim is not refreshed on every tick"""
+        authenticator = SystemairAuthenticator("test@example.com", "test_password")
+        token = make_token({"sub": "user"})
+
+        def login():
+            authenticator.access_token = token
+            authenticator.token_expiry = authenticator.get_token_expiry(token)
+            return token
+
+        daemon = SystemairDaemon(authenticator, PollScheduler(requests_per_minute=600), health_interval=3600,
+                                 websocket_factory=websocket_factory, api_factory=lambda token: api)
+        with patch.object(authenticator, "authenticate", side_effect=login), \
+                patch.object(authenticator, "refresh_access_token", side_effect=login) as refresh:
+            daemon.start()
+            try:
+                assert authenticator.time_to_expiry() is None
+                now = time.monotonic()
+                for t in range(10):
+                    daemon.tick(now=now + t)
+                refresh.assert_not_called()
+                assert websocket_factory.call_count == 1
+
+                daemon.tick(now=now + MAX_AUTH_BACKOFF + 1)
+                daemon.tick(now=now + MAX_AUTH_BACKOFF + 2)
+                refresh.assert_called_once()
+                assert websocket_factory.call_count == 2
+            finally:
+                daemon.stop()
+
+    def test_websocket_reconnect(self, daemon, api, websocket_factory):
+        """Test that a dropped WebSocket connection is restarted"""
+        daemon.api = api
+        daemon._connect_websocket("token")
+        daemon.tick(now=0.0)
+        assert websocket_factory.call_count == 1
+        websocket_factory.return_value.thread.is_alive.return_value = False
+        daemon.tick(now=10.0)
+        daemon.tick(now=10.5)
+        assert websocket_factory.call_count == 2
+        assert daemon.health()["websocket_failures"] == 1
+
+    def test_exporter(self, api, authenticator, websocket_factory):
+        """Test that discovered units are attached to the exporter"""
+        exporter = PrometheusExporter()
+        daemon = SystemairDaemon(authenticator, websocket_factory=websocket_factory, api_factory=lambda token: api,
+                                 exporter=exporter)
+        daemon.api = api
+        daemon.discover_units()
+        daemon._on_message({"type": "SYSTEM_EVENT", "action": "DEVICE_STATUS_UPDATE",
+                            "properties": {"id": "IAM_2", "co2": 800}})
+
+        text = exporter.render().decode()
+        assert "systemair_exporter_units 2" in text
+        assert 'systemair_co2_ppm{unit="IAM_2"} 800' in text
+
+    def test_unwritable_health_file(self, daemon, api, tmp_path, caplog):
+        """Test that a missing health directory is logged instead of failing ticks and shutdown"""
+        daemon.api = api
+        daemon.health_file = str(tmp_path / "missing" / "health.json")
+        daemon.tick(now=0.0)
+        daemon.stop()
+        assert "Failed to write health file" in caplog.text
+
+    def test_invalid_workers(self, authenticator):
+        """Test that worker counts must be positive"""
+        with pytest.raises(ValueError):
+            SystemairDaemon(authenticator, poll_workers=0)
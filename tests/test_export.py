@@ -0,0 +1,104 @@
+import datetime
+
+import pytest
+
+from systemair_api.models import export
+from systemair_api.models.changes import FieldChange
+from systemair_api.models.fleet import Fleet
+from systemair_api.models.history import HistoryStore
+from systemair_api.models.telemetry_log import TelemetryLog, TelemetryReader
+from systemair_api.models.ventilation_unit import VentilationUnit
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def _unit(identifier, **attributes):
+    unit = VentilationUnit(identifier, identifier)
+    for name, value in attributes.items():
+        setattr(unit, name, value)
+    return unit
+
+
+@pytest.fixture
+def fleet():
+    fleet = Fleet()
+    heating = _unit("IAM_1", user_mode=1, airflow=3, co2=850, eco_mode=True)
+    heating.temperatures["oat"] = 4.5
+    heating.active_functions["heating"] = True
+    fleet.add(heating, site="Oslo", updated_at=1700000000.25)
+    fleet.add(_unit("IAM_2", humidity=40))
+    return fleet
+
+
+class TestFleetExport:
+    def test_typed_columns(self, fleet):
+        """Test that fleet columns are exported with narrow types and nulls for missing values"""
+        table = pa.Table.from_batches(list(export.fleet_batches(fleet)))
+        assert table.schema == export.fleet_schema()
+        assert table.schema.field("user_mode").type == pa.int8()
+        assert table.schema.field("function_heating").type == pa.bool_()
+        rows = table.to_pylist()
+        assert rows[0]["identifier"] == "IAM_1"
+        assert rows[0]["site"] == "Oslo"
+        assert rows[0]["updated_at"] == datetime.datetime(2023, 11, 14, 22, 13, 20, 250000,
+                                                          tzinfo=datetime.timezone.utc)
+        assert (rows[0]["user_mode"], rows[0]["co2"], rows[0]["oat"], rows[0]["eco_mode"]) == (1, 850, 4.5, True)
+        assert rows[0]["function_heating"] and not rows[0]["function_cooling"]
+        assert rows[1]["site"] is None and rows[1]["updated_at"] is None
+        assert rows[1]["co2"] is None and rows[1]["oat"] is None and rows[1]["humidity"] == 40
+
+    def test_batches_and_units(self, fleet):
+        """Test that exports are split into batches and accept plain units"""
+        assert [batch.num_rows for batch in export.fleet_batches(list(fleet), batch_size=1, created_at=10.0)] == [1, 1]
+        batch = next(export.fleet_batches(list(fleet), created_at=10.0))
+        assert batch.column("updated_at").to_pylist()[1].timestamp() == 10.0
+        with pytest.raises(ValueError):
+            next(export.fleet_batches(fleet, batch_size=0))
+
+    @pytest.mark.parametrize("format", ["parquet", "arrow"])
+    def test_export_file(self, fleet, tmp_path, format):
+        """Test writing a fleet to Parquet and Arrow IPC files"""
+        path = str(tmp_path / f"fleet.{format}")
+        assert export.export_fleet(path, fleet, format=format) == 2
+        if format == "parquet":
+            table = pq.read_table(path)
+        else:
+            with pa.ipc.open_file(path) as reader:
+                table = reader.read_all()
+        assert table.column("identifier").to_pylist() == ["IAM_1", "IAM_2"]
+        assert [p.name for p in tmp_path.iterdir()] == [f"fleet.{format}"]
+
+    def test_unknown_format(self, fleet, tmp_path):
+        """Test that an unknown format is rejected without leaving files behind"""
+        with pytest.raises(ValueError):
+            export.export_fleet(str(tmp_path / "fleet.csv"), fleet, format="csv")
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestHistoryExport:
+    def test_telemetry_log(self, tmp_path):
+        """Test that telemetry samples are streamed into dictionary-encoded batches"""
+        with TelemetryLog(str(tmp_path / "log")) as log:
+            for t in range(5):
+                log.append("IAM_1", [FieldChange("co2", None, 800 + t, "websocket", 100.0 + t),
+                                     FieldChange("humidity", None, None, "api", 100.0 + t)])
+        batches = list(export.history_batches(TelemetryReader(str(tmp_path / "log")), start=101, batch_size=3))
+        assert [batch.num_rows for batch in batches] == [3, 3, 2]
+        table = pa.Table.from_batches(batches)
+        assert table.schema == export.history_schema()
+        row = table.to_pylist()[0]
+        assert (row["identifier"], row["field"], row["value"], row["source"]) == ("IAM_1", "co2", 801.0, "websocket")
+        assert row["timestamp"].timestamp() == 101.0
+        assert table.column("value").null_count == 4
+
+    def test_history_store(self, tmp_path):
+        """Test exporting the in-memory history of a single field"""
+        store = HistoryStore(capacity=8)
+        store.record("IAM_1", [FieldChange("co2", None, 900, "api", 1.0), FieldChange("airflow", None, 2, "api", 1.0)])
+        store.record("IAM_2", [FieldChange("co2", None, 700, "api", 2.0)])
+        path = str(tmp_path / "history.parquet")
+        assert export.export_history(path, store, field="co2") == 2
+        rows = pq.read_table(path).to_pylist()
+        assert [(row["identifier"], row["value"], row["source"]) for row in rows] == [
+            ("IAM_1", 900.0, None), ("IAM_2", 700.0, None)]
@@ -0,0 +1,96 @@
+from unittest.mock import patch
+from urllib.request import urlopen
+
+import pytest
+import requests
+
+from systemair_api.api.systemair_api import SystemairAPI
+from systemair_api.api.websocket_client import SystemairWebSocket
+from systemair_api.exporter import PrometheusExporter
+from systemair_api.models.ventilation_unit import VentilationUnit
+from systemair_api.utils.metrics import MetricRegistry
+from systemair_api.utils.register_constants import RegisterConstants
+
+HEATING = {"data": {"GetView": {"children": [
+    {"properties": {"dataItem": {"id": RegisterConstants.REG_MAINBOARD_FUNCTION_ACTIVE_HEATING, "value": 1}}}]}}}
+
+
+@pytest.fixture
+def exporter():
+    exporter = PrometheusExporter()
+    yield exporter
+    exporter.close()
+
+
+@pytest.fixture
+def unit(mock_websocket_data):
+    unit = VentilationUnit("IAM_123456789ABC", "Test Unit")
+    unit.update_from_websocket(mock_websocket_data["properties"])
+    return unit
+
+
+class TestPrometheusExporter:
+    def test_unit_metrics(self, exporter, unit):
+        """Test that attached units export their current state and later changes"""
+        exporter.attach(unit)
+        text = exporter.render().decode()
+        assert 'systemair_co2_ppm{unit="IAM_123456789ABC"} 650' in text
+        assert 'systemair_temperature_celsius{unit="IAM_123456789ABC",sensor="oat"} 15' in text
+        assert 'systemair_function_active{unit="IAM_123456789ABC",function="heating"} 0' in text
+        assert "systemair_exporter_units 1" in text
+
+        unit.update_from_websocket({"co2": 900})
+        unit.update_from_api(HEATING)
+        text = exporter.render().decode()
+        assert 'systemair_function_active{unit="IAM_123456789ABC",function="heating"} 1' in text
+        assert 'systemair_co2_ppm{unit="IAM_123456789ABC"} 900' in text
+        assert 'systemair_last_update_timestamp_seconds{unit="IAM_123456789ABC"}' in text
+
+        exporter.detach(unit)
+        assert "IAM_123456789ABC" not in exporter.render().decode()
+
+    def test_function_metrics_can_be_disabled(self, unit):
+        """Test that per-function series are left out with functions=False"""
+        exporter = PrometheusExporter(MetricRegistry(), functions=False, client_metrics=False)
+        exporter.attach(unit)
+        unit.update_from_api(HEATING)
+        assert b'function="' not in exporter.render()
+        assert SystemairAPI.metrics is None
+
+    @patch("requests.post")
+    def test_client_metrics(self, mock_post, exporter, mock_response, mock_device_status_response):
+        """Test that API requests, 429s and WebSocket events are recorded"""
+        api = SystemairAPI("token")
+        mock_post.return_value = mock_device_status_response
+        api.fetch_device_status("IAM_1")
+        mock_post.return_value = mock_response({}, status_code=429)
+        with pytest.raises(Exception):
+            api.fetch_device_status("IAM_1")
+        mock_post.side_effect = requests.exceptions.ConnectionError("down")
+        with pytest.raises(Exception):
+            api.get_account_devices()
+
+        ws = SystemairWebSocket("token", lambda data: None)
+        ws.on_open(None)
+        ws.on_open(None)
+        ws.on_message(None, "{}")
+
+        text = exporter.render().decode()
+        assert 'systemair_api_requests_total{operation="GetView",status="200"} 1' in text
+        assert 'systemair_api_requests_total{operation="GetView",status="429"} 1' in text
+        assert 'systemair_api_requests_total{operation="GetAccountDevices",status="error"} 1' in text
+        assert 'systemair_api_rate_limited_total{operation="GetView"} 1' in text
+        assert 'systemair_api_request_duration_seconds_count{operation="GetView"} 2' in text
+        assert "systemair_websocket_reconnects_total 1" in text
+        assert "systemair_websocket_messages_total 1" in text
+
+        exporter.close()
+        assert SystemairAPI.metrics is None and SystemairWebSocket.metrics is None
+
+    def test_serve(self, exporter, unit):
+        """Test scraping the HTTP endpoint"""
+        exporter.attach(unit)
+        _, port = exporter.serve(0, "127.0.0.1")
+        with urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+            assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            assert b'systemair_co2_ppm{unit="IAM_123456789ABC"} 650' in response.read()
@@ -0,0 +1,193 @@
+import math
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+from unittest.mock import patch
+
+from systemair_api.models import fleet as fleet_module
+from systemair_api.models.fleet import MISSING_INT, Fleet
+from systemair_api.models.ventilation_unit import VentilationUnit
+from systemair_api.utils.exceptions import DeviceNotFoundError
+from systemair_api.utils.register_constants import RegisterConstants
+
+
+def status_message(device_id, **properties):
+    """Build a DEVICE_STATUS_UPDATE WebSocket message"""
+    return {"type": "SYSTEM_EVENT", "action": "DEVICE_STATUS_UPDATE", "properties": dict(properties, id=device_id)}
+
+
+@pytest.fixture(params=["python", "numpy"])
+def backend(request):
+    """Run each test with and without NumPy"""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+        yield request.param
+    else:
+        with patch.object(fleet_module, "np", None):
+            yield request.param
+
+
+class TestFleet:
+    @pytest.fixture
+    def fleet(self, backend):
+        """Create a fleet of four units on two sites, three of them with data"""
+        fleet = Fleet()
+        for i in range(4):
+            fleet.add(VentilationUnit(f"IAM_{i}", f"Unit {i}"), site="oslo" if i < 2 else "bergen")
+        fleet.update_from_websocket(status_message("IAM_0", co2=900, activeAlarms=False, temperatures={"oat": 5.0}))
+        fleet.update_from_websocket(status_message("IAM_1", co2=1400, activeAlarms=True, temperatures={"oat": 7.0}))
+        fleet.update_from_websocket(status_message("IAM_2", co2=1100, activeAlarms=False, temperatures={"oat": 12.0}))
+        return fleet
+
+    def test_add(self, fleet):
+        """Test that existing unit state is copied into the columns"""
+        unit = VentilationUnit("IAM_X", "Existing")
+        unit.airflow = 3
+        unit.active_functions["heating"] = True
+        fleet.add(unit)
+
+        assert len(fleet) == 5
+        assert "IAM_X" in fleet
+        assert fleet.column("airflow")[4] == 3
+        assert fleet.with_function("heating") == ["IAM_X"]
+        assert fleet.site_of("IAM_X") is None
+        with pytest.raises(ValueError):
+            fleet.add(VentilationUnit("IAM_X", "Duplicate"))
+
+    def test_columns_follow_updates(self, fleet):
+        """Test that API and WebSocket updates are mirrored into the columns"""
+        fleet.update_from_api("IAM_3", {"data": {"GetView": {"children": [
+            {"properties": {"dataItem": {"id": RegisterConstants.REG_MAINBOARD_TC_SP, "value": 215}}}]}}})
+
+        assert fleet.column("setpoint")[3] == 21.5
+        assert fleet.column("co2")[0] == 900
+        assert fleet.column("co2")[3] == MISSING_INT
+        assert math.isnan(fleet.column("oat")[3])
+        assert fleet.get("IAM_1").co2 == 1400
+
+    def test_update_unknown_unit(self, fleet):
+        """Test that messages about units outside the fleet are ignored"""
+        assert fleet.update_from_websocket(status_message("IAM_9", co2=500)) == []
+        with pytest.raises(DeviceNotFoundError):
+            fleet.update_from_api("IAM_9", {})
+
+    def test_filter(self, fleet):
+        """Test comparisons, missing values and site restriction"""
+        assert fleet.filter("co2", ">", 1000) == ["IAM_1", "IAM_2"]
+        assert fleet.filter("co2", "<", 1000) == ["IAM_0"]
+        assert fleet.filter("co2", ">", 1000, site="bergen") == ["IAM_2"]
+        assert fleet.filter("co2", ">", 1000, site="trondheim") == []
+        assert fleet.with_alarms() == ["IAM_1"]
+        with pytest.raises(ValueError):
+            fleet.filter("co2", "~", 1)
+        with pytest.raises(ValueError):
+            fleet.filter("unknown", ">", 1)
+
+    def test_aggregate(self, fleet):
+        """Test fleet-wide and per-site aggregates"""
+        assert fleet.aggregate("oat") == pytest.approx(8.0)
+        assert fleet.aggregate("co2", "max") == 1400
+        assert fleet.aggregate("co2", "count") == 3
+        assert fleet.aggregate("oat", "mean", by_site=True) == {"oslo": pytest.approx(6.0), "bergen": 12.0}
+        assert fleet.aggregate("co2", "min", by_site=True) == {"oslo": 900, "bergen": 1100}
+        assert fleet.aggregate("humidity") is None
+        with pytest.raises(ValueError):
+            fleet.aggregate("co2", "median")
+
+    def test_top_k(self, fleet):
+        """Test top-k in both directions, skipping missing values"""
+        assert fleet.top_k("co2", 2) == [("IAM_1", 1400), ("IAM_2", 1100)]
+        assert fleet.top_k("oat", 5, largest=False) == [("IAM_0", 5.0), ("IAM_1", 7.0), ("IAM_2", 12.0)]
+        assert fleet.top_k("co2", 0) == []
+
+    def test_stale(self, fleet):
+        """Test that units without recent changes are reported as stale"""
+        updated_at = fleet.column("updated_at")[0]
+        assert fleet.stale(60, now=updated_at + 1) == ["IAM_3"]
+        assert fleet.stale(60, now=updated_at + 120) == ["IAM_0", "IAM_1", "IAM_2", "IAM_3"]
+
+    def test_remove(self, fleet):
+        """Test that removing a unit keeps the remaining rows consistent"""
+        unit = fleet.remove("IAM_0")
+        assert unit.identifier == "IAM_0"
+        assert fleet.identifiers() == ["IAM_3", "IAM_1", "IAM_2"]
+        assert fleet.filter("co2", ">", 0) == ["IAM_1", "IAM_2"]
+        assert fleet.site_of("IAM_3") == "bergen"
+
+        # The removed unit no longer feeds the fleet
+        unit.update_from_websocket({"co2": 2000})
+        assert fleet.top_k("co2", 1) == [("IAM_1", 1400)]
+        with pytest.raises(DeviceNotFoundError):
+            fleet.remove("IAM_0")
+
+    def test_sites(self, fleet):
+        """Test site labels"""
+        assert fleet.sites() == ["oslo", "bergen"]
+        fleet.set_site("IAM_0", "bergen")
+        fleet.set_site("IAM_1", None)
+        assert fleet.sites() == ["bergen"]
+        assert fleet.aggregate("co2", "count", by_site=True) == {"bergen": 2, None: 1}
+
+    def test_add_many(self, fleet):
+        """Test adding several units in one call"""
+        units = [VentilationUnit(f"IAM_B{i}", f"Batch {i}") for i in range(3)]
+        fleet.add_many(units, sites=["oslo", None, "tromso"], updated_at=[100.0, None, 200.0])
+
+        assert fleet.identifiers()[-3:] == ["IAM_B0", "IAM_B1", "IAM_B2"]
+        assert fleet.site_of("IAM_B2") == "tromso"
+        assert fleet.column("updated_at")[4] == 100.0
+        with pytest.raises(ValueError):
+            fleet.add_many([VentilationUnit("IAM_C", "C"), VentilationUnit("IAM_C", "C again")])
+        with pytest.raises(ValueError):
+            fleet.add_many([VentilationUnit("IAM_D", "D")], sites=[])
+        assert "IAM_C" not in fleet and "IAM_D" not in fleet
+
+    def test_import_is_lazy(self):
+        """Test that importing the package loads neither NumPy nor pyarrow"""
+        code = "import sys, systemair_api.models; print('numpy' in sys.modules, 'pyarrow' in sys.modules)"
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+
+        assert result.stdout.split() == ["False", "False"]
+
+    def test_concurrent_updates_and_queries(self, fleet):
+        """Test that units can be added, removed and updated while other threads query"""
+        errors = []
+        stop = threading.Event()
+
+        def run(func):
+            try:
+                while not stop.is_set():
+                    func()
+            except Exception as e:
+                errors.append(e)
+                stop.set()
+
+        def churn():
+            fleet.add_many([VentilationUnit(f"IAM_X{i}", f"Extra {i}") for i in range(50)])
+            for i in range(50):
+                fleet.remove(f"IAM_X{i}")
+
+        def query():
+            fleet.filter("co2", ">", 1000)
+            fleet.top_k("co2", 2)
+            fleet.aggregate("oat", "mean", by_site=True)
+            fleet.table(["co2"])
+
+        def update():
+            fleet.update_from_websocket(status_message("IAM_3", co2=800, temperatures={"oat": 1.0}))
+            fleet.update_from_websocket(status_message("IAM_3", co2=700, temperatures={"oat": 2.0}))
+
+        threads = [threading.Thread(target=run, args=(func,)) for func in (churn, query, query, update)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.5)
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert len(fleet) == 4
+        assert fleet.column("co2")[3] in (700, 800)
@@ -0,0 +1,105 @@
+import math
+from unittest.mock import Mock, patch
+
+import pytest
+
+from systemair_api.models.changes import FieldChange
+from systemair_api.models.history import HistoryStore, RingBuffer
+from systemair_api.models.ventilation_unit import VentilationUnit
+from systemair_api.utils.register_constants import RegisterConstants
+
+
+class TestRingBuffer:
+    def test_wraps_around(self):
+        """Test that a full buffer overwrites its oldest samples"""
+        buffer = RingBuffer(4)
+        for t in range(6):
+            buffer.append(float(t), t * 10)
+        assert len(buffer) == 4
+        timestamps, values = buffer.range()
+        assert list(timestamps) == [2.0, 3.0, 4.0, 5.0]
+        assert list(values) == [20.0, 30.0, 40.0, 50.0]
+        assert buffer.latest() == (5.0, 50.0)
+
+    def test_range(self):
+        """Test half-open time ranges across the wrap-around point"""
+        buffer = RingBuffer(5)
+        for t in range(8):
+            buffer.append(float(t), float(t))
+        assert list(buffer.range(4.0, 6.0)[0]) == [4.0, 5.0]
+        assert list(buffer.range(start=6.0)[1]) == [6.0, 7.0]
+        assert list(buffer.range(end=1.0)[0]) == []
+        assert list(buffer.range(7.5, 3.0)[0]) == []
+
+    def test_rejects_out_of_order_samples(self):
+        """Test that samples older than the newest one are dropped"""
+        buffer = RingBuffer(4)
+        assert buffer.append(10.0, 1)
+        assert not buffer.append(5.0, 2)
+        assert buffer.append(10.0, None)
+        assert len(buffer) == 2
+        assert math.isnan(buffer.latest()[1])
+
+    def test_downsample(self):
+        """Test bucketed aggregates, skipping missing values and empty buckets"""
+        buffer = RingBuffer(16)
+        for t, value in [(0, 1.0), (30, 3.0), (60, None), (150, 10.0), (170, 20.0)]:
+            buffer.append(float(t), value)
+        assert buffer.downsample(60) == [(0.0, 2.0), (120.0, 15.0)]
+        assert buffer.downsample(60, aggregate="max") == [(0.0, 3.0), (120.0, 20.0)]
+        assert buffer.downsample(60, start=100.0, aggregate="count") == [(120.0, 2.0)]
+        with pytest.raises(ValueError):
+            buffer.downsample(0)
+        with pytest.raises(ValueError):
+            buffer.downsample(60, aggregate="median")
+
+
+class TestHistoryStore:
+    @staticmethod
+    def setpoint_response(raw):
+        """Build a GetView response reporting a setpoint register value"""
+        return {"data": {"GetView": {"children": [
+            {"properties": {"dataItem": {"id": RegisterConstants.REG_MAINBOARD_TC_SP, "value": raw}}}]}}}
+
+    def test_records_device_updates(self):
+        """Test that API and WebSocket updates feed the history, local writes do not"""
+        store = HistoryStore(capacity=8)
+        unit = VentilationUnit("IAM_1", "Unit")
+        store.attach(unit)
+        unit.update_from_websocket({"co2": 800, "model": "VTR 300", "temperatures": {"oat": 4.5}})
+        unit.update_from_api({"data": {"GetView": {"children": [
+            {"properties": {"dataItem": {"id": RegisterConstants.REG_MAINBOARD_TC_SP, "value": 215}}}]}}})
+        unit._set_local_field("co2", "co2", 900)
+
+        assert [value for _, value in store.range("IAM_1", "co2")] == [800]
+        assert [value for _, value in store.range("IAM_1", "temperatures.setpoint")] == [21.5]
+        assert store.series("IAM_1", "model") is None
+        assert store.identifiers() == ["IAM_1"]
+        assert store.memory_usage() == 3 * 8 * 16
+
+        store.detach(unit, forget=True)
+        unit.update_from_websocket({"co2": 1000})
+        assert store.range("IAM_1", "co2") == []
+
+    @patch.object(VentilationUnit, 'set_value', return_value=True)
+    def test_records_confirmed_writes(self, mock_set_value):
+        """Test that a write confirmed by the device is recorded, though the optimistic value is not"""
+        store = HistoryStore()
+        unit = VentilationUnit("IAM_1", "Unit")
+        store.attach(unit)
+        unit.update_from_api(self.setpoint_response(200))
+        unit.set_temperature(Mock(), 215)
+        assert [value for _, value in store.range("IAM_1", "temperatures.setpoint")] == [20.0]
+
+        unit.update_from_api(self.setpoint_response(215))
+        assert [value for _, value in store.range("IAM_1", "temperatures.setpoint")] == [20.0, 21.5]
+        assert not unit.pending_writes()
+
+    def test_downsample(self):
+        """Test downsampled reads through the store"""
+        store = HistoryStore(fields=["co2"])
+        store.record("IAM_1", [FieldChange("co2", None, value, "websocket", float(t))
+                               for t, value in [(0, 600), (20, 800), (70, 1000)]])
+        assert store.downsample("IAM_1", "co2", 60) == [(0.0, 700.0), (60.0, 1000.0)]
+        assert store.downsample("IAM_2", "co2", 60) == []
+        assert store.range("IAM_1", "co2", start=10.0) == [(20.0, 800), (70.0, 1000)]
@@ -0,0 +1,34 @@
+import pytest
+
+from systemair_api.testing.loadgen import LoadGenerator, format_reports, percentiles
+
+
+class TestLoadGenerator:
+    def test_percentiles(self):
+        """Test summarizing latency samples"""
+        summary = percentiles([float(i) for i in range(100, 0, -1)])
+        assert summary == {"p50": 51.0, "p95": 96.0, "p99": 100.0, "max": 100.0}
+        assert percentiles([]) == {}
+
+    def test_invalid_options(self):
+        """Test that an empty fleet or window is rejected"""
+        with pytest.raises(ValueError):
+            LoadGenerator(units=0)
+        with pytest.raises(ValueError):
+            LoadGenerator(duration=0)
+
+    @pytest.mark.parametrize("separate_process", [False, True])
+    def test_run(self, separate_process):
+        """Test measuring polling and WebSocket ingest of a small fleet"""
+        generator = LoadGenerator(units=20, message_rate=100, poll_rate=50, poll_interval=0.5, duration=1.0,
+                                  warmup=0.5, separate_process=separate_process)
+        report = generator.run()
+
+        assert report.units == 20 and report.duration >= 1.0
+        assert report.messages > 0 and report.messages_sent > 0
+        assert 0 <= report.update_latency["p50"] <= report.update_latency["max"] < 1.0
+        assert report.polls > 0 and report.poll_errors == 0 and report.poll_latency["p99"] < 1.0
+        assert report.changes > 0 and report.cpu_time > 0
+        assert (report.server_cpu_time is not None) == separate_process
+        assert report.as_dict()["messages_per_second"] == report.messages_per_second
+        assert format_reports([report]).splitlines()[1].split()[0] == "20"
@@ -0,0 +1,43 @@
+import logging
+
+from systemair_api.utils.log import LOGGER_NAME, disable_queue_logging, enable_queue_logging, get_logger
+
+
+class ListHandler(logging.Handler):
+    """Collect formatted records in a list"""
+
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(self.format(record))
+
+
+class TestQueueLogging:
+    def test_get_logger(self):
+        """Test package and subsystem logger names"""
+        assert get_logger().name == LOGGER_NAME
+        assert get_logger("api").name == "systemair_api.api"
+        assert get_logger("api").parent is get_logger()
+
+    def test_package_has_null_handler(self):
+        """Test that importing the package installs a NullHandler"""
+        import systemair_api  # noqa: F401
+        assert any(isinstance(handler, logging.NullHandler) for handler in get_logger().handlers)
+
+    def test_records_reach_handlers(self):
+        """Test that subsystem records are written by the listener and the handler is detached"""
+        handler = ListHandler()
+        logger = get_logger()
+        level = logger.level
+        listener = enable_queue_logging(handler, level=logging.INFO)
+        try:
+            get_logger("models.ventilation_unit").info("Temperature set to %.1f°C for %s", 21.5, "Unit")
+            get_logger("api").debug("Not enabled: %s", "skipped")
+        finally:
+            disable_queue_logging(listener)
+            logger.setLevel(level)
+
+        assert handler.messages == ["Temperature set to 21.5°C for Unit"]
+        assert listener.queue_handler not in logger.handlers
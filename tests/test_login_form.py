@@ -0,0 +1,84 @@
+import pytest
+from unittest.mock import patch, MagicMock
+
+from systemair_api.auth.authenticator import SystemairAuthenticator
+from systemair_api.auth.login_form import parse_login_form, parse_login_form_bs4
+from systemair_api.utils.exceptions import AuthenticationError
+
+
+LOGIN_PAGE = """
+<html><body>
+<input type="hidden" name="outside_form" value="ignored" />
+<form id="kc-form-login" action="https://sso.systemair.com/auth/login?session_code=abc&amp;tab_id=xyz" method="post">
+    <input type="text" name="username" value="" />
+    <input type="password" name="password">
+    <input type="checkbox" name="rememberMe">
+    <input type="hidden" name="credentialId" />
+    <input type="submit" name="login" value="Sign In" />
+    <input type="submit" value="Unnamed" />
+</form>
+<form action="https://example.com/other"><input name="other" value="1"></form>
+</body></html>
+"""
+
+
+class TestLoginForm:
+    def test_parse_login_form(self):
+        """Test extracting the first form with the stdlib parser"""
+        action, inputs = parse_login_form(LOGIN_PAGE)
+
+        assert action == "https://sso.systemair.com/auth/login?session_code=abc&tab_id=xyz"
+        assert inputs == [
+            ("username", ""),
+            ("password", ""),
+            ("rememberMe", ""),
+            ("credentialId", ""),
+            ("login", "Sign In"),
+        ]
+
+    def test_parse_login_form_matches_bs4(self):
+        """Test that the fast path and the BeautifulSoup fallback agree"""
+        assert parse_login_form(LOGIN_PAGE) == parse_login_form_bs4(LOGIN_PAGE.encode())
+
+    def test_parse_login_form_without_form(self):
+        """Test that pages without a usable form return None"""
+        assert parse_login_form("<html><body>No form</body></html>") is None
+        assert parse_login_form("<form><input name='a'></form>") is None
+        assert parse_login_form_bs4(b"<html><body>No form</body></html>") is None
+
+    @patch('systemair_api.auth.authenticator.parse_login_form_bs4')
+    @patch('systemair_api.auth.authenticator.parse_login_form')
+    @patch('requests.Session.get')
+    @patch('requests.Session.post')
+    def test_simulate_login_falls_back_to_bs4(self, mock_post, mock_get, mock_parse,
+                                              mock_parse_bs4, mock_response):
+        """Test that simulate_login uses BeautifulSoup when the fast path fails"""
+        mock_parse.return_value = None
+        mock_parse_bs4.return_value = ("https://sso.systemair.com/auth/login",
+                                       [("username", ""), ("password", "")])
+        mock_post_response = MagicMock()
+        mock_post_response.status_code = 302
+        mock_post_response.headers = {"Location": "https://callback"}
+        mock_post.return_value = mock_post_response
+        mock_redirect = MagicMock()
+        mock_redirect.status_code = 200
+        mock_redirect.url = "https://homesolutions.systemair.com?code=test_auth_code&state=s"
+        mock_get.side_effect = [mock_response({}, content=b"<html></html>"), mock_redirect]
+
+        auth = SystemairAuthenticator("test@example.com", "test_password")
+        assert auth.simulate_login("https://test_auth_url") == "test_auth_code"
+
+        mock_parse_bs4.assert_called_once_with(b"<html></html>")
+        assert mock_post.call_args[1]["data"] == {
+            "username": "test@example.com",
+            "password": "test_password",
+        }
+
+    @patch('requests.Session.get')
+    def test_simulate_login_without_form(self, mock_get, mock_response):
+        """Test that a page without a login form raises AuthenticationError"""
+        mock_get.return_value = mock_response({}, content=b"<html><body></body></html>")
+
+        auth = SystemairAuthenticator("test@example.com", "test_password")
+        with pytest.raises(AuthenticationError):
+            auth.simulate_login("https://test_auth_url")
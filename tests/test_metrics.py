@@ -0,0 +1,106 @@
+import threading
+
+import pytest
+
+from systemair_api.utils.metrics import MetricRegistry
+
+
+class TestMetricRegistry:
+    def test_render(self):
+        """Test the exposition text of counters, gauges and histograms"""
+        registry = MetricRegistry()
+        requests = registry.counter("requests_total", "Requests.", ("status",))
+        temperature = registry.gauge("temperature_celsius", "Temperature.", ("unit",))
+        latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+        requests.inc(labels=("200",))
+        requests.inc(2, labels=("200",))
+        temperature.set(21.5, ("IAM_1",))
+        temperature.set(4, ('IAM_"2"',))
+        latency.observe(0.05)
+        latency.observe(0.5)
+        latency.observe(3)
+
+        assert registry.render().decode() == "\n".join([
+            "# HELP requests_total Requests.",
+            "# TYPE requests_total counter",
+            'requests_total{status="200"} 3',
+            "# HELP temperature_celsius Temperature.",
+            "# TYPE temperature_celsius gauge",
+            'temperature_celsius{unit="IAM_1"} 21.5',
+            'temperature_celsius{unit="IAM_\\"2\\""} 4',
+            "# HELP latency_seconds Latency.",
+            "# TYPE latency_seconds histogram",
+            'latency_seconds_bucket{le="0.1"} 1',
+            'latency_seconds_bucket{le="1"} 2',
+            'latency_seconds_bucket{le="+Inf"} 3',
+            "latency_seconds_sum 3.55",
+            "latency_seconds_count 3",
+        ]) + "\n"
+
+    def test_rerenders_only_on_change(self):
+        """Test that unchanged metrics reuse their rendered text"""
+        registry = MetricRegistry()
+        gauge = registry.gauge("co2_ppm", "CO2.", ("unit",))
+        gauge.set(800, ("IAM_1",))
+        first = registry.render()
+        version = gauge.version
+        gauge.set(800, ("IAM_1",))
+        assert gauge.version == version
+        assert registry.render() is first
+        gauge.set(None, ("IAM_1",))
+        assert b"IAM_1" not in registry.render()
+
+    def test_series_limit(self):
+        """Test that label combinations beyond the limit are dropped and counted"""
+        registry = MetricRegistry(max_series=2)
+        gauge = registry.gauge("humidity_percent", "Humidity.", ("unit",))
+        for index in range(4):
+            gauge.set(40, (f"IAM_{index}",))
+        assert gauge.value(("IAM_1",)) == 40
+        assert gauge.value(("IAM_2",)) is None
+        assert registry.dropped == 2
+        gauge.remove(("IAM_0",))
+        gauge.set(41, ("IAM_3",))
+        assert gauge.value(("IAM_3",)) == 41
+        with pytest.raises(ValueError):
+            gauge.set(1, ())
+
+    def test_registration(self):
+        """Test that metrics are shared by name and conflicting definitions are rejected"""
+        registry = MetricRegistry()
+        counter = registry.counter("events_total", "Events.")
+        assert registry.counter("events_total", "Events.") is counter
+        assert "events_total" in registry
+        with pytest.raises(ValueError):
+            registry.gauge("events_total", "Events.")
+
+    def test_concurrent_increments(self):
+        """Test that increments from many threads are not lost"""
+        registry = MetricRegistry()
+        counter = registry.counter("messages_total", "Messages.")
+
+        def work():
+            for _ in range(10000):
+                counter.inc()
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert counter.value() == 80000
+
+    def test_finished_threads_are_folded(self):
+        """Test that the shards of finished threads are merged instead of piling up"""
+        registry = MetricRegistry()
+        counter = registry.counter("reconnects_total", "Reconnects.", ("kind",))
+        for _ in range(50):
+            thread = threading.Thread(target=counter.inc, args=(1.0, ("websocket",)))
+            thread.start()
+            thread.join()
+        counter.inc(labels=("websocket",))
+
+        assert len(counter._shards) == 1
+        assert counter.value(("websocket",)) == 51
+        assert 'reconnects_total{kind="websocket"} 51' in registry.render().decode()
+        counter.remove(("websocket",))
+        assert counter.value(("websocket",)) == 0
@@ -0,0 +1,101 @@
+import queue
+import time
+
+import pytest
+
+from systemair_api.api.systemair_api import SystemairAPI
+from systemair_api.api.websocket_client import SystemairWebSocket
+from systemair_api.auth.authenticator import SystemairAuthenticator
+from systemair_api.models.ventilation_unit import VentilationUnit
+from systemair_api.testing import (DEFAULT_EMAIL, DEFAULT_PASSWORD, FaultProfile, MockSystemairServer,
+                                   SimulatedBackend)
+from systemair_api.utils.constants import APIEndpoints, UserModes
+from systemair_api.utils.exceptions import (APIError, AuthenticationError, DeviceNotFoundError, RateLimitError,
+                                            ValidationError)
+
+
+@pytest.fixture
+def server():
+    with MockSystemairServer(SimulatedBackend(units=50, seed=1), seed=1) as server:
+        yield server
+
+
+@pytest.fixture
+def api(server):
+    return SystemairAPI(SystemairAuthenticator(DEFAULT_EMAIL, DEFAULT_PASSWORD).authenticate())
+
+
+class TestMockSystemairServer:
+    def test_login_and_refresh(self, server):
+        """Test the SSO login flow, token refresh and restoring the endpoints"""
+        authenticator = SystemairAuthenticator(DEFAULT_EMAIL, DEFAULT_PASSWORD)
+        token = authenticator.authenticate()
+        assert authenticator.is_token_valid()
+        assert authenticator.refresh_access_token() != token
+        assert server.stats["logins"] == 1 and server.stats["tokens"] == 2
+
+        with pytest.raises(AuthenticationError):
+            SystemairAuthenticator(DEFAULT_EMAIL, "wrong").authenticate()
+
+        server.uninstall()
+        assert APIEndpoints.GATEWAY == "https://homesolutions.systemair.com/gateway/api"
+
+    def test_graphql_operations(self, server, api):
+        """Test discovering units, reading their view and writing registers"""
+        devices = api.get_account_devices()["data"]["GetAccountDevices"]
+        assert len(devices) == 50
+        unit = VentilationUnit(devices[0]["identifier"], devices[0]["name"])
+        assert unit.update_from_api(api.fetch_device_status(unit.identifier))
+        assert unit.user_mode in (UserModes.AUTO, UserModes.MANUAL)
+
+        unit.set_user_mode(api, UserModes.AWAY)
+        unit.update_from_api(api.fetch_device_status(unit.identifier))
+        assert unit.user_mode == UserModes.AWAY and not unit.pending_writes()
+
+        with pytest.raises(ValidationError):
+            api.write_data_item(unit.identifier, 32, 999)
+        with pytest.raises(DeviceNotFoundError):
+            api.fetch_device_status("IAM_UNKNOWN")
+
+    def test_fault_injection(self, server, api):
+        """Test injected rate limiting, server errors and expired tokens"""
+        server.faults = FaultProfile(rate_limit=1.0, retry_after=7)
+        with pytest.raises(RateLimitError) as excinfo:
+            api.get_account_devices()
+        assert excinfo.value.retry_after == 7
+
+        server.faults = FaultProfile(failure_rate=1.0)
+        with pytest.raises(APIError):
+            api.get_account_devices()
+
+        server.faults = FaultProfile()
+        server.expire_tokens()
+        with pytest.raises(APIError):
+            api.get_account_devices()
+        assert server.stats["rate_limited"] == 1 and server.stats["failed"] == 1
+        assert server.stats["unauthorized"] == 1
+
+    def test_streaming(self, server, api):
+        """Test that broadcasts and drift are streamed over the WebSocket"""
+        received = queue.Queue()
+        websocket = SystemairWebSocket(api.access_token, received.put)
+        websocket.connect()
+        try:
+            deadline = time.monotonic() + 5
+            while server.stream_count() == 0 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            identifiers = [device["identifier"] for device in api.get_account_devices()["data"]["GetAccountDevices"]]
+            api.broadcast_device_statuses(identifiers[:10])
+            # Broadcasts are streamed after the response, so wait for them before drifting
+            messages = [received.get(timeout=5) for _ in range(10)]
+            assert server.drift(identifiers=[identifiers[0]]) == 1
+            messages.append(received.get(timeout=5))
+        finally:
+            # A close from the server ends the client's read loop right away
+            assert server.close_streams() == 1
+            websocket.thread.join(5)
+
+        assert [message["properties"]["id"] for message in messages] == identifiers[:10] + identifiers[:1]
+        unit = VentilationUnit(identifiers[0], "Unit 1")
+        assert unit.update_from_websocket(messages[0])
+        assert unit.co2 == messages[0]["properties"]["co2"]
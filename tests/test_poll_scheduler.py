@@ -0,0 +1,127 @@
+import math
+
+import pytest
+from unittest.mock import Mock
+
+from systemair_api.api.poll_scheduler import PollScheduler
+from systemair_api.models.ventilation_unit import VentilationUnit
+from systemair_api.utils.exceptions import APIError, RateLimitError
+from systemair_api.utils.register_constants import RegisterConstants
+
+
+def setpoint_response(raw):
+    """Build a GetView response reporting a setpoint register value"""
+    return {"data": {"GetView": {"children": [
+        {"properties": {"dataItem": {"id": RegisterConstants.REG_MAINBOARD_TC_SP, "value": raw}}}]}}}
+
+
+class TestPollScheduler:
+    @pytest.fixture
+    def scheduler(self):
+        """Create a scheduler with three units at time 0"""
+        scheduler = PollScheduler(requests_per_minute=6, burst=3, min_interval=10, max_interval=600,
+                                  clock=lambda: 0.0)
+        for identifier in ("IAM_1", "IAM_2", "IAM_3"):
+            scheduler.add(identifier, now=0.0)
+        return scheduler
+
+    def test_new_units_are_due(self, scheduler):
+        """Test that new units are polled at once, within the burst"""
+        assert scheduler.due(now=0.0) == ["IAM_1", "IAM_2", "IAM_3"]
+        # Handed-out units are not returned again and the budget is spent
+        scheduler.add("IAM_4", now=0.0)
+        assert scheduler.due(now=0.0) == []
+        assert scheduler.next_due_in(now=0.0) == pytest.approx(10.0)
+        assert scheduler.due(now=10.0) == ["IAM_4"]
+
+    def test_intervals_follow_change_rate(self, scheduler):
+        """Test that changing units are polled often and idle units rarely"""
+        for identifier in scheduler.due(now=0.0):
+            scheduler.record_poll(identifier, 20, now=0.0)
+        # The change rate is unknown after a single observation
+        assert scheduler.interval("IAM_1") == 10
+
+        for t in range(10, 200, 10):
+            scheduler.record_update("IAM_1", 2, now=float(t))
+        scheduler.record_poll("IAM_2", 0, now=300.0)
+
+        assert scheduler.interval("IAM_1") == 10
+        assert scheduler.interval("IAM_2") == 600
+        freshness = scheduler.freshness("IAM_1", now=195.0)
+        assert freshness["since_change"] == 5.0 and freshness["due_in"] == 5.0
+
+    def test_websocket_updates_postpone_polls(self, scheduler):
+        """Test that units kept fresh by other updates are not polled"""
+        for identifier in scheduler.due(now=0.0):
+            scheduler.record_poll(identifier, 20, now=0.0)
+        for t in range(100, 1300, 100):
+            scheduler.record_update("IAM_1", 0, now=float(t))
+        assert scheduler.due(now=1250.0) == ["IAM_2", "IAM_3"]
+
+    def test_updates_do_not_reschedule_polls_in_flight(self, scheduler):
+        """Test that a unit handed out for polling is not handed out again before its poll is reported"""
+        assert scheduler.due(limit=1, now=0.0) == ["IAM_1"]
+        scheduler.record_update("IAM_1", 1, now=5.0)
+        assert scheduler.freshness("IAM_1", now=5.0)["in_flight"] is True
+
+        assert scheduler.due(now=100.0) == ["IAM_2", "IAM_3"]
+        assert "IAM_1" not in scheduler.due(now=200.0)
+
+        scheduler.record_poll("IAM_1", 0, now=200.0)
+        assert scheduler.freshness("IAM_1", now=200.0)["in_flight"] is False
+        assert scheduler.due(now=800.0) == ["IAM_1"]
+        scheduler.record_failure("IAM_1", now=800.0)
+        assert scheduler.freshness("IAM_1", now=800.0)["due_in"] == 10
+
+    def test_budget(self):
+        """Test that the token bucket limits the request rate"""
+        scheduler = PollScheduler(requests_per_minute=60, burst=2, min_interval=1, max_interval=1,
+                                  clock=lambda: 0.0)
+        for i in range(10):
+            scheduler.add(f"IAM_{i}", now=0.0)
+        assert len(scheduler.due(now=0.0)) == 2
+        assert scheduler.due(now=0.5) == []
+        assert len(scheduler.due(now=1.0)) == 1
+        assert len(scheduler.due(now=100.0, limit=1)) == 1
+
+    def test_failures_back_off(self, scheduler):
+        """Test exponential backoff of failing units and pausing on rate limits"""
+        scheduler.due(now=0.0)
+        scheduler.record_failure("IAM_1", now=0.0)
+        assert scheduler.freshness("IAM_1", now=0.0)["due_in"] == 10
+        scheduler.record_failure("IAM_1", now=0.0)
+        assert scheduler.freshness("IAM_1", now=0.0)["due_in"] == 20
+
+        scheduler.record_failure("IAM_2", retry_after=120, now=0.0)
+        assert scheduler.due(now=60.0) == []
+        assert scheduler.next_due_in(now=60.0) == 60.0
+
+    def test_poll(self, scheduler):
+        """Test fetching and applying the status of due units"""
+        units = {identifier: VentilationUnit(identifier, identifier) for identifier in ("IAM_1", "IAM_2")}
+        api = Mock()
+        api.fetch_device_status.side_effect = [setpoint_response(215), APIError("Boom"),
+                                               RateLimitError(retry_after=30)]
+
+        results = scheduler.poll(api, units)
+        assert list(results) == ["IAM_1"]
+        assert results["IAM_1"][0].new == 21.5
+        assert units["IAM_1"].temperatures["setpoint"] == 21.5
+        # IAM_3 has no unit and is skipped without a request
+        assert api.fetch_device_status.call_count == 2
+        stats = scheduler.stats()
+        assert stats["polls"] == 1 and stats["failures"] == 2
+
+    def test_remove(self, scheduler):
+        """Test that removed units are never handed out"""
+        scheduler.remove("IAM_2")
+        assert "IAM_2" not in scheduler
+        assert scheduler.due(now=0.0) == ["IAM_1", "IAM_3"]
+        assert math.isinf(PollScheduler().next_due_in())
+
+    def test_invalid_configuration(self):
+        """Test that impossible budgets and intervals are rejected"""
+        with pytest.raises(ValueError):
+            PollScheduler(requests_per_minute=0)
+        with pytest.raises(ValueError):
+            PollScheduler(min_interval=60, max_interval=30)
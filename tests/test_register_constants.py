@@ -0,0 +1,54 @@
+import pytest
+
+from systemair_api.utils.register_constants import (
+    REGISTER_IDS,
+    REGISTER_NAMES,
+    REGISTER_SUBSYSTEMS,
+    RegisterConstants,
+    register_name,
+    register_number,
+    register_short_name,
+    register_subsystem,
+)
+
+
+class TestRegisterConstants:
+    def test_index_matches_class_attributes(self):
+        """Test that the index covers every register constant in both directions"""
+        constants = {name: value for name, value in vars(RegisterConstants).items()
+                     if name.startswith("REG_")}
+        assert dict(REGISTER_IDS) == constants
+        for name, value in constants.items():
+            assert REGISTER_NAMES[value] == name
+
+    def test_lookups(self):
+        """Test the name and number lookups"""
+        assert register_name(32) == "REG_MAINBOARD_TC_SP"
+        assert register_short_name(32) == "TC_SP"
+        assert register_short_name(RegisterConstants.REG_IAM_UPTIME) == "REG_IAM_UPTIME"
+        assert register_number("REG_MAINBOARD_TC_SP") == 32
+        assert register_number("TC_SP") == 32
+        assert register_number("NOT_A_REGISTER") is None
+
+    def test_unknown_register(self):
+        """Test lookups of unknown register numbers"""
+        assert register_name(99999) == "UNKNOWN_REGISTER_99999"
+        assert register_short_name(99999) == "UNKNOWN_REGISTER_99999"
+        assert register_subsystem(99999) is None
+
+    def test_subsystems(self):
+        """Test grouping registers by subsystem"""
+        assert set(REGISTER_SUBSYSTEMS) == {"IAM", "MAINBOARD"}
+        assert RegisterConstants.REG_IAM_HEARTBEAT in REGISTER_SUBSYSTEMS["IAM"]
+        assert register_subsystem(RegisterConstants.REG_MAINBOARD_SENSOR_OAT) == "MAINBOARD"
+
+    def test_classmethods(self):
+        """Test that the RegisterConstants classmethods use the index"""
+        assert RegisterConstants.get_register_name(54) == "REG_MAINBOARD_SENSOR_OAT"
+        assert RegisterConstants.get_register_name_by_number(54) == "REG_MAINBOARD_SENSOR_OAT"
+        assert RegisterConstants.get_register_name_without_prefix(54) == "SENSOR_OAT"
+
+    def test_index_is_read_only(self):
+        """Test that the shared mappings cannot be modified"""
+        with pytest.raises(TypeError):
+            REGISTER_NAMES[32] = "OTHER"
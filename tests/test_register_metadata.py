@@ -0,0 +1,64 @@
+import pytest
+
+from systemair_api.utils.exceptions import ValidationError
+from systemair_api.utils.register_constants import RegisterConstants
+from systemair_api.utils.register_metadata import (
+    ACCESS_READ,
+    REGISTER_CATALOG,
+    RegisterCatalog,
+    catalogued_registers,
+    get_register_metadata,
+)
+
+
+class TestRegisterCatalog:
+    def test_get_metadata(self):
+        """Test looking up the metadata of a register"""
+        meta = get_register_metadata(RegisterConstants.REG_MAINBOARD_TC_SP)
+
+        assert meta.name == "REG_MAINBOARD_TC_SP"
+        assert meta.scale == 10.0
+        assert meta.unit == "°C"
+        assert (meta.minimum, meta.maximum) == (12.0, 30.0)
+        assert meta.readable and meta.writable
+        assert meta.data_type == "float"
+
+        meta = get_register_metadata(RegisterConstants.REG_MAINBOARD_ALARM_TYPE_A)
+        assert meta.minimum is None and meta.maximum is None
+        assert not meta.writable
+
+    def test_uncatalogued_register(self):
+        """Test that registers without metadata decode unchanged"""
+        register_id = RegisterConstants.REG_MAINBOARD_PASSWD_ADMIN
+        assert register_id not in REGISTER_CATALOG
+        assert get_register_metadata(register_id) is None
+        assert get_register_metadata(100000) is None
+        assert REGISTER_CATALOG.decode(register_id, 42) == 42
+        assert REGISTER_CATALOG.decode(100000, 42) == 42
+        REGISTER_CATALOG.validate(register_id, -1000)
+
+    def test_decode_and_encode(self):
+        """Test scaling between raw and engineering units"""
+        assert REGISTER_CATALOG.decode(RegisterConstants.REG_MAINBOARD_SENSOR_OAT, -55) == -5.5
+        assert REGISTER_CATALOG.encode(RegisterConstants.REG_MAINBOARD_TC_SP, 21.5) == 215
+        assert REGISTER_CATALOG.decode_many(
+            [RegisterConstants.REG_MAINBOARD_TC_SP, RegisterConstants.REG_MAINBOARD_USERMODE_MODE_HMI],
+            [210, 3],
+        ) == [21.0, 3]
+
+    def test_validate(self):
+        """Test range and access validation"""
+        REGISTER_CATALOG.validate_raw(RegisterConstants.REG_MAINBOARD_TC_SP, 210, write=True)
+        with pytest.raises(ValidationError):
+            REGISTER_CATALOG.validate_raw(RegisterConstants.REG_MAINBOARD_TC_SP, 400)
+        with pytest.raises(ValidationError):
+            REGISTER_CATALOG.validate(RegisterConstants.REG_MAINBOARD_USERMODE_AWAY_TIME, 0)
+        with pytest.raises(ValidationError):
+            REGISTER_CATALOG.validate(RegisterConstants.REG_MAINBOARD_USERMODE_MODE_HMI, 1, write=True)
+
+    def test_custom_catalog(self):
+        """Test building a catalog from custom definitions"""
+        catalog = RegisterCatalog([(5, 100, "%", 0, 1, ACCESS_READ, "float")])
+        assert catalog.decode(5, 50) == 0.5
+        assert catalog.unit(5) == "%"
+        assert len(catalogued_registers()) > 0
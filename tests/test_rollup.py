@@ -0,0 +1,93 @@
+from unittest.mock import Mock, patch
+
+import pytest
+
+from systemair_api.models.changes import FieldChange
+from systemair_api.models.rollup import Rollup, RollupEngine, RollupSeries
+from systemair_api.models.telemetry_log import TelemetrySample
+from systemair_api.models.ventilation_unit import VentilationUnit
+
+
+class TestRollupSeries:
+    def test_buckets(self):
+        """Test that samples are aggregated into buckets aligned to the resolution"""
+        series = RollupSeries(60, 10)
+        for timestamp, value in ((0, 5.0), (30, 1.0), (59, 3.0), (125, 7.0)):
+            series.add(float(timestamp), value)
+        assert series.range() == [Rollup(0.0, 3, 3.0, 1.0, 5.0, 3.0), Rollup(120.0, 1, 7.0, 7.0, 7.0, 7.0)]
+        assert series.latest() == Rollup(120.0, 1, 7.0, 7.0, 7.0, 7.0)
+        assert [rollup.start for rollup in series.range(start=60)] == [120.0]
+
+    def test_late_samples(self):
+        """Test that late samples update their own bucket and keep the last value by time"""
+        series = RollupSeries(60, 3)
+        series.add(100.0, 1.0)
+        series.add(200.0, 2.0)
+        assert series.add(90.0, 4.0)
+        assert series.add(130.0, 8.0)
+        assert [(rollup.start, rollup.samples, rollup.last) for rollup in series.range()] == [
+            (60.0, 2, 1.0), (120.0, 1, 8.0), (180.0, 1, 2.0)]
+        series.add(300.0, 0.0)
+        assert not series.add(10.0, 0.0)
+        assert [rollup.start for rollup in series.range()] == [120.0, 180.0, 300.0]
+
+    def test_capacity(self):
+        """Test that only the newest buckets are kept"""
+        series = RollupSeries(60, 2)
+        for minute in range(5):
+            series.add(minute * 60.0, float(minute))
+        assert [rollup.mean for rollup in series.range()] == [3.0, 4.0]
+        with pytest.raises(ValueError):
+            RollupSeries(0, 2)
+
+
+class TestRollupEngine:
+    def test_records_device_updates(self):
+        """Test that API and WebSocket changes are rolled up at every resolution"""
+        engine = RollupEngine({60: 10, 3600: 2})
+        unit = VentilationUnit("IAM_1", "Unit")
+        engine.attach(unit)
+        unit.update_from_websocket({"co2": 800})
+        unit.update_from_websocket({"co2": 1000, "model": "VTR 300"})
+        unit._set_local_field("co2", "co2", 5000)
+
+        hourly = engine.latest("IAM_1", "co2", 3600)
+        assert (hourly.samples, hourly.min, hourly.max, hourly.mean, hourly.last) == (2, 800.0, 1000.0, 900.0, 1000.0)
+        assert sum(rollup.samples for rollup in engine.query("IAM_1", "co2", 60)) == 2
+        assert engine.query("IAM_1", "model", 60) == []
+        with pytest.raises(ValueError):
+            engine.query("IAM_1", "co2", 900)
+
+        engine.detach(unit, forget=True)
+        unit.update_from_websocket({"co2": 1200})
+        assert engine.identifiers() == []
+
+    @patch.object(VentilationUnit, 'set_value', return_value=True)
+    def test_records_confirmed_writes(self, mock_set_value):
+        """Test that a write confirmed by the device is rolled up, though the optimistic value is not"""
+        engine = RollupEngine({3600: 2})
+        unit = VentilationUnit("IAM_1", "Unit")
+        engine.attach(unit)
+        unit.update_from_websocket({"temperatures": {"setpoint": 20.0}})
+        unit.set_temperature(Mock(), 215)
+        assert engine.latest("IAM_1", "temperatures.setpoint", 3600).last == 20.0
+
+        unit.update_from_websocket({"temperatures": {"setpoint": 21.5}})
+        hourly = engine.latest("IAM_1", "temperatures.setpoint", 3600)
+        assert (hourly.samples, hourly.min, hourly.max, hourly.last) == (2, 20.0, 21.5, 21.5)
+
+    def test_backfill(self):
+        """Test replaying stored samples, skipping missing values and local writes"""
+        engine = RollupEngine({900: 4})
+        added = engine.backfill([
+            TelemetrySample(0.0, "IAM_1", "temperatures.oat", 4.0, "api"),
+            TelemetrySample(600.0, "IAM_1", "temperatures.oat", 6.0, "websocket"),
+            TelemetrySample(700.0, "IAM_1", "temperatures.oat", None, "api"),
+            TelemetrySample(800.0, "IAM_1", "temperatures.oat", 9.0, "local"),
+            TelemetrySample(950.0, "IAM_1", "temperatures.oat", 8.0, "api"),
+        ])
+        assert added == 3
+        assert engine.query("IAM_1", "temperatures.oat", 900) == [
+            Rollup(0.0, 2, 5.0, 4.0, 6.0, 6.0), Rollup(900.0, 1, 8.0, 8.0, 8.0, 8.0)]
+        engine.record("IAM_1", [FieldChange("temperatures.oat", 8.0, 2.0, "api", 960.0)])
+        assert engine.latest("IAM_1", "temperatures.oat", 900).min == 2.0
@@ -0,0 +1,154 @@
+import struct
+
+import pytest
+
+from systemair_api.models.fleet import Fleet
+from systemair_api.models.snapshot import (
+    SNAPSHOT_VERSION,
+    Snapshot,
+    load_snapshot,
+    save_snapshot,
+)
+from systemair_api.models.ventilation_unit import VentilationUnit
+
+
+def make_unit(identifier):
+    """Create a unit with a mix of field types set"""
+    unit = VentilationUnit(identifier, f"Unit {identifier}")
+    unit.update_from_websocket({
+        "model": "VTR 300",
+        "activeAlarms": True,
+        "airflow": 3,
+        "connectivity": ["online", "cloud"],
+        "temperatures": {"oat": 4.5, "setpoint": 21.0},
+        "versions": [{"type": "mb", "version": "1.2.3"}],
+    })
+    unit.active_functions["heating"] = True
+    unit.user_mode_times["away"] = 600
+    return unit
+
+
+class TestSnapshot:
+    @pytest.fixture
+    def fleet(self):
+        """Create a fleet of three units on two sites"""
+        fleet = Fleet()
+        fleet.add(make_unit("IAM_1"), site="oslo")
+        fleet.add(make_unit("IAM_2"), site="bergen")
+        fleet.add(VentilationUnit("IAM_3", "Never updated"))
+        fleet.update_from_websocket({"properties": {"id": "IAM_1", "co2": 650}})
+        fleet.update_from_websocket({"properties": {"id": "IAM_2", "co2": 1300}})
+        return fleet
+
+    def test_fleet_round_trip(self, fleet, tmp_path):
+        """Test that unit state, sites and update times survive a snapshot"""
+        path = str(tmp_path / "fleet.snap")
+        assert save_snapshot(path, fleet) == 3
+
+        restored = load_snapshot(path)
+        assert restored.identifiers() == fleet.identifiers()
+        for unit in fleet:
+            assert restored.get(unit.identifier).get_status() == unit.get_status()
+            assert restored.site_of(unit.identifier) == fleet.site_of(unit.identifier)
+        assert list(restored.column("updated_at")[:2]) == list(fleet.column("updated_at")[:2])
+        assert restored.filter("co2", ">", 1000) == ["IAM_2"]
+        assert restored.with_function("heating") == ["IAM_1", "IAM_2"]
+
+    def test_restored_units_keep_tracking_changes(self, fleet, tmp_path):
+        """Test that restored units still feed the fleet columns"""
+        path = str(tmp_path / "fleet.snap")
+        save_snapshot(path, fleet)
+        restored = load_snapshot(path)
+
+        restored.update_from_websocket({"properties": {"id": "IAM_3", "co2": 2000}})
+        assert restored.top_k("co2", 1) == [("IAM_3", 2000)]
+
+    def test_units_round_trip_types(self, tmp_path):
+        """Test that values keep their exact Python types"""
+        unit = make_unit("IAM_1")
+        unit.humidity = 45.5
+        unit.filter_expiration = 2 ** 40
+        other = make_unit("IAM_2")
+        other.humidity = 40
+        path = str(tmp_path / "units.snap")
+        save_snapshot(path, [unit, other], created_at=1000.0)
+
+        with Snapshot(path) as snapshot:
+            assert snapshot.count == 2
+            assert snapshot.created_at == 1000.0
+            assert snapshot.values("updated_at") == [1000.0, 1000.0]
+            restored = snapshot.units()
+        assert restored[0].humidity == 45.5
+        assert type(restored[1].humidity) is int
+        assert restored[0].filter_expiration == 2 ** 40
+        assert restored[0].active_alarms is True
+        assert restored[0].co2 is None
+
+    def test_numeric_columns_are_zero_copy(self, fleet, tmp_path):
+        """Test that numeric columns are served from the mapped file"""
+        path = str(tmp_path / "fleet.snap")
+        save_snapshot(path, fleet)
+        with Snapshot(path) as snapshot:
+            column = snapshot.column("airflow")
+            assert isinstance(column, memoryview)
+            assert column.tolist() == [3, 3, column[2]]
+            column.release()
+            assert snapshot.values("co2") == [650, 1300, None]
+
+    def test_stale(self, fleet, tmp_path):
+        """Test finding units to refetch without building them"""
+        path = str(tmp_path / "fleet.snap")
+        save_snapshot(path, fleet)
+        updated_at = fleet.column("updated_at")[0]
+        with Snapshot(path) as snapshot:
+            assert snapshot.stale(60, now=updated_at + 1) == ["IAM_3"]
+            assert snapshot.stale(60, now=updated_at + 3600) == ["IAM_1", "IAM_2", "IAM_3"]
+
+    def test_corrupt_snapshot(self, fleet, tmp_path):
+        """Test that damaged files are rejected"""
+        path = tmp_path / "fleet.snap"
+        save_snapshot(str(path), fleet)
+        data = bytearray(path.read_bytes())
+        data[-1] ^= 0xFF
+        path.write_bytes(bytes(data))
+
+        with pytest.raises(ValueError, match="checksum"):
+            load_snapshot(str(path))
+
+    def test_corrupt_header(self, fleet, tmp_path):
+        """Test that the unit count and creation time are covered by the checks"""
+        path = tmp_path / "fleet.snap"
+        save_snapshot(str(path), fleet, created_at=1000.0)
+        original = path.read_bytes()
+
+        data = bytearray(original)
+        struct.pack_into("<d", data, 16, 2000.0)
+        path.write_bytes(bytes(data))
+        with pytest.raises(ValueError, match="checksum"):
+            load_snapshot(str(path))
+
+        data = bytearray(original)
+        struct.pack_into("<I", data, 12, 4)
+        path.write_bytes(bytes(data))
+        with pytest.raises(ValueError, match="checksum"):
+            load_snapshot(str(path))
+        with pytest.raises(ValueError, match="4 values"):
+            load_snapshot(str(path), verify=False)
+
+    def test_invalid_files(self, fleet, tmp_path):
+        """Test that foreign, empty and newer files are rejected"""
+        path = tmp_path / "other.snap"
+        path.write_bytes(b"not a snapshot at all, just some text")
+        with pytest.raises(ValueError, match="not a snapshot"):
+            load_snapshot(str(path))
+
+        path.write_bytes(b"")
+        with pytest.raises(ValueError):
+            load_snapshot(str(path))
+
+        save_snapshot(str(path), fleet)
+        data = bytearray(path.read_bytes())
+        struct.pack_into("<H", data, 8, SNAPSHOT_VERSION + 1)
+        path.write_bytes(bytes(data))
+        with pytest.raises(ValueError, match="version"):
+            load_snapshot(str(path))
@@ -150,4 +150,16 @@ class TestSystemairAPI:
         
         # Assertions
         assert result is None
-        mock_post.assert_called_once()
\ No newline at end of file
+        mock_post.assert_called_once()
+
+    def test_requests_use_session(self, mock_device_status_response):
+        """Test that a client created with a session sends requests through it"""
+        session = Mock()
+        session.post.return_value = mock_device_status_response
+        api_client = SystemairAPI("test_access_token", session=session)
+
+        result = api_client.fetch_device_status("IAM_123456789ABC")
+
+        assert "data" in result
+        session.post.assert_called_once()
+        assert session.post.call_args[0][0] == APIEndpoints.REMOTE
@@ -0,0 +1,121 @@
+import os
+
+import pytest
+
+from systemair_api.models import telemetry_log
+from systemair_api.models.changes import FieldChange
+from systemair_api.models.telemetry_log import TelemetryLog, TelemetryReader, TelemetrySegment
+from systemair_api.models.ventilation_unit import VentilationUnit
+from systemair_api.utils.register_constants import RegisterConstants
+
+
+def _changes(t, **values):
+    return [FieldChange(field.replace("__", "."), None, value, "api", float(t)) for field, value in values.items()]
+
+
+@pytest.fixture(params=["numpy", "struct"])
+def decoder(request, monkeypatch):
+    """Run reads with and without the numpy fast path."""
+    if request.param == "struct":
+        monkeypatch.setattr(telemetry_log, "np", None)
+    elif telemetry_log._numpy() is None:
+        pytest.skip("numpy is not installed")
+    return request.param
+
+
+class TestTelemetryLog:
+    def test_roundtrip(self, tmp_path, decoder):
+        """Test that logged changes are read back with their unit, field and source"""
+        with TelemetryLog(str(tmp_path), block_records=4) as log:
+            for t in range(10):
+                log.append("IAM_1", _changes(t, temperature=20 + t, co2=400))
+                log.append("IAM_2", _changes(t, temperatures__oat=None))
+        reader = TelemetryReader(str(tmp_path))
+        assert reader.series("IAM_1", "temperature") == [(float(t), 20.0 + t) for t in range(10)]
+        assert reader.series("IAM_2", "temperatures.oat", start=8) == [(8.0, None), (9.0, None)]
+        samples = list(reader.scan(start=3, end=4))
+        assert [(s.identifier, s.field, s.source) for s in samples] == [
+            ("IAM_1", "temperature", "api"), ("IAM_1", "co2", "api"), ("IAM_2", "temperatures.oat", "api")]
+        assert reader.series("IAM_3", "co2") == []
+
+    def test_skips_non_numeric_and_unknown_fields(self, tmp_path):
+        """Test that only known numeric fields are appended"""
+        with TelemetryLog(str(tmp_path)) as log:
+            appended = log.append("IAM_1", _changes(0, humidity=40, model="SAVE VTR", foo=1))
+            with pytest.raises(ValueError):
+                log.append_sample(0.0, "IAM_1", "foo", 1.0)
+        assert appended == 1
+        assert len(list(TelemetryReader(str(tmp_path)).scan())) == 1
+
+    def test_block_layout(self, tmp_path, decoder):
+        """Test that index blocks follow every full block and are used to skip blocks"""
+        with TelemetryLog(str(tmp_path), block_records=8) as log:
+            for t in range(20):
+                log.append_sample(float(t), "IAM_1", "airflow", t)
+            log.append_sample(20.0, "IAM_2", "co2", 600)
+        path = TelemetryReader(str(tmp_path)).segments()[0]
+        header, record, index = (telemetry_log._HEADER.size, telemetry_log._RECORD.size,
+                                 telemetry_log._INDEX.size)
+        assert os.path.getsize(path) == header + 21 * record + 2 * index
+        with TelemetrySegment(path) as segment:
+            blocks = list(segment._blocks())
+            assert [(count, index is None) for _, count, index in blocks] == [(8, False), (8, False), (5, True)]
+            assert blocks[0][2][:2] == (0.0, 7.0)
+            assert [s.timestamp for s in segment.scan("IAM_1", "airflow", 6, 9)] == [6.0, 7.0, 8.0]
+            assert [s.value for s in segment.scan("IAM_2")] == [600.0]
+
+    def test_rotation_and_retention(self, tmp_path):
+        """Test that segments rotate at the segment size and old ones are deleted"""
+        with TelemetryLog(str(tmp_path), block_records=2, segment_records=4, max_segments=2) as log:
+            for t in range(12):
+                log.append_sample(float(t), "IAM_1", "humidity", t)
+        reader = TelemetryReader(str(tmp_path))
+        assert [os.path.basename(path) for path in reader.segments()] == [
+            "segment-00000002.tlog", "segment-00000003.tlog"]
+        assert not os.path.exists(tmp_path / "segment-00000001.units")
+        assert [t for t, _ in reader.series("IAM_1", "humidity")] == [float(t) for t in range(4, 12)]
+
+    def test_reopen_starts_new_segment(self, tmp_path):
+        """Test that a new writer never modifies existing segments"""
+        with TelemetryLog(str(tmp_path)) as log:
+            log.append_sample(1.0, "IAM_1", "co2", 500)
+        first = TelemetryReader(str(tmp_path)).segments()[0]
+        size = os.path.getsize(first)
+        with TelemetryLog(str(tmp_path)) as log:
+            log.append_sample(2.0, "IAM_1", "co2", 510)
+        reader = TelemetryReader(str(tmp_path))
+        assert len(reader.segments()) == 2
+        assert os.path.getsize(first) == size
+        assert reader.series("IAM_1", "co2") == [(1.0, 500.0), (2.0, 510.0)]
+
+    def test_flush_makes_records_visible(self, tmp_path):
+        """Test that buffered records can be read after a flush while the writer stays open"""
+        log = TelemetryLog(str(tmp_path))
+        log.append_sample(1.0, "IAM_1", "co2", 500)
+        reader = TelemetryReader(str(tmp_path))
+        assert reader.series("IAM_1", "co2") == []
+        log.flush()
+        assert reader.series("IAM_1", "co2") == [(1.0, 500.0)]
+        log.close()
+
+    def test_invalid_segment(self, tmp_path):
+        """Test that foreign files are rejected and skipped by the reader"""
+        path = tmp_path / "segment-00000001.tlog"
+        path.write_bytes(b"not a telemetry segment at all, really not")
+        (tmp_path / "segment-00000001.units").write_text("")
+        with pytest.raises(ValueError):
+            TelemetrySegment(str(path))
+        assert list(TelemetryReader(str(tmp_path)).scan()) == []
+
+    def test_attach_to_unit(self, tmp_path):
+        """Test that an attached log records the changes of unit updates"""
+        unit = VentilationUnit("IAM_1", "Test Unit")
+        log = TelemetryLog(str(tmp_path))
+        log.attach(unit)
+        unit.update_from_api({"data": {"GetView": {"children": [
+            {"properties": {"dataItem": {"id": RegisterConstants.REG_MAINBOARD_TC_SP, "value": 215}}},
+        ]}}})
+        log.detach(unit)
+        log.close()
+        samples = list(TelemetryReader(str(tmp_path)).scan("IAM_1"))
+        assert [(s.field, s.value) for s in samples] == [("temperatures.setpoint", 21.5)]
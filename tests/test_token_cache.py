@@ -0,0 +1,140 @@
+import os
+import stat
+import pytest
+from unittest.mock import patch
+from datetime import datetime, timedelta
+
+from systemair_api.auth.authenticator import SystemairAuthenticator
+from systemair_api.auth.token_cache import TokenCache
+from systemair_api.auth.token_claims import TokenClaims
+from systemair_api.utils.exceptions import TokenRefreshError
+
+
+class TestTokenCache:
+    @pytest.fixture
+    def token_cache(self, tmp_path):
+        """Create a token cache in a temporary directory"""
+        return TokenCache(str(tmp_path / "cache" / "tokens.json"))
+
+    def test_load_missing(self, token_cache):
+        """Test that loading from an empty cache returns None"""
+        assert token_cache.load("test@example.com") is None
+
+    def test_store_and_load(self, token_cache):
+        """Test round-tripping tokens through the cache"""
+        expiry = datetime.now().replace(microsecond=0) + timedelta(hours=1)
+        token_cache.store("test@example.com", "access", "refresh", expiry)
+
+        cached = token_cache.load("Test@Example.com ")
+        assert cached["access_token"] == "access"
+        assert cached["refresh_token"] == "refresh"
+        assert cached["token_expiry"] == expiry
+        assert token_cache.load("other@example.com") is None
+
+    def test_file_permissions(self, token_cache):
+        """Test that the cache file is only accessible by its owner"""
+        token_cache.store("test@example.com", "access", None, None)
+        mode = stat.S_IMODE(os.stat(token_cache.path).st_mode)
+        assert mode == 0o600
+        with open(token_cache.path) as f:
+            assert "test@example.com" not in f.read()
+
+    def test_clear(self, token_cache):
+        """Test removing an account from the cache"""
+        token_cache.store("test@example.com", "access", "refresh", None)
+        token_cache.store("other@example.com", "access2", "refresh2", None)
+        token_cache.clear("test@example.com")
+        assert token_cache.load("test@example.com") is None
+        assert token_cache.load("other@example.com")["access_token"] == "access2"
+
+    def test_corrupt_file(self, token_cache):
+        """Test that a corrupt cache file is treated as empty"""
+        os.makedirs(os.path.dirname(token_cache.path), exist_ok=True)
+        with open(token_cache.path, "w") as f:
+            f.write("{not json")
+        assert token_cache.load("test@example.com") is None
+        token_cache.store("test@example.com", "access", None, None)
+        assert token_cache.load("test@example.com")["access_token"] == "access"
+
+
+class TestAuthenticatorTokenCache:
+    @pytest.fixture
+    def token_cache(self, tmp_path):
+        """Create a token cache in a temporary directory"""
+        return TokenCache(str(tmp_path / "tokens.json"))
+
+    @pytest.fixture
+    def authenticator(self, token_cache):
+        """Create an authenticator backed by the token cache"""
+        return SystemairAuthenticator("test@example.com", "test_password", token_cache)
+
+    @patch.object(SystemairAuthenticator, 'simulate_login')
+    def test_valid_cached_token_skips_login(self, mock_simulate_login, authenticator, token_cache):
+        """Test that a valid cached access token is reused"""
+        token_cache.store("test@example.com", "cached_access", "cached_refresh",
+                          datetime.now() + timedelta(hours=1))
+
+        assert authenticator.authenticate() == "cached_access"
+        assert authenticator.refresh_token == "cached_refresh"
+        mock_simulate_login.assert_not_called()
+
+    @patch.object(SystemairAuthenticator, 'simulate_login')
+    @patch.object(SystemairAuthenticator, 'refresh_access_token')
+    def test_expired_cached_token_is_refreshed(self, mock_refresh, mock_simulate_login,
+                                               authenticator, token_cache):
+        """Test that an expired cached token is refreshed instead of logging in"""
+        token_cache.store("test@example.com", "old_access", "cached_refresh",
+                          datetime.now() - timedelta(minutes=5))
+        def refresh():
+            authenticator.access_token = "new_access"
+            return "new_access"
+        mock_refresh.side_effect = refresh
+
+        assert authenticator.authenticate() == "new_access"
+        mock_refresh.assert_called_once()
+        mock_simulate_login.assert_not_called()
+
+    @patch.object(SystemairAuthenticator, 'simulate_login')
+    @patch.object(SystemairAuthenticator, 'exchange_code_for_token')
+    @patch.object(SystemairAuthenticator, 'refresh_access_token')
+    @patch.object(SystemairAuthenticator, 'get_token_claims')
+    def test_failed_refresh_falls_back_to_login(self, mock_get_token_claims, mock_refresh,
+                                                mock_exchange_code, mock_simulate_login,
+                                                authenticator, token_cache):
+        """Test that a rejected refresh token falls back to the full login flow"""
+        token_cache.store("test@example.com", "old_access", "stale_refresh",
+                          datetime.now() - timedelta(minutes=5))
+        mock_refresh.side_effect = TokenRefreshError()
+        mock_simulate_login.return_value = "test_auth_code"
+        mock_exchange_code.return_value = {
+            "access_token": "fresh_access",
+            "refresh_token": "fresh_refresh"
+        }
+        expiry = datetime.now().replace(microsecond=0) + timedelta(hours=1)
+        mock_get_token_claims.return_value = TokenClaims(expiry.timestamp())
+
+        assert authenticator.authenticate() == "fresh_access"
+        mock_simulate_login.assert_called_once()
+
+        cached = token_cache.load("test@example.com")
+        assert cached["access_token"] == "fresh_access"
+        assert cached["refresh_token"] == "fresh_refresh"
+        assert cached["token_expiry"] == expiry
+
+    @patch.object(SystemairAuthenticator, 'refresh_access_token')
+    def test_failed_refresh_clears_entry(self, mock_refresh, authenticator, token_cache):
+        """Test that a cached entry whose refresh token is rejected is removed"""
+        token_cache.store("test@example.com", "old_access", "stale_refresh",
+                          datetime.now() - timedelta(minutes=5))
+        mock_refresh.side_effect = TokenRefreshError()
+
+        assert authenticator.restore_cached_tokens() is False
+        assert token_cache.load("test@example.com") is None
+        assert authenticator.access_token is None
+
+    @patch.object(TokenCache, 'load')
+    def test_unreadable_cache_falls_back_to_login(self, mock_load, authenticator):
+        """Test that a cache that cannot be read is treated as empty"""
+        mock_load.side_effect = PermissionError("permission denied")
+
+        assert authenticator.restore_cached_tokens() is False
@@ -0,0 +1,63 @@
+import base64
+import json
+import time
+import pytest
+from datetime import datetime, timedelta
+
+from systemair_api.auth.authenticator import SystemairAuthenticator
+from systemair_api.auth.token_claims import TokenClaims, decode_token_claims
+
+
+def make_token(claims):
+    """Build an unsigned JWT carrying the given claims"""
+    def encode(data):
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).rstrip(b"=").decode()
+    return f"{encode({'alg': 'none', 'typ': 'JWT'})}.{encode(claims)}.signature"
+
+
+class TestTokenClaims:
+    def test_decode_token_claims(self):
+        """Test decoding the claims of a JWT"""
+        exp = int(time.time()) + 3600
+        token = make_token({"exp": exp, "iat": exp - 3600, "sub": "user-1",
+                            "scope": "openid profile email"})
+
+        claims = decode_token_claims(token)
+
+        assert claims.exp == exp
+        assert claims.iat == exp - 3600
+        assert claims.sub == "user-1"
+        assert claims.scopes == ("openid", "profile", "email")
+        assert claims.expiry == datetime.fromtimestamp(exp)
+        assert 3590 < claims.time_to_expiry() <= 3600
+        assert claims.is_valid()
+
+    def test_decode_is_cached(self):
+        """Test that a token is only decoded once"""
+        token = make_token({"exp": int(time.time()) + 60})
+        assert decode_token_claims(token) is decode_token_claims(token)
+
+    def test_decode_invalid_token(self):
+        """Test that malformed tokens raise ValueError"""
+        with pytest.raises(ValueError):
+            decode_token_claims("not-a-jwt")
+        with pytest.raises(ValueError):
+            decode_token_claims(make_token({"sub": "no-expiry"}))
+
+    def test_is_valid_leeway(self):
+        """Test the validity margin"""
+        claims = TokenClaims(exp=time.time() + 20)
+        assert claims.is_valid(leeway=10)
+        assert not claims.is_valid(leeway=30)
+
+    def test_authenticator_time_to_expiry(self):
+        """Test that the authenticator exposes the remaining token lifetime"""
+        auth = SystemairAuthenticator("test@example.com", "test_password")
+        assert auth.time_to_expiry() is None
+
+        auth.token_expiry = datetime.now() + timedelta(minutes=10)
+        assert 590 < auth.time_to_expiry() <= 600
+
+        token = make_token({"exp": int(time.time()) + 120, "sub": "user-1"})
+        assert auth.get_token_claims(token).sub == "user-1"
+        assert auth.get_token_claims("not-a-jwt") is None
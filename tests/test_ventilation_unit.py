@@ -1,9 +1,15 @@
+import logging
+import threading
+import time
+
 import pytest
 from unittest.mock import patch, Mock
 
-from systemair_api.models.ventilation_unit import VentilationUnit
+from systemair_api.models.pending import WriteMetrics
+from systemair_api.models.ventilation_unit import FUNCTION_REGISTERS, VentilationUnit
 from systemair_api.utils.constants import UserModes
 from systemair_api.utils.register_constants import RegisterConstants
+from systemair_api.utils.exceptions import ValidationError
 
 
 class TestVentilationUnit:
@@ -83,9 +89,8 @@ class TestVentilationUnit:
         assert "active_functions" in status
         assert "versions" in status
 
-    @patch('builtins.print')
-    def test_print_status(self, mock_print, ventilation_unit):
-        """Test printing unit status"""
+    def test_print_status(self, caplog, ventilation_unit):
+        """Test logging unit status"""
         # Setup - add some test data to the unit
         ventilation_unit.user_mode = 1
         ventilation_unit.airflow = 3
@@ -99,10 +104,20 @@ class TestVentilationUnit:
         ]
         
         # Call the method
-        ventilation_unit.print_status()
+        with caplog.at_level(logging.INFO, logger="systemair_api.models"):
+            ventilation_unit.print_status()
         
-        # Assertions - verify print was called multiple times
-        assert mock_print.call_count > 5
+        # Assertions - verify the status was logged as one record
+        assert len(caplog.records) == 1
+        assert "  - Heating" in caplog.text
+        assert "  - FIRMWARE: 1.5.2" in caplog.text
+
+    def test_print_status_disabled(self, caplog, ventilation_unit):
+        """Test that the status is not formatted when the logger is disabled"""
+        caplog.set_level(logging.WARNING, logger="systemair_api.models")
+        with patch.object(VentilationUnit, 'format_status') as mock_format_status:
+            ventilation_unit.print_status()
+        mock_format_status.assert_not_called()
 
     @patch('systemair_api.api.systemair_api.SystemairAPI.write_data_item')
     def test_set_value(self, mock_write_data_item, ventilation_unit):
@@ -179,4 +194,281 @@ class TestVentilationUnit:
         
         # Test active function update
         ventilation_unit._update_attribute({"id": RegisterConstants.REG_MAINBOARD_FUNCTION_ACTIVE_HEATING, "value": 1})
-        assert ventilation_unit.active_functions["heating"] == 1
\ No newline at end of file
+        assert ventilation_unit.active_functions["heating"] == 1
+
+    def test_update_attribute_function_registers(self, ventilation_unit):
+        """Test that every function register updates its own active_functions key"""
+        ventilation_unit._update_attribute({"id": RegisterConstants.REG_MAINBOARD_FUNCTION_ACTIVE_FREE_COOLING, "value": 1})
+        ventilation_unit._update_attribute({"id": RegisterConstants.REG_MAINBOARD_FUNCTION_ACTIVE_CDI_2, "value": 1})
+
+        assert ventilation_unit.active_functions["free_cooling"] == 1
+        assert ventilation_unit.active_functions["cdi_2"] == 1
+        assert ventilation_unit.active_functions["cooling"] is False
+        assert set(ventilation_unit.active_functions) == set(FUNCTION_REGISTERS.values())
+
+    def test_update_attribute_unknown_register(self, ventilation_unit):
+        """Test that untracked registers are ignored"""
+        before = ventilation_unit.get_status()
+        ventilation_unit._update_attribute({"id": RegisterConstants.REG_MAINBOARD_PASSWD_ADMIN, "value": 1234})
+        assert ventilation_unit.get_status() == before
+
+    @patch.object(VentilationUnit, 'set_value')
+    def test_set_temperature_out_of_range(self, mock_set_value, ventilation_unit):
+        """Test that setpoints outside the register limits are rejected before writing"""
+        with pytest.raises(ValidationError):
+            ventilation_unit.set_temperature(Mock(), 450)
+        mock_set_value.assert_not_called()
+
+        mock_set_value.return_value = True
+        ventilation_unit.set_temperature(Mock(), 215)
+        mock_set_value.assert_called_once()
+
+    def test_slotted_state(self, ventilation_unit):
+        """Test that the dict attributes are write-through views over the unit's slots"""
+        temperatures = ventilation_unit.temperatures
+        temperatures["setpoint"] = 21.5
+        assert ventilation_unit.temperatures["setpoint"] == 21.5
+
+        ventilation_unit.user_mode_times = {"away": 120}
+        assert ventilation_unit.user_mode_times["away"] == 120
+        assert ventilation_unit.user_mode_times["holiday"] is None
+        # Assignment replaces all values, as assigning a dict did
+        ventilation_unit.temperatures = {"oat": 5.0}
+        assert dict(ventilation_unit.temperatures) == {"oat": 5.0, "sat": None, "setpoint": None}
+        with pytest.raises(KeyError):
+            ventilation_unit.temperatures = {"oat": 6.0, "extract": 20.0}
+        assert ventilation_unit.temperatures["oat"] == 5.0
+
+        ventilation_unit.active_functions["heating"] = True
+        ventilation_unit.active_functions["heating"] = False
+        ventilation_unit.active_functions["cdi_3"] = 1
+        assert [name for name, active in ventilation_unit.active_functions.items() if active] == ["cdi_3"]
+
+        with pytest.raises(KeyError):
+            ventilation_unit.temperatures["unknown"] = 1
+        with pytest.raises(AttributeError):
+            ventilation_unit.unknown_attribute = 1
+
+    def test_get_status_returns_plain_dicts(self, ventilation_unit):
+        """Test that get_status copies the slot-backed views into dictionaries"""
+        status = ventilation_unit.get_status()
+        for key in ("temperatures", "user_mode_times", "active_functions"):
+            assert type(status[key]) is dict
+        status["temperatures"]["oat"] = 5.0
+        assert ventilation_unit.temperatures["oat"] is None
+
+    def test_update_from_api_returns_changes(self, ventilation_unit, mock_device_status_response):
+        """Test that API updates report the changed fields and skip no-op updates"""
+        listener = Mock()
+        ventilation_unit.subscribe(listener)
+
+        changes = ventilation_unit.update_from_api(mock_device_status_response.json())
+        fields = {change.field: change for change in changes}
+        assert fields["temperatures.oat"].old is None
+        assert fields["temperatures.oat"].new == ventilation_unit.temperatures["oat"]
+        assert all(change.source == "api" for change in changes)
+        listener.assert_called_once_with(ventilation_unit, changes)
+
+        listener.reset_mock()
+        assert ventilation_unit.update_from_api(mock_device_status_response.json()) == []
+        listener.assert_not_called()
+
+    def test_update_from_websocket_returns_changes(self, ventilation_unit):
+        """Test that WebSocket updates report only the fields whose value changed"""
+        ventilation_unit.airflow = 3
+        changes = ventilation_unit.update_from_websocket(
+            {"properties": {"airflow": 3, "humidity": 45, "temperatures": {"sat": 19.5}}})
+
+        assert [(c.field, c.old, c.new, c.source) for c in changes] == [
+            ("humidity", None, 45, "websocket"),
+            ("temperatures.sat", None, 19.5, "websocket"),
+        ]
+
+    def test_function_register_changes(self, ventilation_unit):
+        """Test that active function changes are reported as booleans"""
+        item = {"id": RegisterConstants.REG_MAINBOARD_FUNCTION_ACTIVE_HEATING, "value": 1}
+        change = ventilation_unit._update_attribute(item)
+        assert (change.field, change.old, change.new) == ("active_functions.heating", False, True)
+        assert ventilation_unit._update_attribute(item) is None
+
+    def test_unsubscribe(self, ventilation_unit):
+        """Test that unsubscribed and failing listeners do not affect updates"""
+        listener = Mock()
+        failing = Mock(side_effect=RuntimeError("boom"))
+        ventilation_unit.subscribe(failing)
+        ventilation_unit.subscribe(listener)
+        ventilation_unit.update_from_websocket({"airflow": 1})
+        listener.assert_called_once()
+
+        ventilation_unit.unsubscribe(listener)
+        ventilation_unit.update_from_websocket({"airflow": 2})
+        listener.assert_called_once()
+        assert ventilation_unit.airflow == 2
+
+    def test_get_status_cached(self, ventilation_unit):
+        """Test that the status is cached until a field changes"""
+        with patch.object(VentilationUnit, '_build_status', wraps=ventilation_unit._build_status) as build:
+            first = ventilation_unit.get_status()
+            assert ventilation_unit.get_status() == first
+            assert build.call_count == 1
+
+            ventilation_unit.update_from_websocket({"airflow": 2})
+            assert ventilation_unit.get_status()["airflow"] == 2
+            ventilation_unit.temperatures["oat"] = 4.5
+            assert ventilation_unit.get_status()["temperatures"]["oat"] == 4.5
+            assert build.call_count == 3
+
+            ventilation_unit.update_from_websocket({"airflow": 2})
+            ventilation_unit.get_status()
+            assert build.call_count == 3
+
+    def test_invalidate_status(self, ventilation_unit):
+        """Test that direct attribute assignments show up after invalidate_status"""
+        ventilation_unit.get_status()
+        ventilation_unit.humidity = 40
+        ventilation_unit.invalidate_status()
+        assert ventilation_unit.get_status()["humidity"] == 40
+
+    def test_get_status_shared(self, ventilation_unit):
+        """Test that the shared status view is read-only and reused until a change"""
+        shared = ventilation_unit.get_status(shared=True)
+        assert ventilation_unit.get_status(shared=True) is shared
+        assert dict(shared) == {key: tuple(value) if isinstance(value, list) else value
+                                for key, value in ventilation_unit.get_status().items()}
+        with pytest.raises(TypeError):
+            shared["airflow"] = 1
+        with pytest.raises(TypeError):
+            shared["temperatures"]["oat"] = 1
+
+        ventilation_unit.update_from_websocket({"airflow": 1})
+        assert ventilation_unit.get_status(shared=True)["airflow"] == 1
+
+
+class BlockingWriteMetrics(WriteMetrics):
+    """Write metrics pausing in record_requested, i.e. in the middle of a write"""
+
+    def __init__(self):
+        super().__init__()
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def record_requested(self, superseded=False):
+        super().record_requested(superseded)
+        self.entered.set()
+        self.release.wait(5)
+
+
+class TestOptimisticWrites:
+    @pytest.fixture
+    def ventilation_unit(self):
+        """Create a unit with a known setpoint and fresh write metrics"""
+        VentilationUnit.write_metrics.reset()
+        unit = VentilationUnit("IAM_123456789ABC", "Test Unit")
+        unit.update_from_websocket({"userMode": UserModes.MANUAL, "temperatures": {"setpoint": 20.0}})
+        yield unit
+        VentilationUnit.write_metrics.reset()
+
+    @staticmethod
+    def setpoint_response(raw):
+        """Build a GetView response reporting a setpoint register value"""
+        return {"data": {"GetView": {"children": [
+            {"properties": {"dataItem": {"id": RegisterConstants.REG_MAINBOARD_TC_SP, "value": raw}}}]}}}
+
+    @patch.object(VentilationUnit, 'set_value')
+    def test_confirmed_by_poll(self, mock_set_value, ventilation_unit):
+        """Test that a write is applied at once and confirmed by a matching poll"""
+        mock_set_value.return_value = True
+        changes = []
+        ventilation_unit.subscribe(lambda unit, applied: changes.extend(applied))
+
+        ventilation_unit.set_temperature(Mock(), 215)
+        assert ventilation_unit.temperatures["setpoint"] == 21.5
+        assert ventilation_unit.pending_writes() == {"temperatures.setpoint": 21.5}
+        assert [(change.old, change.new, change.source) for change in changes] == [(20.0, 21.5, "local")]
+
+        # A poll racing the write still reports the old value and is held back
+        assert ventilation_unit.update_from_api(self.setpoint_response(200)) == []
+        assert ventilation_unit.temperatures["setpoint"] == 21.5
+
+        # The confirmation is reported as a device change from the value before the write
+        confirmed = ventilation_unit.update_from_api(self.setpoint_response(215))
+        assert [(change.field, change.old, change.new, change.source) for change in confirmed] == [
+            ("temperatures.setpoint", 20.0, 21.5, "api")]
+        assert not ventilation_unit.is_pending("temperatures.setpoint")
+        metrics = VentilationUnit.write_metrics.as_dict()
+        assert metrics["confirmed"] == 1 and metrics["pending"] == 0
+        assert metrics["latency_max"] >= 0
+
+    @patch.object(VentilationUnit, 'set_value')
+    def test_confirmed_by_websocket(self, mock_set_value, ventilation_unit):
+        """Test that a WebSocket update confirms a user mode write"""
+        mock_set_value.return_value = True
+        ventilation_unit.set_user_mode(Mock(), UserModes.AWAY)
+        assert ventilation_unit.user_mode == UserModes.AWAY
+        assert ventilation_unit.is_pending("user_mode")
+
+        ventilation_unit.update_from_websocket({"userMode": UserModes.AWAY, "airflow": 2})
+        assert ventilation_unit.pending_writes() == {}
+        assert VentilationUnit.write_metrics.confirmed == 1
+
+    @patch.object(VentilationUnit, 'set_value')
+    def test_rollback_after_timeout(self, mock_set_value, ventilation_unit):
+        """Test that unconfirmed writes revert to the last value reported by the device"""
+        mock_set_value.return_value = True
+        ventilation_unit.set_user_mode(Mock(), UserModes.AWAY)
+        ventilation_unit.update_from_websocket({"userMode": UserModes.CROWDED})
+        assert ventilation_unit.user_mode == UserModes.AWAY
+
+        assert ventilation_unit.expire_pending() == []
+        changes = ventilation_unit.expire_pending(now=time.monotonic() + VentilationUnit.confirmation_timeout)
+        assert [(change.field, change.new, change.source) for change in changes] == [
+            ("user_mode", UserModes.CROWDED, "rollback")]
+        assert ventilation_unit.user_mode == UserModes.CROWDED
+        assert not ventilation_unit.is_pending("user_mode")
+        assert VentilationUnit.write_metrics.rolled_back == 1
+
+    @patch.object(VentilationUnit, 'set_value')
+    def test_failed_write_is_not_applied(self, mock_set_value, ventilation_unit):
+        """Test that failed writes leave the unit untouched"""
+        mock_set_value.return_value = False
+        assert ventilation_unit.set_temperature(Mock(), 215) is False
+        assert ventilation_unit.set_user_mode(Mock(), UserModes.AWAY, 60) is False
+        assert ventilation_unit.temperatures["setpoint"] == 20.0
+        assert ventilation_unit.user_mode_times["away"] is None
+        assert ventilation_unit.pending_writes() == {}
+        assert VentilationUnit.write_metrics.requested == 0
+
+    @patch.object(VentilationUnit, 'set_value')
+    def test_superseded_write(self, mock_set_value, ventilation_unit):
+        """Test that a second write replaces the pending one but keeps its rollback value"""
+        mock_set_value.return_value = True
+        ventilation_unit.set_temperature(Mock(), 215)
+        ventilation_unit.set_temperature(Mock(), 225)
+        assert ventilation_unit.pending_writes() == {"temperatures.setpoint": 22.5}
+
+        ventilation_unit.expire_pending(now=time.monotonic() + VentilationUnit.confirmation_timeout)
+        assert ventilation_unit.temperatures["setpoint"] == 20.0
+        metrics = VentilationUnit.write_metrics.as_dict()
+        assert (metrics["requested"], metrics["superseded"], metrics["rolled_back"]) == (2, 1, 1)
+        assert metrics["latency_p50"] is None
+
+    def test_updates_wait_for_concurrent_write(self, monkeypatch, ventilation_unit):
+        """Test that an update from another thread waits until a write is applied"""
+        metrics = BlockingWriteMetrics()
+        monkeypatch.setattr(VentilationUnit, "write_metrics", metrics)
+        writer = threading.Thread(target=ventilation_unit._begin_pending,
+                                  args=("temperatures.setpoint", "_temperature_setpoint", 21.5))
+        writer.start()
+        assert metrics.entered.wait(5)
+
+        update = threading.Thread(target=ventilation_unit.update_from_websocket,
+                                  args=({"temperatures": {"setpoint": 21.5}},))
+        update.start()
+        update.join(0.2)
+        assert update.is_alive()
+
+        metrics.release.set()
+        writer.join(5)
+        update.join(5)
+        assert ventilation_unit.pending_writes() == {}
+        assert (metrics.requested, metrics.confirmed) == (1, 1)